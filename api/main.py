@@ -317,6 +317,13 @@ async def detailed_health_check():
     except Exception as e:
         health["checks"]["redis"] = f"unavailable: {str(e)}"
     
+    # Background job queue depth
+    try:
+        from services.job_queue import get_job_queue
+        health["checks"]["job_queue"] = get_job_queue().get_stats()
+    except Exception as e:
+        health["checks"]["job_queue"] = f"error: {str(e)}"
+    
     # ClamAV
     try:
         scanner = MalwareScannerService()
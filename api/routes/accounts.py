@@ -11,6 +11,9 @@ from pydantic import BaseModel, Field, EmailStr
 from api.middleware.auth import AuthenticatedUser, get_current_membership
 from database.supabase_client import get_supabase_service_client
 from services.account_service import AccountService
+from services.kiosk_roster import invalidate_kiosk_roster
+from services.scheduling.grid_cache import invalidate_account_grids
+from services.scheduling.labor_summary_service import LaborSummaryService
 
 logger = logging.getLogger(__name__)
 
@@ -297,6 +300,14 @@ async def assign_compensation(
             "notes": payload.notes,
             "set_by": auth.id
         }).execute()
+        # Scheduler grids and the kiosk roster carry current compensation
+        invalidate_account_grids(auth.account_id)
+        invalidate_kiosk_roster(auth.account_id)
+        # Stored labor buckets are priced at the old rate
+        try:
+            LaborSummaryService(auth.account_id).refresh_member_weeks(payload.user_id, effective_at.date())
+        except Exception as exc:  # pylint: disable=broad-except
+            logger.warning("Labor refresh after compensation change failed for %s: %s", payload.user_id, exc)
 
         return {"success": True}
     except HTTPException:
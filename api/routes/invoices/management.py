@@ -2,7 +2,7 @@
 Invoice Management Routes
 Handles save, list, get, delete operations
 """
-from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi import APIRouter, BackgroundTasks, Depends, HTTPException, Query
 from fastapi.responses import JSONResponse
 from typing import Optional
 from pydantic import BaseModel
@@ -16,6 +16,8 @@ from services.invoice_duplicate_detector import InvoiceDuplicateDetector
 from services.invoice_processor import InvoiceProcessor
 from services.invoice_batch_processor import InvoiceBatchProcessor
 from services.invoice_monitoring_service import monitoring_service
+from services.background_tasks import schedule_ordering_refresh
+from services.price_history_frame import invalidate_price_frames
 from api.middleware.auth import get_current_membership, AuthenticatedUser
 
 logger = logging.getLogger(__name__)
@@ -45,6 +47,7 @@ class SaveInvoiceRequest(BaseModel):
 @router.post("/save")
 async def save_invoice(
     request: SaveInvoiceRequest,
+    background_tasks: BackgroundTasks,
     auth: AuthenticatedUser = Depends(get_current_membership)
 ):
     """
@@ -152,6 +155,16 @@ async def save_invoice(
         # Inventory system should read FROM invoices via separate endpoints
         logger.info(f"✅ Invoice {invoice_id} saved successfully (inventory processing disabled)")
         
+        # Price analytics rebuild their shared frame on the next read
+        invalidate_price_frames(current_user)
+        
+        # Predictive ordering recomputes only what this invoice touched
+        background_tasks.add_task(
+            schedule_ordering_refresh,
+            current_user,
+            invoice_ids=[invoice_id],
+        )
+        
         if session_id:
             monitoring_service.end_session(session_id)
         
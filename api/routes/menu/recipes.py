@@ -12,13 +12,9 @@ from supabase import create_client
 from dotenv import load_dotenv
 
 from services.menu_recipe_service import MenuRecipeService
+from services.cogs_snapshot_store import CogsSnapshotStore
 from api.middleware.auth import get_current_user
-from services.background_tasks import (
-    get_cached_payload,
-    recipe_snapshot_key,
-    run_post_recipe_change_tasks,
-    store_recipe_snapshot,
-)
+from services.background_tasks import run_post_recipe_change_tasks
 
 load_dotenv()
 logger = logging.getLogger(__name__)
@@ -29,6 +25,7 @@ supabase_url = os.getenv("SUPABASE_URL")
 supabase_key = os.getenv("SUPABASE_SERVICE_ROLE_KEY")
 supabase_client = create_client(supabase_url, supabase_key)
 recipe_service = MenuRecipeService(supabase_client)
+snapshot_store = CogsSnapshotStore(supabase_client, recipe_service)
 
 
 # Pydantic models
@@ -149,23 +146,20 @@ async def get_menu_item_recipe(
     """
     try:
         if price_id is None:
-            cache_key = recipe_snapshot_key(current_user, menu_item_id)
-            cached = get_cached_payload(cache_key)
-            if cached:
+            # Read-through: Redis -> snapshot table -> recompute
+            recipe, source = await snapshot_store.get_recipe(current_user, menu_item_id)
+            if source != "computed":
                 return JSONResponse({
                     "success": True,
-                    **cached,
+                    **recipe,
                     "cache_hit": True
                 })
-
-        recipe = await recipe_service.get_recipe(
-            menu_item_id=menu_item_id,
-            user_id=current_user,
-            price_id=price_id
-        )
-
-        if price_id is None:
-            store_recipe_snapshot(current_user, menu_item_id, recipe)
+        else:
+            recipe = await recipe_service.get_recipe(
+                menu_item_id=menu_item_id,
+                user_id=current_user,
+                price_id=price_id
+            )
 
         return JSONResponse({
             "success": True,
@@ -16,6 +16,9 @@ router = APIRouter(prefix="/api/v1/menu", tags=["menu-sales"])
 
 sales_service = MenuSalesService()
 
+# A month of sales for a large menu in one backfill call
+MAX_SALES_BATCH = 10000
+
 
 class DailySalesEntry(BaseModel):
     menu_item_id: str = Field(..., description="Menu item identifier")
@@ -23,6 +26,9 @@ class DailySalesEntry(BaseModel):
         None, description="Optional menu item price variant identifier"
     )
     quantity_sold: float = Field(..., gt=0, description="Quantity sold for the day")
+    sale_date: Optional[date] = Field(
+        None, description="Overrides the request sale_date (multi-day batches)"
+    )
     metadata: Optional[dict] = Field(
         None, description="Optional metadata captured alongside the entry"
     )
@@ -37,8 +43,16 @@ class DailySalesEntry(BaseModel):
 
 
 class RecordDailySalesRequest(BaseModel):
-    sale_date: date = Field(..., description="Calendar date for the sales entries")
-    entries: List[DailySalesEntry] = Field(..., min_items=1)
+    sale_date: Optional[date] = Field(
+        None, description="Default calendar date for entries without their own"
+    )
+    entries: List[DailySalesEntry] = Field(..., min_items=1, max_items=MAX_SALES_BATCH)
+
+    @validator("entries")
+    def validate_entry_dates(cls, entries: List[DailySalesEntry], values: dict) -> List[DailySalesEntry]:
+        if values.get("sale_date") is None and any(entry.sale_date is None for entry in entries):
+            raise ValueError("sale_date is required on the request or on every entry")
+        return entries
 
 
 @router.post("/sales/daily")
@@ -47,7 +61,10 @@ async def record_daily_sales(
     current_user: str = Depends(get_current_user),
 ):
     """
-    Record or update quantities sold for menu items on a specific day.
+    Record or update quantities sold for menu items.
+
+    Entries may carry their own sale_date, so a single call can backfill
+    several days; everything is written with one bulk upsert.
     """
     try:
         result = await sales_service.upsert_daily_sales(
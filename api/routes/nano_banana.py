@@ -374,10 +374,11 @@ async def generate_sequential(
     current_user: str = Depends(get_current_user),
 ):
     """
-    Generate multiple images sequentially with different prompts.
+    Generate multiple images with different prompts.
     
     Streams results back as each image completes, providing a smooth UX
-    where users see images appear one by one.
+    where users see images appear one by one. Images are generated in
+    parallel (bounded per user and per process) unless "parallel" is false.
     
     Request body:
     {
@@ -391,13 +392,15 @@ async def generate_sequential(
             "brand_profile_id": "...",
             "style_preferences": {...},
             "desired_outputs": {"dimensions": "1024x1024", "format": "png"}
-        }
+        },
+        "parallel": true
     }
     """
     try:
         raw_body = await request.json()
         prompts = raw_body.get("prompts", [])
         shared_config = raw_body.get("shared_config", {})
+        parallel = bool(raw_body.get("parallel", True))
         
         if not prompts:
             raise HTTPException(status_code=400, detail="At least one prompt is required")
@@ -413,6 +416,7 @@ async def generate_sequential(
                     user_id=current_user,
                     prompts=prompts,
                     shared_config=shared_config,
+                    parallel=parallel,
                 ):
                     event_type = event.get("type", "message")
                     data: Dict = event.get("data", {})
@@ -451,7 +455,7 @@ async def nano_banana_webhook(request: Request) -> JSONResponse:
 
     body = await request.body()
     try:
-        result = get_orchestrator().process_webhook(raw_body=body, signature=signature)
+        result = await get_orchestrator().process_webhook(raw_body=body, signature=signature)
         return JSONResponse({"success": True, **result})
     except Exception as exc:  # noqa: BLE001
         logger.error("Nano Banana webhook processing failed: %s", exc, exc_info=True)
@@ -3,6 +3,7 @@ Price Analytics API Routes V2 - Source of Truth Pattern
 Thin controllers - business logic in service layer
 """
 import logging
+from typing import Optional
 from fastapi import APIRouter, Depends, HTTPException, Query
 from api.middleware.auth import get_current_user
 from database.supabase_client import get_supabase_service_client
@@ -46,13 +47,15 @@ async def get_price_comparison_by_description(
 async def get_price_trends_by_description(
     item_description: str = Query(..., description="Item description"),
     days: int = Query(90, ge=1, le=365),
+    bucket: Optional[str] = Query(None, pattern="^(day|week)$", description="Aggregate per vendor by day or week"),
+    max_points: Optional[int] = Query(None, ge=10, le=5000, description="Downsample to at most this many points"),
     current_user: str = Depends(get_current_user)
 ):
     """Get price trend data for an item"""
     try:
         supabase = get_supabase_service_client()
         service = PriceAnalyticsService(supabase)
-        trends = service.get_price_trends(current_user, item_description, days)
+        trends = service.get_price_trends(current_user, item_description, days, bucket, max_points)
         return {
             "item_description": item_description,
             "trends": trends,
@@ -128,12 +131,13 @@ async def get_vendor_performance(
 async def get_price_anomalies(
     days_back: int = Query(90, ge=1, le=365),
     min_change_percent: float = Query(20.0, ge=0, le=100),
+    method: str = Query("mean", pattern="^(mean|ewma|median_mad)$"),
     current_user: str = Depends(get_current_user)
 ):
     """Detect unusual price changes"""
     try:
         cache_key = None
-        if days_back == 90 and min_change_percent == 20.0:
+        if days_back == 90 and min_change_percent == 20.0 and method == "mean":
             cache_key = price_anomalies_key(current_user, min_change_percent, days_back)
             cached = get_cached_payload(cache_key)
             if cached:
@@ -151,7 +155,7 @@ async def get_price_anomalies(
 
         supabase = get_supabase_service_client()
         service = PriceAnalyticsService(supabase)
-        anomalies = service.detect_price_anomalies(current_user, days_back, min_change_percent)
+        anomalies = service.detect_price_anomalies(current_user, days_back, min_change_percent, method)
         return {
             "anomalies": anomalies,
             "total_anomalies": len(anomalies)
@@ -3,15 +3,26 @@ from __future__ import annotations
 from datetime import datetime
 from decimal import Decimal
 from typing import Optional
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Request, Response
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse
 
 from api.middleware.auth import get_current_user
 from services.account_service import AccountService
 from services.scheduling.week_service import SchedulingWeekService
 from services.scheduling.labor_summary_service import LaborSummaryService
+from services.scheduling.grid_cache import (
+    cached_grid_etag,
+    grid_etag,
+    grid_generation,
+    remember_grid_etag,
+)
 
 router = APIRouter()
 
+# Clients must revalidate, which the ETag makes cheap
+GRID_CACHE_CONTROL = "private, no-cache"
+
 
 def _get_services(user_id: str):
     account_service = AccountService()
@@ -20,26 +31,38 @@ def _get_services(user_id: str):
 
 
 @router.get("/weeks/{week_id}/grid")
-async def get_scheduler_grid(week_id: str, current_user: str = Depends(get_current_user)):
+async def get_scheduler_grid(
+    week_id: str,
+    request: Request,
+    current_user: str = Depends(get_current_user),
+):
+    # Conditional GET: unchanged weeks are answered from Redis alone
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match:
+        cached_etag = cached_grid_etag(current_user, week_id)
+        if cached_etag and cached_etag == if_none_match:
+            return Response(status_code=304, headers={"ETag": cached_etag, "Cache-Control": GRID_CACHE_CONTROL})
+
     account_id, week_service, account_service = _get_services(current_user)
-    week = week_service.get_week(week_id)
+    generation = grid_generation(account_id)
+    week, version = week_service.get_week_with_version(week_id)
     if not week:
         raise HTTPException(status_code=404, detail="Week not found")
 
-    labor_summary = LaborSummaryService(account_id)
-    
-    # Only recompute if there are live sessions (active clock-ins)
-    # This avoids expensive recomputation on every page load
     has_live_sessions = any(
-        len(shift.get("live_sessions", [])) > 0
+        shift.get("live_sessions")
         for day in week.get("days", [])
         for shift in day.get("shifts", [])
     )
-    
-    if has_live_sessions:
-        # Recompute to get accurate live labor costs
-        labor_summary.recompute_week(week_id)
-    
+    etag = grid_etag(week_id, version, live=has_live_sessions)
+    remember_grid_etag(current_user, account_id, week_id, etag, generation=generation, live=has_live_sessions)
+    headers = {"ETag": etag, "Cache-Control": GRID_CACHE_CONTROL}
+    if if_none_match == etag:
+        return Response(status_code=304, headers=headers)
+
+    # Aggregates are maintained on shift edits / clock-outs; live time is
+    # projected at read time, so loading the grid never recomputes.
+    labor_summary = LaborSummaryService(account_id)
     totals = labor_summary.get_week_totals(week_id)
     members = account_service.list_members_with_compensation(account_id)
     member_lookup = {member["user_id"]: member for member in members}
@@ -58,11 +81,14 @@ async def get_scheduler_grid(week_id: str, current_user: str = Depends(get_curre
             else:
                 shift["scheduled_cost_cents"] = 0
 
-    return {
-        "week": week,
-        "members": members,
-        "totals": totals,
-    }
+    return JSONResponse(
+        content=jsonable_encoder({
+            "week": week,
+            "members": members,
+            "totals": totals,
+        }),
+        headers=headers,
+    )
 
 
 def shift_duration_minutes(shift: dict) -> int:
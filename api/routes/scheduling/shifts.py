@@ -40,6 +40,7 @@ class ShiftUpdateRequest(BaseModel):
     break_minutes: Optional[int] = Field(default=None, ge=0)
     role_label: Optional[str] = None
     notes: Optional[str] = None
+    day_id: Optional[str] = None
 
 
 def _get_account_id(user_id: str) -> str:
@@ -119,6 +120,7 @@ async def update_shift(
         break_minutes=payload.break_minutes,
         role_label=payload.role_label,
         notes=payload.notes,
+        day_id=payload.day_id,
     )
     return {"shift": shift}
 
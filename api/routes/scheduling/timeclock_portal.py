@@ -1,6 +1,6 @@
 from __future__ import annotations
 
-from typing import Optional
+from typing import Dict
 
 from fastapi import APIRouter, HTTPException, status
 from pydantic import BaseModel, Field
@@ -24,6 +24,21 @@ class ValidateLocationRequest(BaseModel):
     location_code: str = Field(..., min_length=4, max_length=4, pattern=r"^\d{4}$")
 
 
+def _kiosk_toggle(account_id: str, user_record: Dict, *, forbidden_detail: str) -> Dict:
+    """Clock a PIN-verified member in or out in one round trip."""
+    clock_service = ClockService(account_id=account_id)
+    try:
+        return clock_service.kiosk_toggle(
+            user_record["id"],
+            compensation=user_record.get("compensation"),
+            source="pin_kiosk",
+        )
+    except PermissionError as exc:
+        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail=forbidden_detail) from exc
+    except ValueError as exc:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(exc)) from exc
+
+
 @router.post("/validate-location")
 async def validate_location_code(payload: ValidateLocationRequest):
     """Validate a location code and return the restaurant name."""
@@ -75,55 +90,34 @@ async def clock_with_location_and_pin(payload: LocationPinClockRequest):
         )
     
     member_user_id = user_record["id"]
-    if not account_service.ensure_active_member(account_id, member_user_id):
-        raise HTTPException(
-            status_code=status.HTTP_403_FORBIDDEN,
-            detail="Member is not active at this location.",
-        )
-    
-    clock_service = ClockService(account_id=account_id)
-    live_session = clock_service.get_live_session_for_member(member_user_id)
     display_name = (
         " ".join(filter(None, [user_record.get("first_name"), user_record.get("last_name")])).strip()
         or "Team member"
     )
-    
-    if live_session:
-        try:
-            entry = clock_service.end_shift(
-                shift_id=live_session["shift_id"],
-                member_user_id=member_user_id,
-                source="pin_kiosk",
-            )
-        except ValueError as exc:
-            raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(exc)) from exc
-        
+    outcome = _kiosk_toggle(
+        account_id,
+        user_record,
+        forbidden_detail="Member is not active at this location.",
+    )
+
+    if outcome["status"] == "clocked_out":
+        entry = outcome["entry"]
         return {
             "status": "clocked_out",
             "account_id": account_id,
             "account_name": account.get("name"),
             "member_user_id": member_user_id,
             "member_name": display_name,
-            "shift_id": live_session["shift_id"],
+            "shift_id": outcome["shift_id"],
             "entry_id": entry["id"],
             "occurred_at": entry["clock_out_at"],
             "message": f"Goodbye {display_name}! You've clocked out.",
         }
-    
-    try:
-        shift_id, is_unscheduled = clock_service.find_shift_for_member(member_user_id)
-    except ValueError as exc:
-        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(exc)) from exc
-    
-    try:
-        session = clock_service.start_shift(
-            shift_id=shift_id,
-            member_user_id=member_user_id,
-            source="pin_kiosk",
-        )
-    except (ValueError, PermissionError) as exc:
-        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(exc)) from exc
-    
+
+    shift_id = outcome["shift_id"]
+    session = outcome["session"]
+    is_unscheduled = outcome["is_unscheduled"]
+
     # Build response with optional warning for unscheduled clock-ins
     response = {
         "status": "clocked_in",
@@ -167,47 +161,29 @@ async def toggle_clock_with_pin(payload: PinClockRequest):
         )
 
     member_user_id = user_record["id"]
-    if not account_service.ensure_active_member(account_id, member_user_id):
-        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Member is not active on this account")
-
-    clock_service = ClockService(account_id=account_id)
-    live_session = clock_service.get_live_session_for_member(member_user_id)
     display_name = " ".join(filter(None, [user_record.get("first_name"), user_record.get("last_name")])).strip() or "Team member"
+    outcome = _kiosk_toggle(
+        account_id,
+        user_record,
+        forbidden_detail="Member is not active on this account",
+    )
 
-    if live_session:
-        try:
-            entry = clock_service.end_shift(
-                shift_id=live_session["shift_id"],
-                member_user_id=member_user_id,
-                source="pin_kiosk",
-            )
-        except ValueError as exc:
-            raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(exc)) from exc
-
+    if outcome["status"] == "clocked_out":
+        entry = outcome["entry"]
         return {
             "status": "clocked_out",
             "account_id": account_id,
             "member_user_id": member_user_id,
             "member_name": display_name,
-            "shift_id": live_session["shift_id"],
+            "shift_id": outcome["shift_id"],
             "entry_id": entry["id"],
             "occurred_at": entry["clock_out_at"],
             "message": f"{display_name} clocked out successfully.",
         }
 
-    try:
-        shift_id, is_unscheduled = clock_service.find_shift_for_member(member_user_id)
-    except ValueError as exc:
-        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(exc)) from exc
-
-    try:
-        session = clock_service.start_shift(
-            shift_id=shift_id,
-            member_user_id=member_user_id,
-            source="pin_kiosk",
-        )
-    except (ValueError, PermissionError) as exc:
-        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(exc)) from exc
+    shift_id = outcome["shift_id"]
+    session = outcome["session"]
+    is_unscheduled = outcome["is_unscheduled"]
 
     # Build response with optional warning for unscheduled clock-ins
     response = {
@@ -3,15 +3,19 @@ from __future__ import annotations
 from datetime import datetime
 from typing import Optional
 
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Query, status
 from pydantic import BaseModel, Field
 
 from api.middleware.auth import get_current_user
 from services.account_service import AccountService
 from services.scheduling import ClockService, LaborSummaryService
+from services.scheduling.heartbeat_buffer import HEARTBEAT_STALE_SECONDS
+from services.redis_client import cache
 
 router = APIRouter()
 
+HEARTBEAT_ACCOUNT_TTL_SECONDS = 300
+
 
 class ClockInRequest(BaseModel):
     source: str = Field(default="self")
@@ -83,7 +87,13 @@ async def heartbeat_shift(
     shift_id: str,
     current_user: str = Depends(get_current_user),
 ):
-    service = _get_clock_service(current_user)
+    # Heartbeats arrive every minute per device; keep the account lookup off the database
+    cache_key = f"sched:primary_account:{current_user}"
+    account_id = cache.get(cache_key)
+    if not account_id:
+        account_id = _get_account_id(current_user)
+        cache.set(cache_key, account_id, ttl=HEARTBEAT_ACCOUNT_TTL_SECONDS)
+    service = ClockService(account_id=account_id)
     try:
         session = service.heartbeat(shift_id=shift_id, member_user_id=current_user)
     except ValueError as exc:
@@ -91,6 +101,16 @@ async def heartbeat_shift(
     return {"session": session}
 
 
+@router.get("/sessions/stale")
+async def list_stale_sessions(
+    stale_after_seconds: int = Query(default=HEARTBEAT_STALE_SECONDS, ge=60, le=24 * 3600),
+    current_user: str = Depends(get_current_user),
+):
+    """Clocked-in sessions whose device stopped sending heartbeats."""
+    service = _get_clock_service(current_user)
+    return {"sessions": service.get_stale_sessions(stale_after_seconds)}
+
+
 @router.get("/weeks/{week_id}/timesheet")
 async def get_week_timesheet(
     week_id: str,
@@ -98,8 +118,8 @@ async def get_week_timesheet(
 ):
     account_id = _get_account_id(current_user)
     summary_service = LaborSummaryService(account_id=account_id)
-    # recompute week to ensure latest snapshot
-    summary_service.recompute_week(week_id)
+    # Summaries are event-maintained; only live time is projected here
+    labor = summary_service.get_week_labor(week_id)
 
     day_summaries = (
         summary_service.client.table("scheduling_labor_day_summary")
@@ -112,7 +132,7 @@ async def get_week_timesheet(
 
     augmented_days = []
     for day in day_summaries:
-        components = summary_service.get_day_actual_components(day["day_id"])
+        components = labor["days"].get(day["day_id"]) or summary_service.empty_components()
         day["completed_minutes"] = components["completed_minutes"]
         day["completed_cost_cents"] = components["completed_cost_cents"]
         day["in_progress_minutes"] = components["live_minutes"]
@@ -130,7 +150,7 @@ async def get_week_timesheet(
         .execute()
     ).data
 
-    week_components = summary_service.get_week_actual_components(week_id)
+    week_components = labor["week"]
     week_payload = week_summary[0] if week_summary else None
     if week_payload:
         week_payload["completed_minutes"] = week_components["completed_minutes"]
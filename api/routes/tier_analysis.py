@@ -149,8 +149,8 @@ async def run_tier_analysis(
         # Phase 1 & 2: Discover competitors AND fetch reviews (OPTIMIZED PARALLEL)
         logger.info(f"🚀 starting_parallel_analysis: analysis_id={analysis_id}")
         
-        # Use optimized parallel method (3-5x faster) with smart caching
-        analysis_results = outscraper_service.analyze_competitors_parallel(
+        # Concurrent review collection over the shared Outscraper pool, with smart caching
+        analysis_results = await outscraper_service.analyze_competitors_async(
             location=request.location,
             restaurant_name=request.restaurant_name,
             category=request.category or "restaurant",
@@ -398,7 +398,10 @@ async def estimate_analysis_cost(
 async def get_cache_stats(current_user: str = Depends(get_current_user)):
     """Get Redis cache statistics"""
     from services.redis_client import cache
-    return cache.get_stats()
+    return {
+        **cache.get_stats(),
+        'analysis_cache': orchestrator.get_cache_stats()
+    }
 
 @router.post("/cache/invalidate")
 async def invalidate_cache(
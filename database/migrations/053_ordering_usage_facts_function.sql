@@ -0,0 +1,66 @@
+-- ================================================================================
+-- MIGRATION 053: ORDERING USAGE FACTS FUNCTION
+-- Purpose: Return inventory facts already joined with vendor name and item
+--          description so UsageCalculator needs one paginated read instead of
+--          chunked invoice_items -> invoices lookups.
+-- ================================================================================
+
+CREATE OR REPLACE FUNCTION public.get_ordering_usage_facts(
+    p_user_id UUID,
+    p_since DATE,
+    p_ingredient_ids UUID[] DEFAULT NULL,
+    p_item_slugs TEXT[] DEFAULT NULL,
+    p_limit INT DEFAULT 1000,
+    p_offset INT DEFAULT 0
+)
+RETURNS TABLE (
+    normalized_item_id TEXT,
+    normalized_ingredient_id UUID,
+    quantity NUMERIC,
+    base_unit TEXT,
+    delivery_date DATE,
+    invoice_item_id UUID,
+    vendor_name TEXT,
+    item_name TEXT
+)
+LANGUAGE sql
+STABLE
+SECURITY DEFINER
+SET search_path = public
+AS $$
+    SELECT
+        f.normalized_item_id,
+        f.normalized_ingredient_id,
+        ii.quantity,
+        f.base_unit,
+        f.delivery_date,
+        f.invoice_item_id,
+        NULLIF(inv.vendor_name, '') AS vendor_name,
+        NULLIF(ii.description, '') AS item_name
+    FROM inventory_item_facts f
+    JOIN invoice_items ii ON ii.id = f.invoice_item_id
+    LEFT JOIN invoices inv ON inv.id = ii.invoice_id AND inv.user_id = p_user_id
+    WHERE f.user_id = p_user_id
+      AND f.delivery_date >= p_since
+      AND (p_ingredient_ids IS NULL OR f.normalized_ingredient_id = ANY(p_ingredient_ids))
+      AND (p_item_slugs IS NULL OR f.normalized_item_id = ANY(p_item_slugs))
+    ORDER BY f.delivery_date DESC, f.invoice_item_id
+    LIMIT p_limit
+    OFFSET p_offset;
+$$;
+
+COMMENT ON FUNCTION public.get_ordering_usage_facts IS
+    'Inventory facts in a delivery window enriched with vendor name and item description (paginated).';
+
+-- Service-role only: the function takes an explicit user id
+REVOKE EXECUTE ON FUNCTION public.get_ordering_usage_facts FROM PUBLIC, anon, authenticated;
+GRANT EXECUTE ON FUNCTION public.get_ordering_usage_facts TO service_role;
+
+-- Window scans by user + delivery date
+CREATE INDEX IF NOT EXISTS idx_item_facts_user_delivery
+    ON inventory_item_facts(user_id, delivery_date DESC);
+
+CREATE INDEX IF NOT EXISTS idx_item_facts_user_ingredient_delivery
+    ON inventory_item_facts(user_id, normalized_ingredient_id, delivery_date DESC);
+
+SELECT 'Migration 053 complete: ordering usage facts function' AS status;
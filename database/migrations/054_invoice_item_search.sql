@@ -0,0 +1,85 @@
+-- ================================================================================
+-- MIGRATION 054: INDEXED INVOICE ITEM SEARCH
+-- Purpose: Trigram index on invoice_items.description plus a user-scoped,
+--          ranked search function so price comparison, price trends and
+--          purchase history stop sequentially scanning invoice_items for
+--          ILIKE '%term%' filters. Modeled on find_similar_items (004).
+-- ================================================================================
+
+CREATE EXTENSION IF NOT EXISTS pg_trgm;
+
+-- Trigram GIN index: serves ILIKE '%term%' and similarity() on descriptions
+CREATE INDEX IF NOT EXISTS idx_invoice_items_description_trgm
+    ON invoice_items USING gin (description gin_trgm_ops);
+
+-- Scope filter after the trigram match: invoices by user + date window
+CREATE INDEX IF NOT EXISTS idx_invoices_user_invoice_date
+    ON invoices(user_id, invoice_date DESC);
+
+CREATE OR REPLACE FUNCTION public.search_invoice_items(
+    p_user_id UUID,
+    p_query TEXT,
+    p_since DATE DEFAULT NULL,
+    p_sort TEXT DEFAULT 'rank',
+    p_limit INT DEFAULT 1000,
+    p_offset INT DEFAULT 0
+)
+RETURNS TABLE (
+    id UUID,
+    invoice_id UUID,
+    description TEXT,
+    unit_price NUMERIC,
+    quantity NUMERIC,
+    extended_price NUMERIC,
+    created_at TIMESTAMPTZ,
+    vendor_name TEXT,
+    invoice_number TEXT,
+    invoice_date DATE,
+    rank REAL
+)
+LANGUAGE sql
+STABLE
+SECURITY DEFINER
+SET search_path = public
+AS $$
+    WITH params AS (
+        -- Match the search term literally (escape LIKE wildcards)
+        SELECT
+            '%' || replace(replace(replace(btrim(p_query), '\', '\\'), '%', '\%'), '_', '\_') || '%' AS pattern,
+            lower(btrim(p_query)) AS term
+    )
+    SELECT
+        ii.id,
+        ii.invoice_id,
+        ii.description::TEXT,
+        ii.unit_price::NUMERIC,
+        ii.quantity::NUMERIC,
+        ii.extended_price::NUMERIC,
+        ii.created_at::TIMESTAMPTZ,
+        inv.vendor_name::TEXT,
+        inv.invoice_number::TEXT,
+        inv.invoice_date::DATE,
+        similarity(lower(ii.description), params.term) AS rank
+    FROM params
+    JOIN invoice_items ii ON ii.description ILIKE params.pattern
+    JOIN invoices inv ON inv.id = ii.invoice_id
+    WHERE inv.user_id = p_user_id
+      AND (p_since IS NULL OR inv.invoice_date >= p_since)
+    ORDER BY
+        CASE WHEN p_sort = 'recent' THEN NULL ELSE similarity(lower(ii.description), params.term) END DESC NULLS LAST,
+        ii.created_at DESC,
+        ii.id
+    LIMIT p_limit
+    OFFSET p_offset;
+$$;
+
+COMMENT ON FUNCTION public.search_invoice_items IS
+    'Invoice lines whose description contains the query, scoped to a user; ranked by trigram similarity or most recent first (paginated).';
+
+-- Service-role only: the function takes an explicit user id
+REVOKE EXECUTE ON FUNCTION public.search_invoice_items FROM PUBLIC, anon, authenticated;
+GRANT EXECUTE ON FUNCTION public.search_invoice_items TO service_role;
+
+ANALYZE invoice_items;
+
+SELECT 'Migration 054 complete: invoice item search' AS status;
@@ -0,0 +1,151 @@
+-- ================================================================================
+-- MIGRATION 055: MENU COGS DEPENDENCY INDEX
+-- Purpose: Reverse index from invoice lines and normalized ingredients to the
+--          recipe lines / menu items that cost against them, so a price change
+--          only recomputes the recipes it actually affects.
+-- ================================================================================
+-- Kept in sync by triggers on menu_item_ingredients (recipe edits) and
+-- ingredient_mappings (normalization assigning an invoice line to an
+-- ingredient). Rows disappear with their recipe line via ON DELETE CASCADE.
+-- ================================================================================
+
+CREATE TABLE IF NOT EXISTS menu_cogs_dependencies (
+    menu_item_ingredient_id UUID PRIMARY KEY REFERENCES menu_item_ingredients(id) ON DELETE CASCADE,
+    user_id UUID NOT NULL REFERENCES auth.users(id) ON DELETE CASCADE,
+    menu_item_id UUID NOT NULL REFERENCES menu_items(id) ON DELETE CASCADE,
+    invoice_item_id UUID REFERENCES invoice_items(id) ON DELETE CASCADE,
+    normalized_ingredient_id UUID REFERENCES normalized_ingredients(id) ON DELETE SET NULL,
+    updated_at TIMESTAMP DEFAULT NOW()
+);
+
+CREATE INDEX IF NOT EXISTS idx_menu_cogs_deps_user_invoice_item
+    ON menu_cogs_dependencies(user_id, invoice_item_id);
+
+CREATE INDEX IF NOT EXISTS idx_menu_cogs_deps_user_ingredient
+    ON menu_cogs_dependencies(user_id, normalized_ingredient_id)
+    WHERE normalized_ingredient_id IS NOT NULL;
+
+COMMENT ON TABLE menu_cogs_dependencies IS
+    'Reverse index: invoice line / normalized ingredient -> recipe line -> menu item (maintained by triggers)';
+
+ALTER TABLE menu_cogs_dependencies ENABLE ROW LEVEL SECURITY;
+DROP POLICY IF EXISTS "Users read menu cogs dependencies" ON menu_cogs_dependencies;
+CREATE POLICY "Users read menu cogs dependencies" ON menu_cogs_dependencies
+    FOR SELECT USING (user_id = auth.uid());
+
+DROP POLICY IF EXISTS "Service role manages menu cogs dependencies" ON menu_cogs_dependencies;
+CREATE POLICY "Service role manages menu cogs dependencies" ON menu_cogs_dependencies
+    USING (auth.role() = 'service_role')
+    WITH CHECK (auth.role() = 'service_role');
+
+-- ----------------------------------------------------------------------------
+-- Recipe line inserted / relinked -> upsert its dependency row
+-- ----------------------------------------------------------------------------
+CREATE OR REPLACE FUNCTION public.sync_menu_cogs_dependency()
+RETURNS TRIGGER
+LANGUAGE plpgsql
+SECURITY DEFINER
+SET search_path = public
+AS $$
+BEGIN
+    INSERT INTO menu_cogs_dependencies (
+        menu_item_ingredient_id, user_id, menu_item_id, invoice_item_id, normalized_ingredient_id, updated_at
+    )
+    SELECT
+        NEW.id,
+        rm.user_id,
+        NEW.menu_item_id,
+        NEW.invoice_item_id,
+        im.normalized_ingredient_id,
+        NOW()
+    FROM menu_items mi
+    JOIN restaurant_menus rm ON rm.id = mi.menu_id
+    LEFT JOIN ingredient_mappings im ON im.invoice_item_id = NEW.invoice_item_id
+    WHERE mi.id = NEW.menu_item_id
+    ON CONFLICT (menu_item_ingredient_id) DO UPDATE SET
+        user_id = EXCLUDED.user_id,
+        menu_item_id = EXCLUDED.menu_item_id,
+        invoice_item_id = EXCLUDED.invoice_item_id,
+        normalized_ingredient_id = EXCLUDED.normalized_ingredient_id,
+        updated_at = NOW();
+    RETURN NEW;
+END;
+$$;
+
+DROP TRIGGER IF EXISTS trigger_sync_menu_cogs_dependency ON menu_item_ingredients;
+CREATE TRIGGER trigger_sync_menu_cogs_dependency
+    AFTER INSERT OR UPDATE OF menu_item_id, invoice_item_id ON menu_item_ingredients
+    FOR EACH ROW EXECUTE FUNCTION public.sync_menu_cogs_dependency();
+
+-- ----------------------------------------------------------------------------
+-- Invoice line (re)mapped to an ingredient -> refresh the ingredient edge
+-- ----------------------------------------------------------------------------
+CREATE OR REPLACE FUNCTION public.sync_menu_cogs_ingredient()
+RETURNS TRIGGER
+LANGUAGE plpgsql
+SECURITY DEFINER
+SET search_path = public
+AS $$
+BEGIN
+    UPDATE menu_cogs_dependencies
+    SET normalized_ingredient_id = NEW.normalized_ingredient_id,
+        updated_at = NOW()
+    WHERE invoice_item_id = NEW.invoice_item_id
+      AND normalized_ingredient_id IS DISTINCT FROM NEW.normalized_ingredient_id;
+    RETURN NEW;
+END;
+$$;
+
+DROP TRIGGER IF EXISTS trigger_sync_menu_cogs_ingredient ON ingredient_mappings;
+CREATE TRIGGER trigger_sync_menu_cogs_ingredient
+    AFTER INSERT OR UPDATE OF normalized_ingredient_id, invoice_item_id ON ingredient_mappings
+    FOR EACH ROW EXECUTE FUNCTION public.sync_menu_cogs_ingredient();
+
+-- ----------------------------------------------------------------------------
+-- Backfill existing recipes
+-- ----------------------------------------------------------------------------
+INSERT INTO menu_cogs_dependencies (
+    menu_item_ingredient_id, user_id, menu_item_id, invoice_item_id, normalized_ingredient_id
+)
+SELECT
+    mii.id,
+    rm.user_id,
+    mii.menu_item_id,
+    mii.invoice_item_id,
+    im.normalized_ingredient_id
+FROM menu_item_ingredients mii
+JOIN menu_items mi ON mi.id = mii.menu_item_id
+JOIN restaurant_menus rm ON rm.id = mi.menu_id
+LEFT JOIN ingredient_mappings im ON im.invoice_item_id = mii.invoice_item_id
+ON CONFLICT (menu_item_ingredient_id) DO NOTHING;
+
+-- ----------------------------------------------------------------------------
+-- Lookup: menu items whose COGS depends on the given lines / ingredients
+-- ----------------------------------------------------------------------------
+CREATE OR REPLACE FUNCTION public.get_cogs_dependents(
+    p_user_id UUID,
+    p_invoice_item_ids UUID[] DEFAULT NULL,
+    p_normalized_ingredient_ids UUID[] DEFAULT NULL
+)
+RETURNS TABLE (menu_item_id UUID)
+LANGUAGE sql
+STABLE
+SECURITY DEFINER
+SET search_path = public
+AS $$
+    SELECT DISTINCT d.menu_item_id
+    FROM menu_cogs_dependencies d
+    WHERE d.user_id = p_user_id
+      AND (
+          d.invoice_item_id = ANY(COALESCE(p_invoice_item_ids, ARRAY[]::UUID[]))
+          OR d.normalized_ingredient_id = ANY(COALESCE(p_normalized_ingredient_ids, ARRAY[]::UUID[]))
+      );
+$$;
+
+COMMENT ON FUNCTION public.get_cogs_dependents IS
+    'Menu items whose recipe costs against any of the given invoice lines or normalized ingredients.';
+
+REVOKE EXECUTE ON FUNCTION public.get_cogs_dependents FROM PUBLIC, anon, authenticated;
+GRANT EXECUTE ON FUNCTION public.get_cogs_dependents TO service_role;
+
+SELECT 'Migration 055 complete: menu cogs dependency index' AS status;
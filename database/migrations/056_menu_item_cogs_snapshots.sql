@@ -0,0 +1,111 @@
+-- ================================================================================
+-- MIGRATION 056: MENU ITEM COGS SNAPSHOTS
+-- Purpose: Persist computed recipe COGS snapshots so they survive Redis
+--          restarts/evictions, versioned by the inputs they were priced from.
+-- ================================================================================
+-- price_version = latest ingredient price timestamp (invoice line created_at)
+-- inputs_hash   = fingerprint of recipe lines, linked invoice prices/packs and
+--                 menu prices; a stored snapshot is only served while the
+--                 current fingerprint still matches.
+-- ================================================================================
+
+CREATE TABLE IF NOT EXISTS menu_item_cogs_snapshots (
+    menu_item_id UUID PRIMARY KEY REFERENCES menu_items(id) ON DELETE CASCADE,
+    user_id UUID NOT NULL REFERENCES auth.users(id) ON DELETE CASCADE,
+    payload JSONB NOT NULL,
+    total_cogs NUMERIC(12,4),
+    food_cost_percent NUMERIC(7,2),
+    price_version TIMESTAMPTZ,
+    inputs_hash TEXT NOT NULL,
+    computed_at TIMESTAMPTZ DEFAULT NOW()
+);
+
+CREATE INDEX IF NOT EXISTS idx_menu_item_cogs_snapshots_user
+    ON menu_item_cogs_snapshots(user_id);
+
+COMMENT ON TABLE menu_item_cogs_snapshots IS
+    'Materialized recipe COGS snapshots (written by the recompute path, read through Redis)';
+
+ALTER TABLE menu_item_cogs_snapshots ENABLE ROW LEVEL SECURITY;
+DROP POLICY IF EXISTS "Users read cogs snapshots" ON menu_item_cogs_snapshots;
+CREATE POLICY "Users read cogs snapshots" ON menu_item_cogs_snapshots
+    FOR SELECT USING (user_id = auth.uid());
+
+DROP POLICY IF EXISTS "Service role manages cogs snapshots" ON menu_item_cogs_snapshots;
+CREATE POLICY "Service role manages cogs snapshots" ON menu_item_cogs_snapshots
+    USING (auth.role() = 'service_role')
+    WITH CHECK (auth.role() = 'service_role');
+
+-- ----------------------------------------------------------------------------
+-- Current pricing inputs per menu item (one grouped query)
+-- ----------------------------------------------------------------------------
+CREATE OR REPLACE FUNCTION public.get_menu_item_cogs_versions(
+    p_user_id UUID,
+    p_menu_item_ids UUID[]
+)
+RETURNS TABLE (
+    menu_item_id UUID,
+    price_version TIMESTAMPTZ,
+    inputs_hash TEXT
+)
+LANGUAGE sql
+STABLE
+SECURITY DEFINER
+SET search_path = public
+AS $$
+    SELECT
+        mi.id,
+        MAX(ii.created_at)::TIMESTAMPTZ,
+        md5(
+            mi.item_name
+            || '|' || COALESCE(
+                string_agg(
+                    concat_ws(':', mii::TEXT, ii.unit_price, ii.pack_size, ii.description, ii.created_at),
+                    ',' ORDER BY mii.id
+                ),
+                ''
+            )
+            || '|' || COALESCE(
+                (SELECT string_agg(p::TEXT, ',' ORDER BY p.id) FROM menu_item_prices p WHERE p.menu_item_id = mi.id),
+                ''
+            )
+        )
+    FROM menu_items mi
+    JOIN restaurant_menus rm ON rm.id = mi.menu_id AND rm.user_id = p_user_id
+    LEFT JOIN menu_item_ingredients mii ON mii.menu_item_id = mi.id
+    LEFT JOIN invoice_items ii ON ii.id = mii.invoice_item_id
+    WHERE mi.id = ANY(p_menu_item_ids)
+    GROUP BY mi.id, mi.item_name;
+$$;
+
+-- ----------------------------------------------------------------------------
+-- Stored snapshots that are still current
+-- ----------------------------------------------------------------------------
+CREATE OR REPLACE FUNCTION public.get_fresh_cogs_snapshots(
+    p_user_id UUID,
+    p_menu_item_ids UUID[]
+)
+RETURNS TABLE (
+    menu_item_id UUID,
+    payload JSONB,
+    price_version TIMESTAMPTZ
+)
+LANGUAGE sql
+STABLE
+SECURITY DEFINER
+SET search_path = public
+AS $$
+    SELECT s.menu_item_id, s.payload, s.price_version
+    FROM menu_item_cogs_snapshots s
+    JOIN public.get_menu_item_cogs_versions(p_user_id, p_menu_item_ids) v
+      ON v.menu_item_id = s.menu_item_id
+     AND v.inputs_hash = s.inputs_hash
+    WHERE s.user_id = p_user_id;
+$$;
+
+REVOKE EXECUTE ON FUNCTION public.get_menu_item_cogs_versions FROM PUBLIC, anon, authenticated;
+GRANT EXECUTE ON FUNCTION public.get_menu_item_cogs_versions TO service_role;
+REVOKE EXECUTE ON FUNCTION public.get_fresh_cogs_snapshots FROM PUBLIC, anon, authenticated;
+GRANT EXECUTE ON FUNCTION public.get_fresh_cogs_snapshots TO service_role;
+
+SELECT 'Migration 056 complete: menu item cogs snapshots' AS status;
@@ -0,0 +1,19 @@
+-- ================================================================================
+-- MIGRATION 057: MENU DAILY SALES UPSERT KEY
+-- Purpose: Give menu_item_daily_sales a plain-column unique key so sales
+--          batches can be written with a single bulk upsert
+--          (ON CONFLICT (user_id, menu_item_id, menu_item_price_id, sale_date)).
+-- ================================================================================
+-- Migration 030's unique index is on COALESCE(menu_item_price_id::text, 'all'),
+-- an expression PostgREST cannot name as a conflict target. NULLS NOT DISTINCT
+-- (Postgres 15+) keeps the same semantics - at most one "all sizes" row per
+-- item per day - on the raw columns, so it replaces the expression index.
+-- ================================================================================
+
+CREATE UNIQUE INDEX IF NOT EXISTS idx_menu_item_daily_sales_upsert_key
+    ON menu_item_daily_sales (user_id, menu_item_id, menu_item_price_id, sale_date)
+    NULLS NOT DISTINCT;
+
+DROP INDEX IF EXISTS idx_menu_item_daily_sales_unique_entry;
+
+SELECT 'Migration 057 complete: menu daily sales upsert key' AS status;
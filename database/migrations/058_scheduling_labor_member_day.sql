@@ -0,0 +1,235 @@
+-- ================================================================================
+-- MIGRATION 058: EVENT-MAINTAINED LABOR AGGREGATES
+-- Purpose: Keep scheduled / actual labor minutes and cost per member per day
+--          up to date as shifts are edited and members clock out, so reading
+--          a week's labor totals is a couple of indexed selects instead of a
+--          recompute over every day, shift, clock entry and live session.
+-- ================================================================================
+-- refresh_scheduling_labor_day() rebuilds the member buckets of the one day
+-- an event touched, then rolls them up into scheduling_labor_day_summary and
+-- scheduling_labor_week_summary. Buckets hold completed time only; live
+-- sessions are projected from started_at at read time.
+-- ================================================================================
+
+CREATE TABLE IF NOT EXISTS scheduling_labor_member_day (
+    id UUID PRIMARY KEY DEFAULT uuid_generate_v4(),
+    account_id UUID NOT NULL REFERENCES accounts(id) ON DELETE CASCADE,
+    week_id UUID NOT NULL REFERENCES scheduling_weeks(id) ON DELETE CASCADE,
+    day_id UUID NOT NULL REFERENCES scheduling_days(id) ON DELETE CASCADE,
+    schedule_date DATE NOT NULL,
+    -- NULL bucket = unassigned scheduled shifts
+    member_user_id UUID REFERENCES auth.users(id) ON DELETE CASCADE,
+    scheduled_minutes INTEGER NOT NULL DEFAULT 0,
+    scheduled_cost_cents BIGINT NOT NULL DEFAULT 0,
+    actual_minutes INTEGER NOT NULL DEFAULT 0,
+    actual_cost_cents BIGINT NOT NULL DEFAULT 0,
+    -- Rate of the member's latest clock entry that day (overtime pricing)
+    rate_cents BIGINT,
+    rate_type TEXT,
+    updated_at TIMESTAMPTZ NOT NULL DEFAULT NOW()
+);
+
+CREATE UNIQUE INDEX IF NOT EXISTS idx_labor_member_day_unique
+    ON scheduling_labor_member_day (day_id, member_user_id) NULLS NOT DISTINCT;
+
+CREATE INDEX IF NOT EXISTS idx_labor_member_day_account_week
+    ON scheduling_labor_member_day (account_id, week_id);
+
+COMMENT ON TABLE scheduling_labor_member_day IS
+    'Completed labor per member per day, refreshed on shift edits and clock-outs';
+
+ALTER TABLE scheduling_labor_member_day ENABLE ROW LEVEL SECURITY;
+
+DROP POLICY IF EXISTS "Service role manages scheduling_labor_member_day" ON scheduling_labor_member_day;
+CREATE POLICY "Service role manages scheduling_labor_member_day"
+    ON scheduling_labor_member_day
+    USING (auth.role() = 'service_role')
+    WITH CHECK (auth.role() = 'service_role');
+
+DROP POLICY IF EXISTS "Members view scheduling_labor_member_day" ON scheduling_labor_member_day;
+CREATE POLICY "Members view scheduling_labor_member_day"
+    ON scheduling_labor_member_day
+    FOR SELECT
+    USING (
+        auth.role() = 'service_role'
+        OR EXISTS (
+            SELECT 1 FROM account_members am
+            WHERE am.account_id = scheduling_labor_member_day.account_id
+              AND am.user_id = auth.uid()
+              AND am.status = 'active'
+        )
+    );
+
+-- Live sessions are read per week through their shift
+CREATE INDEX IF NOT EXISTS idx_sched_shifts_week_day
+    ON scheduling_shifts(week_id, day_id);
+
+-- ----------------------------------------------------------------------------
+-- Rebuild one day's buckets and roll up day + week summaries
+-- ----------------------------------------------------------------------------
+CREATE OR REPLACE FUNCTION public.refresh_scheduling_labor_day(
+    p_account_id UUID,
+    p_day_id UUID
+)
+RETURNS VOID
+LANGUAGE plpgsql
+SECURITY DEFINER
+SET search_path = public
+AS $$
+DECLARE
+    v_week_id UUID;
+    v_schedule_date DATE;
+BEGIN
+    SELECT d.week_id, d.schedule_date
+    INTO v_week_id, v_schedule_date
+    FROM scheduling_days d
+    WHERE d.id = p_day_id AND d.account_id = p_account_id;
+
+    IF NOT FOUND THEN
+        RETURN;
+    END IF;
+
+    DELETE FROM scheduling_labor_member_day
+    WHERE account_id = p_account_id AND day_id = p_day_id;
+
+    INSERT INTO scheduling_labor_member_day (
+        account_id, week_id, day_id, schedule_date, member_user_id,
+        scheduled_minutes, scheduled_cost_cents, actual_minutes, actual_cost_cents,
+        rate_cents, rate_type, updated_at
+    )
+    WITH shift_minutes AS (
+        SELECT
+            s.assigned_member_id AS member_user_id,
+            s.wage_override_cents,
+            -- Overnight shifts wrap past midnight
+            ((FLOOR(EXTRACT(EPOCH FROM (s.end_time - s.start_time)))::INT + 86400) % 86400) / 60 AS duration,
+            COALESCE(s.break_minutes, 0) AS break_minutes
+        FROM scheduling_shifts s
+        WHERE s.account_id = p_account_id AND s.day_id = p_day_id
+    ),
+    scheduled AS (
+        SELECT
+            sm.member_user_id,
+            GREATEST(sm.duration - sm.break_minutes, 0) AS paid_minutes,
+            COALESCE(NULLIF(sm.wage_override_cents, 0), comp.rate_cents, 0) AS rate_cents
+        FROM shift_minutes sm
+        LEFT JOIN LATERAL (
+            SELECT c.rate_cents
+            FROM account_member_compensation c
+            WHERE c.account_id = p_account_id
+              AND c.user_id = sm.member_user_id
+              AND c.ends_at IS NULL
+            LIMIT 1
+        ) comp ON TRUE
+        WHERE sm.duration > 0
+    ),
+    completed AS (
+        SELECT
+            e.member_user_id,
+            GREATEST(GREATEST(COALESCE(e.total_minutes, 0), 0) - GREATEST(COALESCE(e.break_minutes, 0), 0), 0) AS paid_minutes,
+            COALESCE(e.effective_rate_cents, 0) AS rate_cents,
+            e.effective_rate_type::TEXT AS rate_type,
+            COALESCE(e.clock_out_at, e.clock_in_at) AS recorded_at
+        FROM scheduling_shift_clock_entries e
+        JOIN scheduling_shifts s ON s.id = e.shift_id
+        WHERE e.account_id = p_account_id AND s.day_id = p_day_id
+    ),
+    combined AS (
+        SELECT member_user_id, paid_minutes AS scheduled_minutes,
+               ROUND(rate_cents * paid_minutes / 60.0)::BIGINT AS scheduled_cost_cents,
+               0 AS actual_minutes, 0::BIGINT AS actual_cost_cents,
+               NULL::BIGINT AS rate_cents, NULL::TEXT AS rate_type, NULL::TIMESTAMPTZ AS recorded_at
+        FROM scheduled
+        UNION ALL
+        SELECT member_user_id, 0, 0,
+               paid_minutes, ROUND(rate_cents * paid_minutes / 60.0)::BIGINT,
+               rate_cents, rate_type, recorded_at
+        FROM completed
+    )
+    SELECT
+        p_account_id, v_week_id, p_day_id, v_schedule_date, member_user_id,
+        SUM(scheduled_minutes), SUM(scheduled_cost_cents),
+        SUM(actual_minutes), SUM(actual_cost_cents),
+        (ARRAY_AGG(rate_cents ORDER BY recorded_at DESC) FILTER (WHERE recorded_at IS NOT NULL))[1],
+        (ARRAY_AGG(rate_type ORDER BY recorded_at DESC) FILTER (WHERE recorded_at IS NOT NULL))[1],
+        NOW()
+    FROM combined
+    GROUP BY member_user_id;
+
+    INSERT INTO scheduling_labor_day_summary (
+        account_id, week_id, day_id, schedule_date,
+        scheduled_minutes, scheduled_cost_cents, actual_minutes, actual_cost_cents, updated_at
+    )
+    SELECT
+        p_account_id, v_week_id, p_day_id, v_schedule_date,
+        COALESCE(SUM(b.scheduled_minutes), 0), COALESCE(SUM(b.scheduled_cost_cents), 0),
+        COALESCE(SUM(b.actual_minutes), 0), COALESCE(SUM(b.actual_cost_cents), 0),
+        NOW()
+    FROM scheduling_labor_member_day b
+    WHERE b.account_id = p_account_id AND b.day_id = p_day_id
+    ON CONFLICT (account_id, day_id) DO UPDATE SET
+        scheduled_minutes = EXCLUDED.scheduled_minutes,
+        scheduled_cost_cents = EXCLUDED.scheduled_cost_cents,
+        actual_minutes = EXCLUDED.actual_minutes,
+        actual_cost_cents = EXCLUDED.actual_cost_cents,
+        updated_at = NOW();
+
+    INSERT INTO scheduling_labor_week_summary (
+        account_id, week_id, week_start_date,
+        scheduled_minutes, scheduled_cost_cents, actual_minutes, actual_cost_cents, updated_at
+    )
+    SELECT
+        p_account_id, w.id, w.week_start_date,
+        COALESCE(SUM(ds.scheduled_minutes), 0), COALESCE(SUM(ds.scheduled_cost_cents), 0),
+        COALESCE(SUM(ds.actual_minutes), 0), COALESCE(SUM(ds.actual_cost_cents), 0),
+        NOW()
+    FROM scheduling_weeks w
+    LEFT JOIN scheduling_labor_day_summary ds
+      ON ds.week_id = w.id AND ds.account_id = p_account_id
+    WHERE w.id = v_week_id AND w.account_id = p_account_id
+    GROUP BY w.id, w.week_start_date
+    ON CONFLICT (account_id, week_id) DO UPDATE SET
+        scheduled_minutes = EXCLUDED.scheduled_minutes,
+        scheduled_cost_cents = EXCLUDED.scheduled_cost_cents,
+        actual_minutes = EXCLUDED.actual_minutes,
+        actual_cost_cents = EXCLUDED.actual_cost_cents,
+        updated_at = NOW();
+END;
+$$;
+
+-- ----------------------------------------------------------------------------
+-- Full rebuild of a week (backfill / repair)
+-- ----------------------------------------------------------------------------
+CREATE OR REPLACE FUNCTION public.refresh_scheduling_labor_week(
+    p_account_id UUID,
+    p_week_id UUID
+)
+RETURNS VOID
+LANGUAGE plpgsql
+SECURITY DEFINER
+SET search_path = public
+AS $$
+DECLARE
+    v_day_id UUID;
+BEGIN
+    FOR v_day_id IN
+        SELECT id FROM scheduling_days
+        WHERE account_id = p_account_id AND week_id = p_week_id
+    LOOP
+        PERFORM public.refresh_scheduling_labor_day(p_account_id, v_day_id);
+    END LOOP;
+END;
+$$;
+
+REVOKE EXECUTE ON FUNCTION public.refresh_scheduling_labor_day FROM PUBLIC, anon, authenticated;
+GRANT EXECUTE ON FUNCTION public.refresh_scheduling_labor_day TO service_role;
+REVOKE EXECUTE ON FUNCTION public.refresh_scheduling_labor_week FROM PUBLIC, anon, authenticated;
+GRANT EXECUTE ON FUNCTION public.refresh_scheduling_labor_week TO service_role;
+
+-- ----------------------------------------------------------------------------
+-- Backfill existing weeks
+-- ----------------------------------------------------------------------------
+SELECT public.refresh_scheduling_labor_week(w.account_id, w.id)
+FROM scheduling_weeks w;
+
+SELECT 'Migration 058 complete: event-maintained labor aggregates' AS status;
@@ -0,0 +1,123 @@
+-- ================================================================================
+-- MIGRATION 059: SCHEDULING WEEK TREE RPC
+-- Purpose: Return a scheduling week with its days, shifts, assignments, live
+--          sessions and latest clock entry as one JSON document, replacing six
+--          sequential PostgREST queries in SchedulingWeekService.get_week.
+-- ================================================================================
+-- "version" combines the newest updated_at across everything the scheduler
+-- grid renders with per-table row counts (so deletes change it too); the API
+-- derives the grid ETag from it.
+-- ================================================================================
+
+-- Latest clock entry per shift (DISTINCT ON ... ORDER BY shift_id, clock_out_at DESC)
+CREATE INDEX IF NOT EXISTS idx_clock_entries_shift_clock_out
+    ON scheduling_shift_clock_entries(shift_id, clock_out_at DESC);
+
+CREATE INDEX IF NOT EXISTS idx_sched_assign_shift
+    ON scheduling_shift_assignments(shift_id);
+
+CREATE OR REPLACE FUNCTION public.get_scheduling_week_tree(
+    p_account_id UUID,
+    p_week_id UUID
+)
+RETURNS JSONB
+LANGUAGE sql
+STABLE
+SECURITY DEFINER
+SET search_path = public
+AS $$
+    WITH week AS (
+        SELECT w.*
+        FROM scheduling_weeks w
+        WHERE w.id = p_week_id AND w.account_id = p_account_id
+    ),
+    days AS (
+        SELECT d.* FROM scheduling_days d JOIN week ON d.week_id = week.id
+    ),
+    shifts AS (
+        SELECT s.* FROM scheduling_shifts s JOIN week ON s.week_id = week.id
+    ),
+    assignments AS (
+        SELECT a.* FROM scheduling_shift_assignments a JOIN shifts s ON s.id = a.shift_id
+    ),
+    live_sessions AS (
+        SELECT l.* FROM scheduling_shift_live_sessions l JOIN shifts s ON s.id = l.shift_id
+    ),
+    latest_entries AS (
+        SELECT DISTINCT ON (e.shift_id) e.*
+        FROM scheduling_shift_clock_entries e
+        JOIN shifts s ON s.id = e.shift_id
+        ORDER BY e.shift_id, e.clock_out_at DESC
+    ),
+    shift_docs AS (
+        SELECT
+            s.day_id,
+            s.start_time,
+            to_jsonb(s) || jsonb_build_object(
+                'assignments', COALESCE(
+                    (SELECT jsonb_agg(to_jsonb(a)) FROM assignments a WHERE a.shift_id = s.id),
+                    '[]'::JSONB
+                ),
+                'live_sessions', COALESCE(
+                    (SELECT jsonb_agg(to_jsonb(l)) FROM live_sessions l WHERE l.shift_id = s.id),
+                    '[]'::JSONB
+                ),
+                'latest_entry', (SELECT to_jsonb(le) FROM latest_entries le WHERE le.shift_id = s.id)
+            ) AS doc
+        FROM shifts s
+    ),
+    day_docs AS (
+        SELECT
+            d.schedule_date,
+            to_jsonb(d) || jsonb_build_object(
+                'shifts', COALESCE(
+                    (SELECT jsonb_agg(sd.doc ORDER BY sd.start_time) FROM shift_docs sd WHERE sd.day_id = d.id),
+                    '[]'::JSONB
+                )
+            ) AS doc
+        FROM days d
+    ),
+    stamps AS (
+        SELECT w.updated_at AS ts FROM week w
+        UNION ALL SELECT updated_at FROM days
+        UNION ALL SELECT updated_at FROM shifts
+        UNION ALL SELECT updated_at FROM assignments
+        UNION ALL SELECT updated_at FROM live_sessions
+        UNION ALL
+        SELECT MAX(e.updated_at)
+        FROM scheduling_shift_clock_entries e JOIN shifts s ON s.id = e.shift_id
+        UNION ALL
+        SELECT ws.updated_at FROM scheduling_labor_week_summary ws
+        WHERE ws.account_id = p_account_id AND ws.week_id = p_week_id
+        UNION ALL
+        SELECT ss.updated_at FROM scheduling_settings ss WHERE ss.account_id = p_account_id
+        UNION ALL
+        SELECT MAX(m.updated_at) FROM account_members m WHERE m.account_id = p_account_id
+        UNION ALL
+        SELECT MAX(GREATEST(c.created_at, c.effective_at, COALESCE(c.ends_at, c.created_at)))
+        FROM account_member_compensation c WHERE c.account_id = p_account_id
+    )
+    SELECT to_jsonb(w) || jsonb_build_object(
+        'days', COALESCE((SELECT jsonb_agg(dd.doc ORDER BY dd.schedule_date) FROM day_docs dd), '[]'::JSONB),
+        'version', concat_ws(
+            ':',
+            (SELECT MAX(ts) FROM stamps),
+            (SELECT COUNT(*) FROM days),
+            (SELECT COUNT(*) FROM shifts),
+            (SELECT COUNT(*) FROM assignments),
+            (SELECT COUNT(*) FROM live_sessions),
+            (SELECT COUNT(*) FROM scheduling_shift_clock_entries e JOIN shifts s ON s.id = e.shift_id),
+            (SELECT COUNT(*) FROM account_members m WHERE m.account_id = p_account_id),
+            (SELECT COUNT(*) FROM account_member_compensation c WHERE c.account_id = p_account_id)
+        )
+    )
+    FROM week w;
+$$;
+
+COMMENT ON FUNCTION public.get_scheduling_week_tree IS
+    'Scheduling week with nested days/shifts/assignments/live sessions/latest entry, plus a change version.';
+
+REVOKE EXECUTE ON FUNCTION public.get_scheduling_week_tree FROM PUBLIC, anon, authenticated;
+GRANT EXECUTE ON FUNCTION public.get_scheduling_week_tree TO service_role;
+
+SELECT 'Migration 059 complete: scheduling week tree rpc' AS status;
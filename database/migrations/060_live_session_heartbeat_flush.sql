@@ -0,0 +1,46 @@
+-- ================================================================================
+-- MIGRATION 060: BULK LIVE-SESSION HEARTBEAT FLUSH
+-- Purpose: Apply a batch of buffered heartbeats (collected in Redis) to
+--          scheduling_shift_live_sessions in one statement per account,
+--          instead of one UPDATE per device ping.
+-- ================================================================================
+-- Only existing sessions are updated (a late ping after clock-out is a no-op)
+-- and timestamps never move backwards.
+-- ================================================================================
+
+CREATE OR REPLACE FUNCTION public.touch_live_session_heartbeats(
+    p_account_id UUID,
+    p_heartbeats JSONB
+)
+RETURNS INTEGER
+LANGUAGE plpgsql
+SECURITY DEFINER
+SET search_path = public
+AS $$
+DECLARE
+    v_updated INTEGER;
+BEGIN
+    UPDATE scheduling_shift_live_sessions ls
+    SET last_heartbeat_at = hb.last_heartbeat_at
+    FROM jsonb_to_recordset(p_heartbeats) AS hb(
+        shift_id UUID,
+        member_user_id UUID,
+        last_heartbeat_at TIMESTAMPTZ
+    )
+    WHERE ls.account_id = p_account_id
+      AND ls.shift_id = hb.shift_id
+      AND ls.member_user_id = hb.member_user_id
+      AND ls.last_heartbeat_at < hb.last_heartbeat_at;
+
+    GET DIAGNOSTICS v_updated = ROW_COUNT;
+    RETURN v_updated;
+END;
+$$;
+
+COMMENT ON FUNCTION public.touch_live_session_heartbeats IS
+    'Bulk-apply buffered live-session heartbeats for one account.';
+
+REVOKE EXECUTE ON FUNCTION public.touch_live_session_heartbeats FROM PUBLIC, anon, authenticated;
+GRANT EXECUTE ON FUNCTION public.touch_live_session_heartbeats TO service_role;
+
+SELECT 'Migration 060 complete: bulk live-session heartbeat flush' AS status;
@@ -0,0 +1,187 @@
+-- ================================================================================
+-- MIGRATION 061: KIOSK CLOCK TOGGLE RPC
+-- Purpose: Clock a member in or out from the PIN kiosk in one round trip.
+--          The API verifies the PIN against a cached per-account roster and
+--          then calls kiosk_clock_toggle(), which checks membership, ends the
+--          live session (writing the clock entry and refreshing labor) or
+--          picks the shift to clock into and opens a live session, atomically.
+-- ================================================================================
+-- Shift selection mirrors ClockService.find_shift_for_member: an assigned shift
+-- whose window (start - 60 min .. end + 180 min, in the account timezone) covers
+-- now, else the next upcoming one. When nothing qualifies the function returns
+-- status 'needs_shift'; the API creates an ad-hoc shift and calls it again with
+-- p_shift_id. A per-member advisory lock serialises double taps.
+-- ================================================================================
+
+CREATE INDEX IF NOT EXISTS idx_sched_assign_account_member
+    ON scheduling_shift_assignments(account_id, member_user_id);
+
+CREATE INDEX IF NOT EXISTS idx_live_sessions_account_member
+    ON scheduling_shift_live_sessions(account_id, member_user_id);
+
+CREATE OR REPLACE FUNCTION public.kiosk_clock_toggle(
+    p_account_id UUID,
+    p_member_user_id UUID,
+    p_source TEXT DEFAULT 'pin_kiosk',
+    p_shift_id UUID DEFAULT NULL
+)
+RETURNS JSONB
+LANGUAGE plpgsql
+SECURITY DEFINER
+SET search_path = public
+AS $$
+DECLARE
+    v_session scheduling_shift_live_sessions%ROWTYPE;
+    v_entry scheduling_shift_clock_entries%ROWTYPE;
+    v_shift RECORD;
+    v_comp RECORD;
+    v_tz TEXT;
+    v_now TIMESTAMPTZ := NOW();
+    v_shift_id UUID := p_shift_id;
+BEGIN
+    PERFORM pg_advisory_xact_lock(hashtext(p_account_id::TEXT || ':' || p_member_user_id::TEXT));
+
+    IF NOT EXISTS (
+        SELECT 1 FROM account_members am
+        WHERE am.account_id = p_account_id
+          AND am.user_id = p_member_user_id
+          AND am.status = 'active'
+    ) THEN
+        RETURN jsonb_build_object('status', 'not_member');
+    END IF;
+
+    -- ------------------------------------------------------------------
+    -- Clock out: the member has a live session on any shift
+    -- ------------------------------------------------------------------
+    SELECT * INTO v_session
+    FROM scheduling_shift_live_sessions ls
+    WHERE ls.account_id = p_account_id AND ls.member_user_id = p_member_user_id
+    ORDER BY ls.started_at
+    LIMIT 1
+    FOR UPDATE;
+
+    IF FOUND THEN
+        INSERT INTO scheduling_shift_clock_entries (
+            account_id, shift_id, member_user_id, clock_in_at, clock_out_at,
+            clock_in_source, clock_out_source,
+            effective_rate_cents, effective_rate_type, effective_rate_currency,
+            total_minutes, break_minutes, created_at
+        )
+        VALUES (
+            p_account_id, v_session.shift_id, p_member_user_id, v_session.started_at, v_now,
+            COALESCE(v_session.clock_in_source, 'self'), p_source::shift_clock_source,
+            COALESCE(v_session.started_rate_cents, 0),
+            COALESCE(v_session.started_rate_type, 'hourly'),
+            COALESCE(v_session.started_rate_currency, 'USD'),
+            GREATEST(FLOOR(EXTRACT(EPOCH FROM (v_now - v_session.started_at)) / 60)::INT, 0),
+            0, v_now
+        )
+        RETURNING * INTO v_entry;
+
+        DELETE FROM scheduling_shift_live_sessions WHERE id = v_session.id;
+
+        SELECT s.day_id, s.week_id INTO v_shift
+        FROM scheduling_shifts s WHERE s.id = v_session.shift_id;
+
+        IF v_shift.day_id IS NOT NULL THEN
+            PERFORM public.refresh_scheduling_labor_day(p_account_id, v_shift.day_id);
+        END IF;
+
+        RETURN jsonb_build_object(
+            'status', 'clocked_out',
+            'shift_id', v_session.shift_id,
+            'entry', to_jsonb(v_entry)
+        );
+    END IF;
+
+    -- ------------------------------------------------------------------
+    -- Clock in: pick the shift
+    -- ------------------------------------------------------------------
+    IF v_shift_id IS NULL THEN
+        SELECT COALESCE(NULLIF(ss.timezone, ''), 'UTC') INTO v_tz
+        FROM scheduling_settings ss WHERE ss.account_id = p_account_id;
+        v_tz := COALESCE(v_tz, 'UTC');
+        BEGIN
+            PERFORM v_now AT TIME ZONE v_tz;
+        EXCEPTION WHEN invalid_parameter_value THEN
+            v_tz := 'UTC';
+        END;
+
+        WITH candidates AS (
+            SELECT
+                s.id,
+                (d.schedule_date + s.start_time) AT TIME ZONE v_tz AS start_at,
+                (d.schedule_date + s.end_time) AT TIME ZONE v_tz AS end_at
+            FROM scheduling_shift_assignments a
+            JOIN scheduling_shifts s ON s.id = a.shift_id AND s.account_id = p_account_id
+            JOIN scheduling_days d ON d.id = s.day_id
+            WHERE a.account_id = p_account_id
+              AND a.member_user_id = p_member_user_id
+              AND s.start_time IS NOT NULL
+              AND s.end_time IS NOT NULL
+        ),
+        windows AS (
+            SELECT
+                id,
+                start_at,
+                -- Overnight shifts end the next day
+                CASE WHEN end_at <= start_at THEN end_at + INTERVAL '1 day' ELSE end_at END AS end_at
+            FROM candidates
+        )
+        SELECT w.id INTO v_shift_id
+        FROM windows w
+        WHERE v_now BETWEEN w.start_at - INTERVAL '60 minutes' AND w.end_at + INTERVAL '180 minutes'
+           OR w.start_at > v_now
+        -- Active windows first, then the soonest start
+        ORDER BY (v_now >= w.start_at - INTERVAL '60 minutes') DESC, w.start_at
+        LIMIT 1;
+
+        IF v_shift_id IS NULL THEN
+            RETURN jsonb_build_object('status', 'needs_shift');
+        END IF;
+    ELSIF NOT EXISTS (
+        SELECT 1 FROM scheduling_shifts s WHERE s.id = v_shift_id AND s.account_id = p_account_id
+    ) THEN
+        RETURN jsonb_build_object('status', 'shift_not_found');
+    END IF;
+
+    SELECT c.rate_cents, c.rate_type, c.currency INTO v_comp
+    FROM account_member_compensation c
+    WHERE c.account_id = p_account_id
+      AND c.user_id = p_member_user_id
+      AND c.ends_at IS NULL
+    ORDER BY c.effective_at DESC
+    LIMIT 1;
+
+    IF NOT FOUND THEN
+        RETURN jsonb_build_object('status', 'no_compensation', 'shift_id', v_shift_id);
+    END IF;
+
+    INSERT INTO scheduling_shift_live_sessions (
+        account_id, shift_id, member_user_id, started_at, last_heartbeat_at,
+        clock_in_source, started_rate_cents, started_rate_type, started_rate_currency
+    )
+    VALUES (
+        p_account_id, v_shift_id, p_member_user_id, v_now, v_now,
+        p_source::shift_clock_source,
+        COALESCE(v_comp.rate_cents, 0),
+        COALESCE(v_comp.rate_type, 'hourly')::schedule_wage_type,
+        COALESCE(v_comp.currency, 'USD')
+    )
+    RETURNING * INTO v_session;
+
+    RETURN jsonb_build_object(
+        'status', 'clocked_in',
+        'shift_id', v_shift_id,
+        'session', to_jsonb(v_session)
+    );
+END;
+$$;
+
+COMMENT ON FUNCTION public.kiosk_clock_toggle IS
+    'PIN kiosk tap: clock a verified member out of their live session or into the best shift, atomically.';
+
+REVOKE EXECUTE ON FUNCTION public.kiosk_clock_toggle FROM PUBLIC, anon, authenticated;
+GRANT EXECUTE ON FUNCTION public.kiosk_clock_toggle TO service_role;
+
+SELECT 'Migration 061 complete: kiosk clock toggle rpc' AS status;
@@ -0,0 +1,118 @@
+-- ================================================================================
+-- MIGRATION 062: PRICE RECIPE LINES FROM THE LATEST INGREDIENT PURCHASE
+-- Purpose: A recipe line links to the invoice line (vendor item) it was built
+--          from; its cost should follow the latest purchase of that same
+--          vendor item, so a new invoice actually moves menu COGS.
+-- ================================================================================
+-- get_recipe_pricing_lines maps each linked invoice line to the invoice line
+-- it is priced from: the newest ingredient_price_history row (by invoice date)
+-- of the same normalized ingredient from the same vendor as the linked line.
+-- Pricing never moves to another vendor's line; a line that is not
+-- normalized yet (or has no known vendor) is priced from itself.
+--
+-- get_menu_item_cogs_versions (migration 056) is redefined to fingerprint the
+-- priced line instead of the linked one, so stored snapshots go stale when a
+-- newer purchase of an ingredient lands.
+-- ================================================================================
+
+CREATE OR REPLACE FUNCTION public.get_recipe_pricing_lines(
+    p_user_id UUID,
+    p_invoice_item_ids UUID[]
+)
+RETURNS TABLE (
+    invoice_item_id UUID,
+    priced_invoice_item_id UUID,
+    normalized_ingredient_id UUID
+)
+LANGUAGE sql
+STABLE
+SECURITY DEFINER
+SET search_path = public
+AS $$
+    SELECT
+        linked.id,
+        COALESCE(latest.invoice_item_id, linked.id),
+        im.normalized_ingredient_id
+    FROM unnest(p_invoice_item_ids) AS linked(id)
+    LEFT JOIN ingredient_mappings im
+      ON im.invoice_item_id = linked.id
+     AND im.user_id = p_user_id
+    LEFT JOIN ingredient_price_history own
+      ON own.invoice_item_id = linked.id
+     AND own.user_id = p_user_id
+    LEFT JOIN LATERAL (
+        SELECT ph.invoice_item_id
+        FROM ingredient_price_history ph
+        WHERE ph.user_id = p_user_id
+          AND ph.normalized_ingredient_id = im.normalized_ingredient_id
+          AND ph.vendor_name = own.vendor_name
+          AND ph.unit_price > 0
+        ORDER BY ph.invoice_date DESC, ph.created_at DESC
+        LIMIT 1
+    ) latest ON TRUE;
+$$;
+
+COMMENT ON FUNCTION public.get_recipe_pricing_lines IS
+    'Invoice line each linked recipe line is priced from (latest purchase of the same ingredient from the same vendor).';
+
+-- ----------------------------------------------------------------------------
+-- Snapshot fingerprint follows the priced line
+-- ----------------------------------------------------------------------------
+CREATE OR REPLACE FUNCTION public.get_menu_item_cogs_versions(
+    p_user_id UUID,
+    p_menu_item_ids UUID[]
+)
+RETURNS TABLE (
+    menu_item_id UUID,
+    price_version TIMESTAMPTZ,
+    inputs_hash TEXT
+)
+LANGUAGE sql
+STABLE
+SECURITY DEFINER
+SET search_path = public
+AS $$
+    WITH pricing AS (
+        SELECT *
+        FROM public.get_recipe_pricing_lines(
+            p_user_id,
+            ARRAY(
+                SELECT DISTINCT mii.invoice_item_id
+                FROM menu_item_ingredients mii
+                WHERE mii.menu_item_id = ANY(p_menu_item_ids)
+                  AND mii.invoice_item_id IS NOT NULL
+            )
+        )
+    )
+    SELECT
+        mi.id,
+        MAX(ii.created_at)::TIMESTAMPTZ,
+        md5(
+            mi.item_name
+            || '|' || COALESCE(
+                string_agg(
+                    concat_ws(':', mii::TEXT, ii.id, ii.unit_price, ii.pack_size, ii.description, ii.created_at),
+                    ',' ORDER BY mii.id
+                ),
+                ''
+            )
+            || '|' || COALESCE(
+                (SELECT string_agg(p::TEXT, ',' ORDER BY p.id) FROM menu_item_prices p WHERE p.menu_item_id = mi.id),
+                ''
+            )
+        )
+    FROM menu_items mi
+    JOIN restaurant_menus rm ON rm.id = mi.menu_id AND rm.user_id = p_user_id
+    LEFT JOIN menu_item_ingredients mii ON mii.menu_item_id = mi.id
+    LEFT JOIN pricing pr ON pr.invoice_item_id = mii.invoice_item_id
+    LEFT JOIN invoice_items ii ON ii.id = COALESCE(pr.priced_invoice_item_id, mii.invoice_item_id)
+    WHERE mi.id = ANY(p_menu_item_ids)
+    GROUP BY mi.id, mi.item_name;
+$$;
+
+REVOKE EXECUTE ON FUNCTION public.get_recipe_pricing_lines FROM PUBLIC, anon, authenticated;
+GRANT EXECUTE ON FUNCTION public.get_recipe_pricing_lines TO service_role;
+REVOKE EXECUTE ON FUNCTION public.get_menu_item_cogs_versions FROM PUBLIC, anon, authenticated;
+GRANT EXECUTE ON FUNCTION public.get_menu_item_cogs_versions TO service_role;
+
+SELECT 'Migration 062 complete: recipe latest ingredient pricing' AS status;
@@ -59,13 +59,15 @@ export const analyticsApi = {
 
   /**
    * Get price trends for charting (by description)
+   * The series is downsampled server-side to at most `maxPoints` points.
    */
-  async getPriceTrends(itemDescription: string, days = 90): Promise<PriceTrendsResponse> {
+  async getPriceTrends(itemDescription: string, days = 90, maxPoints = 365): Promise<PriceTrendsResponse> {
     const result = await safeRequest<unknown>(() =>
       apiClient.get('/api/v1/analytics/price-trends', {
         params: {
           item_description: itemDescription,
           days,
+          max_points: maxPoints,
         },
       })
     );
@@ -12,11 +12,13 @@ import type {
 } from '@/types/menuSales'
 
 export interface RecordDailySalesPayload {
-  sale_date: string
+  /** Default date; entries may override it to backfill several days at once */
+  sale_date?: string
   entries: Array<{
     menu_item_id: string
     menu_item_price_id?: string | null
     quantity_sold: number
+    sale_date?: string
     metadata?: Record<string, unknown>
   }>
 }
@@ -99,6 +99,9 @@ export const priceTrendPointSchema = z.object({
   price: z.number(),
   vendor_name: z.string(),
   quantity: z.number(),
+  min_price: z.number().optional(),
+  max_price: z.number().optional(),
+  purchase_count: z.number().optional(),
 });
 
 export const priceTrendsResponseSchema = z.object({
@@ -556,6 +559,7 @@ export const menuSalesRecordSchema = z.object({
   menu_item_id: z.string(),
   menu_item_name: z.string().nullable().optional(),
   menu_item_price_id: z.string().nullable().optional(),
+  sale_date: z.string().optional(),
   size_label: z.string().nullable().optional(),
   quantity_sold: z.number(),
   unit_cogs_snapshot: z.number().nullable(),
@@ -8,6 +8,10 @@ export interface PriceTrendPoint {
   price: number;
   vendor_name: string;
   quantity: number;
+  // Present when the series is bucketed by day/week
+  min_price?: number;
+  max_price?: number;
+  purchase_count?: number;
 }
 
 export interface PriceTrendsResponse {
@@ -3,6 +3,7 @@ export interface MenuSalesRecord {
   menu_item_id: string
   menu_item_name?: string | null
   menu_item_price_id?: string | null
+  sale_date?: string
   size_label?: string | null
   quantity_sold: number
   unit_cogs_snapshot: number | null
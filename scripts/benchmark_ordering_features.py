@@ -0,0 +1,92 @@
+"""
+Parity check + benchmark for ordering feature engineering.
+
+Compares the columnar FeatureCalculator against the per-item reference
+implementation in OrderingFeatureService on synthetic facts, then times both.
+
+    python -m scripts.benchmark_ordering_features --ingredients 5000 --days 180
+"""
+import argparse
+import math
+import random
+import time
+from datetime import date, timedelta
+
+from services.ordering.feature_calculator import FeatureCalculator
+from services.ordering.feature_service import OrderingFeatureService
+
+
+def build_facts(ingredients: int, days: int, seed: int = 7) -> list:
+    rng = random.Random(seed)
+    today = date.today()
+    facts = []
+    for i in range(ingredients):
+        # Weekly-ish cadence with jitter, occasional same-day duplicates
+        cadence = rng.choice([1, 2, 3, 7, 14])
+        day = rng.randint(0, cadence)
+        while day < days:
+            delivery = today - timedelta(days=day)
+            for _ in range(2 if rng.random() < 0.05 else 1):
+                facts.append(
+                    {
+                        "normalized_item_id": f"item-{i}",
+                        "normalized_ingredient_id": f"ing-{i}",
+                        "delivery_date": delivery.isoformat(),
+                        "base_quantity": round(rng.uniform(0, 40), 2),
+                        "base_unit": rng.choice(["lb", "ea", None]),
+                        "invoice_item_id": f"ii-{i}-{day}-{len(facts)}",
+                        "pack_description": rng.choice(["6/#10 CAN", "40 LB", None]),
+                    }
+                )
+            day += max(1, cadence + rng.randint(-1, 1))
+    rng.shuffle(facts)
+    return facts
+
+
+def _close(a, b) -> bool:
+    if isinstance(a, float) or isinstance(b, float):
+        if a is None or b is None:
+            return a is b
+        return math.isclose(a, b, rel_tol=1e-9, abs_tol=1e-9)
+    if isinstance(a, dict) and isinstance(b, dict):
+        return a.keys() == b.keys() and all(_close(a[k], b[k]) for k in a)
+    return a == b
+
+
+def check_parity(facts: list, today: date) -> int:
+    columnar = FeatureCalculator().calculate(facts, today)
+    reference = OrderingFeatureService.compute_features_per_item(facts, today)
+    assert columnar.keys() == reference.keys(), "ingredient sets differ"
+    mismatches = 0
+    for key, expected in reference.items():
+        if not _close(columnar[key], expected):
+            mismatches += 1
+            if mismatches <= 3:
+                print(f"Mismatch for {key}:\n  columnar={columnar[key]}\n  reference={expected}")
+    return mismatches
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--ingredients", type=int, default=5000)
+    parser.add_argument("--days", type=int, default=180)
+    args = parser.parse_args()
+
+    today = date.today()
+    facts = build_facts(args.ingredients, args.days)
+    print(f"{len(facts):,} facts across {args.ingredients:,} ingredients / {args.days} days")
+
+    mismatches = check_parity(facts, today)
+    print(f"Parity: {'OK' if not mismatches else f'{mismatches} mismatches'}")
+
+    for label, fn in (
+        ("per-item", lambda: OrderingFeatureService.compute_features_per_item(facts, today)),
+        ("columnar", lambda: FeatureCalculator().calculate(facts, today)),
+    ):
+        started = time.perf_counter()
+        fn()
+        print(f"{label:>9}: {time.perf_counter() - started:.3f}s")
+
+
+if __name__ == "__main__":
+    main()
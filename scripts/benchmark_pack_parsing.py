@@ -0,0 +1,138 @@
+"""
+Parity check + benchmark for UnitConverter pack-size parsing.
+
+Uses a corpus of foodservice pack strings: pass --corpus with one pack
+string per line (e.g. exported from invoice_items.pack_size), or use the
+built-in sample of distributor formats. The corpus is repeated to mimic
+recipes and invoices re-parsing the same strings.
+
+    python -m scripts.benchmark_pack_parsing --repeat 200
+    python -m scripts.benchmark_pack_parsing --corpus pack_sizes.txt
+"""
+import argparse
+import math
+import random
+import re
+import time
+from decimal import Decimal
+
+from services.unit_converter import CAN_SIZES_OZ, UnitConverter, _parse_pack_size_cached
+
+SAMPLE_CORPUS = [
+    "6/#10", "6 #10", "6 10", "6 10 CS", "12/#5", "24 #2", "6/10 oz", "4/5 lb", "2/5 LB",
+    "24/12 oz", "12 x 2 lb", "12x2lb", "24×8oz", "4 x 1 gal", "4/1 GA", "6/.5 GAL", "9/1 QT",
+    "2 5 LB", "60 4 OZ", "24 8 OZ", "4  10 LB", "1/40 LB", "40 LB", "40#", "50#", "25 lb",
+    "10 lb", "5 gal", "1 GAL", "3 L", "1.5 lt", "750 ml", "24 ct", "180 CT", "15 DZ", "2 dz",
+    "1 cs", "1 case", "12 pkg", "6 pack", "1 box", "Case 4 x 10 lb", "Tray 96 ct", "Bottle 16 oz",
+    "Wheel 20 lb", "1/2 LB", "8/1 LB", "200/1 EA", "500 EA", "100 pcs", "16 fl oz", "12/16 fl oz",
+    "6/64 floz", "4/2.5 kg", "10 kg", "500 g", "1000 g", "48/4 oz", "10/1 LB AVG", "CW", "AVG WT",
+    "", None, "1 EACH", "6/32 OZ", "2/3 LB", "36 ct", "1/50 lb bag", "4/6 LB AVG", "12 cup",
+]
+
+
+def legacy_parse(pack_size):
+    """Previous implementation: re-runs every pattern uncompiled per call."""
+    if not pack_size:
+        return None
+    pack_size = pack_size.lower().strip()
+    can = re.match(r'^(?P<count>\d+)\s+(?P<can>10|6|5|3|2|1)\s*(?:cs|case)?$', pack_size)
+    if can:
+        return (int(can.group('count')), Decimal(str(CAN_SIZES_OZ.get(can.group('can'), 96))), 'oz', 'can_size')
+    for pattern, pattern_type in UnitConverter.PACK_PATTERNS:
+        match = re.search(pattern, pack_size, re.IGNORECASE)
+        if match:
+            if pattern_type == 'multiply':
+                return (int(match.group(1)), Decimal(match.group(2)), match.group(3).lower(), 'multiply')
+            if pattern_type == 'can_size':
+                return (int(match.group(1)), Decimal(str(CAN_SIZES_OZ.get(match.group(2), 96))), 'oz', 'can_size')
+            if pattern_type == 'simple':
+                return (1, Decimal(match.group(1)), match.group(2).lower(), 'simple')
+            if pattern_type == 'count':
+                return (int(match.group(1)), Decimal('1.0'), 'ea', 'count')
+    return None
+
+
+def load_corpus(path):
+    if not path:
+        return SAMPLE_CORPUS
+    with open(path, encoding="utf-8") as handle:
+        return [line.rstrip("\n") for line in handle]
+
+
+def check_parity(converter, corpus, prices) -> int:
+    mismatches = 0
+    for pack_size in corpus:
+        parsed = converter.parse_pack_size(pack_size)
+        expected = legacy_parse(pack_size)
+        actual = None if parsed is None else (parsed['count'], parsed['size'], parsed['unit'], parsed['type'])
+        if actual != expected:
+            mismatches += 1
+            print(f"Parse mismatch for {pack_size!r}: {actual} != {expected}")
+
+    batch = converter.unit_costs_many(prices, corpus)
+    for i, (price, pack_size) in enumerate(zip(prices, corpus)):
+        weight, unit, piece, error = converter.calculate_unit_cost_from_pack(Decimal(str(price)), pack_size)
+        got = (batch['unit_cost_per_weight'][i], batch['weight_unit'][i], batch['unit_cost_per_piece'][i], batch['error'][i])
+        same = (
+            _close(weight, got[0]) and unit == got[1] and _close(piece, got[2]) and error == got[3]
+        )
+        if not same:
+            mismatches += 1
+            print(f"Cost mismatch for {pack_size!r} @ {price}: {got} != {(weight, unit, piece, error)}")
+    return mismatches
+
+
+def _close(expected, actual) -> bool:
+    if expected is None:
+        return math.isnan(actual)
+    return math.isclose(float(expected), actual, rel_tol=1e-9)
+
+
+def time_call(fn) -> float:
+    started = time.perf_counter()
+    fn()
+    return time.perf_counter() - started
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--corpus", help="File with one pack size string per line")
+    parser.add_argument("--repeat", type=int, default=200)
+    args = parser.parse_args()
+
+    rng = random.Random(3)
+    converter = UnitConverter()
+    corpus = load_corpus(args.corpus)
+    prices = [round(rng.uniform(-5, 120), 2) for _ in corpus]
+
+    mismatches = check_parity(converter, corpus, prices)
+    print(f"Parity over {len(corpus)} strings: {'OK' if not mismatches else f'{mismatches} mismatches'}")
+
+    workload = corpus * args.repeat
+    rng.shuffle(workload)
+    workload_prices = [round(rng.uniform(1, 120), 2) for _ in workload]
+    print(f"Workload: {len(workload):,} parses over {len(set(corpus)):,} distinct strings")
+
+    _parse_pack_size_cached.cache_clear()
+    uncached = _parse_pack_size_cached.__wrapped__
+    timings = [
+        ("legacy re.search", lambda: [legacy_parse(p) for p in workload]),
+        ("compiled, no cache", lambda: [uncached(p.lower().strip()) for p in workload if p]),
+        ("parse_pack_size", lambda: [converter.parse_pack_size(p) for p in workload]),
+        ("parse_many", lambda: converter.parse_many(workload)),
+        (
+            "scalar unit costs",
+            lambda: [
+                converter.calculate_unit_cost_from_pack(Decimal(str(price)), pack)
+                for price, pack in zip(workload_prices, workload)
+            ],
+        ),
+        ("unit_costs_many", lambda: converter.unit_costs_many(workload_prices, workload)),
+    ]
+    for label, fn in timings:
+        print(f"{label:>20}: {time_call(fn) * 1e3:8.1f}ms")
+    print(f"Cache: {UnitConverter.parse_cache_info()}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,104 @@
+"""
+Parity check + benchmark for price anomaly detection.
+
+Compares the running-sum mean detector against the original prefix-mean
+loop on synthetic price series, then times every detector for growing
+purchase counts to show per-item cost stays linear.
+
+    python -m scripts.benchmark_price_anomalies --items 200 --max-purchases 4000
+"""
+import argparse
+import math
+import random
+import statistics
+import time
+
+import numpy as np
+
+from services.price_analytics_service import calculate_price_change
+from services.price_anomaly_detector import ANOMALY_METHODS, PriceAnomalyDetector
+
+
+def build_series(purchases: int, rng: random.Random) -> list:
+    base = rng.uniform(5, 60)
+    prices = []
+    for _ in range(purchases):
+        price = base * rng.uniform(0.95, 1.05)
+        if rng.random() < 0.03:
+            price *= rng.choice([0.5, 1.6, 2.2])
+        prices.append(round(price, 2))
+    return prices
+
+
+def reference_flags(prices: list, min_change_percent: float) -> list:
+    """The original O(n^2) prefix-mean loop."""
+    flags = []
+    for i in range(2, len(prices)):
+        avg_price = statistics.mean(prices[:i])
+        change = calculate_price_change(avg_price, prices[i])
+        if change is None:
+            continue
+        if abs(change) >= min_change_percent:
+            flags.append((i, round(avg_price, 2), round(abs(change), 2)))
+    return flags
+
+
+def check_parity(items: int, purchases: int, min_change_percent: float) -> int:
+    rng = random.Random(11)
+    detector = PriceAnomalyDetector()
+    mismatches = 0
+    for _ in range(items):
+        prices = build_series(rng.randint(3, purchases), rng)
+        expected = reference_flags(prices, min_change_percent)
+        actual = [
+            (i, round(avg, 2), round(change, 2))
+            for i, avg, change in detector.flag(np.asarray(prices), min_change_percent)
+        ]
+        if len(actual) != len(expected) or any(
+            a[0] != e[0] or not math.isclose(a[1], e[1]) or not math.isclose(a[2], e[2])
+            for a, e in zip(actual, expected)
+        ):
+            mismatches += 1
+    return mismatches
+
+
+def time_call(fn, repeat: int = 3) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        started = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - started)
+    return best
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--items", type=int, default=200)
+    parser.add_argument("--max-purchases", type=int, default=4000)
+    parser.add_argument("--min-change", type=float, default=20.0)
+    args = parser.parse_args()
+
+    mismatches = check_parity(args.items, 300, args.min_change)
+    print(f"Parity (mean vs prefix loop, {args.items} items): {'OK' if not mismatches else f'{mismatches} mismatches'}")
+
+    rng = random.Random(5)
+    sizes = []
+    n = 250
+    while n <= args.max_purchases:
+        sizes.append(n)
+        n *= 2
+
+    header = f"{'purchases':>10} {'prefix loop':>12}" + "".join(f" {m:>12}" for m in ANOMALY_METHODS)
+    print(header)
+    for size in sizes:
+        prices = build_series(size, rng)
+        array = np.asarray(prices)
+        row = f"{size:>10} {time_call(lambda: reference_flags(prices, args.min_change), repeat=1) * 1e3:>10.1f}ms"
+        for method in ANOMALY_METHODS:
+            detector = PriceAnomalyDetector(method=method)
+            row += f" {time_call(lambda: detector.flag(array, args.min_change)) * 1e3:>10.2f}ms"
+        print(row)
+
+
+if __name__ == "__main__":
+    main()
@@ -11,10 +11,21 @@ import hmac
 import logging
 import os
 import secrets
+import threading
+from collections import OrderedDict
 from datetime import datetime, timezone
 from typing import Dict, List, Optional, Tuple
 
 from database.supabase_client import get_supabase_service_client
+from services.kiosk_roster import (
+    PIN_SECRET_COLUMNS,
+    cached_location_account,
+    invalidate_kiosk_roster,
+    invalidate_member_kiosk_rosters,
+    load_kiosk_roster,
+    remember_location_account,
+    roster_is_stale,
+)
 
 logger = logging.getLogger(__name__)
 
@@ -26,6 +37,13 @@ class AccountService:
     PIN_HASH_ITERATIONS = 390_000
     PIN_SALT_BYTES = 16
     PIN_DEFAULT_PEPPER = "restiq-clock-pin-pepper"
+    PIN_VERIFIED_CACHE_SIZE = 4096
+
+    # (lookup hash, stored hash, salt) triples that already passed PBKDF2.
+    # The lookup hash is a deterministic digest of the PIN, so a later tap with
+    # the same lookup hash against the same stored hash needs no re-derivation.
+    _verified_pins: "OrderedDict[Tuple[str, str, str], bool]" = OrderedDict()
+    _verified_lock = threading.Lock()
 
     def __init__(self) -> None:
         self.client = get_supabase_service_client()
@@ -175,6 +193,7 @@ class AccountService:
                 "clock_pin_failed_attempts": 0,
             }
         ).eq("id", user_id).execute()
+        invalidate_member_kiosk_rosters(self.client, user_id)
         return timestamp
 
     def clear_clock_pin(self, user_id: str) -> None:
@@ -187,6 +206,7 @@ class AccountService:
                 "clock_pin_failed_attempts": 0,
             }
         ).eq("id", user_id).execute()
+        invalidate_member_kiosk_rosters(self.client, user_id)
 
     def lookup_user_by_pin(self, pin: str) -> Optional[Dict]:
         """Global PIN lookup (legacy - may have collisions across accounts)."""
@@ -213,44 +233,51 @@ class AccountService:
         """Look up user by PIN, scoped to a specific account (no collisions)."""
         normalized = self._normalize_pin(pin)
         lookup_hash = self._build_lookup_hash(normalized)
-        
-        # Get all members of this account
-        members_result = (
-            self.client.table("account_members")
-            .select("user_id")
-            .eq("account_id", account_id)
-            .eq("status", "active")
-            .execute()
-        )
-        member_user_ids = [m["user_id"] for m in (members_result.data or [])]
-        
-        if not member_user_ids:
+
+        roster = load_kiosk_roster(self.client, account_id)
+        candidates = roster["members"].get(lookup_hash)
+        if not candidates and roster_is_stale(roster):
+            # Member may have joined or set a PIN outside the API
+            roster = load_kiosk_roster(self.client, account_id, refresh=True)
+            candidates = roster["members"].get(lookup_hash)
+
+        if not candidates:
             return None
-        
-        # Look up users with matching PIN hash who are members of this account
-        result = (
-            self.client.table("users")
-            .select(
-                "id, primary_account_id, default_account_role, first_name, last_name, clock_pin_hash, clock_pin_salt, clock_pin_updated_at"
-            )
-            .eq("clock_pin_lookup", lookup_hash)
-            .in_("id", member_user_ids)
-            .execute()
-        )
-        
-        for row in result.data or []:
-            if self._verify_pin_hash(normalized, row.get("clock_pin_hash"), row.get("clock_pin_salt")):
-                self.client.table("users").update({"clock_pin_failed_attempts": 0}).eq("id", row["id"]).execute()
-                row.pop("clock_pin_hash", None)
-                row.pop("clock_pin_salt", None)
-                return row
+
+        # PIN hash/salt are not cached; read them for the candidates only
+        secrets_by_id = {
+            row["id"]: row
+            for row in (
+                self.client.table("users")
+                .select(PIN_SECRET_COLUMNS)
+                .in_("id", [candidate["id"] for candidate in candidates])
+                .execute()
+            ).data or []
+        }
+        for candidate in candidates:
+            secret = secrets_by_id.get(candidate["id"])
+            if not secret or secret.get("clock_pin_lookup") != lookup_hash:
+                continue  # PIN changed or cleared since the roster was built
+            if self._verify_pin_hash(
+                normalized,
+                secret.get("clock_pin_hash"),
+                secret.get("clock_pin_salt"),
+                lookup_hash=lookup_hash,
+            ):
+                if secret.get("clock_pin_failed_attempts"):
+                    self.client.table("users").update({"clock_pin_failed_attempts": 0}).eq("id", candidate["id"]).execute()
+                return dict(candidate)
         return None
 
     def get_account_by_location_code(self, location_code: str) -> Optional[Dict]:
         """Look up an account by its 4-digit location code."""
         if not location_code or len(location_code) != 4 or not location_code.isdigit():
             return None
-        
+
+        cached = cached_location_account(location_code)
+        if cached:
+            return cached
+
         result = (
             self.client.table("accounts")
             .select("id, name, plan, clock_location_code")
@@ -258,8 +285,11 @@ class AccountService:
             .limit(1)
             .execute()
         )
-        
-        return result.data[0] if result.data else None
+
+        if not result.data:
+            return None
+        remember_location_account(location_code, result.data[0])
+        return result.data[0]
 
     def get_account_location_code(self, account_id: str) -> Optional[str]:
         """Get the location code for an account."""
@@ -296,11 +326,31 @@ class AccountService:
         digest = hashlib.pbkdf2_hmac("sha256", payload, salt_bytes, self.PIN_HASH_ITERATIONS)
         return digest.hex(), salt_bytes.hex()
 
-    def _verify_pin_hash(self, pin: str, expected_hash: Optional[str], salt_hex: Optional[str]) -> bool:
+    def _verify_pin_hash(
+        self,
+        pin: str,
+        expected_hash: Optional[str],
+        salt_hex: Optional[str],
+        *,
+        lookup_hash: Optional[str] = None,
+    ) -> bool:
         if not expected_hash or not salt_hex:
             return False
+        memo_key = (lookup_hash or self._build_lookup_hash(pin), expected_hash, salt_hex)
+        with self._verified_lock:
+            if memo_key in self._verified_pins:
+                self._verified_pins.move_to_end(memo_key)
+                return True
+
         computed, _ = self._derive_pin_hash(pin, salt_hex=salt_hex)
-        return hmac.compare_digest(computed, expected_hash)
+        if not hmac.compare_digest(computed, expected_hash):
+            return False
+
+        with self._verified_lock:
+            self._verified_pins[memo_key] = True
+            if len(self._verified_pins) > self.PIN_VERIFIED_CACHE_SIZE:
+                self._verified_pins.popitem(last=False)
+        return True
 
     def _fetch_auth_profiles(self, user_ids: List[str]) -> Dict[str, Dict]:
         """Fetch auth profile details via admin API without mutating table schema."""
@@ -407,6 +457,8 @@ class AccountService:
             }
         ).execute()
 
+        invalidate_kiosk_roster(account_id)
+
         # Update invitation status
         self.client.table("account_invitations").update(
             {
@@ -0,0 +1,211 @@
+"""
+Analysis Result Cache
+Content-addressed cache and single-flight for competitor LLM analyses
+
+The key hashes everything that shapes the LLM output: restaurant, location,
+category, tier, the service's prompt fingerprint and the optimized review
+selection. A retry, a double-click or a second device asking for the same
+analysis gets the stored result instead of a new LLM call.
+
+Identical requests that arrive while the first is still running share it:
+within a process they await the same task, and across workers the first one
+takes a short Redis lock while the others poll for its result. Fallback
+(non-LLM) results are never stored.
+"""
+import asyncio
+import copy
+import hashlib
+import json
+import logging
+import os
+import time
+import uuid
+from typing import Any, Awaitable, Callable, Dict, Optional, Tuple
+
+from services.redis_client import cache, get_analysis_cache_key
+
+logger = logging.getLogger(__name__)
+
+ANALYSIS_CACHE_TTL_SECONDS = int(os.getenv("ANALYSIS_CACHE_TTL_SECONDS", "86400"))
+# Longer than the slowest LLM call (premium timeout is 45s)
+ANALYSIS_LOCK_TTL_SECONDS = 90
+ANALYSIS_REMOTE_WAIT_SECONDS = 60
+ANALYSIS_REMOTE_POLL_SECONDS = 0.5
+
+STATS_KEY = "analysis:cache:stats"
+STAT_NAMES = ("hit", "miss", "coalesced", "remote_coalesced", "stored", "uncacheable")
+
+
+def analysis_content_key(
+    restaurant_name: str,
+    restaurant_location: str,
+    restaurant_category: str,
+    tier: str,
+    prompt_fingerprint: str,
+    optimized_data: Dict,
+) -> str:
+    """Cache key: readable prefix plus a hash of the prompt inputs"""
+    competitors = {}
+    for competitor_id, data in optimized_data.items():
+        reviews = data.get("reviews", []) if isinstance(data, dict) else data
+        evidence = data.get("evidence", {}) if isinstance(data, dict) else {}
+        competitors[str(competitor_id)] = {
+            # What the prompt sees
+            "prompt": [
+                [
+                    review.get("competitor_name"),
+                    review.get("rating"),
+                    review.get("text"),
+                    str(review.get("date") or ""),
+                ]
+                for review in reviews or []
+            ],
+            # Returned with the result as evidence
+            "evidence": sorted(
+                review.get("full_text") or review.get("text") or ""
+                for segment in evidence.values()
+                for review in segment
+            ),
+        }
+    material = json.dumps(
+        {
+            "restaurant": restaurant_name.lower().strip(),
+            "location": restaurant_location.lower().strip(),
+            "category": restaurant_category.lower().strip(),
+            "tier": tier,
+            "prompt": prompt_fingerprint,
+            "competitors": competitors,
+        },
+        sort_keys=True,
+        default=str,
+    )
+    digest = hashlib.sha256(material.encode("utf-8")).hexdigest()[:32]
+    return f"{get_analysis_cache_key(restaurant_name, restaurant_location, tier)}:{digest}"
+
+
+class AnalysisResultCache:
+    """Redis result cache plus in-process and cross-worker request coalescing"""
+
+    def __init__(self):
+        self._inflight: Dict[Tuple[int, str], asyncio.Task] = {}
+        self._stats = {name: 0 for name in STAT_NAMES}
+
+    async def get_or_compute(
+        self,
+        key: str,
+        compute: Callable[[], Awaitable[Dict]],
+        is_cacheable: Callable[[Dict], bool],
+    ) -> Tuple[Dict, str]:
+        """
+        Return (result, status) where status is hit, miss, coalesced or
+        remote_coalesced. Every caller gets its own copy of the result.
+        """
+        cached = cache.get(key)
+        if isinstance(cached, dict):
+            self._record("hit")
+            return cached, "hit"
+
+        loop = asyncio.get_running_loop()
+        slot = (id(loop), key)
+        task = self._inflight.get(slot)
+        if task is not None:
+            self._record("coalesced")
+            logger.info(f"🔗 Analysis coalesced with in-flight request: {key}")
+            result, _ = await asyncio.shield(task)
+            return copy.deepcopy(result), "coalesced"
+
+        # The shared work outlives a caller that disconnects mid-analysis
+        task = loop.create_task(self._compute_once(key, compute, is_cacheable))
+        self._inflight[slot] = task
+        task.add_done_callback(lambda _: self._inflight.pop(slot, None))
+        result, status = await asyncio.shield(task)
+        return copy.deepcopy(result), status
+
+    async def _compute_once(
+        self,
+        key: str,
+        compute: Callable[[], Awaitable[Dict]],
+        is_cacheable: Callable[[Dict], bool],
+    ) -> Tuple[Dict, str]:
+        lock_key = f"{key}:lock"
+        token = uuid.uuid4().hex
+        if not self._acquire_lock(lock_key, token):
+            result = await self._wait_for_remote(key, lock_key)
+            if result is not None:
+                self._record("remote_coalesced")
+                logger.info(f"🔗 Analysis served by another worker's request: {key}")
+                return result, "remote_coalesced"
+            # The other worker failed, fell back or timed out: run it here
+            self._acquire_lock(lock_key, token)
+
+        try:
+            self._record("miss")
+            result = await compute()
+            if is_cacheable(result):
+                if cache.set(key, result, ttl=ANALYSIS_CACHE_TTL_SECONDS):
+                    self._record("stored")
+            else:
+                self._record("uncacheable")
+            return result, "miss"
+        finally:
+            self._release_lock(lock_key, token)
+
+    @staticmethod
+    def _acquire_lock(lock_key: str, token: str) -> bool:
+        if not cache.enabled:
+            return True
+        try:
+            return bool(cache.client.set(lock_key, token, nx=True, ex=ANALYSIS_LOCK_TTL_SECONDS))
+        except Exception as e:
+            logger.warning(f"Analysis lock unavailable, computing without it: {e}")
+            return True
+
+    @staticmethod
+    def _release_lock(lock_key: str, token: str) -> None:
+        if not cache.enabled:
+            return
+        try:
+            if cache.client.get(lock_key) == token:
+                cache.client.delete(lock_key)
+        except Exception as e:
+            logger.warning(f"Analysis lock release failed for {lock_key}: {e}")
+
+    @staticmethod
+    async def _wait_for_remote(key: str, lock_key: str) -> Optional[Dict]:
+        """Poll for another worker's result while it still holds the lock"""
+        deadline = time.monotonic() + ANALYSIS_REMOTE_WAIT_SECONDS
+        while time.monotonic() < deadline:
+            await asyncio.sleep(ANALYSIS_REMOTE_POLL_SECONDS)
+            cached = cache.get(key)
+            if isinstance(cached, dict):
+                return cached
+            try:
+                if not cache.client.exists(lock_key):
+                    return cache.get(key)
+            except Exception:  # pylint: disable=broad-except
+                return None
+        return None
+
+    def _record(self, stat: str) -> None:
+        self._stats[stat] += 1
+        if not cache.enabled:
+            return
+        try:
+            cache.client.hincrby(STATS_KEY, stat, 1)
+        except Exception as e:
+            logger.debug(f"Analysis cache stat update failed: {e}")
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Hit/coalesce counters for this process and (with Redis) all workers"""
+        stats: Dict[str, Any] = {"process": dict(self._stats), "in_flight": len(self._inflight)}
+        if cache.enabled:
+            try:
+                shared = cache.client.hgetall(STATS_KEY) or {}
+                stats["all_workers"] = {name: int(shared.get(name, 0)) for name in STAT_NAMES}
+            except Exception as e:
+                logger.debug(f"Analysis cache stats read failed: {e}")
+        return stats
+
+
+# Shared by every orchestrator instance in the process
+analysis_result_cache = AnalysisResultCache()
@@ -9,6 +9,7 @@ from datetime import datetime
 
 from services.real_free_tier_llm_service import RealFreeTierLLMService
 from services.premium_tier_llm_service import PremiumTierLLMService
+from services.analysis_result_cache import analysis_content_key, analysis_result_cache
 
 logger = logging.getLogger(__name__)
 
@@ -64,37 +65,52 @@ class AnalysisServiceOrchestrator:
         start_time = datetime.now()
         
         try:
-            if tier == "premium":
-                # Route to enhanced service
-                logger.info(f"routing_to_premium_tier")
-                
-                result = await self.premium_service.analyze_competitors_premium_tier(
+            service = self.premium_service if tier == "premium" else self.free_service
+            logger.info(f"routing_to_{tier}_tier")
+            
+            # The optimized review selection is both the prompt input and the cache content
+            optimized_data = service.prepare_competitor_data(competitors_data) if competitors_data else None
+            
+            async def run_analysis() -> Dict:
+                if tier == "premium":
+                    return await self.premium_service.analyze_competitors_premium_tier(
+                        restaurant_name=restaurant_name,
+                        restaurant_location=restaurant_location,
+                        restaurant_category=restaurant_category,
+                        competitors_data=competitors_data,
+                        optimized_data=optimized_data
+                    )
+                return await self.free_service.analyze_competitors_free_tier(
                     restaurant_name=restaurant_name,
                     restaurant_location=restaurant_location,
                     restaurant_category=restaurant_category,
-                    competitors_data=competitors_data
+                    competitors_data=competitors_data,
+                    optimized_data=optimized_data
                 )
-                
-                # Add premium tier metadata
-                result = self._add_tier_metadata(result, tier, start_time)
-                
-            else:
-                # Route to free tier service
-                logger.info(f"routing_to_free_tier")
-                
-                result = await self.free_service.analyze_competitors_free_tier(
+            
+            if optimized_data and service.model:
+                cache_key = analysis_content_key(
                     restaurant_name=restaurant_name,
                     restaurant_location=restaurant_location,
                     restaurant_category=restaurant_category,
-                    competitors_data=competitors_data
+                    tier=tier,
+                    prompt_fingerprint=service.prompt_fingerprint(),
+                    optimized_data=optimized_data
+                )
+                result, cache_status = await analysis_result_cache.get_or_compute(
+                    cache_key, run_analysis, self._is_cacheable_result
                 )
-                
-                # Add free tier metadata
-                result = self._add_tier_metadata(result, tier, start_time)
+            else:
+                # Fallback analysis only; nothing worth caching
+                result, cache_status = await run_analysis(), "bypass"
+            
+            # Add tier metadata
+            result = self._add_tier_metadata(result, tier, start_time)
+            result['metadata']['analysis_cache'] = cache_status
             
             # Log completion
             processing_time = (datetime.now() - start_time).total_seconds()
-            logger.info(f"analysis_routing_completed: tier={tier}, processing_time_seconds={processing_time}, insights_count={len(result.get('actionable_insights', []))}")
+            logger.info(f"analysis_routing_completed: tier={tier}, cache={cache_status}, processing_time_seconds={processing_time}, insights_count={len(result.get('actionable_insights', []))}")
             
             return result
             
@@ -104,6 +120,17 @@ class AnalysisServiceOrchestrator:
             # Return fallback mock analysis
             return self._get_fallback_analysis(restaurant_name, tier, competitors_data)
     
+    @staticmethod
+    def _is_cacheable_result(result: Dict) -> bool:
+        """Only real LLM analyses are cached, never fallbacks"""
+        if not isinstance(result, dict) or not result.get('actionable_insights'):
+            return False
+        return result.get('filtering_metadata', {}).get('is_fallback') is False
+    
+    def get_cache_stats(self) -> Dict:
+        """Analysis cache hit and coalescing counters"""
+        return analysis_result_cache.get_stats()
+    
     def _add_tier_metadata(self, result: Dict, tier: str, start_time: datetime) -> Dict:
         """Add tier-specific metadata to analysis result"""
         
@@ -10,18 +10,22 @@ from __future__ import annotations
 import asyncio
 import logging
 import os
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
+from functools import partial
 from typing import Iterable, Sequence
 
 from database.supabase_client import get_supabase_service_client
 from services.dashboard_analytics_service import DashboardAnalyticsService
-from services.menu_recipe_service import MenuRecipeService
+from services.cogs_snapshot_store import CogsSnapshotStore, recipe_snapshot_key
+from services.job_queue import get_job_queue
+from services.menu_cogs_dependency_index import MenuCogsDependencyIndex
 from services.price_analytics_service import PriceAnalyticsService
+from services.price_history_frame import invalidate_price_frames
 from services.ordering.tasks import (
-    enqueue_delivery_pattern_detection,
-    enqueue_feature_refresh,
-    enqueue_forecast_generation,
-    enqueue_normalization_job,
+    mark_ordering_dirty,
+    process_dirty_ordering,
+    run_full_ordering_pipeline,
     warm_forecast_cache,
 )
 from services.redis_client import cache
@@ -31,7 +35,6 @@ logger = logging.getLogger(__name__)
 # TTLs (seconds) – overridable via environment for tuning without code changes.
 DASHBOARD_CACHE_TTL = int(os.getenv("DASHBOARD_CACHE_TTL", "300"))
 PRICE_ANALYTICS_CACHE_TTL = int(os.getenv("PRICE_ANALYTICS_CACHE_TTL", "300"))
-COGS_CACHE_TTL = int(os.getenv("COGS_CACHE_TTL", "240"))
 
 
 def _cache_set(key: str, data, ttl: int) -> None:
@@ -89,22 +92,21 @@ def price_anomalies_key(user_id: str, min_change: float, days_back: int) -> str:
     return f"price:anomalies:{user_id}:{min_change}:{days_back}"
 
 
-def recipe_snapshot_key(user_id: str, menu_item_id: str) -> str:
-    return f"cogs:recipe:{user_id}:{menu_item_id}"
-
-
 def store_recipe_snapshot(user_id: str, menu_item_id: str, payload) -> None:
-    """Persist a freshly computed recipe snapshot."""
-    _cache_set(recipe_snapshot_key(user_id, menu_item_id), payload, COGS_CACHE_TTL)
+    """Persist a freshly computed recipe snapshot (Redis + snapshot table)."""
+    CogsSnapshotStore(get_supabase_service_client()).save(user_id, menu_item_id, payload)
 
 
 # ---------------------------------------------------------------------------
 # Cache warmers
 # ---------------------------------------------------------------------------
-def warm_dashboard_cache(user_id: str) -> None:
+def warm_dashboard_cache(user_id: str, *, raise_errors: bool = False) -> None:
     """
     Fetches the high-traffic dashboard widgets and stores them so the next
     request can be served straight from Redis.
+
+    Failures are logged; with raise_errors (queued jobs) they propagate so
+    the job queue retries.
     """
     logger.info("🔥 Warming dashboard cache for user %s", user_id)
     supabase = get_supabase_service_client()
@@ -125,13 +127,21 @@ def warm_dashboard_cache(user_id: str) -> None:
         )
     except Exception as exc:
         logger.exception("Dashboard cache warmer failed for %s: %s", user_id, exc)
+        if raise_errors:
+            raise
 
 
-def warm_price_analytics_cache(user_id: str) -> None:
-    """Pre-compute the heaviest price analytics payloads."""
+def warm_price_analytics_cache(user_id: str, *, raise_errors: bool = False) -> None:
+    """
+    Pre-compute the heaviest price analytics payloads.
+
+    All three share one freshly built price frame, so this is a single fetch.
+    Failures propagate only with raise_errors, as in warm_dashboard_cache.
+    """
     logger.info("🔥 Warming price analytics cache for user %s", user_id)
     supabase = get_supabase_service_client()
     service = PriceAnalyticsService(supabase)
+    invalidate_price_frames(user_id)
 
     try:
         _cache_set(
@@ -151,10 +161,17 @@ def warm_price_analytics_cache(user_id: str) -> None:
         )
     except Exception as exc:
         logger.exception("Price analytics cache warmer failed for %s: %s", user_id, exc)
+        if raise_errors:
+            raise
 
 
-async def _build_recipe_snapshots(user_id: str, menu_item_ids: Sequence[str]) -> None:
-    """Fetch menu recipes in batch and cache each snapshot."""
+async def _build_recipe_snapshots(
+    user_id: str,
+    menu_item_ids: Sequence[str],
+    *,
+    raise_errors: bool = False,
+) -> None:
+    """Recompute menu recipes in batch and persist each snapshot."""
     seen: set[str] = set()
     unique_ids = []
     for item_id in menu_item_ids:
@@ -166,42 +183,144 @@ async def _build_recipe_snapshots(user_id: str, menu_item_ids: Sequence[str]) ->
         return
 
     logger.info("🔥 Warming %d COGS snapshots for user %s", len(unique_ids), user_id)
-    supabase = get_supabase_service_client()
-    recipe_service = MenuRecipeService(supabase)
+    store = CogsSnapshotStore(get_supabase_service_client())
 
     try:
-        recipes = await recipe_service.get_recipes_batch(menu_item_ids=unique_ids, user_id=user_id)
+        await store.recompute(user_id, unique_ids)
     except Exception as exc:
         logger.exception("Failed to build recipe snapshots for %s: %s", user_id, exc)
-        return
+        if raise_errors:
+            raise
 
-    for menu_item_id, payload in (recipes or {}).items():
-        _cache_set(recipe_snapshot_key(user_id, menu_item_id), payload, COGS_CACHE_TTL)
 
+def refresh_recipe_snapshots(
+    user_id: str,
+    menu_item_ids: Iterable[str],
+    *,
+    raise_errors: bool = False,
+) -> None:
+    """
+    Public entry-point for background tasks to refresh recipe caches.
 
-def refresh_recipe_snapshots(user_id: str, menu_item_ids: Iterable[str]) -> None:
-    """Public entry-point for background tasks to refresh recipe caches."""
+    With raise_errors (queued jobs) this always runs to completion and the
+    failure reaches the caller, even when called from inside an event loop.
+    """
     ids = [item_id for item_id in menu_item_ids if item_id]
     if not ids:
         return
 
     async def runner():
-        await _build_recipe_snapshots(user_id, ids)
+        await _build_recipe_snapshots(user_id, ids, raise_errors=raise_errors)
 
-    _run_async_task(runner())
+    _run_async_task(runner(), wait=raise_errors)
 
 
-def _run_async_task(coro) -> None:
+def refresh_cogs_for_price_changes(
+    user_id: str,
+    *,
+    invoice_item_ids: Iterable[str] = (),
+    normalized_ingredient_ids: Iterable[str] = (),
+) -> dict:
+    """
+    Recompute COGS snapshots only for recipes that depend on the changed
+    invoice lines / normalized ingredients (via the dependency index).
+
+    Recipe lines are priced from the latest purchase of their ingredient
+    from the same vendor (MenuRecipeService.get_pricing_lines), so a new
+    invoice for that vendor item changes the snapshots of every recipe
+    using it.
+    """
+    index = MenuCogsDependencyIndex(get_supabase_service_client())
+    menu_item_ids = index.affected_menu_items(
+        user_id,
+        invoice_item_ids=invoice_item_ids,
+        normalized_ingredient_ids=normalized_ingredient_ids,
+    )
+    if menu_item_ids:
+        logger.info("🔁 Price change affects %d recipes for user %s", len(menu_item_ids), user_id)
+        refresh_recipe_snapshots(user_id, menu_item_ids, raise_errors=True)
+    return {"status": "success", "user_id": user_id, "menu_items_refreshed": len(menu_item_ids)}
+
+
+def _run_async_task(coro, *, wait: bool = False) -> None:
     """
     Fire-and-forget helper that works whether we're already inside an event loop
     (FastAPI workers) or not (CLI scripts/tests).
+
+    Inside a loop the coroutine becomes a task whose failure is logged. With
+    wait=True it instead runs to completion on a helper thread's loop, so
+    its exception propagates to the caller (e.g. a job run inline).
     """
     try:
         loop = asyncio.get_running_loop()
     except RuntimeError:
         asyncio.run(coro)
-    else:
-        loop.create_task(coro)
+        return
+    if wait:
+        with ThreadPoolExecutor(max_workers=1) as executor:
+            executor.submit(asyncio.run, coro).result()
+        return
+    loop.create_task(coro).add_done_callback(_log_task_failure)
+
+
+def _log_task_failure(task: asyncio.Task) -> None:
+    if not task.cancelled() and task.exception() is not None:
+        logger.error("Background task failed: %s", task.exception())
+
+
+# ---------------------------------------------------------------------------
+# Job queue registrations – executed by the worker (python -m services.worker)
+# ---------------------------------------------------------------------------
+JOB_WARM_DASHBOARD = "warm_dashboard"
+JOB_WARM_PRICE_ANALYTICS = "warm_price_analytics"
+JOB_ORDERING_PIPELINE = "ordering_pipeline"
+JOB_ORDERING_INCREMENTAL = "ordering_incremental"
+JOB_COGS_REFRESH = "cogs_refresh"
+
+
+def _process_dirty_ordering(user_id: str) -> dict:
+    """
+    Incremental ordering, then COGS refresh for whatever it normalized.
+
+    Normalization is what links new invoice lines to ingredients, so the
+    affected recipes are only known once it has run.
+    """
+    result = process_dirty_ordering(user_id)
+    touched = result.get("touched") or {}
+    if touched.get("invoice_item_ids") or touched.get("ingredient_ids"):
+        job_queue.enqueue(
+            JOB_COGS_REFRESH,
+            user_id,
+            dedupe=False,
+            invoice_item_ids=touched.get("invoice_item_ids") or [],
+            normalized_ingredient_ids=touched.get("ingredient_ids") or [],
+        )
+    return result
+
+
+job_queue = get_job_queue()
+# Queued warmers raise on failure so the queue retries / dead-letters them
+job_queue.register(JOB_WARM_DASHBOARD, partial(warm_dashboard_cache, raise_errors=True))
+job_queue.register(JOB_WARM_PRICE_ANALYTICS, partial(warm_price_analytics_cache, raise_errors=True))
+job_queue.register(JOB_ORDERING_PIPELINE, run_full_ordering_pipeline)
+job_queue.register(JOB_ORDERING_INCREMENTAL, _process_dirty_ordering)
+job_queue.register(JOB_COGS_REFRESH, refresh_cogs_for_price_changes)
+
+
+def schedule_ordering_refresh(
+    user_id: str,
+    *,
+    invoice_ids: Iterable[str] = (),
+    invoice_item_ids: Iterable[str] = (),
+) -> None:
+    """
+    Mark invoices dirty and queue an incremental ordering recompute.
+
+    The job is deduplicated per user, so uploads that land while one is
+    waiting are folded into the same drain of the dirty set.
+    """
+    mark_ordering_dirty(user_id, invoice_ids=invoice_ids, invoice_item_ids=invoice_item_ids)
+    job_queue.enqueue(JOB_ORDERING_INCREMENTAL, user_id, lane="low")
 
 
 # ---------------------------------------------------------------------------
@@ -211,6 +330,9 @@ def run_post_invoice_upload_tasks(user_id: str, session_id: str, *, is_guest: bo
     """
     Triggered after a successful invoice upload (guest or authenticated) to
     keep the landing demos and dashboards fresh.
+
+    Work is queued for the background worker, deduplicated per user so a
+    burst of uploads only recomputes once. Without Redis the jobs run inline.
     """
     logger.info(
         "Scheduling post-upload cache warmers for user=%s session=%s guest=%s",
@@ -218,14 +340,11 @@ def run_post_invoice_upload_tasks(user_id: str, session_id: str, *, is_guest: bo
         session_id,
         is_guest,
     )
-    warm_dashboard_cache(user_id)
+    job_queue.enqueue(JOB_WARM_DASHBOARD, user_id, lane="high")
     if not is_guest:
-        warm_price_analytics_cache(user_id)
-        enqueue_normalization_job(user_id)
-        enqueue_feature_refresh(user_id)
-        enqueue_forecast_generation(user_id)
-        enqueue_delivery_pattern_detection(user_id)
-        warm_forecast_cache(user_id)
+        job_queue.enqueue(JOB_WARM_PRICE_ANALYTICS, user_id, lane="default")
+        # Picks up any invoices saved since the last run; no-op when clean.
+        job_queue.enqueue(JOB_ORDERING_INCREMENTAL, user_id, lane="low")
 
 
 def run_post_recipe_change_tasks(user_id: str, menu_item_ids: Iterable[str]) -> None:
@@ -248,12 +367,15 @@ __all__ = [
     "price_savings_key",
     "recipe_snapshot_key",
     "store_recipe_snapshot",
+    "refresh_cogs_for_price_changes",
     "refresh_recipe_snapshots",
     "run_post_invoice_upload_tasks",
     "run_post_recipe_change_tasks",
+    "schedule_ordering_refresh",
     "warm_dashboard_cache",
     "warm_price_analytics_cache",
     "warm_forecast_cache",
     "get_cached_payload",
+    "job_queue",
 ]
 
@@ -0,0 +1,208 @@
+"""
+COGS Snapshot Store
+Read-through storage for recipe COGS snapshots.
+
+Reads go Redis → ``menu_item_cogs_snapshots`` table → recompute. Only the
+recompute path writes, and it writes both layers. Table rows carry the
+fingerprint of the recipe/price inputs they were computed from
+(migration 056) and are only served while it still matches, so snapshots
+survive Redis restarts without going stale.
+
+Single and batch reads share one computation (MenuRecipeService costs every
+line the same way), so either path can serve the recipe detail. Payloads
+are stamped with SNAPSHOT_FORMAT and entries written in another format are
+treated as missing.
+"""
+import logging
+import os
+from datetime import datetime
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from supabase import Client
+
+from services.menu_recipe_service import MenuRecipeService
+from services.redis_client import cache
+
+logger = logging.getLogger(__name__)
+
+COGS_CACHE_TTL = int(os.getenv("COGS_CACHE_TTL", "240"))
+
+# Bump when the snapshot payload shape changes
+SNAPSHOT_FORMAT = 2
+
+# Keeps RPC array arguments and upsert batches reasonably sized
+SNAPSHOT_CHUNK_SIZE = 200
+
+
+def recipe_snapshot_key(user_id: str, menu_item_id: str) -> str:
+    return f"cogs:recipe:{user_id}:{menu_item_id}"
+
+
+def _is_current(payload) -> bool:
+    return isinstance(payload, dict) and payload.get("snapshot_format") == SNAPSHOT_FORMAT
+
+
+def _chunks(ids: List[str]) -> Iterable[List[str]]:
+    for start in range(0, len(ids), SNAPSHOT_CHUNK_SIZE):
+        yield ids[start:start + SNAPSHOT_CHUNK_SIZE]
+
+
+class CogsSnapshotStore:
+    """Redis + table backed recipe COGS snapshots."""
+
+    def __init__(self, supabase_client: Client, recipe_service: Optional[MenuRecipeService] = None):
+        self.client = supabase_client
+        self.recipe_service = recipe_service or MenuRecipeService(supabase_client)
+
+    # ------------------------------------------------------------------
+    # Read-through
+    # ------------------------------------------------------------------
+    async def get_many(self, user_id: str, menu_item_ids: Iterable[str]) -> Dict[str, Dict]:
+        """
+        Snapshots for the given menu items, recomputing only what neither
+        Redis nor the table can serve.
+        """
+        ids = list(dict.fromkeys(item_id for item_id in menu_item_ids if item_id))
+        snapshots: Dict[str, Dict] = {}
+
+        for menu_item_id in ids:
+            cached = self._cache_get(user_id, menu_item_id)
+            if cached is not None:
+                snapshots[menu_item_id] = cached
+
+        missing = [item_id for item_id in ids if item_id not in snapshots]
+        if missing:
+            stored = self._load_fresh(user_id, missing)
+            for menu_item_id, payload in stored.items():
+                self._cache_set(user_id, menu_item_id, payload)
+            snapshots.update(stored)
+
+        missing = [item_id for item_id in ids if item_id not in snapshots]
+        if missing:
+            logger.info(f"🧮 Recomputing {len(missing)}/{len(ids)} COGS snapshots for user {user_id}")
+            snapshots.update(await self.recompute(user_id, missing))
+
+        return snapshots
+
+    async def get_recipe(self, user_id: str, menu_item_id: str) -> Tuple[Dict, str]:
+        """
+        Detailed recipe snapshot for one menu item.
+
+        Returns:
+            (payload, source) where source is "redis", "table" or "computed"
+        """
+        cached = self._cache_get(user_id, menu_item_id)
+        if cached is not None:
+            return cached, "redis"
+
+        stored = self._load_fresh(user_id, [menu_item_id]).get(menu_item_id)
+        if stored is not None:
+            self._cache_set(user_id, menu_item_id, stored)
+            return stored, "table"
+
+        versions = self.fetch_versions(user_id, [menu_item_id])
+        recipe = await self.recipe_service.get_recipe(menu_item_id=menu_item_id, user_id=user_id)
+        self.save_many(user_id, {menu_item_id: recipe}, versions)
+        return recipe, "computed"
+
+    # ------------------------------------------------------------------
+    # Recompute / write path
+    # ------------------------------------------------------------------
+    async def recompute(self, user_id: str, menu_item_ids: Iterable[str]) -> Dict[str, Dict]:
+        """Rebuild snapshots in batch and persist them to both layers."""
+        ids = list(dict.fromkeys(item_id for item_id in menu_item_ids if item_id))
+        if not ids:
+            return {}
+
+        # Read versions before pricing so a concurrent price change leaves the
+        # stored fingerprint behind and forces the next read to recompute.
+        versions = self.fetch_versions(user_id, ids)
+        recipes = await self.recipe_service.get_recipes_batch(menu_item_ids=ids, user_id=user_id) or {}
+        self.save_many(user_id, recipes, versions)
+        return recipes
+
+    def save(self, user_id: str, menu_item_id: str, payload: Dict) -> None:
+        """Persist a snapshot computed elsewhere (versions fetched now)."""
+        self.save_many(user_id, {menu_item_id: payload}, self.fetch_versions(user_id, [menu_item_id]))
+
+    def save_many(self, user_id: str, payloads: Dict[str, Dict], versions: Dict[str, Dict]) -> None:
+        """Write snapshots to Redis, and to the table where a version is known."""
+        rows = []
+        computed_at = datetime.utcnow().isoformat()
+        for menu_item_id, payload in payloads.items():
+            payload["snapshot_format"] = SNAPSHOT_FORMAT
+            self._cache_set(user_id, menu_item_id, payload)
+            version = versions.get(menu_item_id)
+            if not version:
+                continue
+            rows.append({
+                "menu_item_id": menu_item_id,
+                "user_id": user_id,
+                "payload": payload,
+                "total_cogs": payload.get("total_cogs"),
+                "food_cost_percent": payload.get("food_cost_percent"),
+                "price_version": version.get("price_version"),
+                "inputs_hash": version["inputs_hash"],
+                "computed_at": computed_at,
+            })
+
+        try:
+            for start in range(0, len(rows), SNAPSHOT_CHUNK_SIZE):
+                self.client.table("menu_item_cogs_snapshots").upsert(
+                    rows[start:start + SNAPSHOT_CHUNK_SIZE], on_conflict="menu_item_id"
+                ).execute()
+        except Exception as e:  # pylint: disable=broad-except
+            logger.warning(f"⚠️ Failed to persist COGS snapshots for user {user_id}: {e}")
+
+    def fetch_versions(self, user_id: str, menu_item_ids: List[str]) -> Dict[str, Dict]:
+        """Current price_version / inputs_hash per menu item ({} if unavailable)."""
+        versions: Dict[str, Dict] = {}
+        try:
+            for chunk in _chunks(menu_item_ids):
+                result = self.client.rpc("get_menu_item_cogs_versions", {
+                    "p_user_id": user_id,
+                    "p_menu_item_ids": chunk,
+                }).execute()
+                for row in result.data or []:
+                    versions[row["menu_item_id"]] = row
+        except Exception as e:  # pylint: disable=broad-except
+            logger.warning(f"⚠️ COGS version lookup failed, snapshots will not be persisted: {e}")
+            return {}
+        return versions
+
+    # ------------------------------------------------------------------
+    # Layers
+    # ------------------------------------------------------------------
+    def _load_fresh(self, user_id: str, menu_item_ids: List[str]) -> Dict[str, Dict]:
+        stored: Dict[str, Dict] = {}
+        try:
+            for chunk in _chunks(menu_item_ids):
+                result = self.client.rpc("get_fresh_cogs_snapshots", {
+                    "p_user_id": user_id,
+                    "p_menu_item_ids": chunk,
+                }).execute()
+                for row in result.data or []:
+                    if _is_current(row["payload"]):
+                        stored[row["menu_item_id"]] = row["payload"]
+        except Exception as e:  # pylint: disable=broad-except
+            logger.warning(f"⚠️ COGS snapshot table read failed: {e}")
+        return stored
+
+    @staticmethod
+    def _cache_get(user_id: str, menu_item_id: str) -> Optional[Dict]:
+        if not cache.enabled:
+            return None
+        cached = cache.get(recipe_snapshot_key(user_id, menu_item_id))
+        if isinstance(cached, dict) and "data" in cached:
+            cached = cached["data"]
+        return cached if _is_current(cached) else None
+
+    @staticmethod
+    def _cache_set(user_id: str, menu_item_id: str, payload: Dict) -> None:
+        if not cache.enabled:
+            return
+        cache.set(
+            recipe_snapshot_key(user_id, menu_item_id),
+            {"data": payload, "generated_at": datetime.utcnow().isoformat()},
+            ttl=COGS_CACHE_TTL,
+        )
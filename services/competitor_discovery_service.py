@@ -5,14 +5,30 @@ Separation of Concerns: Only handles competitor discovery, no menu parsing
 """
 import os
 import logging
+import time
 import requests
 from typing import List, Dict, Optional
 from dataclasses import dataclass
 from dotenv import load_dotenv
 
+from services.competitor_geo_cache import (
+    NearbyPlacesCache,
+    cached_place_details,
+    geocode_location,
+    haversine_miles,
+    remember_place_details,
+)
+
 load_dotenv()
 logger = logging.getLogger(__name__)
 
+METERS_PER_MILE = 1609.34
+MAX_NEARBY_RADIUS_METERS = 50000  # Places API limit
+# Nearby Search returns 20 places per page and at most 3 pages
+NEARBY_TILE_MAX_PAGES = 3
+# A next_page_token only becomes valid a short while after it is issued
+NEXT_PAGE_TOKEN_DELAY_SECONDS = 2
+
 
 @dataclass
 class CompetitorBusiness:
@@ -51,6 +67,7 @@ class CompetitorDiscoveryService:
         
         self.base_url = "https://maps.googleapis.com/maps/api/place"
         self.exclusion_service = exclusion_service  # Optional exclusion service
+        self.nearby_cache = NearbyPlacesCache("google_places")
         logger.info("✅ Competitor Discovery Service initialized")
     
     async def find_competitors(
@@ -82,45 +99,44 @@ class CompetitorDiscoveryService:
         logger.info(f"   Category: {category}, Radius: {radius_miles} miles")
         
         try:
-            # Step 1: Geocode location to get lat/lng
+            # Step 1: Geocode location to get lat/lng (cached per normalized location)
             lat, lng = self._geocode_location(location)
             logger.info(f"📍 Location coordinates: {lat}, {lng}")
             
-            # Step 2: Search for nearby restaurants (get more to account for exclusions)
-            radius_meters = int(radius_miles * 1609.34)  # Convert miles to meters
-            search_limit = max_results + 10  # Get extra for filtering
-            competitors = self._search_nearby_places(
-                lat=lat,
-                lng=lng,
-                radius_meters=radius_meters,
-                category=category,
-                max_results=search_limit
+            # Step 2: Nearby restaurants within the radius (shared geo-tile cache);
+            # enough to still fill max_results after the filters below
+            places = self._find_nearby_places(
+                lat, lng, radius_miles, category,
+                min_results=max_results + 1 + len(excluded_place_ids or [])
             )
             
             # Step 3: Filter out user's restaurant
-            filtered_competitors = []
-            for competitor in competitors:
-                if not self._is_same_restaurant(competitor.business_name, restaurant_name):
-                    filtered_competitors.append(competitor)
+            filtered_places = []
+            for place in places:
+                if not self._is_same_restaurant(place["business_name"], restaurant_name):
+                    filtered_places.append(place)
                 else:
-                    logger.info(f"   Skipping user's restaurant: {competitor.business_name}")
+                    logger.info(f"   Skipping user's restaurant: {place['business_name']}")
             
             # Step 4: Filter out excluded competitors (recently analyzed)
             if excluded_place_ids:
                 excluded_set = set(excluded_place_ids)
-                before_count = len(filtered_competitors)
-                filtered_competitors = [
-                    c for c in filtered_competitors 
-                    if c.place_id not in excluded_set
+                before_count = len(filtered_places)
+                filtered_places = [
+                    p for p in filtered_places 
+                    if p["place_id"] not in excluded_set
                 ]
-                excluded_count = before_count - len(filtered_competitors)
+                excluded_count = before_count - len(filtered_places)
                 if excluded_count > 0:
                     logger.info(
                         f"🚫 Filtered out {excluded_count} recently analyzed competitors"
                     )
             
-            # Step 5: Limit to max_results
-            final_competitors = filtered_competitors[:max_results]
+            # Step 5: Limit to max_results, then fetch details only for those
+            final_competitors = [
+                self._build_competitor(place)
+                for place in filtered_places[:max_results]
+            ]
             
             logger.info(f"✅ Found {len(final_competitors)} competitors")
             return final_competitors
@@ -140,36 +156,72 @@ class CompetitorDiscoveryService:
             Tuple of (latitude, longitude)
         """
         try:
-            url = f"{self.base_url}/findplacefromtext/json"
-            params = {
-                "input": location,
-                "inputtype": "textquery",
-                "fields": "geometry",
-                "key": self.api_key
-            }
-            
-            response = requests.get(url, params=params, timeout=10)
-            response.raise_for_status()
-            data = response.json()
-            
-            if data.get("status") != "OK" or not data.get("candidates"):
-                raise Exception(f"Geocoding failed: {data.get('status')}")
-            
-            location_data = data["candidates"][0]["geometry"]["location"]
-            return location_data["lat"], location_data["lng"]
-            
+            return geocode_location(location, self.api_key)
         except Exception as e:
             logger.error(f"❌ Geocoding failed: {e}")
             raise Exception(f"Failed to geocode location: {str(e)}")
     
+    def _find_nearby_places(
+        self,
+        lat: float,
+        lng: float,
+        radius_miles: float,
+        category: str,
+        min_results: int = 0
+    ) -> List[Dict]:
+        """
+        Places within radius_miles of the point, in Google's ranking order
+        
+        Served from the shared tile cache when an entry covers the circle;
+        otherwise a nearby search (all result pages) runs from the tile
+        center, wide enough for any query in the tile, and is cached for
+        every user. The widened circle spreads its results over a larger
+        area, so when fewer than min_results fall inside the requested
+        circle, one search centered on the point tops them up.
+        
+        Returns:
+            Place summaries with distance_miles from (lat, lng)
+        """
+        radius_meters = min(int(radius_miles * METERS_PER_MILE), MAX_NEARBY_RADIUS_METERS)
+        nearby = self.nearby_cache.get(lat, lng, radius_miles, category)
+        if nearby is None:
+            area = self.nearby_cache.search_area(lat, lng, radius_miles)
+            places = self._search_nearby_places(
+                lat=area["lat"],
+                lng=area["lng"],
+                radius_meters=min(int(area["radius_miles"] * METERS_PER_MILE), MAX_NEARBY_RADIUS_METERS),
+                category=category,
+                max_pages=NEARBY_TILE_MAX_PAGES
+            )
+            self.nearby_cache.set(
+                lat=area["lat"],
+                lng=area["lng"],
+                searched_radius_miles=min(area["radius_miles"], MAX_NEARBY_RADIUS_METERS / METERS_PER_MILE),
+                bucket_radius_miles=area["bucket"],
+                category=category,
+                places=places
+            )
+            nearby = NearbyPlacesCache.within_radius(places, lat, lng, radius_miles)
+        
+        if len(nearby) >= min_results:
+            return nearby
+        
+        logger.info(f"🔁 Tile gave {len(nearby)}/{min_results} places in radius, searching from the point")
+        direct = NearbyPlacesCache.within_radius(
+            self._search_nearby_places(lat=lat, lng=lng, radius_meters=radius_meters, category=category),
+            lat, lng, radius_miles
+        )
+        seen = {place["place_id"] for place in direct}
+        return direct + [place for place in nearby if place["place_id"] not in seen]
+    
     def _search_nearby_places(
         self,
         lat: float,
         lng: float,
         radius_meters: int,
         category: str,
-        max_results: int
-    ) -> List[CompetitorBusiness]:
+        max_pages: int = 1
+    ) -> List[Dict]:
         """
         Search for nearby restaurants using Google Places Nearby Search
         
@@ -178,10 +230,10 @@ class CompetitorDiscoveryService:
             lng: Longitude
             radius_meters: Search radius in meters
             category: Restaurant category
-            max_results: Maximum results to return
+            max_pages: Result pages to follow via next_page_token (20 places each)
             
         Returns:
-            List of CompetitorBusiness objects
+            List of place summaries (no details, no distance)
         """
         try:
             url = f"{self.base_url}/nearbysearch/json"
@@ -197,75 +249,102 @@ class CompetitorDiscoveryService:
                 "key": self.api_key
             }
             
-            response = requests.get(url, params=params, timeout=15)
-            response.raise_for_status()
-            data = response.json()
-            
-            if data.get("status") not in ["OK", "ZERO_RESULTS"]:
-                raise Exception(f"Places search failed: {data.get('status')}")
-            
-            competitors = []
-            for place in data.get("results", [])[:max_results]:
-                competitor = self._parse_place_data(place, lat, lng)
-                if competitor:
-                    competitors.append(competitor)
-            
-            return competitors
+            places = []
+            for page in range(max_pages):
+                response = requests.get(url, params=params, timeout=15)
+                response.raise_for_status()
+                data = response.json()
+                
+                if page and data.get("status") == "INVALID_REQUEST":
+                    # Token not active yet: wait once more, then keep what we have
+                    time.sleep(NEXT_PAGE_TOKEN_DELAY_SECONDS)
+                    response = requests.get(url, params=params, timeout=15)
+                    response.raise_for_status()
+                    data = response.json()
+                    if data.get("status") == "INVALID_REQUEST":
+                        break
+                
+                if data.get("status") not in ["OK", "ZERO_RESULTS"]:
+                    raise Exception(f"Places search failed: {data.get('status')}")
+                
+                for place in data.get("results", []):
+                    parsed = self._parse_place_data(place)
+                    if parsed:
+                        places.append(parsed)
+                
+                next_page_token = data.get("next_page_token")
+                if not next_page_token or page + 1 == max_pages:
+                    break
+                params = {"pagetoken": next_page_token, "key": self.api_key}
+                time.sleep(NEXT_PAGE_TOKEN_DELAY_SECONDS)
+            
+            return places
             
         except Exception as e:
             logger.error(f"❌ Places search failed: {e}")
             raise Exception(f"Failed to search nearby places: {str(e)}")
     
-    def _parse_place_data(self, place: Dict, origin_lat: float, origin_lng: float) -> Optional[CompetitorBusiness]:
+    def _parse_place_data(self, place: Dict) -> Optional[Dict]:
         """
-        Parse Google Places API response into CompetitorBusiness object
+        Parse a Google Places search result into a cacheable place summary
         
         Args:
             place: Place data from Google Places API
-            origin_lat: Origin latitude for distance calculation
-            origin_lng: Origin longitude for distance calculation
             
         Returns:
-            CompetitorBusiness object or None if parsing fails
+            Place summary dict or None if parsing fails
         """
         try:
             place_id = place.get("place_id")
             if not place_id:
                 return None
             
-            # Get place details for more info (phone, website, menu)
-            details = self._get_place_details(place_id)
-            
-            # Calculate distance
-            place_lat = place["geometry"]["location"]["lat"]
-            place_lng = place["geometry"]["location"]["lng"]
-            distance_miles = self._calculate_distance(
-                origin_lat, origin_lng, place_lat, place_lng
-            )
-            
-            return CompetitorBusiness(
-                place_id=place_id,
-                business_name=place.get("name", ""),
-                address=place.get("vicinity", ""),
-                latitude=place_lat,
-                longitude=place_lng,
-                rating=place.get("rating"),
-                review_count=place.get("user_ratings_total"),
-                price_level=place.get("price_level"),
-                distance_miles=round(distance_miles, 2),
-                phone=details.get("phone"),
-                website=details.get("website"),
-                menu_url=details.get("menu_url"),
-                types=place.get("types", [])
-            )
+            return {
+                "place_id": place_id,
+                "business_name": place.get("name", ""),
+                "address": place.get("vicinity", ""),
+                "latitude": place["geometry"]["location"]["lat"],
+                "longitude": place["geometry"]["location"]["lng"],
+                "rating": place.get("rating"),
+                "review_count": place.get("user_ratings_total"),
+                "price_level": place.get("price_level"),
+                "types": place.get("types", [])
+            }
             
         except Exception as e:
             logger.warning(f"⚠️  Failed to parse place data: {e}")
             return None
     
+    def _build_competitor(self, place: Dict) -> CompetitorBusiness:
+        """
+        Combine a place summary with its (cached) details
+        
+        Args:
+            place: Place summary with distance_miles
+            
+        Returns:
+            CompetitorBusiness object
+        """
+        details = self._get_place_details(place["place_id"])
+        return CompetitorBusiness(
+            place_id=place["place_id"],
+            business_name=place["business_name"],
+            address=place["address"],
+            latitude=place["latitude"],
+            longitude=place["longitude"],
+            rating=place.get("rating"),
+            review_count=place.get("review_count"),
+            price_level=place.get("price_level"),
+            distance_miles=place.get("distance_miles"),
+            phone=details.get("phone"),
+            website=details.get("website"),
+            menu_url=details.get("menu_url"),
+            types=place.get("types", [])
+        )
+    
     def _get_place_details(self, place_id: str) -> Dict:
         """
-        Get detailed information about a place
+        Get detailed information about a place (cached for 7 days)
         
         Args:
             place_id: Google Place ID
@@ -273,6 +352,10 @@ class CompetitorDiscoveryService:
         Returns:
             Dict with phone, website, menu_url
         """
+        cached = cached_place_details(place_id)
+        if cached is not None:
+            return cached
+        
         try:
             url = f"{self.base_url}/details/json"
             params = {
@@ -289,11 +372,13 @@ class CompetitorDiscoveryService:
                 return {}
             
             result = data.get("result", {})
-            return {
+            details = {
                 "phone": result.get("formatted_phone_number"),
                 "website": result.get("website"),
                 "menu_url": result.get("url")  # Google Maps URL as fallback
             }
+            remember_place_details(place_id, details)
+            return details
             
         except Exception as e:
             logger.warning(f"⚠️  Failed to get place details: {e}")
@@ -310,24 +395,7 @@ class CompetitorDiscoveryService:
         Returns:
             Distance in miles
         """
-        from math import radians, sin, cos, sqrt, atan2
-        
-        # Earth radius in miles
-        R = 3959.0
-        
-        lat1_rad = radians(lat1)
-        lng1_rad = radians(lng1)
-        lat2_rad = radians(lat2)
-        lng2_rad = radians(lng2)
-        
-        dlat = lat2_rad - lat1_rad
-        dlng = lng2_rad - lng1_rad
-        
-        a = sin(dlat / 2)**2 + cos(lat1_rad) * cos(lat2_rad) * sin(dlng / 2)**2
-        c = 2 * atan2(sqrt(a), sqrt(1 - a))
-        
-        distance = R * c
-        return distance
+        return haversine_miles(lat1, lng1, lat2, lng2)
     
     def _is_same_restaurant(self, place_name: str, target_name: str) -> bool:
         """
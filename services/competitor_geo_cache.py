@@ -0,0 +1,332 @@
+"""
+Geo-tiled competitor discovery cache
+
+Competitor discovery used to geocode the location text and run a nearby
+search on every call, and the Outscraper path cached results under the raw
+location string. Both now go through this module:
+
+- Geocodes are cached per normalized location text ("Woonsocket, RI" and
+  "woonsocket ri" share one entry).
+- Nearby-search results are cached per geohash tile, provider, category and
+  radius bucket, shared across users. Each entry remembers the point and
+  radius it was searched with; a query is served from an entry (its own tile
+  first, then the 8 neighbours) when its circle lies inside the searched one,
+  and results are filtered by distance from the query point at read time.
+- Per-user filtering (the user's own restaurant, recently analyzed place ids)
+  stays with the caller, after the cache.
+
+Radius buckets: small radii use precision-5 tiles (~4.9 km), larger ones
+precision-4 tiles (~39 x 19.5 km), so a tile search never has to cover much
+more than the requested circle.
+"""
+import logging
+import os
+import re
+from math import atan2, cos, radians, sin, sqrt
+from typing import Dict, List, Optional, Tuple
+
+import requests
+
+from services.redis_client import cache
+
+logger = logging.getLogger(__name__)
+
+GEOCODE_TTL_SECONDS = int(os.getenv("GEOCODE_CACHE_TTL_SECONDS", str(30 * 86400)))
+NEARBY_TILE_TTL_SECONDS = int(os.getenv("NEARBY_TILE_CACHE_TTL_SECONDS", "86400"))
+PLACE_DETAILS_TTL_SECONDS = int(os.getenv("PLACE_DETAILS_CACHE_TTL_SECONDS", str(7 * 86400)))
+
+# (radius bucket in miles, geohash precision of its tiles)
+RADIUS_BUCKETS = ((1.0, 5), (3.0, 5), (5.0, 5), (10.0, 4), (25.0, 4))
+
+EARTH_RADIUS_MILES = 3959.0
+
+_GEOHASH_ALPHABET = "0123456789bcdefghjkmnpqrstuvwxyz"
+_NON_WORD = re.compile(r"[^\w\s]")
+_CATEGORY_SUFFIX = re.compile(r"\s+(restaurants?|food)$")
+
+
+# ============================================================================
+# Normalization and geometry
+# ============================================================================
+
+def normalize_location(location: str) -> str:
+    """Lowercase, strip punctuation and collapse whitespace."""
+    return " ".join(_NON_WORD.sub(" ", (location or "").lower()).split())
+
+
+def normalize_category(category: Optional[str]) -> str:
+    """'Pizza Restaurants' -> 'pizza'; empty or generic -> 'restaurant'."""
+    text = normalize_location(category or "")
+    text = _CATEGORY_SUFFIX.sub("", text).strip()
+    if not text or text in ("restaurant", "restaurants", "food"):
+        return "restaurant"
+    return text.replace(" ", "_")
+
+
+def haversine_miles(lat1: float, lng1: float, lat2: float, lng2: float) -> float:
+    """Great-circle distance in miles."""
+    dlat = radians(lat2 - lat1)
+    dlng = radians(lng2 - lng1)
+    a = sin(dlat / 2) ** 2 + cos(radians(lat1)) * cos(radians(lat2)) * sin(dlng / 2) ** 2
+    return EARTH_RADIUS_MILES * 2 * atan2(sqrt(a), sqrt(1 - a))
+
+
+def geohash_encode(lat: float, lng: float, precision: int) -> str:
+    """Standard base-32 geohash."""
+    lat_range = [-90.0, 90.0]
+    lng_range = [-180.0, 180.0]
+    chars = []
+    bits = 0
+    value = 0
+    even = True
+    while len(chars) < precision:
+        rng, coord = (lng_range, lng) if even else (lat_range, lat)
+        mid = (rng[0] + rng[1]) / 2
+        if coord >= mid:
+            value = (value << 1) | 1
+            rng[0] = mid
+        else:
+            value <<= 1
+            rng[1] = mid
+        even = not even
+        bits += 1
+        if bits == 5:
+            chars.append(_GEOHASH_ALPHABET[value])
+            bits = 0
+            value = 0
+    return "".join(chars)
+
+
+def geohash_bounds(tile: str) -> Tuple[float, float, float, float]:
+    """(min_lat, max_lat, min_lng, max_lng) of a geohash tile."""
+    lat_range = [-90.0, 90.0]
+    lng_range = [-180.0, 180.0]
+    even = True
+    for char in tile:
+        value = _GEOHASH_ALPHABET.index(char)
+        for shift in range(4, -1, -1):
+            rng = lng_range if even else lat_range
+            mid = (rng[0] + rng[1]) / 2
+            if (value >> shift) & 1:
+                rng[0] = mid
+            else:
+                rng[1] = mid
+            even = not even
+    return lat_range[0], lat_range[1], lng_range[0], lng_range[1]
+
+
+def geohash_neighbours(tile: str) -> List[str]:
+    """The 8 tiles around `tile` (fewer at the poles)."""
+    min_lat, max_lat, min_lng, max_lng = geohash_bounds(tile)
+    center_lat = (min_lat + max_lat) / 2
+    center_lng = (min_lng + max_lng) / 2
+    height = max_lat - min_lat
+    width = max_lng - min_lng
+    neighbours = []
+    for dlat in (-1, 0, 1):
+        for dlng in (-1, 0, 1):
+            if not dlat and not dlng:
+                continue
+            lat = center_lat + dlat * height
+            if not -90.0 <= lat <= 90.0:
+                continue
+            lng = (center_lng + dlng * width + 180.0) % 360.0 - 180.0
+            neighbour = geohash_encode(lat, lng, len(tile))
+            if neighbour != tile and neighbour not in neighbours:
+                neighbours.append(neighbour)
+    return neighbours
+
+
+def tile_center(tile: str) -> Tuple[float, float]:
+    min_lat, max_lat, min_lng, max_lng = geohash_bounds(tile)
+    return (min_lat + max_lat) / 2, (min_lng + max_lng) / 2
+
+
+def tile_half_diagonal_miles(tile: str) -> float:
+    """Distance from the tile center to its farthest corner."""
+    min_lat, max_lat, min_lng, max_lng = geohash_bounds(tile)
+    center_lat, center_lng = tile_center(tile)
+    return max(
+        haversine_miles(center_lat, center_lng, lat, lng)
+        for lat in (min_lat, max_lat)
+        for lng in (min_lng, max_lng)
+    )
+
+
+def radius_bucket(radius_miles: float) -> Tuple[float, int]:
+    """Smallest (bucket, precision) covering the radius."""
+    for bucket, precision in RADIUS_BUCKETS:
+        if radius_miles <= bucket:
+            return bucket, precision
+    return RADIUS_BUCKETS[-1]
+
+
+# ============================================================================
+# Geocode cache
+# ============================================================================
+
+def _geocode_key(location: str) -> str:
+    return f"geocode:{normalize_location(location).replace(' ', '_')}"
+
+
+def cached_geocode(location: str) -> Optional[Tuple[float, float]]:
+    if not cache.enabled or not normalize_location(location):
+        return None
+    cached = cache.get(_geocode_key(location))
+    if isinstance(cached, dict) and "lat" in cached and "lng" in cached:
+        return float(cached["lat"]), float(cached["lng"])
+    return None
+
+
+def remember_geocode(location: str, lat: float, lng: float) -> None:
+    if not cache.enabled or not normalize_location(location):
+        return
+    cache.set(_geocode_key(location), {"lat": lat, "lng": lng}, ttl=GEOCODE_TTL_SECONDS)
+
+
+def geocode_location(location: str, api_key: str) -> Tuple[float, float]:
+    """Cached Google Places text geocode; raises when the location is not found."""
+    cached = cached_geocode(location)
+    if cached:
+        logger.info(f"✅ Geocode cache HIT: {location}")
+        return cached
+
+    response = requests.get(
+        "https://maps.googleapis.com/maps/api/place/findplacefromtext/json",
+        params={
+            "input": location,
+            "inputtype": "textquery",
+            "fields": "geometry",
+            "key": api_key,
+        },
+        timeout=10,
+    )
+    response.raise_for_status()
+    data = response.json()
+    if data.get("status") != "OK" or not data.get("candidates"):
+        raise Exception(f"Geocoding failed: {data.get('status')}")
+
+    location_data = data["candidates"][0]["geometry"]["location"]
+    lat, lng = location_data["lat"], location_data["lng"]
+    remember_geocode(location, lat, lng)
+    return lat, lng
+
+
+# ============================================================================
+# Nearby-place tile cache
+# ============================================================================
+
+class NearbyPlacesCache:
+    """
+    Shared tile cache of nearby-search results for one provider.
+
+    Places are stored as plain dicts that carry "latitude" and "longitude";
+    read results get a fresh "distance_miles" from the query point and keep
+    the provider's ranking order.
+    """
+
+    def __init__(self, provider: str):
+        self.provider = provider
+
+    def _tile_key(self, tile: str, category: str, bucket: float) -> str:
+        return f"competitors:tile:{self.provider}:{tile}:{normalize_category(category)}:{bucket:g}"
+
+    def search_area(self, lat: float, lng: float, radius_miles: float) -> Dict:
+        """
+        Where a cache-filling search should run: the tile center, with the
+        bucket radius widened by the tile's half-diagonal so that every query
+        point in the tile is covered.
+        """
+        bucket, precision = radius_bucket(radius_miles)
+        tile = geohash_encode(lat, lng, precision)
+        center_lat, center_lng = tile_center(tile)
+        return {
+            "tile": tile,
+            "bucket": bucket,
+            "lat": center_lat,
+            "lng": center_lng,
+            "radius_miles": bucket + tile_half_diagonal_miles(tile),
+        }
+
+    def get(self, lat: float, lng: float, radius_miles: float, category: str) -> Optional[List[Dict]]:
+        """Cached places within radius_miles of the point, or None on a miss."""
+        if not cache.enabled:
+            return None
+        bucket, precision = radius_bucket(radius_miles)
+        tile = geohash_encode(lat, lng, precision)
+
+        for candidate in [tile] + geohash_neighbours(tile):
+            entry = cache.get(self._tile_key(candidate, category, bucket))
+            if not isinstance(entry, dict) or not isinstance(entry.get("places"), list):
+                continue
+            distance_to_center = haversine_miles(lat, lng, entry["lat"], entry["lng"])
+            if distance_to_center + radius_miles > float(entry["radius_miles"]) + 1e-6:
+                continue  # The entry's search circle does not cover this query
+            logger.info(f"✅ Nearby tile cache HIT: {self.provider} {candidate} ({category}, {bucket:g} mi)")
+            return self.within_radius(entry["places"], lat, lng, radius_miles)
+
+        logger.info(f"❌ Nearby tile cache MISS: {self.provider} {tile} ({category}, {bucket:g} mi)")
+        return None
+
+    def set(
+        self,
+        lat: float,
+        lng: float,
+        searched_radius_miles: float,
+        bucket_radius_miles: float,
+        category: str,
+        places: List[Dict],
+    ) -> None:
+        """Store the places found by a search around (lat, lng)."""
+        if not cache.enabled:
+            return
+        bucket, precision = radius_bucket(bucket_radius_miles)
+        tile = geohash_encode(lat, lng, precision)
+        entry = {
+            "lat": lat,
+            "lng": lng,
+            "radius_miles": searched_radius_miles,
+            "places": [place for place in places if place.get("latitude") is not None],
+        }
+        cache.set(self._tile_key(tile, category, bucket), entry, ttl=NEARBY_TILE_TTL_SECONDS)
+
+    def invalidate_around(self, lat: float, lng: float) -> int:
+        """Drop every cached entry whose tile contains the point."""
+        deleted = 0
+        for precision in sorted({precision for _, precision in RADIUS_BUCKETS}):
+            tile = geohash_encode(lat, lng, precision)
+            deleted += cache.delete_pattern(f"competitors:tile:{self.provider}:{tile}:*")
+        return deleted
+
+    @staticmethod
+    def within_radius(places: List[Dict], lat: float, lng: float, radius_miles: float) -> List[Dict]:
+        """Places within radius_miles of the point, with distance_miles set."""
+        nearby = []
+        for place in places:
+            if place.get("latitude") is None or place.get("longitude") is None:
+                continue
+            distance = haversine_miles(lat, lng, place["latitude"], place["longitude"])
+            if distance <= radius_miles:
+                nearby.append({**place, "distance_miles": round(distance, 2)})
+        return nearby
+
+
+# ============================================================================
+# Place details cache
+# ============================================================================
+
+def _details_key(place_id: str) -> str:
+    return f"place_details:{place_id}"
+
+
+def cached_place_details(place_id: str) -> Optional[Dict]:
+    if not cache.enabled:
+        return None
+    details = cache.get(_details_key(place_id))
+    return details if isinstance(details, dict) else None
+
+
+def remember_place_details(place_id: str, details: Dict) -> None:
+    if not cache.enabled or not details:
+        return
+    cache.set(_details_key(place_id), details, ttl=PLACE_DETAILS_TTL_SECONDS)
@@ -5,6 +5,7 @@ Separation of Concerns: Only handles menu parsing, no discovery or comparison
 """
 import os
 import time
+import asyncio
 import logging
 from typing import Dict, List, Optional
 import google.generativeai as genai
@@ -74,7 +75,9 @@ class CompetitorMenuParser:
             logger.info(f"🤖 Calling {self.model_name} with web search...")
             model = genai.GenerativeModel(self.model_name)
             
-            response = model.generate_content(
+            # Off the event loop so several competitors can parse concurrently
+            response = await asyncio.to_thread(
+                model.generate_content,
                 prompt,
                 generation_config={
                     "temperature": 0.1,
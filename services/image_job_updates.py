@@ -0,0 +1,168 @@
+"""
+Live image job updates
+
+Job status reaches open progress streams over the event bus instead of each
+SSE connection polling Nano Banana on its own:
+
+- Webhooks (and the poller below) apply a status change once, persist it only
+  when it differs from the last known state, and emit JOB_UPDATE_EVENT. With
+  Redis the event reaches every worker, so a viewer connected to one worker
+  sees a webhook delivered to another.
+- Each process keeps one background poller for the jobs its viewers are
+  watching. A job is polled at most once per interval however many viewers
+  it has, and only when no update (webhook or poll, from any worker) arrived
+  within the interval, so it only covers late or missing webhooks.
+- The last known (status, progress, error) per watched job is kept here and
+  refreshed by every update event; the poller skips writes that would not
+  change anything.
+"""
+import asyncio
+import logging
+import threading
+import time
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple
+
+from services.event_bus import get_event_bus
+
+logger = logging.getLogger(__name__)
+
+JOB_UPDATE_EVENT = "image_job.updated"
+
+JobState = Tuple[Optional[str], Optional[int], Optional[str]]
+
+
+def job_state(status: Optional[str], progress: Any, error: Optional[str]) -> JobState:
+    """Comparable status snapshot; progress is normalized to int."""
+    try:
+        progress = int(progress) if progress is not None else None
+    except (TypeError, ValueError):
+        progress = None
+    return status, progress, error or None
+
+
+class ImageJobUpdateHub:
+    """Per-process fan-out of job updates to stream subscribers."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._subscribers: Dict[str, List[Tuple[asyncio.AbstractEventLoop, asyncio.Queue]]] = {}
+        self._states: Dict[str, JobState] = {}
+        self._updated_at: Dict[str, float] = {}
+        self._registered = False
+
+    def _ensure_registered(self) -> None:
+        with self._lock:
+            if self._registered:
+                return
+            self._registered = True
+        # Sync handler: the bus calls it from a worker thread (local emits)
+        # or from its Redis subscriber thread (other workers' emits)
+        get_event_bus().register_handler(JOB_UPDATE_EVENT, self._on_event)
+
+    def subscribe(self, job_id: str, state: JobState) -> asyncio.Queue:
+        """Queue receiving every update for the job; seeds the known state."""
+        self._ensure_registered()
+        queue: asyncio.Queue = asyncio.Queue()
+        loop = asyncio.get_running_loop()
+        with self._lock:
+            self._subscribers.setdefault(job_id, []).append((loop, queue))
+            self._states.setdefault(job_id, state)
+        return queue
+
+    def unsubscribe(self, job_id: str, queue: asyncio.Queue) -> None:
+        with self._lock:
+            remaining = [entry for entry in self._subscribers.get(job_id, []) if entry[1] is not queue]
+            if remaining:
+                self._subscribers[job_id] = remaining
+                return
+            # Nobody is watching: webhooks dedupe against the job row instead
+            self._subscribers.pop(job_id, None)
+            self._states.pop(job_id, None)
+            self._updated_at.pop(job_id, None)
+
+    def known_state(self, job_id: str) -> Optional[JobState]:
+        with self._lock:
+            return self._states.get(job_id)
+
+    def seconds_since_update(self, job_id: str) -> float:
+        with self._lock:
+            updated_at = self._updated_at.get(job_id)
+        return float("inf") if updated_at is None else time.monotonic() - updated_at
+
+    def publish(self, update: Dict[str, Any]) -> None:
+        """Record the update locally and emit it to every worker."""
+        self._remember(update)
+        get_event_bus().emit(JOB_UPDATE_EVENT, update)
+
+    def _remember(self, update: Dict[str, Any]) -> None:
+        job_id = update.get("job_id")
+        if not job_id:
+            return
+        with self._lock:
+            if job_id in self._subscribers:
+                self._states[job_id] = job_state(update.get("status"), update.get("progress"), update.get("error"))
+                self._updated_at[job_id] = time.monotonic()
+
+    def _on_event(self, update: Dict[str, Any]) -> None:
+        self._remember(update)
+        with self._lock:
+            subscribers = list(self._subscribers.get(update.get("job_id"), []))
+        for loop, queue in subscribers:
+            try:
+                loop.call_soon_threadsafe(queue.put_nowait, update)
+            except RuntimeError:
+                pass  # The subscriber's loop has closed
+
+    def get_stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {
+                "watched_jobs": len(self._subscribers),
+                "subscribers": sum(len(entries) for entries in self._subscribers.values()),
+            }
+
+
+class ImageJobStatusPoller:
+    """One background poll loop per process for watched jobs."""
+
+    def __init__(self, hub: ImageJobUpdateHub, interval_seconds: float = 5):
+        self.hub = hub
+        self.interval_seconds = interval_seconds
+        self._watched: Dict[str, Dict[str, Any]] = {}
+        self._task: Optional[asyncio.Task] = None
+
+    def watch(self, job_id: str, poll: Callable[[], Awaitable[None]]) -> None:
+        """Add a viewer of the job; poll() fetches and applies its status."""
+        entry = self._watched.setdefault(job_id, {"poll": poll, "viewers": 0})
+        entry["viewers"] += 1
+        if self._task is None or self._task.done():
+            self._task = asyncio.get_running_loop().create_task(self._run())
+
+    def unwatch(self, job_id: str) -> None:
+        entry = self._watched.get(job_id)
+        if entry is None:
+            return
+        entry["viewers"] -= 1
+        if entry["viewers"] <= 0:
+            self._watched.pop(job_id, None)
+
+    async def _run(self) -> None:
+        while self._watched:
+            await asyncio.sleep(self.interval_seconds)
+            due = [
+                (job_id, entry["poll"])
+                for job_id, entry in list(self._watched.items())
+                if self.hub.seconds_since_update(job_id) >= self.interval_seconds
+            ]
+            if due:
+                await asyncio.gather(*(self._poll_one(job_id, poll) for job_id, poll in due))
+
+    @staticmethod
+    async def _poll_one(job_id: str, poll: Callable[[], Awaitable[None]]) -> None:
+        try:
+            await poll()
+        except Exception as e:  # pylint: disable=broad-except
+            logger.warning(f"⚠️ Image job status poll failed for {job_id}: {e}")
+
+
+# Shared by every orchestrator instance in the process
+image_job_updates = ImageJobUpdateHub()
@@ -15,7 +15,7 @@ from services.vendor_item_mapper import VendorItemMapper
 from services.inventory_transaction_service import InventoryTransactionService
 from services.price_tracking_service import PriceTrackingService
 from services.invoice_storage_service import InvoiceStorageService
-from services.ordering.tasks import run_full_ordering_pipeline
+from services.ordering.tasks import run_incremental_ordering_pipeline
 from services.error_classifier import classify_invoice_error
 
 load_dotenv()
@@ -186,7 +186,10 @@ class InvoiceProcessor:
                         item["id"] for item in line_items
                         if item["id"] not in {f["item_number"] for f in failed_items}
                     ]
-                    ordering_result = run_full_ordering_pipeline(user_id, processed_item_ids)
+                    ordering_result = run_incremental_ordering_pipeline(
+                        user_id,
+                        invoice_item_ids=processed_item_ids,
+                    )
                     logger.info(f"📊 Ordering pipeline completed: {ordering_result.get('status')}")
                 except Exception as ordering_exc:
                     logger.warning(f"⚠️  Ordering pipeline failed (non-blocking): {ordering_exc}")
@@ -0,0 +1,401 @@
+"""
+Durable background job queue for RestaurantIQ.
+
+Heavy post-request work (cache warming, ordering recomputation, etc.) is
+pushed onto Redis lists and executed by a separate worker process
+(``python -m services.worker``) so web workers can return immediately.
+
+Features:
+- Priority lanes (high/default/low) served in order by a single BRPOP
+- Deduplication per (job type, user) while a job is waiting
+- Retries with exponential backoff and a dead-letter list
+- Lease renewal while a job runs, so only jobs of dead workers are requeued
+- Queue depth stats for health checks
+- Inline fallback when Redis is unavailable (same behaviour as before)
+"""
+from __future__ import annotations
+
+import json
+import logging
+import os
+import random
+import threading
+import time
+import uuid
+from dataclasses import asdict, dataclass, field
+from typing import Any, Callable, Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+# Configuration
+JOB_QUEUE_PREFIX = "jobs:"
+JOB_LANES = ("high", "default", "low")
+JOB_DEFAULT_MAX_ATTEMPTS = int(os.getenv("JOB_MAX_ATTEMPTS", "4"))
+JOB_BACKOFF_BASE_SECONDS = float(os.getenv("JOB_BACKOFF_BASE_SECONDS", "5"))
+JOB_BACKOFF_MAX_SECONDS = float(os.getenv("JOB_BACKOFF_MAX_SECONDS", "300"))
+JOB_DEDUPE_TTL_SECONDS = int(os.getenv("JOB_DEDUPE_TTL_SECONDS", "3600"))
+JOB_VISIBILITY_TIMEOUT_SECONDS = int(os.getenv("JOB_VISIBILITY_TIMEOUT_SECONDS", "900"))
+# A running job's lease is renewed this often, well inside the visibility timeout
+JOB_LEASE_RENEW_SECONDS = max(1, JOB_VISIBILITY_TIMEOUT_SECONDS // 3)
+# Handler result statuses that count as a failed attempt
+JOB_RETRYABLE_STATUSES = ("error", "partial_failure")
+JOB_DEAD_LETTER_MAX = 1000
+JOB_PROMOTE_BATCH = 100
+
+# Move due delayed jobs onto their lanes in one atomic step.
+# KEYS: delayed zset, then one list per lane in ARGV[3] (JSON) order.
+# ARGV: now, batch size, JSON list of lanes.
+_PROMOTE_DELAYED_LUA = """
+local lanes = {}
+for index, lane in ipairs(cjson.decode(ARGV[3])) do
+    lanes[lane] = KEYS[index + 1]
+end
+local due = redis.call('ZRANGEBYSCORE', KEYS[1], '-inf', ARGV[1], 'LIMIT', 0, tonumber(ARGV[2]))
+for _, raw in ipairs(due) do
+    local lane = cjson.decode(raw)['lane']
+    redis.call('LPUSH', lanes[lane] or lanes['default'], raw)
+    redis.call('ZREM', KEYS[1], raw)
+end
+return #due
+"""
+
+# Requeue a stale job only if its lease entry is unchanged (not renewed
+# since it was read). KEYS: processing hash, lane list. ARGV: job id, lease
+# entry as read, job JSON.
+_REQUEUE_STALE_LUA = """
+if redis.call('HGET', KEYS[1], ARGV[1]) ~= ARGV[2] then
+    return 0
+end
+redis.call('HDEL', KEYS[1], ARGV[1])
+redis.call('LPUSH', KEYS[2], ARGV[3])
+return 1
+"""
+
+
+@dataclass
+class Job:
+    """Serialized unit of work stored in Redis."""
+    job_type: str
+    user_id: str
+    kwargs: Dict[str, Any] = field(default_factory=dict)
+    lane: str = "default"
+    job_id: str = field(default_factory=lambda: uuid.uuid4().hex)
+    attempts: int = 0
+    max_attempts: int = JOB_DEFAULT_MAX_ATTEMPTS
+    enqueued_at: float = field(default_factory=time.time)
+    last_error: Optional[str] = None
+
+    def to_json(self) -> str:
+        return json.dumps(asdict(self), default=str)
+
+    @classmethod
+    def from_json(cls, raw: str) -> "Job":
+        return cls(**json.loads(raw))
+
+
+class JobQueue:
+    """
+    Redis-backed job queue with graceful inline fallback.
+
+    Handlers are registered by name so the web process and the worker
+    process resolve the same callable. A handler signals failure either by
+    raising or by returning ``{"status": "error"}`` or
+    ``{"status": "partial_failure"}`` (the conventions used by the ordering
+    task helpers); both are retried with backoff.
+    """
+
+    def __init__(self):
+        self._handlers: Dict[str, Callable[..., Any]] = {}
+        self._redis = None
+        self._redis_enabled = False
+        self._init_redis()
+
+    def _init_redis(self):
+        """Reuse the shared Redis connection when available."""
+        if os.getenv("JOB_QUEUE_ENABLED", "true").lower() == "false":
+            logger.info("⚠️ Job queue disabled via JOB_QUEUE_ENABLED=false (running inline)")
+            return
+        try:
+            from services.redis_client import cache
+            if cache.enabled and cache.client:
+                self._redis = cache.client
+                self._redis_enabled = True
+                logger.info("✅ Job queue using Redis")
+            else:
+                logger.info("⚠️ Job queue running inline (Redis unavailable)")
+        except Exception as e:
+            logger.warning(f"⚠️ Job queue Redis init failed: {e}")
+
+    @property
+    def enabled(self) -> bool:
+        return self._redis_enabled
+
+    # ------------------------------------------------------------------ #
+    # Keys
+    # ------------------------------------------------------------------ #
+    @staticmethod
+    def lane_key(lane: str) -> str:
+        return f"{JOB_QUEUE_PREFIX}queue:{lane}"
+
+    @staticmethod
+    def dedupe_key(job_type: str, user_id: str) -> str:
+        return f"{JOB_QUEUE_PREFIX}dedupe:{job_type}:{user_id}"
+
+    DELAYED_KEY = f"{JOB_QUEUE_PREFIX}delayed"
+    PROCESSING_KEY = f"{JOB_QUEUE_PREFIX}processing"
+    DEAD_KEY = f"{JOB_QUEUE_PREFIX}dead"
+
+    # ------------------------------------------------------------------ #
+    # Registration / enqueue
+    # ------------------------------------------------------------------ #
+    def register(self, job_type: str, handler: Callable[..., Any]) -> None:
+        """Register a handler called as ``handler(user_id, **kwargs)``."""
+        self._handlers[job_type] = handler
+
+    def registered_types(self) -> List[str]:
+        return sorted(self._handlers)
+
+    def enqueue(
+        self,
+        job_type: str,
+        user_id: str,
+        *,
+        lane: str = "default",
+        dedupe: bool = True,
+        max_attempts: Optional[int] = None,
+        **kwargs: Any,
+    ) -> Optional[str]:
+        """
+        Queue a job and return its id.
+
+        Returns ``None`` when an identical (job type, user) job is already
+        waiting. Without Redis the handler runs inline before returning.
+        """
+        if job_type not in self._handlers:
+            raise ValueError(f"Unknown job type: {job_type}")
+        if lane not in JOB_LANES:
+            raise ValueError(f"Unknown job lane: {lane}")
+
+        job = Job(
+            job_type=job_type,
+            user_id=user_id,
+            kwargs=kwargs,
+            lane=lane,
+            max_attempts=max_attempts or JOB_DEFAULT_MAX_ATTEMPTS,
+        )
+
+        if not self._redis_enabled:
+            self._run_inline(job)
+            return job.job_id
+
+        try:
+            if dedupe:
+                claimed = self._redis.set(
+                    self.dedupe_key(job_type, user_id),
+                    job.job_id,
+                    nx=True,
+                    ex=JOB_DEDUPE_TTL_SECONDS,
+                )
+                if not claimed:
+                    logger.debug("⏭️ Job %s for user=%s already queued", job_type, user_id)
+                    return None
+            self._redis.lpush(self.lane_key(lane), job.to_json())
+            logger.debug("📥 Job queued: %s user=%s lane=%s id=%s", job_type, user_id, lane, job.job_id)
+            return job.job_id
+        except Exception as e:
+            logger.warning(f"⚠️ Job enqueue failed ({e}); running {job_type} inline")
+            self._run_inline(job)
+            return job.job_id
+
+    def _run_inline(self, job: Job) -> None:
+        try:
+            self._execute(job)
+        except Exception as exc:  # pylint: disable=broad-except
+            logger.exception("Inline job %s failed for user=%s: %s", job.job_type, job.user_id, exc)
+
+    # ------------------------------------------------------------------ #
+    # Worker side
+    # ------------------------------------------------------------------ #
+    def _execute(self, job: Job) -> Any:
+        handler = self._handlers.get(job.job_type)
+        if handler is None:
+            raise ValueError(f"No handler registered for job type {job.job_type}")
+        result = handler(job.user_id, **job.kwargs)
+        if isinstance(result, dict) and result.get("status") in JOB_RETRYABLE_STATUSES:
+            raise RuntimeError(result.get("error") or f"{job.job_type} reported {result['status']}")
+        return result
+
+    def promote_delayed(self, now: Optional[float] = None) -> int:
+        """Move retry jobs whose backoff has elapsed back onto their lane."""
+        if not self._redis_enabled:
+            return 0
+        now = now or time.time()
+        # One script: a crash cannot drop a job between ZREM and LPUSH, and
+        # concurrent promoters cannot both move the same entry
+        return int(self._redis.eval(
+            _PROMOTE_DELAYED_LUA,
+            1 + len(JOB_LANES),
+            self.DELAYED_KEY,
+            *(self.lane_key(lane) for lane in JOB_LANES),
+            now,
+            JOB_PROMOTE_BATCH,
+            json.dumps(JOB_LANES),
+        ))
+
+    def requeue_stale(self, now: Optional[float] = None) -> int:
+        """Requeue jobs whose lease was not renewed (the worker died mid-execution)."""
+        if not self._redis_enabled:
+            return 0
+        now = now or time.time()
+        requeued = 0
+        for job_id, raw in self._redis.hgetall(self.PROCESSING_KEY).items():
+            entry = json.loads(raw)
+            leased_at = entry.get("heartbeat_at", entry.get("started_at", now))
+            if now - leased_at < JOB_VISIBILITY_TIMEOUT_SECONDS:
+                continue
+            job = Job.from_json(entry["job"])
+            if self._redis.eval(
+                _REQUEUE_STALE_LUA, 2, self.PROCESSING_KEY, self.lane_key(job.lane), job_id, raw, job.to_json()
+            ):
+                logger.warning("♻️ Requeueing stale job %s (%s)", job.job_id, job.job_type)
+                requeued += 1
+        return requeued
+
+    def process_next(self, timeout: int = 5) -> bool:
+        """
+        Pop and execute one job, honouring lane priority.
+
+        Returns True when a job was processed (successfully or not).
+        """
+        if not self._redis_enabled:
+            return False
+
+        popped = self._redis.brpop([self.lane_key(lane) for lane in JOB_LANES], timeout=timeout)
+        if not popped:
+            return False
+
+        _, raw = popped
+        job = Job.from_json(raw)
+        started = time.time()
+        self._redis.hset(
+            self.PROCESSING_KEY,
+            job.job_id,
+            json.dumps({"job": raw, "started_at": started, "heartbeat_at": started}),
+        )
+        # Release the dedupe slot once running so a newer upload can queue a
+        # fresh run instead of being swallowed by this (now stale) one.
+        dedupe_key = self.dedupe_key(job.job_type, job.user_id)
+        if self._redis.get(dedupe_key) == job.job_id:
+            self._redis.delete(dedupe_key)
+
+        lease_done = threading.Event()
+        renewer = threading.Thread(
+            target=self._renew_lease,
+            args=(job, raw, started, lease_done),
+            daemon=True,
+            name=f"JobLease-{job.job_id}",
+        )
+        renewer.start()
+        try:
+            self._execute(job)
+            logger.info(
+                "✅ Job %s (%s) done for user=%s in %.2fs",
+                job.job_type,
+                job.job_id,
+                job.user_id,
+                time.time() - started,
+            )
+        except Exception as exc:  # pylint: disable=broad-except
+            self._handle_failure(job, exc)
+        finally:
+            lease_done.set()
+            renewer.join()
+            self._redis.hdel(self.PROCESSING_KEY, job.job_id)
+        return True
+
+    def _renew_lease(self, job: Job, raw: str, started: float, done: threading.Event) -> None:
+        """Keep the processing entry fresh so requeue_stale leaves a long job alone."""
+        while not done.wait(JOB_LEASE_RENEW_SECONDS):
+            try:
+                # Don't resurrect an entry that was already requeued
+                if not self._redis.hexists(self.PROCESSING_KEY, job.job_id):
+                    logger.warning("⚠️ Lease lost for running job %s (%s)", job.job_id, job.job_type)
+                    return
+                self._redis.hset(
+                    self.PROCESSING_KEY,
+                    job.job_id,
+                    json.dumps({"job": raw, "started_at": started, "heartbeat_at": time.time()}),
+                )
+            except Exception as e:
+                logger.warning(f"⚠️ Lease renewal failed for job {job.job_id}: {e}")
+
+    def _handle_failure(self, job: Job, exc: Exception) -> None:
+        job.attempts += 1
+        job.last_error = str(exc)
+        if job.attempts >= job.max_attempts:
+            logger.error(
+                "💀 Job %s (%s) failed permanently for user=%s after %d attempts: %s",
+                job.job_type,
+                job.job_id,
+                job.user_id,
+                job.attempts,
+                exc,
+            )
+            self._redis.lpush(self.DEAD_KEY, job.to_json())
+            self._redis.ltrim(self.DEAD_KEY, 0, JOB_DEAD_LETTER_MAX - 1)
+            return
+
+        delay = min(JOB_BACKOFF_MAX_SECONDS, JOB_BACKOFF_BASE_SECONDS * (2 ** (job.attempts - 1)))
+        delay *= random.uniform(0.8, 1.2)
+        logger.warning(
+            "🔁 Job %s (%s) failed for user=%s (attempt %d/%d), retrying in %.0fs: %s",
+            job.job_type,
+            job.job_id,
+            job.user_id,
+            job.attempts,
+            job.max_attempts,
+            delay,
+            exc,
+        )
+        self._redis.zadd(self.DELAYED_KEY, {job.to_json(): time.time() + delay})
+
+    # ------------------------------------------------------------------ #
+    # Visibility
+    # ------------------------------------------------------------------ #
+    def get_stats(self) -> Dict[str, Any]:
+        """Queue depth per lane plus delayed/processing/dead counts."""
+        if not self._redis_enabled:
+            return {"enabled": False, "mode": "inline"}
+        try:
+            pipe = self._redis.pipeline()
+            for lane in JOB_LANES:
+                pipe.llen(self.lane_key(lane))
+            pipe.zcard(self.DELAYED_KEY)
+            pipe.hlen(self.PROCESSING_KEY)
+            pipe.llen(self.DEAD_KEY)
+            counts = pipe.execute()
+            lanes = dict(zip(JOB_LANES, counts[: len(JOB_LANES)]))
+            delayed, processing, dead = counts[len(JOB_LANES):]
+            return {
+                "enabled": True,
+                "lanes": lanes,
+                "queued": sum(lanes.values()),
+                "delayed": delayed,
+                "processing": processing,
+                "dead": dead,
+            }
+        except Exception as e:
+            logger.error(f"Job queue stats error: {e}")
+            return {"enabled": True, "error": str(e)}
+
+
+# Global instance
+_job_queue: Optional[JobQueue] = None
+
+
+def get_job_queue() -> JobQueue:
+    """Get the global job queue instance."""
+    global _job_queue
+    if _job_queue is None:
+        _job_queue = JobQueue()
+    return _job_queue
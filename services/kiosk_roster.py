@@ -0,0 +1,145 @@
+"""
+Kiosk PIN roster.
+
+The time-clock kiosk resolves a 4-digit PIN to a member of one account on
+every tap. Instead of listing the account's members and then querying users
+by lookup hash each time, the account's roster (PIN lookup hash -> member
+identity, display name and current compensation) is built once and kept in
+Redis. PIN secrets are never cached: the PIN hash and salt of the matched
+candidates are read from the database before verifying (see
+ROSTER_USER_COLUMNS / PIN_SECRET_COLUMNS). PIN, membership and compensation
+changes drop the
+roster; a lookup miss on a roster older than KIOSK_ROSTER_MISS_REFRESH_SECONDS
+rebuilds it once, so a member added outside the API is not locked out until
+the TTL expires.
+"""
+from __future__ import annotations
+
+import logging
+import os
+import time
+from typing import Dict, List, Optional
+
+from services.redis_client import cache
+
+logger = logging.getLogger(__name__)
+
+KIOSK_ROSTER_TTL_SECONDS = int(os.getenv("KIOSK_ROSTER_TTL_SECONDS", "900"))
+KIOSK_ROSTER_MISS_REFRESH_SECONDS = 30
+KIOSK_LOCATION_TTL_SECONDS = 3600
+
+# Cached per member; no PIN secrets
+ROSTER_USER_COLUMNS = "id, primary_account_id, default_account_role, first_name, last_name, clock_pin_lookup"
+# Read fresh for the candidates of one tap
+PIN_SECRET_COLUMNS = "id, clock_pin_hash, clock_pin_salt, clock_pin_lookup, clock_pin_failed_attempts"
+
+
+def _roster_key(account_id: str) -> str:
+    return f"sched:kiosk:roster:v2:{account_id}"
+
+
+def location_cache_key(location_code: str) -> str:
+    return f"sched:kiosk:location:{location_code}"
+
+
+def build_kiosk_roster(client, account_id: str) -> Dict:
+    """Read active members with a PIN set, keyed by PIN lookup hash."""
+    members = (
+        client.table("account_members")
+        .select("user_id")
+        .eq("account_id", account_id)
+        .eq("status", "active")
+        .execute()
+    ).data or []
+    user_ids = [row["user_id"] for row in members if row.get("user_id")]
+
+    roster: Dict[str, List[Dict]] = {}
+    if user_ids:
+        users = (
+            client.table("users")
+            .select(ROSTER_USER_COLUMNS)
+            .in_("id", user_ids)
+            .execute()
+        ).data or []
+        compensation = (
+            client.table("account_member_compensation")
+            .select("user_id, rate_cents, rate_type, currency")
+            .eq("account_id", account_id)
+            .is_("ends_at", None)
+            .execute()
+        ).data or []
+        comp_by_user = {row["user_id"]: row for row in compensation}
+
+        for row in users:
+            lookup_hash = row.get("clock_pin_lookup")
+            if not lookup_hash:
+                continue
+            user = {key: value for key, value in row.items() if key != "clock_pin_lookup"}
+            comp = comp_by_user.get(user["id"])
+            user["compensation"] = (
+                {
+                    "rate_cents": int(comp.get("rate_cents") or 0),
+                    "rate_type": comp.get("rate_type") or "hourly",
+                    "currency": comp.get("currency") or "USD",
+                }
+                if comp
+                else None
+            )
+            roster.setdefault(lookup_hash, []).append(user)
+
+    return {"built_at": time.time(), "members": roster}
+
+
+def load_kiosk_roster(client, account_id: str, *, refresh: bool = False) -> Dict:
+    """Cached roster for the account, rebuilt when missing or when refresh=True."""
+    if cache.enabled and not refresh:
+        roster = cache.get(_roster_key(account_id))
+        if isinstance(roster, dict) and "members" in roster:
+            return roster
+
+    roster = build_kiosk_roster(client, account_id)
+    if cache.enabled:
+        cache.set(_roster_key(account_id), roster, ttl=KIOSK_ROSTER_TTL_SECONDS)
+    return roster
+
+
+def roster_is_stale(roster: Dict) -> bool:
+    return time.time() - float(roster.get("built_at") or 0) > KIOSK_ROSTER_MISS_REFRESH_SECONDS
+
+
+def invalidate_kiosk_roster(account_id: str) -> None:
+    """Drop the account's roster (membership or compensation changed)."""
+    if not cache.enabled:
+        return
+    cache.delete(_roster_key(account_id))
+
+
+def invalidate_member_kiosk_rosters(client, user_id: str) -> None:
+    """Drop the roster of every account the user belongs to (PIN changed)."""
+    if not cache.enabled:
+        return
+    try:
+        memberships = (
+            client.table("account_members")
+            .select("account_id")
+            .eq("user_id", user_id)
+            .execute()
+        ).data or []
+    except Exception as exc:  # pylint: disable=broad-except
+        logger.warning("Could not list memberships to invalidate kiosk rosters for %s: %s", user_id, exc)
+        return
+    for row in memberships:
+        invalidate_kiosk_roster(row["account_id"])
+
+
+def cached_location_account(location_code: str) -> Optional[Dict]:
+    if not cache.enabled:
+        return None
+    account = cache.get(location_cache_key(location_code))
+    return account if isinstance(account, dict) else None
+
+
+def remember_location_account(location_code: str, account: Dict) -> None:
+    if not cache.enabled:
+        return
+    cache.set(location_cache_key(location_code), account, ttl=KIOSK_LOCATION_TTL_SECONDS)
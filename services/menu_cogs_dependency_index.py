@@ -0,0 +1,60 @@
+"""
+Menu COGS Dependency Index
+Answers "which menu items cost against these invoice lines / ingredients?"
+
+Backed by the trigger-maintained ``menu_cogs_dependencies`` table
+(migration 055) and its ``get_cogs_dependents`` RPC, so a price change only
+recomputes the recipes it actually affects instead of the whole menu.
+"""
+import logging
+from typing import Iterable, List, Set
+
+from supabase import Client
+
+logger = logging.getLogger(__name__)
+
+# Keeps PostgREST IN (...) filters well under URL length limits
+FALLBACK_CHUNK_SIZE = 200
+
+
+class MenuCogsDependencyIndex:
+    """Reverse lookups from pricing inputs to dependent menu items."""
+
+    def __init__(self, supabase_client: Client):
+        self.client = supabase_client
+
+    def affected_menu_items(
+        self,
+        user_id: str,
+        *,
+        invoice_item_ids: Iterable[str] = (),
+        normalized_ingredient_ids: Iterable[str] = (),
+    ) -> List[str]:
+        """
+        Menu items whose recipe uses any of the given invoice lines or
+        normalized ingredients (directly or through another invoice line
+        mapped to the same ingredient).
+        """
+        item_ids = sorted({i for i in invoice_item_ids if i})
+        ingredient_ids = sorted({i for i in normalized_ingredient_ids if i})
+        if not item_ids and not ingredient_ids:
+            return []
+
+        try:
+            rows = self.client.rpc("get_cogs_dependents", {
+                "p_user_id": user_id,
+                "p_invoice_item_ids": item_ids or None,
+                "p_normalized_ingredient_ids": ingredient_ids or None,
+            }).execute().data or []
+            return sorted({row["menu_item_id"] for row in rows if row.get("menu_item_id")})
+        except Exception as e:  # pylint: disable=broad-except
+            logger.warning(f"⚠️ COGS dependents RPC failed, querying the index table: {e}")
+
+        menu_item_ids: Set[str] = set()
+        for column, ids in (("invoice_item_id", item_ids), ("normalized_ingredient_id", ingredient_ids)):
+            for start in range(0, len(ids), FALLBACK_CHUNK_SIZE):
+                result = self.client.table("menu_cogs_dependencies").select("menu_item_id").eq(
+                    "user_id", user_id
+                ).in_(column, ids[start:start + FALLBACK_CHUNK_SIZE]).execute()
+                menu_item_ids.update(row["menu_item_id"] for row in result.data or [])
+        return sorted(menu_item_ids)
@@ -3,9 +3,10 @@ Menu Comparison Orchestrator
 Coordinates the entire menu comparison workflow
 Separation of Concerns: Orchestrates services, no direct API/DB calls
 """
+import os
 import logging
 import asyncio
-from typing import Dict, List, AsyncGenerator, Any
+from typing import Dict, List, AsyncGenerator, Any, Optional, Tuple
 
 from services.competitor_discovery_service import CompetitorDiscoveryService
 from services.competitor_menu_parser import CompetitorMenuParser
@@ -15,6 +16,9 @@ from services.menu_storage_service import MenuStorageService
 
 logger = logging.getLogger(__name__)
 
+# Concurrent competitor menu parses per process (each is one Gemini web-search call)
+MENU_PARSE_CONCURRENCY = int(os.getenv("MENU_PARSE_CONCURRENCY", "4"))
+
 
 class MenuComparisonOrchestrator:
     """
@@ -40,6 +44,7 @@ class MenuComparisonOrchestrator:
         self.comparison_llm = MenuComparisonLLM()
         self.storage = MenuComparisonStorage()
         self.menu_storage = MenuStorageService()
+        self.menu_parse_semaphore = asyncio.Semaphore(MENU_PARSE_CONCURRENCY)
         logger.info("✅ Menu Comparison Orchestrator initialized")
     
     async def discover_competitors(
@@ -253,26 +258,30 @@ class MenuComparisonOrchestrator:
                 }
             }
             
-            # Parse competitor menus
-            competitor_menus = []
+            # Parse competitor menus concurrently; events stream in completion order
             selected_competitors = [
                 c for c in analysis_data['competitors']
                 if c['id'] in competitor_ids
             ]
+            menus_by_competitor: Dict[str, List[Dict]] = {}
+            total = len(selected_competitors)
+            completed = 0
             
-            for i, competitor in enumerate(selected_competitors):
-                progress = 20 + (i + 1) * 25  # 20-70%
-                
-                # Check if we already have a recent menu snapshot for this competitor
-                existing_menu = self.storage.get_latest_competitor_menu(competitor['id'])
-                
+            def menu_progress() -> int:
+                return 20 + int(50 * completed / total) if total else 70  # 20-70%
+            
+            # Recent menu snapshots (checked together) skip re-parsing
+            existing_menus = await asyncio.gather(*[
+                asyncio.to_thread(self.storage.get_latest_competitor_menu, competitor['id'])
+                for competitor in selected_competitors
+            ])
+            
+            parse_tasks = []
+            for competitor, existing_menu in zip(selected_competitors, existing_menus):
                 if existing_menu and len(existing_menu) > 0:
                     logger.info(f"✅ Using cached menu for {competitor['business_name']} ({len(existing_menu)} items)")
-                    
-                    competitor_menus.append({
-                        "competitor_name": competitor['business_name'],
-                        "items": existing_menu
-                    })
+                    menus_by_competitor[competitor['id']] = existing_menu
+                    completed += 1
                     
                     yield {
                         "type": "competitor_menu_cached",
@@ -280,57 +289,72 @@ class MenuComparisonOrchestrator:
                             "competitor_name": competitor['business_name'],
                             "items_found": len(existing_menu),
                             "message": f"Using cached menu ({len(existing_menu)} items)",
-                            "progress": progress
+                            "progress": menu_progress()
                         }
                     }
                     continue
                 
+                menu_url = competitor.get('menu_url') or competitor.get('website')
+                if not menu_url:
+                    logger.warning(f"⚠️  No menu URL for {competitor['business_name']}")
+                    completed += 1
+                    continue
+                
+                parse_tasks.append(asyncio.create_task(
+                    self._parse_and_store_menu(analysis_id, competitor, menu_url)
+                ))
+                
                 yield {
                     "type": "parsing_competitor_menu",
                     "data": {
                         "competitor_name": competitor['business_name'],
                         "message": f"Parsing {competitor['business_name']} menu...",
-                        "progress": progress
+                        "progress": menu_progress()
                     }
                 }
-                
-                # Parse menu
-                menu_url = competitor.get('menu_url') or competitor.get('website')
-                if not menu_url:
-                    logger.warning(f"⚠️  No menu URL for {competitor['business_name']}")
-                    continue
-                
-                parse_result = await self.menu_parser.parse_competitor_menu(
-                    menu_url=menu_url,
-                    competitor_name=competitor['business_name'],
-                    menu_source="google_places"
-                )
-                
-                if parse_result['metadata']['success']:
-                    # Store parsed menu
-                    self.storage.store_competitor_menu(
-                        competitor_id=competitor['id'],
-                        analysis_id=analysis_id,
-                        menu_items=parse_result['menu_items'],
-                        menu_source="google_places",
-                        menu_url=menu_url,
-                        parse_metadata=parse_result['metadata']
-                    )
+            
+            try:
+                for next_done in asyncio.as_completed(parse_tasks):
+                    competitor, menu_items = await next_done
+                    completed += 1
                     
-                    competitor_menus.append({
-                        "competitor_name": competitor['business_name'],
-                        "items": parse_result['menu_items']
-                    })
+                    if menu_items is None:
+                        yield {
+                            "type": "competitor_menu_failed",
+                            "data": {
+                                "competitor_name": competitor['business_name'],
+                                "message": f"Could not parse {competitor['business_name']} menu",
+                                "progress": menu_progress()
+                            }
+                        }
+                        continue
+                    
+                    menus_by_competitor[competitor['id']] = menu_items
                     
                     yield {
                         "type": "competitor_menu_parsed",
                         "data": {
                             "competitor_name": competitor['business_name'],
-                            "items_found": len(parse_result['menu_items']),
-                            "message": f"Parsed {len(parse_result['menu_items'])} items",
-                            "progress": progress
+                            "items_found": len(menu_items),
+                            "message": f"Parsed {len(menu_items)} items",
+                            "progress": menu_progress()
                         }
                     }
+            finally:
+                # Client went away or a parse raised: don't leave parses running
+                for task in parse_tasks:
+                    if not task.done():
+                        task.cancel()
+            
+            # Selection order, regardless of which parse finished first
+            competitor_menus = [
+                {
+                    "competitor_name": competitor['business_name'],
+                    "items": menus_by_competitor[competitor['id']]
+                }
+                for competitor in selected_competitors
+                if competitor['id'] in menus_by_competitor
+            ]
             
             if not competitor_menus:
                 raise Exception("Failed to parse any competitor menus")
@@ -390,3 +414,37 @@ class MenuComparisonOrchestrator:
                     "error": str(e)
                 }
             }
+    
+    async def _parse_and_store_menu(
+        self,
+        analysis_id: str,
+        competitor: Dict,
+        menu_url: str
+    ) -> Tuple[Dict, Optional[List[Dict]]]:
+        """
+        Parse one competitor menu (bounded by the parse semaphore) and store it
+        
+        Returns:
+            (competitor, menu items), with None items when parsing failed
+        """
+        async with self.menu_parse_semaphore:
+            parse_result = await self.menu_parser.parse_competitor_menu(
+                menu_url=menu_url,
+                competitor_name=competitor['business_name'],
+                menu_source="google_places"
+            )
+        
+        if not parse_result['metadata']['success']:
+            return competitor, None
+        
+        # Store parsed menu
+        await asyncio.to_thread(
+            self.storage.store_competitor_menu,
+            competitor_id=competitor['id'],
+            analysis_id=analysis_id,
+            menu_items=parse_result['menu_items'],
+            menu_source="google_places",
+            menu_url=menu_url,
+            parse_metadata=parse_result['metadata']
+        )
+        return competitor, parse_result['menu_items']
@@ -5,7 +5,7 @@ READ ONLY access to inventory_items (invoice source of truth)
 WRITE access to menu_item_ingredients (menu owns this)
 """
 import logging
-from typing import Dict, List, Optional
+from typing import Dict, List, Optional, Tuple
 from supabase import Client
 from datetime import datetime
 
@@ -199,6 +199,79 @@ class MenuRecipeService:
             traceback.print_exc()
             raise Exception(f"Failed to search invoice items: {str(e)}")
     
+    def get_pricing_lines(self, user_id: str, invoice_item_ids: List[str]) -> Dict[str, str]:
+        """
+        Invoice line each linked recipe line is priced from
+        
+        A recipe line links to the invoice line (vendor item) it was built
+        from; its cost follows the latest purchase (by invoice date) of the
+        same normalized ingredient from the same vendor, never another
+        vendor's line. Lines that are not normalized yet, or whose vendor is
+        unknown, price from themselves.
+        
+        Returns:
+            Dict mapping linked invoice_item_id -> priced invoice_item_id
+        """
+        linked_ids = sorted({item_id for item_id in invoice_item_ids if item_id})
+        if not linked_ids:
+            return {}
+        
+        try:
+            result = self.client.rpc("get_recipe_pricing_lines", {
+                "p_user_id": user_id,
+                "p_invoice_item_ids": linked_ids
+            }).execute()
+            return {
+                row["invoice_item_id"]: row["priced_invoice_item_id"] or row["invoice_item_id"]
+                for row in result.data or []
+            }
+        except Exception as e:
+            logger.warning(f"⚠️ Pricing line RPC failed, querying mappings directly: {e}")
+        
+        pricing = {item_id: item_id for item_id in linked_ids}
+        try:
+            mappings = self.client.table("ingredient_mappings").select(
+                "invoice_item_id, normalized_ingredient_id"
+            ).eq("user_id", user_id).in_("invoice_item_id", linked_ids).execute()
+            ingredient_by_line = {
+                row["invoice_item_id"]: row["normalized_ingredient_id"]
+                for row in mappings.data or []
+                if row.get("normalized_ingredient_id")
+            }
+            if not ingredient_by_line:
+                return pricing
+            
+            own_rows = self.client.table("ingredient_price_history").select(
+                "invoice_item_id, vendor_name"
+            ).eq("user_id", user_id).in_("invoice_item_id", sorted(ingredient_by_line)).execute()
+            vendor_by_line = {
+                row["invoice_item_id"]: row["vendor_name"]
+                for row in own_rows.data or []
+                if row.get("vendor_name")
+            }
+            if not vendor_by_line:
+                return pricing
+            
+            history = self.client.table("ingredient_price_history").select(
+                "invoice_item_id, normalized_ingredient_id, vendor_name"
+            ).eq("user_id", user_id).in_(
+                "normalized_ingredient_id", sorted(set(ingredient_by_line.values()))
+            ).gt("unit_price", 0).order("invoice_date", desc=True).order("created_at", desc=True).execute()
+            
+            latest_by_vendor_item = {}
+            for row in history.data or []:
+                latest_by_vendor_item.setdefault(
+                    (row["normalized_ingredient_id"], row.get("vendor_name")), row["invoice_item_id"]
+                )
+            
+            for linked_id, ingredient_id in ingredient_by_line.items():
+                vendor = vendor_by_line.get(linked_id)
+                if vendor:
+                    pricing[linked_id] = latest_by_vendor_item.get((ingredient_id, vendor), linked_id)
+        except Exception as e:
+            logger.warning(f"⚠️ Latest ingredient price lookup failed, pricing from linked lines: {e}")
+        return pricing
+    
     async def get_recipe(
         self,
         menu_item_id: str,
@@ -260,7 +333,6 @@ class MenuRecipeService:
             
             # Enrich with inventory data and calculate costs with unit conversion (READ ONLY)
             from services.unit_converter import UnitConverter
-            from decimal import Decimal
             
             converter = UnitConverter()
             enriched_ingredients = []
@@ -270,11 +342,14 @@ class MenuRecipeService:
             # OPTIMIZATION: Fetch all invoice items in one query to avoid N+1
             ingredient_ids = [ing.get("invoice_item_id") for ing in ingredients_result.data or [] if ing.get("invoice_item_id")]
             
+            # Lines are priced from the latest purchase of their ingredient
+            pricing_lines = self.get_pricing_lines(user_id, ingredient_ids)
+            
             invoice_items_map = {}
             if ingredient_ids:
                 invoice_items_result = self.client.table("invoice_items").select(
                     "id, description, pack_size, unit_price, created_at, invoice_id"
-                ).in_("id", ingredient_ids).execute()
+                ).in_("id", list(set(ingredient_ids) | set(pricing_lines.values()))).execute()
                 
                 # Create a map for quick lookup
                 invoice_items_map = {item["id"]: item for item in invoice_items_result.data}
@@ -287,142 +362,17 @@ class MenuRecipeService:
                     continue
                 
                 # Get invoice item from map (no additional query)
-                invoice_item = invoice_items_map.get(invoice_item_id)
+                linked_item = invoice_items_map.get(invoice_item_id)
                 
-                if not invoice_item:
+                if not linked_item:
                     logger.error(f"   Invoice item {invoice_item_id} not found!")
                     continue
-                item_name = invoice_item["description"]
-                recipe_qty = float(ing["quantity_per_serving"])
-                recipe_unit = ing["unit_of_measure"]
-                
-                vendor_pack_size = invoice_item.get("pack_size")
-                pack_price = float(invoice_item.get("unit_price") or 0)
-                calculated_unit_cost = None
-                base_unit = None
-                converted_qty = None
-                converted_unit = None
-                ingredient_warnings = []
-                
-                logger.info(f"   Processing: {item_name}, pack={vendor_pack_size}, price=${pack_price}")
-                
-                # Calculate unit cost from pack
-                if vendor_pack_size and pack_price:
-                    unit_cost_weight, weight_unit, unit_cost_piece, error = converter.calculate_unit_cost_from_pack(
-                        Decimal(str(pack_price)),
-                        vendor_pack_size
-                    )
-                    if error:
-                        ingredient_warnings.append(error)
-                    else:
-                        # Determine which cost to use based on recipe unit
-                        if recipe_unit.lower() in ['ea', 'each', 'pc', 'pcs', 'piece', 'pieces']:
-                            # Recipe is in pieces - use per-piece cost if available
-                            if unit_cost_piece:
-                                calculated_unit_cost = float(unit_cost_piece)
-                                base_unit = "ea"
-                                converted_qty = recipe_qty  # Already in pieces
-                                converted_unit = "ea"
-                            elif unit_cost_weight:
-                                # Fallback to weight cost
-                                calculated_unit_cost = float(unit_cost_weight)
-                                base_unit = weight_unit
-                                conv_qty, conv_error = converter.convert_recipe_to_pack_unit(
-                                    Decimal(str(recipe_qty)),
-                                    recipe_unit,
-                                    weight_unit
-                                )
-                                if conv_qty:
-                                    converted_qty = float(conv_qty)
-                                    converted_unit = weight_unit
-                                else:
-                                    ingredient_warnings.append(conv_error or "Unit conversion failed")
-                        else:
-                            # Recipe is in weight/volume - use weight cost
-                            if unit_cost_weight:
-                                base_unit = weight_unit
-                                        
-                                # Check if recipe unit matches pack unit
-                                if recipe_unit.lower() == weight_unit.lower():
-                                    # Units match - use cost directly
-                                    calculated_unit_cost = float(unit_cost_weight)
-                                    converted_qty = recipe_qty
-                                    converted_unit = recipe_unit
-                                else:
-                                    # Units differ - need to convert BOTH quantity AND price
-                                    # Convert recipe quantity to pack unit
-                                    conv_qty, conv_error = converter.convert_recipe_to_pack_unit(
-                                        Decimal(str(recipe_qty)),
-                                        recipe_unit,
-                                        weight_unit
-                                    )
-                                    if conv_qty:
-                                        # Quantity converted successfully
-                                        converted_qty = float(conv_qty)
-                                        converted_unit = weight_unit
-                                        calculated_unit_cost = float(unit_cost_weight)
-                                    else:
-                                        # Conversion failed - try converting the price instead
-                                        # Convert price from pack unit to recipe unit
-                                        price_conv_qty, price_conv_error = converter.convert_recipe_to_pack_unit(
-                                            Decimal('1.0'),
-                                            weight_unit,
-                                            recipe_unit
-                                        )
-                                        if price_conv_qty:
-                                            # Price converted: $X/pack_unit → $Y/recipe_unit
-                                            calculated_unit_cost = float(unit_cost_weight / price_conv_qty)
-                                            converted_qty = recipe_qty
-                                            converted_unit = recipe_unit
-                                            base_unit = recipe_unit  # Update base_unit to match converted price
-                                            logger.info(f"   Converted price: ${unit_cost_weight}/{weight_unit} → ${calculated_unit_cost:.4f}/{recipe_unit}")
-                                        else:
-                                            ingredient_warnings.append(conv_error or price_conv_error or "Unit conversion failed")
-                            else:
-                                ingredient_warnings.append("Weight cost not available")
-                else:
-                    ingredient_warnings.append("Pack size not available")
-                
-                # Calculate ingredient cost
-                if calculated_unit_cost and converted_qty is not None:
-                    # Use calculated unit cost with converted quantity
-                    ingredient_cost = calculated_unit_cost * converted_qty
-                elif calculated_unit_cost:
-                    # Have unit cost but no conversion - use recipe qty directly
-                    ingredient_cost = calculated_unit_cost * recipe_qty
-                    converted_qty = recipe_qty
-                    converted_unit = recipe_unit
-                    ingredient_warnings.append(f"Using recipe quantity directly ({recipe_qty} {recipe_unit})")
-                else:
-                    # Fallback - no cost available
-                    ingredient_cost = 0
-                    calculated_unit_cost = 0
-                    converted_qty = recipe_qty
-                    converted_unit = recipe_unit
-                    ingredient_warnings.append("No cost data available")
-                
+                priced_item_id = pricing_lines.get(invoice_item_id, invoice_item_id)
+                invoice_item = invoice_items_map.get(priced_item_id) or linked_item
+                ingredient_cost, line = self._cost_ingredient_line(ing, linked_item, invoice_item, converter)
                 total_cogs += ingredient_cost
-                
-                enriched_ingredients.append({
-                    "id": ing["id"],
-                    "invoice_item_id": invoice_item_id,
-                    "invoice_item_description": item_name,
-                    "pack_size": vendor_pack_size,
-                    "pack_price": pack_price or float(invoice_item.get("unit_price") or 0),
-                    "calculated_unit_cost": calculated_unit_cost,
-                    "base_unit": base_unit,
-                    "quantity_per_serving": recipe_qty,
-                    "unit_of_measure": recipe_unit,
-                    "converted_quantity": converted_qty,
-                    "converted_unit": converted_unit,
-                    "line_cost": round(ingredient_cost, 2),
-                    "last_purchase_date": invoice_item.get("created_at"),
-                    "notes": ing.get("notes"),
-                    "warnings": ingredient_warnings
-                })
-                
-                if ingredient_warnings:
-                    recipe_warnings.extend(ingredient_warnings)
+                enriched_ingredients.append(line)
+                recipe_warnings.extend(line["warnings"])
             
             # Calculate margins
             menu_price = float(prices_result.data[0]["price"]) if prices_result.data else 0
@@ -451,6 +401,144 @@ class MenuRecipeService:
             logger.error(f"❌ Get recipe failed: {e}")
             raise
     
+    @staticmethod
+    def _cost_ingredient_line(ing: Dict, linked_item: Dict, invoice_item: Dict, converter) -> Tuple[float, Dict]:
+        """
+        Cost one recipe line against the invoice line it is priced from
+        
+        Shared by get_recipe and get_recipes_batch so single and batch
+        snapshots are the same computation (unit conversion and warnings).
+        """
+        from decimal import Decimal
+        
+        item_name = linked_item["description"]
+        recipe_qty = float(ing["quantity_per_serving"])
+        recipe_unit = ing["unit_of_measure"]
+
+        vendor_pack_size = invoice_item.get("pack_size")
+        pack_price = float(invoice_item.get("unit_price") or 0)
+        calculated_unit_cost = None
+        base_unit = None
+        converted_qty = None
+        converted_unit = None
+        ingredient_warnings = []
+
+        logger.debug(f"   Processing: {item_name}, pack={vendor_pack_size}, price=${pack_price}")
+
+        # Calculate unit cost from pack
+        if vendor_pack_size and pack_price:
+            unit_cost_weight, weight_unit, unit_cost_piece, error = converter.calculate_unit_cost_from_pack(
+                Decimal(str(pack_price)),
+                vendor_pack_size
+            )
+            if error:
+                ingredient_warnings.append(error)
+            else:
+                # Determine which cost to use based on recipe unit
+                if recipe_unit.lower() in ['ea', 'each', 'pc', 'pcs', 'piece', 'pieces']:
+                    # Recipe is in pieces - use per-piece cost if available
+                    if unit_cost_piece:
+                        calculated_unit_cost = float(unit_cost_piece)
+                        base_unit = "ea"
+                        converted_qty = recipe_qty  # Already in pieces
+                        converted_unit = "ea"
+                    elif unit_cost_weight:
+                        # Fallback to weight cost
+                        calculated_unit_cost = float(unit_cost_weight)
+                        base_unit = weight_unit
+                        conv_qty, conv_error = converter.convert_recipe_to_pack_unit(
+                            Decimal(str(recipe_qty)),
+                            recipe_unit,
+                            weight_unit
+                        )
+                        if conv_qty:
+                            converted_qty = float(conv_qty)
+                            converted_unit = weight_unit
+                        else:
+                            ingredient_warnings.append(conv_error or "Unit conversion failed")
+                else:
+                    # Recipe is in weight/volume - use weight cost
+                    if unit_cost_weight:
+                        base_unit = weight_unit
+
+                        # Check if recipe unit matches pack unit
+                        if recipe_unit.lower() == weight_unit.lower():
+                            # Units match - use cost directly
+                            calculated_unit_cost = float(unit_cost_weight)
+                            converted_qty = recipe_qty
+                            converted_unit = recipe_unit
+                        else:
+                            # Units differ - need to convert BOTH quantity AND price
+                            # Convert recipe quantity to pack unit
+                            conv_qty, conv_error = converter.convert_recipe_to_pack_unit(
+                                Decimal(str(recipe_qty)),
+                                recipe_unit,
+                                weight_unit
+                            )
+                            if conv_qty:
+                                # Quantity converted successfully
+                                converted_qty = float(conv_qty)
+                                converted_unit = weight_unit
+                                calculated_unit_cost = float(unit_cost_weight)
+                            else:
+                                # Conversion failed - try converting the price instead
+                                # Convert price from pack unit to recipe unit
+                                price_conv_qty, price_conv_error = converter.convert_recipe_to_pack_unit(
+                                    Decimal('1.0'),
+                                    weight_unit,
+                                    recipe_unit
+                                )
+                                if price_conv_qty:
+                                    # Price converted: $X/pack_unit → $Y/recipe_unit
+                                    calculated_unit_cost = float(unit_cost_weight / price_conv_qty)
+                                    converted_qty = recipe_qty
+                                    converted_unit = recipe_unit
+                                    base_unit = recipe_unit  # Update base_unit to match converted price
+                                    logger.info(f"   Converted price: ${unit_cost_weight}/{weight_unit} → ${calculated_unit_cost:.4f}/{recipe_unit}")
+                                else:
+                                    ingredient_warnings.append(conv_error or price_conv_error or "Unit conversion failed")
+                    else:
+                        ingredient_warnings.append("Weight cost not available")
+        else:
+            ingredient_warnings.append("Pack size not available")
+
+        # Calculate ingredient cost
+        if calculated_unit_cost and converted_qty is not None:
+            # Use calculated unit cost with converted quantity
+            ingredient_cost = calculated_unit_cost * converted_qty
+        elif calculated_unit_cost:
+            # Have unit cost but no conversion - use recipe qty directly
+            ingredient_cost = calculated_unit_cost * recipe_qty
+            converted_qty = recipe_qty
+            converted_unit = recipe_unit
+            ingredient_warnings.append(f"Using recipe quantity directly ({recipe_qty} {recipe_unit})")
+        else:
+            # Fallback - no cost available
+            ingredient_cost = 0
+            calculated_unit_cost = 0
+            converted_qty = recipe_qty
+            converted_unit = recipe_unit
+            ingredient_warnings.append("No cost data available")
+
+        return ingredient_cost, {
+            "id": ing["id"],
+            "invoice_item_id": ing["invoice_item_id"],
+            "priced_invoice_item_id": invoice_item["id"],
+            "invoice_item_description": item_name,
+            "pack_size": vendor_pack_size,
+            "pack_price": pack_price or float(invoice_item.get("unit_price") or 0),
+            "calculated_unit_cost": calculated_unit_cost,
+            "base_unit": base_unit,
+            "quantity_per_serving": recipe_qty,
+            "unit_of_measure": recipe_unit,
+            "converted_quantity": converted_qty,
+            "converted_unit": converted_unit,
+            "line_cost": round(ingredient_cost, 2),
+            "last_purchase_date": invoice_item.get("created_at"),
+            "notes": ing.get("notes"),
+            "warnings": ingredient_warnings
+        }
+    
     async def get_recipes_batch(
         self,
         menu_item_ids: list[str],
@@ -467,7 +555,6 @@ class MenuRecipeService:
         
         try:
             from services.unit_converter import UnitConverter
-            from decimal import Decimal
             
             converter = UnitConverter()
             
@@ -530,12 +617,13 @@ class MenuRecipeService:
                 if ing.get("invoice_item_id"):
                     all_invoice_item_ids.add(ing["invoice_item_id"])
             
-            # Step 5: Get all invoice items (ONE query)
+            # Step 5: Get all invoice items, linked and latest-priced (ONE query)
+            pricing_lines = self.get_pricing_lines(user_id, list(all_invoice_item_ids))
             invoice_items_map = {}
             if all_invoice_item_ids:
                 invoice_items_result = self.client.table("invoice_items").select(
                     "id, description, pack_size, unit_price, created_at"
-                ).in_("id", list(all_invoice_item_ids)).execute()
+                ).in_("id", list(all_invoice_item_ids | set(pricing_lines.values()))).execute()
                 
                 invoice_items_map = {item["id"]: item for item in invoice_items_result.data}
             
@@ -552,6 +640,7 @@ class MenuRecipeService:
                 
                 # Calculate COGS
                 enriched_ingredients = []
+                recipe_warnings = []
                 total_cogs = 0.0
                 
                 for ing in ingredients:
@@ -559,46 +648,16 @@ class MenuRecipeService:
                     if not invoice_item_id:
                         continue
                     
-                    invoice_item = invoice_items_map.get(invoice_item_id)
-                    if not invoice_item:
+                    linked_item = invoice_items_map.get(invoice_item_id)
+                    if not linked_item:
                         continue
+                    priced_item_id = pricing_lines.get(invoice_item_id, invoice_item_id)
+                    invoice_item = invoice_items_map.get(priced_item_id) or linked_item
                     
-                    recipe_qty = float(ing["quantity_per_serving"])
-                    recipe_unit = ing["unit_of_measure"]
-                    pack_price = float(invoice_item.get("unit_price") or 0)
-                    vendor_pack_size = invoice_item.get("pack_size")
-                    
-                    # Quick cost calculation (simplified for batch performance)
-                    ingredient_cost = 0
-                    calculated_unit_cost = None
-                    
-                    if vendor_pack_size and pack_price:
-                        unit_cost_weight, weight_unit, unit_cost_piece, _ = converter.calculate_unit_cost_from_pack(
-                            Decimal(str(pack_price)),
-                            vendor_pack_size
-                        )
-                        
-                        if unit_cost_weight:
-                            calculated_unit_cost = float(unit_cost_weight)
-                            ingredient_cost = calculated_unit_cost * recipe_qty
-                        elif unit_cost_piece:
-                            calculated_unit_cost = float(unit_cost_piece)
-                            ingredient_cost = calculated_unit_cost * recipe_qty
-                    
+                    ingredient_cost, line = self._cost_ingredient_line(ing, linked_item, invoice_item, converter)
                     total_cogs += ingredient_cost
-                    
-                    enriched_ingredients.append({
-                        "id": ing["id"],
-                        "invoice_item_id": invoice_item_id,
-                        "invoice_item_description": invoice_item["description"],
-                        "pack_size": vendor_pack_size,
-                        "pack_price": pack_price,
-                        "calculated_unit_cost": calculated_unit_cost,
-                        "quantity_per_serving": recipe_qty,
-                        "unit_of_measure": recipe_unit,
-                        "line_cost": round(ingredient_cost, 2),
-                        "notes": ing.get("notes")
-                    })
+                    enriched_ingredients.append(line)
+                    recipe_warnings.extend(line["warnings"])
                 
                 # Calculate margins
                 menu_price = float(prices[0]["price"]) if prices else 0
@@ -615,7 +674,8 @@ class MenuRecipeService:
                     "total_cogs": round(total_cogs, 2),
                     "menu_price": menu_price,
                     "gross_profit": round(gross_profit, 2),
-                    "food_cost_percent": round(food_cost_percent, 1)
+                    "food_cost_percent": round(food_cost_percent, 1),
+                    "warnings": list(set(recipe_warnings))
                 }
             
             logger.info(f"✅ Batch loaded {len(recipes)} recipes with {len(all_invoice_item_ids)} unique ingredients")
@@ -12,11 +12,17 @@ from typing import Dict, List, Optional, Tuple
 from dotenv import load_dotenv
 from supabase import Client, create_client
 
+from services.cogs_snapshot_store import CogsSnapshotStore
 from services.menu_recipe_service import MenuRecipeService
 
 load_dotenv()
 logger = logging.getLogger(__name__)
 
+# Conflict target backed by migration 057's unique index
+SALES_UPSERT_KEY = "user_id,menu_item_id,menu_item_price_id,sale_date"
+# Rows per upsert request (a month of a full menu stays a handful of calls)
+SALES_UPSERT_CHUNK_SIZE = 500
+
 
 class MenuSalesService:
     """
@@ -37,6 +43,7 @@ class MenuSalesService:
 
         self.client: Client = create_client(supabase_url, supabase_key)
         self.recipe_service = MenuRecipeService(self.client)
+        self.snapshot_store = CogsSnapshotStore(self.client, self.recipe_service)
 
     # ------------------------------------------------------------------
     # Write path
@@ -45,19 +52,20 @@ class MenuSalesService:
         self,
         *,
         user_id: str,
-        sale_date: date,
+        sale_date: Optional[date] = None,
         entries: List[Dict],
     ) -> Dict:
         """
-        Record (or update) daily sales entries.
+        Record (or update) daily sales entries with one bulk upsert.
 
         Args:
             user_id: Authenticated user ID
-            sale_date: Calendar date being recorded
+            sale_date: Default calendar date for entries without their own
             entries: List of dict entries with keys:
                 - menu_item_id (str)
                 - menu_item_price_id (str | None)
                 - quantity_sold (Decimal-compatible)
+                - sale_date (optional date, for multi-day batches)
                 - metadata (optional dict)
 
         Returns:
@@ -74,6 +82,20 @@ class MenuSalesService:
                 },
             }
 
+        # Later entries for the same (item, price, day) win, as they did when
+        # each entry was written on its own.
+        resolved: Dict[Tuple[str, Optional[str], str], Dict] = {}
+        for entry in entries:
+            entry_date = entry.get("sale_date") or sale_date
+            if not entry_date:
+                raise ValueError("sale_date is required for every entry")
+            if isinstance(entry_date, date):
+                entry_date = entry_date.isoformat()
+            key = (entry["menu_item_id"], entry.get("menu_item_price_id"), entry_date)
+            resolved.pop(key, None)
+            resolved[key] = {**entry, "sale_date": entry_date}
+        entries = list(resolved.values())
+
         menu_item_ids = {entry["menu_item_id"] for entry in entries}
         price_ids = {
             entry["menu_item_price_id"]
@@ -129,31 +151,16 @@ class MenuSalesService:
                         "Menu item price does not belong to the specified menu item"
                     )
 
-        # Step 3: Load recipe snapshots for COGS
-        recipes = await self.recipe_service.get_recipes_batch(
-            list(menu_item_ids), user_id
-        )
+        # Step 3: Load recipe snapshots for COGS (Redis -> table -> recompute)
+        recipes = await self.snapshot_store.get_many(user_id, menu_item_ids)
 
-        # Step 4: Fetch existing rows for this date to support updates
-        existing_map: Dict[Tuple[str, Optional[str]], str] = {}
-        existing_query = (
-            self.client.table("menu_item_daily_sales")
-            .select("id, menu_item_id, menu_item_price_id")
-            .eq("user_id", user_id)
-            .eq("sale_date", sale_date.isoformat())
-        )
-        if menu_item_ids:
-            existing_query = existing_query.in_("menu_item_id", list(menu_item_ids))
-        existing_rows = existing_query.execute()
-        for row in existing_rows.data or []:
-            key = (row["menu_item_id"], row.get("menu_item_price_id"))
-            existing_map[key] = row["id"]
-
-        # Step 5: Insert/update rows
+        # Step 4: Build snapshot rows
+        rows: List[Dict] = []
         saved_records: List[Dict] = []
         total_quantity = Decimal("0")
         total_cogs = Decimal("0")
         total_revenue = Decimal("0")
+        updated_at = datetime.utcnow().isoformat()
 
         for entry in entries:
             menu_item_id = entry["menu_item_id"]
@@ -197,11 +204,12 @@ class MenuSalesService:
                 else None
             )
 
+            # created_at is left to the column default so updates keep it
             payload = {
                 "user_id": user_id,
                 "menu_item_id": menu_item_id,
                 "menu_item_price_id": price_id,
-                "sale_date": sale_date.isoformat(),
+                "sale_date": entry["sale_date"],
                 "quantity_sold": float(quantity),
                 "unit_cogs_snapshot": float(unit_cogs)
                 if unit_cogs is not None
@@ -219,26 +227,13 @@ class MenuSalesService:
                 if gross_profit_snapshot is not None
                 else None,
                 "metadata": metadata,
-                "updated_at": datetime.utcnow().isoformat(),
+                "updated_at": updated_at,
             }
+            rows.append(payload)
 
-            key = (menu_item_id, price_id)
-            existing_id = existing_map.get(key)
-            if existing_id:
-                self.client.table("menu_item_daily_sales").update(payload).eq(
-                    "id", existing_id
-                ).execute()
-                record_id = existing_id
-            else:
-                payload["created_at"] = datetime.utcnow().isoformat()
-                insert_result = (
-                    self.client.table("menu_item_daily_sales").insert(payload).execute()
-                )
-                record_id = insert_result.data[0]["id"]
-                existing_map[key] = record_id
-
-            saved_record = {
-                "id": record_id,
+            saved_records.append({
+                "id": None,
+                "sale_date": entry["sale_date"],
                 "menu_item_id": menu_item_id,
                 "menu_item_name": menu_items_map[menu_item_id]["item_name"],
                 "menu_item_price_id": price_id,
@@ -249,8 +244,7 @@ class MenuSalesService:
                 "total_cogs_snapshot": payload["total_cogs_snapshot"],
                 "total_revenue_snapshot": payload["total_revenue_snapshot"],
                 "gross_profit_snapshot": payload["gross_profit_snapshot"],
-            }
-            saved_records.append(saved_record)
+            })
 
             total_quantity += quantity
             if total_cogs_snapshot is not None:
@@ -258,6 +252,31 @@ class MenuSalesService:
             if total_revenue_snapshot is not None:
                 total_revenue += total_revenue_snapshot
 
+        # Step 5: One upsert per chunk (migration 057 unique key)
+        saved_ids: Dict[Tuple[str, Optional[str], str], str] = {}
+        for start in range(0, len(rows), SALES_UPSERT_CHUNK_SIZE):
+            result = (
+                self.client.table("menu_item_daily_sales")
+                .upsert(
+                    rows[start:start + SALES_UPSERT_CHUNK_SIZE],
+                    on_conflict=SALES_UPSERT_KEY,
+                )
+                .execute()
+            )
+            for row in result.data or []:
+                key = (row["menu_item_id"], row.get("menu_item_price_id"), str(row["sale_date"]))
+                saved_ids[key] = row["id"]
+
+        for record in saved_records:
+            record["id"] = saved_ids.get(
+                (record["menu_item_id"], record["menu_item_price_id"], record["sale_date"])
+            )
+
+        logger.info(
+            f"🧾 Upserted {len(rows)} daily sales rows for user {user_id} "
+            f"across {len({row['sale_date'] for row in rows})} day(s)"
+        )
+
         summary = {
             "total_quantity": float(total_quantity),
             "total_cogs": float(total_cogs),
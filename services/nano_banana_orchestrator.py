@@ -21,7 +21,9 @@ from services.creative_template_service import CreativeTemplateService
 from services.creative_variation_engine import CreativeVariationEngine
 from services.creative_quality_validator import CreativeQualityValidator
 from services.feature_flag_service import get_feature_flag_service
+from services.image_job_updates import ImageJobStatusPoller, image_job_updates, job_state
 from services.nano_banana_client import NanoBananaClient, sanitize_payload_for_logging
+from services.redis_client import cache
 from services.usage_limit_service import get_usage_limit_service
 
 logger = logging.getLogger(__name__)
@@ -29,6 +31,12 @@ logger = logging.getLogger(__name__)
 
 TERMINAL_STATUSES = {"completed", "failed", "cancelled"}
 
+# Jobs whose assets this process stored (used when Redis is unavailable)
+_finalized_jobs: set = set()
+
+# A claim outlives its holder only this long if the holder dies mid-finalization
+ASSET_CLAIM_TTL_SECONDS = 600
+
 
 class UsageLimitExceededError(Exception):
     """Raised when a user exceeds their image generation allocation."""
@@ -42,6 +50,7 @@ class NanoBananaImageOrchestrator:
     """High-level coordinator for creative image generation."""
 
     POLL_INTERVAL_SECONDS = 5
+    STREAM_HEARTBEAT_SECONDS = 15
 
     def __init__(self) -> None:
         self.account_service = AccountService()
@@ -579,7 +588,12 @@ class NanoBananaImageOrchestrator:
         job_id: str,
         user_id: str,
     ) -> AsyncGenerator[Dict[str, Any], None]:
-        """Yield progress updates suitable for Server-Sent Events."""
+        """
+        Yield progress updates suitable for Server-Sent Events.
+
+        Updates arrive over the event bus from webhooks and from the shared
+        per-process poller; viewers never poll Nano Banana themselves.
+        """
         job = self.storage.get_job(job_id, user_id)
         if not job:
             raise ValueError("Job not found")
@@ -592,61 +606,198 @@ class NanoBananaImageOrchestrator:
             yield {"type": "job_complete", "data": _serialize_job(job)}
             return
 
-        while True:
-            response = await self.client.get_job(job["nano_job_id"])
-            status = response.get("status") or response.get("state")
-            progress = response.get("progress")
-
-            if status:
-                self.storage.update_job_status(
-                    job_id,
-                    status=status,
-                    progress=progress,
-                    error_message=response.get("error"),
-                    cost_estimate=response.get("cost"),
-                )
-                self.storage.record_event(
-                    job_id=job_id,
-                    event_type=f"status_{status}",
-                    payload=response,
-                    progress=progress,
-                )
+        queue = image_job_updates.subscribe(
+            job_id,
+            job_state(current_status, job.get("progress"), job.get("error_message")),
+        )
+        image_job_poller.watch(job_id, lambda: self._poll_job_status(job))
+        try:
+            yield {
+                "type": "status",
+                "data": {"status": current_status, "progress": job.get("progress"), "message": None},
+            }
+            while True:
+                try:
+                    update = await asyncio.wait_for(queue.get(), timeout=self.STREAM_HEARTBEAT_SECONDS)
+                except asyncio.TimeoutError:
+                    yield {"type": "heartbeat", "data": {"status": current_status}}
+                    continue
+
+                current_status = update.get("status") or current_status
+                yield {
+                    "type": "status",
+                    "data": {
+                        "status": update.get("status"),
+                        "progress": update.get("progress"),
+                        "message": update.get("message"),
+                    },
+                }
+
+                if current_status in TERMINAL_STATUSES:
+                    if current_status == "completed":
+                        final_job = self.storage.get_job(job_id, user_id)
+                        yield {"type": "job_complete", "data": _serialize_job(final_job)}
+                    elif current_status == "failed":
+                        yield {
+                            "type": "job_failed",
+                            "data": {
+                                "error": update.get("error") or "Nano Banana reported failure",
+                                "nano_job_id": job["nano_job_id"],
+                            },
+                        }
+                    break
+        finally:
+            image_job_poller.unwatch(job_id)
+            image_job_updates.unsubscribe(job_id, queue)
+
+    async def _poll_job_status(self, job: Dict[str, Any]) -> None:
+        """Fetch a job's status from Nano Banana and apply it (poller fallback)."""
+        response = await self.client.get_job(job["nano_job_id"])
+        status = response.get("status") or response.get("state")
+        if not status:
+            return
+        if status != "completed":
+            self._apply_job_update(
+                job,
+                status=status,
+                payload=response,
+                event_type=f"status_{status}",
+                assets_response=None,
+                source="poll",
+            )
+            return
+        if not self._claim_asset_finalization(job["id"]):
+            # A webhook or another worker stores the assets; publish what it has
+            # already finished, e.g. for a viewer that subscribed after it did
+            self._publish_stored_terminal_state(job, source="poll")
+            return
+        try:
+            assets_response = await self.client.list_assets(job["nano_job_id"])
+            self._apply_job_update(
+                job,
+                status=status,
+                payload=response,
+                event_type=f"status_{status}",
+                assets_response=assets_response,
+                source="poll",
+            )
+        except Exception:
+            self._release_asset_finalization(job["id"])
+            raise
+
+    def _apply_job_update(
+        self,
+        job: Dict[str, Any],
+        *,
+        status: str,
+        payload: Dict[str, Any],
+        event_type: str,
+        assets_response: Optional[Dict[str, Any]],
+        source: str,
+    ) -> bool:
+        """
+        Persist and publish a status update when it changes the job's state.
+
+        Returns False for a repeat of the last known state, which is neither
+        written nor published.
+        """
+        job_id = job["id"]
+        progress = payload.get("progress")
+        state = job_state(status, progress, payload.get("error"))
+        known = image_job_updates.known_state(job_id) or job_state(
+            job.get("status"), job.get("progress"), job.get("error_message")
+        )
+        if state == known and assets_response is None:
+            return False
+
+        # Assets are stored before the status is written and published, so a
+        # completed job row (or update) always comes with its assets
+        if assets_response is not None:
+            assets = self._normalize_assets(job=job, job_id=job_id, assets_response=assets_response)
+            stored_assets = self.storage.store_assets(job_id, assets)
+            self.storage.record_event(
+                job_id=job_id,
+                event_type="assets_ready",
+                payload={"count": len(stored_assets)},
+                progress=95,
+            )
+
+        if state != known:
+            self.storage.update_job_status(
+                job_id,
+                status=status,
+                progress=progress,
+                error_message=payload.get("error"),
+                cost_estimate=payload.get("cost"),
+            )
+            self.storage.record_event(
+                job_id=job_id,
+                event_type=event_type,
+                payload=payload,
+                progress=progress,
+            )
 
-            payload = {
+        image_job_updates.publish(
+            {
+                "job_id": job_id,
+                "nano_job_id": job.get("nano_job_id"),
                 "status": status,
                 "progress": progress,
-                "message": response.get("message"),
+                "message": payload.get("message"),
+                "error": payload.get("error"),
+                "source": source,
+            }
+        )
+        return True
+
+    @staticmethod
+    def _claim_asset_finalization(job_id: str) -> bool:
+        """True for the first caller (across workers, with Redis) to store a job's assets."""
+        if cache.enabled:
+            try:
+                return bool(cache.client.set(
+                    f"image_job:assets:{job_id}", "1", nx=True, ex=ASSET_CLAIM_TTL_SECONDS
+                ))
+            except Exception as e:  # pylint: disable=broad-except
+                logger.warning("Asset finalization claim unavailable for %s: %s", job_id, e)
+        if job_id in _finalized_jobs:
+            return False
+        _finalized_jobs.add(job_id)
+        return True
+
+    @staticmethod
+    def _release_asset_finalization(job_id: str) -> None:
+        """Give up a claim whose assets were not stored, so the next poll or webhook retries."""
+        _finalized_jobs.discard(job_id)
+        if cache.enabled:
+            try:
+                cache.client.delete(f"image_job:assets:{job_id}")
+            except Exception as e:  # pylint: disable=broad-except
+                logger.warning("Could not release asset finalization claim for %s: %s", job_id, e)
+
+    def _publish_stored_terminal_state(self, job: Dict[str, Any], *, source: str) -> bool:
+        """
+        Publish the job row's state once it is terminal.
+
+        Used when another caller holds the asset claim: the row only turns
+        completed after the assets are stored, so until then nothing is
+        published and the next poll checks again.
+        """
+        current = self.storage.get_job_by_nano_id(job["nano_job_id"]) if job.get("nano_job_id") else None
+        if not current or current.get("status") not in TERMINAL_STATUSES:
+            return False
+        image_job_updates.publish(
+            {
+                "job_id": job["id"],
+                "nano_job_id": job.get("nano_job_id"),
+                "status": current["status"],
+                "progress": current.get("progress"),
+                "message": None,
+                "error": current.get("error_message"),
+                "source": source,
             }
-            yield {"type": "status", "data": payload}
-
-            if status in TERMINAL_STATUSES:
-                if status == "completed":
-                    assets_response = await self.client.list_assets(job["nano_job_id"])
-                    assets = self._normalize_assets(
-                        job=job,
-                        job_id=job_id,
-                        assets_response=assets_response,
-                    )
-                    stored_assets = self.storage.store_assets(job_id, assets)
-                    self.storage.record_event(
-                        job_id=job_id,
-                        event_type="assets_ready",
-                        payload={"count": len(stored_assets)},
-                        progress=95,
-                    )
-                    final_job = self.storage.get_job(job_id, user_id)
-                    yield {"type": "job_complete", "data": _serialize_job(final_job)}
-                elif status == "failed":
-                    yield {
-                        "type": "job_failed",
-                        "data": {
-                            "error": response.get("error") or "Nano Banana reported failure",
-                            "nano_job_id": job["nano_job_id"],
-                        },
-                    }
-                break
-
-            await asyncio.sleep(self.POLL_INTERVAL_SECONDS)
+        )
+        return True
 
     # ------------------------------------------------------------------ #
     # Retrieval helpers
@@ -741,20 +892,20 @@ class NanoBananaImageOrchestrator:
     # Webhook integration
     # ------------------------------------------------------------------ #
 
-    def process_webhook(
+    async def process_webhook(
         self,
         *,
         raw_body: bytes,
         signature: str,
     ) -> Dict[str, Any]:
         """
-        Process Nano Banana webhook callback.
+        Process Nano Banana webhook callback and push it to live streams.
 
         Webhook payload should include keys:
             - nano_job_id
             - status
             - progress
-            - assets (optional)
+            - assets (optional; fetched from Nano Banana when missing)
         """
         if not self.client.validate_webhook(raw_body, signature):
             raise ValueError("Invalid Nano Banana webhook signature")
@@ -769,27 +920,36 @@ class NanoBananaImageOrchestrator:
             logger.warning("Received webhook for unknown Nano Banana job %s", nano_job_id)
             return {"status": "ignored"}
 
-        status = payload.get("status")
-        progress = payload.get("progress")
-
-        self.storage.update_job_status(
-            job["id"],
-            status=status or job.get("status"),
-            progress=progress,
-            error_message=payload.get("error"),
-            cost_estimate=payload.get("cost"),
-        )
-        self.storage.record_event(
-            job_id=job["id"],
-            event_type="webhook_event",
-            payload=payload,
-            progress=progress,
-        )
-
-        if status == "completed" and payload.get("assets"):
-            assets = self._normalize_assets(payload)
-            self.storage.store_assets(job["id"], assets)
+        status = payload.get("status") or job.get("status")
+        if status != "completed":
+            changed = self._apply_job_update(
+                job,
+                status=status,
+                payload=payload,
+                event_type="webhook_event",
+                assets_response=None,
+                source="webhook",
+            )
+            return {"status": "processed" if changed else "unchanged", "job_id": job["id"]}
 
+        if not self._claim_asset_finalization(job["id"]):
+            # Duplicate delivery, or the poller is storing the assets
+            self._publish_stored_terminal_state(job, source="webhook")
+            return {"status": "unchanged", "job_id": job["id"]}
+        try:
+            assets_response = payload if payload.get("assets") else await self.client.list_assets(nano_job_id)
+            self._apply_job_update(
+                job,
+                status=status,
+                payload=payload,
+                event_type="webhook_event",
+                assets_response=assets_response,
+                source="webhook",
+            )
+        except Exception:
+            # Let a webhook retry or the poller store the assets
+            self._release_asset_finalization(job["id"])
+            raise
         return {"status": "processed", "job_id": job["id"]}
 
     # ------------------------------------------------------------------ #
@@ -1061,6 +1221,10 @@ class NanoBananaImageOrchestrator:
         return [asset for asset in assets if asset["asset_url"]]
 
 
+# One status poll loop per process, shared by every open progress stream
+image_job_poller = ImageJobStatusPoller(image_job_updates, NanoBananaImageOrchestrator.POLL_INTERVAL_SECONDS)
+
+
 def _serialize_job(job: Optional[Dict[str, Any]]) -> Dict[str, Any]:
     """Prepare job dict for public responses."""
     if not job:
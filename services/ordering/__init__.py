@@ -17,7 +17,11 @@ from .tasks import (
     enqueue_delivery_pattern_detection,
     warm_forecast_cache,
     run_full_ordering_pipeline,
+    run_incremental_ordering_pipeline,
+    mark_ordering_dirty,
+    process_dirty_ordering,
 )
+from .dirty_tracker import OrderingDirtyTracker
 
 __all__ = [
     "OrderingNormalizationService",
@@ -25,11 +29,15 @@ __all__ = [
     "OrderingForecastService",
     "OrderingCacheService",
     "DeliveryPatternService",
+    "OrderingDirtyTracker",
     "enqueue_normalization_job",
     "enqueue_feature_refresh",
     "enqueue_forecast_generation",
     "enqueue_delivery_pattern_detection",
     "warm_forecast_cache",
     "run_full_ordering_pipeline",
+    "run_incremental_ordering_pipeline",
+    "mark_ordering_dirty",
+    "process_dirty_ordering",
 ]
 
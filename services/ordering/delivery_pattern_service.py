@@ -9,7 +9,7 @@ from __future__ import annotations
 
 from collections import defaultdict
 from datetime import date, datetime, timedelta
-from typing import Dict, Iterable, List, Sequence, Set, Tuple
+from typing import Dict, Iterable, List, Optional, Sequence, Set, Tuple
 
 from database.supabase_client import get_supabase_service_client
 
@@ -42,15 +42,32 @@ class DeliveryPatternService:
         )
         return result.data or []
 
-    def detect_and_save(self, user_id: str) -> List[Dict]:
-        """Analyze vendor deliveries, persist schedules, and return the latest rows."""
-        patterns = self.analyze_vendor_delivery_patterns(user_id)
-        self.save_patterns(user_id, patterns)
+    def detect_and_save(
+        self,
+        user_id: str,
+        vendor_names: Optional[Iterable[str]] = None,
+    ) -> List[Dict]:
+        """
+        Analyze vendor deliveries, persist schedules, and return the latest rows.
+
+        When ``vendor_names`` is provided only those vendors are re-detected;
+        schedules for other vendors are left untouched.
+        """
+        vendors = sorted({name.strip() for name in vendor_names or [] if name and name.strip()}) or None
+        patterns = self.analyze_vendor_delivery_patterns(user_id, vendors)
+        self.save_patterns(user_id, patterns, vendors)
         return self.get_patterns(user_id)
 
-    def analyze_vendor_delivery_patterns(self, user_id: str) -> List[Dict]:
+    def analyze_vendor_delivery_patterns(
+        self,
+        user_id: str,
+        vendor_names: Optional[Sequence[str]] = None,
+    ) -> List[Dict]:
         """Infer vendor delivery weekdays from the normalized invoice facts."""
-        records = self._fetch_delivery_records(user_id)
+        if vendor_names:
+            records = self._fetch_vendor_delivery_records(user_id, vendor_names)
+        else:
+            records = self._fetch_delivery_records(user_id)
         if not records:
             return []
 
@@ -97,17 +114,24 @@ class DeliveryPatternService:
 
         return sorted(patterns, key=lambda row: row["vendor_name"].lower())
 
-    def save_patterns(self, user_id: str, patterns: Sequence[Dict]) -> None:
-        """Upsert detected schedules and remove stale vendors."""
+    def save_patterns(
+        self,
+        user_id: str,
+        patterns: Sequence[Dict],
+        scope_vendor_names: Optional[Sequence[str]] = None,
+    ) -> None:
+        """Upsert detected schedules and remove stale vendors (within scope, if set)."""
         pattern_list = list(patterns or [])
         vendor_names = {row["vendor_name"] for row in pattern_list}
 
-        existing_result = (
+        existing_query = (
             self.client.table("vendor_delivery_schedules")
             .select("id, vendor_name")
             .eq("user_id", user_id)
-            .execute()
         )
+        if scope_vendor_names:
+            existing_query = existing_query.in_("vendor_name", list(scope_vendor_names))
+        existing_result = existing_query.execute()
         existing_rows = existing_result.data or []
         stale_ids = [row["id"] for row in existing_rows if row.get("vendor_name") not in vendor_names]
 
@@ -184,6 +208,67 @@ class DeliveryPatternService:
             records.append((vendor_name, delivery_dt))
         return records
 
+    def _fetch_vendor_delivery_records(
+        self,
+        user_id: str,
+        vendor_names: Sequence[str],
+    ) -> List[Tuple[str, date]]:
+        """
+        Fetch vendor + delivery_date tuples for specific vendors only.
+
+        Walks invoices -> invoice_items -> facts so the cost scales with the
+        vendors' own history rather than the whole account.
+        """
+        cutoff = (date.today() - timedelta(days=self.LOOKBACK_DAYS)).isoformat()
+        invoice_vendor_map: Dict[str, str] = {}
+        for chunk in self._chunked(list(vendor_names)):
+            result = (
+                self.client.table("invoices")
+                .select("id, vendor_name")
+                .eq("user_id", user_id)
+                .in_("vendor_name", list(chunk))
+                .gte("invoice_date", cutoff)
+                .execute()
+            )
+            for row in result.data or []:
+                vendor = (row.get("vendor_name") or "").strip()
+                if vendor:
+                    invoice_vendor_map[row["id"]] = vendor
+        if not invoice_vendor_map:
+            return []
+
+        invoice_item_map: Dict[str, str] = {}
+        for chunk in self._chunked(list(invoice_vendor_map)):
+            result = (
+                self.client.table("invoice_items")
+                .select("id, invoice_id")
+                .in_("invoice_id", list(chunk))
+                .execute()
+            )
+            for row in result.data or []:
+                invoice_item_map[row["id"]] = row.get("invoice_id")
+
+        records: List[Tuple[str, date]] = []
+        for chunk in self._chunked(list(invoice_item_map)):
+            result = (
+                self.client.table("inventory_item_facts")
+                .select("invoice_item_id, delivery_date")
+                .eq("user_id", user_id)
+                .in_("invoice_item_id", list(chunk))
+                .gte("delivery_date", cutoff)
+                .execute()
+            )
+            for row in result.data or []:
+                vendor_name = invoice_vendor_map.get(invoice_item_map.get(row.get("invoice_item_id")))
+                delivery_date_str = row.get("delivery_date")
+                if not vendor_name or not delivery_date_str:
+                    continue
+                try:
+                    records.append((vendor_name, date.fromisoformat(delivery_date_str)))
+                except ValueError:
+                    continue
+        return records
+
     def _fetch_invoice_item_map(self, invoice_item_ids: Iterable[str]) -> Dict[str, str]:
         mapping: Dict[str, str] = {}
         ids = [item_id for item_id in invoice_item_ids if item_id]
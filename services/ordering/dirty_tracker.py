@@ -0,0 +1,89 @@
+"""
+OrderingDirtyTracker
+--------------------
+Tracks which invoices / invoice items changed since the last ordering
+recompute. Bursts of uploads add to the same per-user sets, and the
+incremental pipeline drains them in one pass so back-to-back invoices
+coalesce into a single recompute.
+"""
+from __future__ import annotations
+
+import logging
+import threading
+from collections import defaultdict
+from typing import Dict, Iterable, List, Set
+
+from services.redis_client import cache
+
+logger = logging.getLogger(__name__)
+
+
+class OrderingDirtyTracker:
+    """Per-user dirty sets stored in Redis (process memory when disabled)."""
+
+    KINDS = ("invoice_ids", "invoice_item_ids")
+    DIRTY_TTL = 7 * 24 * 3600  # seconds
+
+    _local: Dict[str, Dict[str, Set[str]]] = defaultdict(lambda: defaultdict(set))
+    _local_lock = threading.Lock()
+
+    @staticmethod
+    def dirty_key(user_id: str, kind: str) -> str:
+        return f"ordering:dirty:{user_id}:{kind}"
+
+    def mark(
+        self,
+        user_id: str,
+        *,
+        invoice_ids: Iterable[str] = (),
+        invoice_item_ids: Iterable[str] = (),
+    ) -> None:
+        """Record invoices / invoice items that need ordering recompute."""
+        pending = {
+            "invoice_ids": [i for i in invoice_ids if i],
+            "invoice_item_ids": [i for i in invoice_item_ids if i],
+        }
+        if not any(pending.values()):
+            return
+
+        if cache.enabled:
+            try:
+                pipe = cache.client.pipeline()
+                for kind, ids in pending.items():
+                    if ids:
+                        key = self.dirty_key(user_id, kind)
+                        pipe.sadd(key, *ids)
+                        pipe.expire(key, self.DIRTY_TTL)
+                pipe.execute()
+                return
+            except Exception as exc:  # pylint: disable=broad-except
+                logger.warning("[Ordering] Dirty-set write failed for user=%s, using memory: %s", user_id, exc)
+
+        with self._local_lock:
+            for kind, ids in pending.items():
+                self._local[user_id][kind].update(ids)
+
+    def drain(self, user_id: str) -> Dict[str, List[str]]:
+        """Atomically take and clear everything marked dirty for the user."""
+        drained: Dict[str, List[str]] = {kind: [] for kind in self.KINDS}
+
+        if cache.enabled:
+            try:
+                pipe = cache.client.pipeline(transaction=True)
+                for kind in self.KINDS:
+                    key = self.dirty_key(user_id, kind)
+                    pipe.smembers(key)
+                    pipe.delete(key)
+                results = pipe.execute()
+                for idx, kind in enumerate(self.KINDS):
+                    drained[kind] = sorted(results[idx * 2] or [])
+            except Exception as exc:  # pylint: disable=broad-except
+                logger.warning("[Ordering] Dirty-set drain failed for user=%s: %s", user_id, exc)
+
+        with self._local_lock:
+            local = self._local.pop(user_id, None) or {}
+        for kind in self.KINDS:
+            if local.get(kind):
+                drained[kind] = sorted(set(drained[kind]) | local[kind])
+
+        return drained
@@ -0,0 +1,238 @@
+"""
+Feature Calculator for Ordering Module
+Columnar (NumPy) computation of rolling features and usage metrics.
+
+All facts are loaded once into flat arrays (ingredient index, day offset,
+quantity) and every window average, variance, weekday histogram and reorder
+interval is computed for all ingredients at once with grouped reductions.
+Results match OrderingFeatureService._calculate_metrics/_calculate_usage.
+"""
+from __future__ import annotations
+
+import math
+from datetime import date, timedelta
+from typing import Dict, List, Optional
+
+import numpy as np
+
+_EPOCH = date(1970, 1, 1)
+_EPOCH_ORDINAL = _EPOCH.toordinal()
+
+
+class FeatureCalculator:
+    """Compute ordering features for every ingredient in one vectorized pass."""
+
+    def calculate(self, facts: List[Dict], today: date) -> Dict[str, Dict]:
+        """
+        Return ``{ingredient_id: {"slug", "metrics", "usage"}}`` for the facts.
+
+        ``metrics`` / ``usage`` have the same shape as the per-item helpers;
+        ``usage`` is None for ingredients with fewer than two deliveries.
+        """
+        keys: List[str] = []
+        key_index: Dict[str, int] = {}
+        slugs: List[Optional[str]] = []
+        group_idx: List[int] = []
+        day_nums: List[int] = []
+        quantities: List[float] = []
+        row_refs: List[Dict] = []
+
+        for fact in facts:
+            try:
+                delivery = date.fromisoformat(fact["delivery_date"])
+            except (TypeError, ValueError):
+                continue
+            quantity = fact.get("base_quantity")
+            if quantity is None:
+                continue
+
+            ingredient_id = fact.get("normalized_ingredient_id") or fact["normalized_item_id"]
+            idx = key_index.get(ingredient_id)
+            if idx is None:
+                idx = key_index[ingredient_id] = len(keys)
+                keys.append(ingredient_id)
+                slugs.append(None)
+            slugs[idx] = fact.get("normalized_item_id") or ingredient_id
+
+            group_idx.append(idx)
+            day_nums.append(delivery.toordinal() - _EPOCH_ORDINAL)
+            quantities.append(float(quantity))
+            row_refs.append(fact)
+
+        if not keys:
+            return {}
+
+        groups = len(keys)
+        gidx = np.asarray(group_idx, dtype=np.int64)
+        days = np.asarray(day_nums, dtype=np.int64)
+        qty = np.asarray(quantities, dtype=np.float64)
+        today_num = (today - _EPOCH).days
+        age = today_num - days
+
+        count = np.bincount(gidx, minlength=groups)
+        total_qty = np.bincount(gidx, weights=qty, minlength=groups)
+
+        windows = {}
+        for window in (7, 28, 90):
+            mask = age <= window
+            windows[window] = (
+                np.bincount(gidx, weights=mask, minlength=groups),
+                np.bincount(gidx, weights=qty * mask, minlength=groups),
+                mask,
+            )
+
+        with np.errstate(divide="ignore", invalid="ignore"):
+            averages = {window: sums / counts for window, (counts, sums, _) in windows.items()}
+
+            # Two-pass sample variance over the 28-day window
+            counts_28, _, mask_28 = windows[28]
+            deviations = (qty - np.nan_to_num(averages[28])[gidx]) * mask_28
+            sq_dev = np.bincount(gidx, weights=deviations * deviations, minlength=groups)
+            variance_28 = sq_dev / (counts_28 - 1)
+
+            # Weekday histogram (Monday=0; 1970-01-01 was a Thursday)
+            weekday = (days + 3) % 7
+            cell = gidx * 7 + weekday
+            wd_counts = np.bincount(cell, weights=mask_28, minlength=groups * 7).reshape(groups, 7)
+            wd_sums = np.bincount(cell, weights=qty * mask_28, minlength=groups * 7).reshape(groups, 7)
+            wd_avg = wd_sums / wd_counts
+
+        # Order by (ingredient, date, original position) so group boundaries,
+        # first/last deliveries and distinct dates fall out of the sort.
+        order = np.lexsort((np.arange(len(gidx)), days, gidx))
+        sorted_g = gidx[order]
+        sorted_days = days[order]
+        starts = np.flatnonzero(np.r_[True, sorted_g[1:] != sorted_g[:-1]])
+        ends = np.r_[starts[1:], len(sorted_g)] - 1
+        first_day = sorted_days[starts]
+        last_day = sorted_days[ends]
+        last_row = order[ends]
+
+        new_date = np.r_[True, (sorted_g[1:] != sorted_g[:-1]) | (sorted_days[1:] != sorted_days[:-1])]
+        distinct_dates = np.bincount(sorted_g, weights=new_date, minlength=groups).astype(np.int64)
+
+        # Plain Python lists for the per-ingredient assembly below
+        avg = {window: averages[window].tolist() for window in windows}
+        support = {window: windows[window][0].tolist() for window in windows}
+        sums = {window: windows[window][1].tolist() for window in windows}
+        variance_list = variance_28.tolist()
+        count_list = count.tolist()
+        total_list = total_qty.tolist()
+        distinct_list = distinct_dates.tolist()
+        qty_list = quantities
+        wd_count_list = wd_counts.tolist()
+        wd_avg_list = wd_avg.tolist()
+
+        results: Dict[str, Dict] = {}
+        for group, first, last, row in zip(
+            sorted_g[starts].tolist(),
+            first_day.tolist(),
+            last_day.tolist(),
+            last_row.tolist(),
+        ):
+            last_delivery = _EPOCH + timedelta(days=last)
+            metrics = {
+                "avg_7d": self._value(avg[7][group], support[7][group]),
+                "avg_28d": self._value(avg[28][group], support[28][group]),
+                "avg_90d": self._value(avg[90][group], support[90][group]),
+                "variance_28d": self._value(variance_list[group], support[28][group] - 1),
+                "seasonality": self._seasonality(wd_count_list[group], wd_avg_list[group]),
+                "last_delivery": last_delivery,
+            }
+
+            usage = None
+            n = count_list[group]
+            if n >= 2:
+                usage = self._usage(
+                    n=n,
+                    total_quantity=total_list[group],
+                    first_day=first,
+                    last_day=last,
+                    distinct_dates=distinct_list[group],
+                    orders_28=int(support[28][group]),
+                    orders_90=int(support[90][group]),
+                    total_28=sums[28][group],
+                    total_90=sums[90][group],
+                    last_delivery=last_delivery,
+                    last_fact=row_refs[row],
+                    last_quantity=qty_list[row],
+                )
+
+            results[keys[group]] = {"slug": slugs[group], "metrics": metrics, "usage": usage}
+        return results
+
+    # ------------------------------------------------------------------#
+    # Helpers
+    # ------------------------------------------------------------------#
+    @staticmethod
+    def _value(value: float, support: float) -> Optional[float]:
+        if support <= 0 or not math.isfinite(value):
+            return None
+        return float(value)
+
+    @staticmethod
+    def _seasonality(counts: List[float], averages: List[float]) -> Optional[Dict[str, float]]:
+        seasonality = {
+            str(weekday): averages[weekday]
+            for weekday in range(7)
+            if counts[weekday] > 0
+        }
+        return seasonality or None
+
+    @staticmethod
+    def _usage(
+        *,
+        n: int,
+        total_quantity: float,
+        first_day: int,
+        last_day: int,
+        distinct_dates: int,
+        orders_28: int,
+        orders_90: int,
+        total_28: float,
+        total_90: float,
+        last_delivery: date,
+        last_fact: Dict,
+        last_quantity: float,
+    ) -> Dict:
+        span_days = max(last_day - first_day, 1)
+        weeks_span = span_days / 7
+
+        weekly_usage = (
+            (total_28 / 4 if orders_28 else None)
+            or (total_90 / 13 if orders_90 else None)
+            or total_quantity / weeks_span
+        )
+
+        # Positive gaps between sorted deliveries sum to the full span
+        reorder_interval = (last_day - first_day) / (distinct_dates - 1) if distinct_dates > 1 else None
+
+        if orders_28:
+            deliveries_per_week = orders_28 / 4
+        elif orders_90:
+            deliveries_per_week = orders_90 / 13
+        else:
+            deliveries_per_week = n / weeks_span
+
+        if reorder_interval and reorder_interval > 0:
+            deliveries_per_week = 7 / reorder_interval
+
+        if deliveries_per_week and deliveries_per_week > 0 and weekly_usage is not None:
+            units_per_delivery = weekly_usage / deliveries_per_week
+        else:
+            units_per_delivery = total_quantity / n
+
+        return {
+            "weekly_usage": weekly_usage,
+            "reorder_interval": reorder_interval,
+            "deliveries_per_week": deliveries_per_week,
+            "units_per_delivery": units_per_delivery,
+            "last_delivery": last_delivery,
+            "last_invoice_item_id": last_fact.get("invoice_item_id"),
+            "pack_units_per_case": last_quantity if last_quantity else None,
+            "pack_label": last_fact.get("pack_description") or (last_fact.get("base_unit") or "case"),
+            "orders_last_28d": orders_28,
+            "orders_last_90d": orders_90,
+            "total_quantity_28d": total_28 if orders_28 else None,
+            "total_quantity_90d": total_90 if orders_90 else None,
+        }
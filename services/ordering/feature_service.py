@@ -14,6 +14,12 @@ from typing import Dict, Iterable, List, Optional, Tuple
 
 from database.supabase_client import get_supabase_service_client
 
+try:
+    from services.ordering.feature_calculator import FeatureCalculator
+    HAS_NUMPY = True
+except ImportError:
+    HAS_NUMPY = False
+
 logger = logging.getLogger(__name__)
 
 
@@ -22,8 +28,9 @@ class OrderingFeatureService:
 
     LOOKBACK_DAYS = 180
 
-    def __init__(self, *, user_id: str) -> None:
+    def __init__(self, *, user_id: str, use_columnar: bool = True) -> None:
         self.user_id = user_id
+        self.use_columnar = use_columnar
         self.client = get_supabase_service_client()
 
     def refresh_features(
@@ -39,24 +46,19 @@ class OrderingFeatureService:
             logger.info("[Ordering] No inventory facts available for feature refresh (user=%s)", self.user_id)
             return
 
-        grouped = self._group_facts_by_item(facts)
         today = date.today()
         feature_rows = []
         usage_rows = []
 
-        for ingredient_id, group in grouped.items():
-            entries = group["entries"]
-            if not entries:
-                continue
-
-            metrics = self._calculate_metrics(entries, today)
-            if metrics is None:
-                continue
+        for ingredient_id, computed in self.compute_features(facts, today).items():
+            metrics = computed["metrics"]
+            usage = computed["usage"]
+            slug = computed["slug"]
 
             feature_rows.append(
                 {
                     "user_id": self.user_id,
-                    "normalized_item_id": group["slug"],
+                    "normalized_item_id": slug,
                     "normalized_ingredient_id": ingredient_id,
                     "feature_date": today.isoformat(),
                     "avg_quantity_7d": metrics["avg_7d"],
@@ -71,12 +73,11 @@ class OrderingFeatureService:
                 }
             )
 
-            usage = self._calculate_usage(entries, today)
             if usage:
                 usage_rows.append(
                     {
                         "user_id": self.user_id,
-                        "normalized_item_id": group["slug"],
+                        "normalized_item_id": slug,
                         "normalized_ingredient_id": ingredient_id,  # Always set for FK integrity
                         "average_weekly_usage": usage["weekly_usage"],
                         "average_reorder_interval_days": usage["reorder_interval"],
@@ -117,6 +118,35 @@ class OrderingFeatureService:
         except Exception as exc:  # pylint: disable=broad-except
             logger.exception("[Ordering] Failed to upsert inventory_item_features for user=%s: %s", self.user_id, exc)
 
+    def compute_features(self, facts: List[Dict], today: date) -> Dict[str, Dict]:
+        """
+        Compute ``{ingredient_id: {"slug", "metrics", "usage"}}`` for the facts.
+
+        Uses the columnar FeatureCalculator; ``use_columnar=False`` (or a
+        missing numpy) falls back to the per-item reference implementation.
+        """
+        if self.use_columnar and HAS_NUMPY:
+            return FeatureCalculator().calculate(facts, today)
+        return self.compute_features_per_item(facts, today)
+
+    @classmethod
+    def compute_features_per_item(cls, facts: List[Dict], today: date) -> Dict[str, Dict]:
+        """Reference implementation looping over each ingredient's entries."""
+        results: Dict[str, Dict] = {}
+        for ingredient_id, group in cls._group_facts_by_item(facts).items():
+            entries = group["entries"]
+            if not entries:
+                continue
+            metrics = cls._calculate_metrics(entries, today)
+            if metrics is None:
+                continue
+            results[ingredient_id] = {
+                "slug": group["slug"],
+                "metrics": metrics,
+                "usage": cls._calculate_usage(entries, today),
+            }
+        return results
+
     # ---------------------------------------------------------------------#
     # Internal helpers
     # ---------------------------------------------------------------------#
@@ -87,10 +87,14 @@ class OrderingForecastService:
         user_id: str,
         normalized_item_ids: Optional[Iterable[str]] = None,
     ) -> None:
-        """Generate forecasts for all qualifying items."""
+        """
+        Generate forecasts for all qualifying items, or only the supplied
+        items (ingredient UUIDs or slugs) when ``normalized_item_ids`` is set.
+        """
+        scope = list(normalized_item_ids) if normalized_item_ids else None
         buffer = self.get_user_buffer(user_id)
         vendor_patterns = self._get_vendor_patterns(user_id)
-        item_usage = self.usage_calc.calculate(user_id, normalized_item_ids)
+        item_usage = self.usage_calc.calculate(user_id, scope)
 
         if not item_usage:
             logger.info(f"[Ordering] No items with sufficient history for user={user_id}")
@@ -131,7 +135,7 @@ class OrderingForecastService:
                     forecast_qty, confidence, explanation, buffer
                 ))
 
-        self._save_forecasts(user_id, payload, today)
+        self._save_forecasts(user_id, payload, today, scope)
 
     def _get_vendor_patterns(self, user_id: str) -> Dict[str, Dict]:
         """Get vendor delivery patterns as lookup."""
@@ -191,8 +195,14 @@ class OrderingForecastService:
             "updated_at": datetime.utcnow().isoformat(),
         }
 
-    def _save_forecasts(self, user_id: str, payload: List[Dict], today: date) -> None:
-        """Save forecasts to database."""
+    def _save_forecasts(
+        self,
+        user_id: str,
+        payload: List[Dict],
+        today: date,
+        scope: Optional[List[str]] = None,
+    ) -> None:
+        """Save forecasts to database, replacing only the scoped items when set."""
         if not payload:
             logger.info(f"[Ordering] No forecasts generated for user={user_id}")
             return
@@ -201,7 +211,19 @@ class OrderingForecastService:
             # Clean old forecasts
             stale = (today - timedelta(days=30)).isoformat()
             self.client.table("inventory_item_forecasts").delete().eq("user_id", user_id).lt("forecast_date", stale).execute()
-            self.client.table("inventory_item_forecasts").delete().eq("user_id", user_id).gte("forecast_date", today.isoformat()).execute()
+            upcoming = (
+                self.client.table("inventory_item_forecasts")
+                .delete()
+                .eq("user_id", user_id)
+                .gte("forecast_date", today.isoformat())
+            )
+            if scope:
+                uuid_ids = [i for i in scope if UsageCalculator._is_uuid(i)]
+                if uuid_ids:
+                    upcoming = upcoming.in_("normalized_ingredient_id", uuid_ids)
+                else:
+                    upcoming = upcoming.in_("normalized_item_id", scope)
+            upcoming.execute()
 
             # Insert new
             self.client.table("inventory_item_forecasts").insert(payload).execute()
@@ -33,15 +33,26 @@ class OrderingNormalizationService:
     def normalize_invoice_items(
         self,
         invoice_item_ids: Optional[Iterable[str]] = None,
-    ) -> None:
+        *,
+        invoice_ids: Optional[Iterable[str]] = None,
+    ) -> Dict[str, List[str]]:
         """
-        Normalize the specified invoice items (or recent items when none are
-        provided) into the inventory_item_facts table.
+        Normalize the specified invoice items / invoices (or recent items when
+        neither is provided) into the inventory_item_facts table.
+
+        Returns the ingredients and vendors touched so downstream steps can
+        recompute only what changed.
         """
-        records = self._fetch_invoice_items(invoice_item_ids)
+        touched: Dict[str, List[str]] = {
+            "invoice_item_ids": [],
+            "normalized_ingredient_ids": [],
+            "normalized_item_ids": [],
+            "vendor_names": [],
+        }
+        records = self._fetch_invoice_items(invoice_item_ids, invoice_ids)
         if not records:
             logger.info("[Ordering] No invoice items found for normalization (user=%s)", self.user_id)
-            return
+            return touched
 
         facts_payload = []
         mappings_payload = []
@@ -74,7 +85,19 @@ class OrderingNormalizationService:
 
         if not facts_payload:
             logger.info("[Ordering] No valid normalization records produced (user=%s)", self.user_id)
-            return
+            return touched
+
+        touched["invoice_item_ids"] = [fact["invoice_item_id"] for fact in facts_payload]
+        touched["normalized_ingredient_ids"] = sorted({fact["normalized_ingredient_id"] for fact in facts_payload})
+        touched["normalized_item_ids"] = sorted({fact["normalized_item_id"] for fact in facts_payload})
+        touched["vendor_names"] = sorted(
+            {
+                ((record.get("invoices") or {}).get("vendor_name") or "").strip()
+                for record in records
+                if record["id"] in seen_invoice_item_ids
+            }
+            - {""}
+        )
 
         try:
             self.client.table("inventory_item_facts").upsert(
@@ -123,12 +146,15 @@ class OrderingNormalizationService:
             except Exception as exc:  # pylint: disable=broad-except
                 logger.exception("[Ordering] Failed to insert invoice_item_logs for user=%s: %s", self.user_id, exc)
 
+        return touched
+
     # ---------------------------------------------------------------------#
     # Internal helpers
     # ---------------------------------------------------------------------#
     def _fetch_invoice_items(
         self,
         invoice_item_ids: Optional[Iterable[str]],
+        invoice_ids: Optional[Iterable[str]] = None,
     ) -> list:
         """Fetch invoice items (with invoice header join) for normalization."""
         query = (
@@ -140,8 +166,17 @@ class OrderingNormalizationService:
             .eq("invoices.user_id", self.user_id)
         )
 
+        invoice_item_ids = list(invoice_item_ids or [])
+        invoice_ids = list(invoice_ids or [])
+        if invoice_item_ids and invoice_ids:
+            # Both scopes requested: fetch each and merge
+            by_item = self._fetch_invoice_items(invoice_item_ids)
+            by_invoice = self._fetch_invoice_items(None, invoice_ids)
+            return by_item + by_invoice
         if invoice_item_ids:
-            query = query.in_("id", list(invoice_item_ids))
+            query = query.in_("id", invoice_item_ids)
+        elif invoice_ids:
+            query = query.in_("invoice_id", invoice_ids)
         else:
             cutoff = (date.today() - timedelta(days=self.DEFAULT_LOOKBACK_DAYS)).isoformat()
             query = query.gte("invoices.invoice_date", cutoff)
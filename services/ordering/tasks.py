@@ -1,16 +1,19 @@
 """
 Background task helpers for predictive ordering.
 
-These functions currently execute synchronously inside the request/response
-cycle so we can deliver value without introducing a dedicated worker queue.
+These functions execute synchronously. After invoice saves they run on the
+background worker via ``services.job_queue`` (see ``services.background_tasks``),
+using the incremental pipeline over the user's dirty set.
 """
 from __future__ import annotations
 
 import logging
+from datetime import date
 from typing import Dict, Iterable, List, Optional
 
 from services.ordering.cache_service import OrderingCacheService
 from services.ordering.delivery_pattern_service import DeliveryPatternService
+from services.ordering.dirty_tracker import OrderingDirtyTracker
 from services.ordering.feature_service import OrderingFeatureService
 from services.ordering.forecast_service import OrderingForecastService
 from services.ordering.normalization_service import OrderingNormalizationService
@@ -21,12 +24,13 @@ logger = logging.getLogger(__name__)
 def enqueue_normalization_job(
     user_id: str,
     invoice_item_ids: Optional[Iterable[str]] = None,
+    invoice_ids: Optional[Iterable[str]] = None,
 ) -> Dict[str, object]:
     """Normalize invoice items into inventory_item_facts."""
     try:
         service = OrderingNormalizationService(user_id=user_id)
-        service.normalize_invoice_items(invoice_item_ids)
-        return {"status": "success", "user_id": user_id}
+        touched = service.normalize_invoice_items(invoice_item_ids, invoice_ids=invoice_ids)
+        return {"status": "success", "user_id": user_id, "touched": touched}
     except Exception as exc:  # pylint: disable=broad-except
         logger.exception("[Ordering] Normalization job failed for user=%s: %s", user_id, exc)
         return {"status": "error", "user_id": user_id, "error": str(exc)}
@@ -60,22 +64,28 @@ def enqueue_forecast_generation(
         return {"status": "error", "user_id": user_id, "error": str(exc)}
 
 
-def enqueue_delivery_pattern_detection(user_id: str) -> Dict[str, object]:
+def enqueue_delivery_pattern_detection(
+    user_id: str,
+    vendor_names: Optional[Iterable[str]] = None,
+) -> Dict[str, object]:
     """Refresh vendor delivery schedules so forecasts align with real delivery days."""
     try:
         service = DeliveryPatternService()
-        service.detect_and_save(user_id)
-        return {"status": "success", "user_id": user_id}
+        patterns = service.detect_and_save(user_id, vendor_names)
+        return {"status": "success", "user_id": user_id, "patterns": patterns}
     except Exception as exc:  # pylint: disable=broad-except
         logger.exception("[Ordering] Delivery pattern detection failed for user=%s: %s", user_id, exc)
         return {"status": "error", "user_id": user_id, "error": str(exc)}
 
 
-def warm_forecast_cache(user_id: str) -> Dict[str, object]:
-    """Warm Redis with the latest forecasts for the user."""
+def warm_forecast_cache(
+    user_id: str,
+    normalized_item_ids: Optional[Iterable[str]] = None,
+) -> Dict[str, object]:
+    """Warm Redis with the latest forecasts for the user (or the given slugs)."""
     try:
         forecast_service = OrderingForecastService()
-        forecasts = forecast_service.get_predictions(user_id)
+        forecasts = forecast_service.get_predictions(user_id, normalized_item_ids)
         cache_service = OrderingCacheService()
         cache_service.warm_forecasts(user_id, forecasts)
         return {"status": "success", "user_id": user_id, "forecasts_cached": len(forecasts)}
@@ -145,3 +155,144 @@ def run_full_ordering_pipeline(
     logger.info("[Ordering] Full pipeline completed for user=%s with status=%s", user_id, results["status"])
     return results
 
+
+
+def _pattern_weekdays(patterns: Optional[List[Dict]]) -> Dict[str, List[int]]:
+    return {
+        row.get("vendor_name"): sorted(row.get("delivery_weekdays") or [])
+        for row in patterns or []
+    }
+
+
+def _ingredients_forecast_for_vendors(user_id: str, vendor_names: Iterable[str]) -> List[str]:
+    """Ingredients whose current forecasts depend on the given vendors' schedules."""
+    vendors = [name for name in vendor_names if name]
+    if not vendors:
+        return []
+    forecast_service = OrderingForecastService()
+    result = (
+        forecast_service.client.table("inventory_item_forecasts")
+        .select("normalized_ingredient_id")
+        .eq("user_id", user_id)
+        .in_("vendor_name", vendors)
+        .gte("forecast_date", date.today().isoformat())
+        .execute()
+    )
+    return sorted({row["normalized_ingredient_id"] for row in result.data or [] if row.get("normalized_ingredient_id")})
+
+
+def run_incremental_ordering_pipeline(
+    user_id: str,
+    *,
+    invoice_ids: Optional[Iterable[str]] = None,
+    invoice_item_ids: Optional[Iterable[str]] = None,
+) -> Dict[str, object]:
+    """
+    Recompute ordering data only for what the given invoices touched.
+
+    The ingredients and vendors produced by normalization are propagated
+    through features, delivery patterns, forecasts and cache. Items of a
+    vendor whose delivery schedule changed are re-forecast too, since their
+    delivery dates depend on it. Cost scales with the invoices' line count
+    rather than the account's catalog size.
+    """
+    results: Dict[str, object] = {"user_id": user_id, "mode": "incremental", "steps": {}}
+
+    norm_result = enqueue_normalization_job(user_id, invoice_item_ids, invoice_ids)
+    results["steps"]["normalization"] = norm_result
+    if norm_result.get("status") == "error":
+        results["status"] = "error"
+        results["error"] = norm_result.get("error")
+        return results
+
+    touched = norm_result.get("touched") or {}
+    ingredient_ids: List[str] = list(touched.get("normalized_ingredient_ids") or [])
+    item_slugs: List[str] = list(touched.get("normalized_item_ids") or [])
+    vendor_names: List[str] = list(touched.get("vendor_names") or [])
+    results["touched"] = {
+        "ingredients": len(ingredient_ids),
+        "vendors": vendor_names,
+        # Ids let follow-up work (e.g. COGS refresh) reuse the same scope
+        "ingredient_ids": ingredient_ids,
+        "invoice_item_ids": list(touched.get("invoice_item_ids") or []),
+    }
+    if not ingredient_ids:
+        results["status"] = "success"
+        logger.info("[Ordering] Incremental pipeline: nothing touched for user=%s", user_id)
+        return results
+
+    feature_result = enqueue_feature_refresh(user_id, item_slugs)
+    results["steps"]["features"] = feature_result
+    if feature_result.get("status") == "error":
+        results["status"] = "partial_failure"
+
+    forecast_scope = set(ingredient_ids)
+    if vendor_names:
+        before = _pattern_weekdays(
+            [row for row in DeliveryPatternService().get_patterns(user_id) if row.get("vendor_name") in vendor_names]
+        )
+        pattern_result = enqueue_delivery_pattern_detection(user_id, vendor_names)
+        after = _pattern_weekdays(pattern_result.pop("patterns", None))
+        results["steps"]["patterns"] = pattern_result
+        if pattern_result.get("status") == "error":
+            results["status"] = "partial_failure"
+        else:
+            changed = [vendor for vendor in vendor_names if before.get(vendor) != after.get(vendor)]
+            if changed:
+                try:
+                    forecast_scope.update(_ingredients_forecast_for_vendors(user_id, changed))
+                except Exception as exc:  # pylint: disable=broad-except
+                    logger.warning("[Ordering] Could not expand forecast scope for user=%s: %s", user_id, exc)
+                results["touched"]["schedule_changed_vendors"] = changed
+
+    forecast_result = enqueue_forecast_generation(user_id, sorted(forecast_scope))
+    results["steps"]["forecasts"] = forecast_result
+    if forecast_result.get("status") == "error":
+        results["status"] = "partial_failure"
+    results["touched"]["forecasted_ingredients"] = len(forecast_scope)
+
+    # Forecast generation already warms the cache for the rows it writes.
+    if results.get("status") != "partial_failure":
+        results["status"] = "success"
+
+    logger.info(
+        "[Ordering] Incremental pipeline completed for user=%s (%d ingredients, %d vendors) status=%s",
+        user_id,
+        len(ingredient_ids),
+        len(vendor_names),
+        results["status"],
+    )
+    return results
+
+
+def mark_ordering_dirty(
+    user_id: str,
+    *,
+    invoice_ids: Iterable[str] = (),
+    invoice_item_ids: Iterable[str] = (),
+) -> None:
+    """Record invoices / items awaiting an incremental ordering recompute."""
+    OrderingDirtyTracker().mark(user_id, invoice_ids=invoice_ids, invoice_item_ids=invoice_item_ids)
+
+
+def process_dirty_ordering(user_id: str) -> Dict[str, object]:
+    """
+    Drain the user's dirty set and run the incremental pipeline over it.
+
+    Everything marked since the last run is handled in one pass. If any
+    stage fails the drained ids are marked dirty again so the job queue's
+    retry picks them up.
+    """
+    tracker = OrderingDirtyTracker()
+    dirty = tracker.drain(user_id)
+    if not dirty["invoice_ids"] and not dirty["invoice_item_ids"]:
+        return {"status": "success", "user_id": user_id, "mode": "incremental", "skipped": True}
+
+    result = run_incremental_ordering_pipeline(
+        user_id,
+        invoice_ids=dirty["invoice_ids"],
+        invoice_item_ids=dirty["invoice_item_ids"],
+    )
+    if result.get("status") in ("error", "partial_failure"):
+        tracker.mark(user_id, invoice_ids=dirty["invoice_ids"], invoice_item_ids=dirty["invoice_item_ids"])
+    return result
@@ -21,6 +21,7 @@ class UsageCalculator:
     MIN_ORDERS_REQUIRED = 2
     PRIMARY_WINDOW_DAYS = 28
     FALLBACK_WINDOW_DAYS = 60
+    RPC_PAGE_SIZE = 1000
 
     def __init__(self):
         self.client = get_supabase_service_client()
@@ -38,25 +39,71 @@ class UsageCalculator:
         cutoff_28d = (today - timedelta(days=self.PRIMARY_WINDOW_DAYS)).isoformat()
         cutoff_60d = (today - timedelta(days=self.FALLBACK_WINDOW_DAYS)).isoformat()
 
-        facts = self._fetch_facts(user_id, cutoff_60d, normalized_item_ids)
+        facts = self._fetch_enriched_facts(user_id, cutoff_60d, normalized_item_ids)
         if not facts:
             return {}
 
-        invoice_item_ids = list({f.get("invoice_item_id") for f in facts if f.get("invoice_item_id")})
-        vendor_map = self._get_vendor_map(user_id, invoice_item_ids)
-        name_map = self._get_name_map(invoice_item_ids)
-
-        # Group by item and enrich
+        # Group by item
         item_facts: Dict[str, List[Dict]] = defaultdict(list)
         for fact in facts:
             item_key = fact.get("normalized_ingredient_id") or fact.get("normalized_item_id")
             if item_key:
-                fact["vendor_name"] = vendor_map.get(fact.get("invoice_item_id"))
-                fact["item_name"] = name_map.get(fact.get("invoice_item_id"))
                 item_facts[item_key].append(fact)
 
         return self._compute_usage(item_facts, cutoff_28d)
 
+    def _fetch_enriched_facts(
+        self,
+        user_id: str,
+        cutoff: str,
+        normalized_item_ids: Optional[Iterable[str]],
+    ) -> List[Dict]:
+        """
+        Fetch facts in the window with vendor_name and item_name attached.
+
+        Uses the get_ordering_usage_facts RPC (one paginated read). Falls back
+        to the chunked invoice_items -> invoices lookups if the RPC fails.
+        """
+        params = {
+            "p_user_id": user_id,
+            "p_since": cutoff,
+            "p_ingredient_ids": None,
+            "p_item_slugs": None,
+            "p_limit": self.RPC_PAGE_SIZE,
+        }
+        if normalized_item_ids:
+            uuid_ids, slug_ids = self._split_ids(normalized_item_ids)
+            if uuid_ids:
+                params["p_ingredient_ids"] = uuid_ids
+            elif slug_ids:
+                params["p_item_slugs"] = slug_ids
+
+        try:
+            facts: List[Dict] = []
+            offset = 0
+            while True:
+                page = (
+                    self.client.rpc("get_ordering_usage_facts", {**params, "p_offset": offset})
+                    .execute()
+                    .data
+                    or []
+                )
+                facts.extend(page)
+                if len(page) < self.RPC_PAGE_SIZE:
+                    return facts
+                offset += self.RPC_PAGE_SIZE
+        except Exception as exc:  # pylint: disable=broad-except
+            logger.warning(f"[Ordering] Usage facts RPC failed, using chunked lookups: {exc}")
+
+        facts = self._fetch_facts(user_id, cutoff, normalized_item_ids)
+        invoice_item_ids = list({f.get("invoice_item_id") for f in facts if f.get("invoice_item_id")})
+        vendor_map = self._get_vendor_map(user_id, invoice_item_ids)
+        name_map = self._get_name_map(invoice_item_ids)
+        for fact in facts:
+            fact["vendor_name"] = vendor_map.get(fact.get("invoice_item_id"))
+            fact["item_name"] = name_map.get(fact.get("invoice_item_id"))
+        return facts
+
     def _fetch_facts(
         self,
         user_id: str,
@@ -73,9 +120,7 @@ class UsageCalculator:
         )
 
         if normalized_item_ids:
-            ids = list(normalized_item_ids)
-            uuid_ids = [i for i in ids if self._is_uuid(i)]
-            slug_ids = [i for i in ids if not self._is_uuid(i)]
+            uuid_ids, slug_ids = self._split_ids(normalized_item_ids)
             if uuid_ids:
                 query = query.in_("normalized_ingredient_id", uuid_ids)
             elif slug_ids:
@@ -189,6 +234,15 @@ class UsageCalculator:
         except (TypeError, ValueError):
             return None
 
+    @classmethod
+    def _split_ids(cls, ids: Iterable[str]) -> Tuple[List[str], List[str]]:
+        """Split identifiers into ingredient UUIDs and item slugs."""
+        values = list(ids)
+        return (
+            [i for i in values if cls._is_uuid(i)],
+            [i for i in values if not cls._is_uuid(i)],
+        )
+
     @staticmethod
     def _is_uuid(value: str) -> bool:
         try:
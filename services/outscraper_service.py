@@ -11,25 +11,118 @@ OPTIMIZED VERSION:
 
 from outscraper import ApiClient
 import os
-from typing import List, Dict, Optional
+from typing import AsyncIterator, List, Dict, Optional, Tuple
 from datetime import datetime
-from dataclasses import dataclass
+from dataclasses import asdict, dataclass
 import logging
 import hashlib
-from concurrent.futures import ThreadPoolExecutor, as_completed
 import asyncio
 import time
 import ssl
+import weakref
+from urllib.parse import urlsplit
+import httpx
 import urllib3
-from urllib3.util.retry import Retry
-from requests.adapters import HTTPAdapter
-import requests
 
 # Import Redis cache
 from services.redis_client import cache, get_reviews_cache_key, get_competitors_cache_key
+from services.review_deduplicator import review_deduplicator
+from services.competitor_geo_cache import (
+    NearbyPlacesCache,
+    cached_geocode,
+    geocode_location,
+    normalize_category,
+    normalize_location,
+)
 
 logger = logging.getLogger(__name__)
 
+OUTSCRAPER_API_URL = "https://api.app.outscraper.com"
+# Upper bound on in-flight Outscraper requests per process, across all analyses
+OUTSCRAPER_MAX_CONCURRENCY = int(os.getenv("OUTSCRAPER_MAX_CONCURRENCY", "8"))
+# Request starts per second per host (replaces the fixed 0.5s/1s sleeps)
+OUTSCRAPER_RATE_PER_SECOND = float(os.getenv("OUTSCRAPER_RATE_PER_SECOND", "4"))
+OUTSCRAPER_HTTP_TIMEOUT = float(os.getenv("OUTSCRAPER_HTTP_TIMEOUT", "90"))
+
+# Competitor discovery: one shared search per area, filtered per user afterwards
+OUTSCRAPER_DISCOVERY_LIMIT = 20
+OUTSCRAPER_DISCOVERY_RADIUS_MILES = float(os.getenv("OUTSCRAPER_DISCOVERY_RADIUS_MILES", "10"))
+# Locations geocoded within this distance of a cached "near <location>" search reuse it
+OUTSCRAPER_SHARE_DISTANCE_MILES = 2.0
+
+# Strategic review segments: (strategy, sort, cutoff_rating, log label)
+REVIEW_SEGMENTS = (
+    ("recent", "newest", None, "Call 1 (recent)"),
+    ("five_star", "highest_rating", 5, "Call 2 (5-star)"),
+    ("low_rated", "lowest_rating", 2, "Call 3 (low-rated)"),
+)
+REVIEW_SEGMENT_LIMITS = {
+    "free": {"recent": 4, "five_star": 4, "low_rated": 4},
+    "premium": {"recent": 20, "five_star": 10, "low_rated": 10},
+}
+
+
+class _RetryableStatus(Exception):
+    """Outscraper answered 429/5xx; worth another attempt."""
+
+
+class HostRateLimiter:
+    """Spaces request starts to at most `rate_per_second` per host."""
+
+    def __init__(self, rate_per_second: float):
+        self.interval = 1.0 / rate_per_second if rate_per_second > 0 else 0.0
+        self._next_slot: Dict[str, float] = {}
+        self._lock = asyncio.Lock()
+
+    async def wait(self, host: str) -> None:
+        if not self.interval:
+            return
+        loop = asyncio.get_running_loop()
+        async with self._lock:
+            now = loop.time()
+            slot = max(now, self._next_slot.get(host, now))
+            self._next_slot[host] = slot + self.interval
+        if slot > now:
+            await asyncio.sleep(slot - now)
+
+
+@dataclass
+class _AsyncResources:
+    client: httpx.AsyncClient
+    semaphore: asyncio.Semaphore
+    limiter: HostRateLimiter
+
+
+# One connection pool / semaphore / limiter per event loop (i.e. per process
+# in the API server); asyncio primitives cannot be shared across loops.
+_loop_resources: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, _AsyncResources]" = weakref.WeakKeyDictionary()
+
+
+def _async_resources() -> _AsyncResources:
+    loop = asyncio.get_running_loop()
+    resources = _loop_resources.get(loop)
+    if resources is None:
+        resources = _AsyncResources(
+            client=httpx.AsyncClient(
+                timeout=httpx.Timeout(OUTSCRAPER_HTTP_TIMEOUT, connect=10.0),
+                limits=httpx.Limits(
+                    max_connections=OUTSCRAPER_MAX_CONCURRENCY,
+                    max_keepalive_connections=OUTSCRAPER_MAX_CONCURRENCY,
+                ),
+            ),
+            semaphore=asyncio.Semaphore(OUTSCRAPER_MAX_CONCURRENCY),
+            limiter=HostRateLimiter(OUTSCRAPER_RATE_PER_SECOND),
+        )
+        _loop_resources[loop] = resources
+    return resources
+
+
+async def close_async_resources() -> None:
+    """Close this loop's Outscraper connection pool (shutdown / asyncio.run)."""
+    resources = _loop_resources.pop(asyncio.get_running_loop(), None)
+    if resources:
+        await resources.client.aclose()
+
 @dataclass
 class CompetitorInfo:
     """Competitor information from Outscraper"""
@@ -66,6 +159,9 @@ class OutscraperService:
         
         self.client = ApiClient(api_key=self.api_key)
         self.timeout = timeout  # Default 30 seconds per API call
+        # Geocoding for the shared discovery cache (optional)
+        self.google_api_key = os.getenv("GOOGLE_PLACES_API_KEY")
+        self.nearby_cache = NearbyPlacesCache("outscraper")
         logger.info(f"Outscraper service initialized (timeout: {timeout}s)")
     
     def _configure_ssl_settings(self):
@@ -128,6 +224,28 @@ class OutscraperService:
             List of CompetitorInfo objects
         """
         
+        search_start = time.time()
+        places = self._search_competitor_places(location, category, limit=max_results + 5)
+        
+        # Filter out the user's restaurant
+        competitors = []
+        for competitor in places:
+            # Skip if it's the same restaurant
+            if self._is_same_restaurant(competitor.name, restaurant_name):
+                logger.info(f"Skipping user's restaurant: {competitor.name}")
+                continue
+            
+            competitors.append(competitor)
+            if len(competitors) >= max_results:
+                break
+        
+        total_time = time.time() - search_start
+        logger.info(f"🎯 Found {len(competitors)} competitors for {restaurant_name} in {total_time:.1f}s")
+        return competitors
+    
+    def _search_competitor_places(self, location: str, category: str, limit: int) -> List[CompetitorInfo]:
+        """Outscraper Maps search for '<category> restaurants near <location>', unfiltered"""
+        
         try:
             # Build search query
             query = f"{category} restaurants near {location}"
@@ -139,7 +257,7 @@ class OutscraperService:
             def make_search():
                 return self.client.google_maps_search(
                     query=[query],
-                    limit=max_results + 5,  # Get extra to filter out user's restaurant
+                    limit=limit,
                     language='en'
                 )
             
@@ -151,25 +269,8 @@ class OutscraperService:
                 logger.warning(f"No competitors found for: {query}")
                 return []
             
-            # Parse results
-            competitors = []
-            for place in results[0]:  # Results come as list of lists
-                # Skip if it's the same restaurant
-                place_name = place.get('name', '')
-                if self._is_same_restaurant(place_name, restaurant_name):
-                    logger.info(f"Skipping user's restaurant: {place_name}")
-                    continue
-                
-                competitor = self._parse_place_data(place)
-                if competitor:
-                    competitors.append(competitor)
-                
-                if len(competitors) >= max_results:
-                    break
-            
-            total_time = time.time() - search_start
-            logger.info(f"🎯 Found {len(competitors)} competitors for {restaurant_name} in {total_time:.1f}s")
-            return competitors
+            # Results come as list of lists
+            return [c for c in (self._parse_place_data(place) for place in results[0]) if c]
             
         except Exception as e:
             logger.error(f"Failed to find competitors: {e}")
@@ -299,163 +400,181 @@ class OutscraperService:
         tier: str = "premium"
     ) -> List[Dict]:
         """
-        Fetch reviews using 3 PARALLEL strategic API calls with TIMEOUT protection
-        
-        Strategy (all calls run simultaneously):
+        Blocking wrapper around fetch_reviews_strategic_async() for sync callers.
+        Must not be called from a running event loop.
+        """
+        return self._run_blocking(
+            self.fetch_reviews_strategic_async(place_id, competitor_name, language=language, tier=tier)
+        )
+
+    async def fetch_reviews_strategic_async(
+        self,
+        place_id: str,
+        competitor_name: str,
+        language: str = "en",
+        tier: str = "premium"
+    ) -> List[Dict]:
+        """
+        Fetch reviews using 3 concurrent strategic API calls
+
+        Strategy (all calls run concurrently):
         - FREE TIER: 4 recent + 4 five-star + 4 low-rated = 12 reviews
         - PREMIUM: 20 recent + 10 five-star + 10 low-rated = ~35-40 reviews
-        
-        OPTIMIZATIONS:
-        - 30-second timeout per call (vs 60+ seconds)
-        - Parallel execution with ThreadPoolExecutor
-        - Graceful failure handling (partial results OK)
-        
+
+        Calls share the process-wide httpx pool, concurrency semaphore and
+        per-host rate limiter, so concurrent analyses cannot multiply
+        connections or threads. Partial results are OK.
+
         Args:
             place_id: Google Place ID
             competitor_name: Name of competitor
             language: Language code
             tier: User tier (free/premium)
-            
+
         Returns:
             List of review dictionaries in standardized format
         """
-        
+
         start_time = time.time()
-        logger.info(f"🎯 Parallel strategic review collection for {competitor_name} (tier: {tier})")
-        
-        # Tier-based limits
-        if tier == "free":
-            recent_limit = 4
-            five_star_limit = 4
-            low_rated_limit = 4
-        else:  # premium/enterprise
-            recent_limit = 20
-            five_star_limit = 10
-            low_rated_limit = 10
-        
-        all_reviews = []
-        
-        # Define the 3 API calls with timeout protection
-        def call_recent():
-            call_start = time.time()
-            logger.info(f"  📞 Call 1 (recent): Starting for {competitor_name}")
-            
-            def make_call():
-                return self.client.google_maps_reviews(
-                    query=[place_id],
-                    reviews_limit=recent_limit,
-                    sort='newest',
-                    language=language,
-                    ignore_empty=True
-                )
-            
-            response = self._make_api_call_with_retry(make_call)
-            call_time = time.time() - call_start
-            
-            if response and len(response) > 0:
-                reviews = response[0].get('reviews_data', [])
-                processed = []
-                for review in reviews:
-                    p = self._process_review(review, place_id, competitor_name)
-                    if p:
-                        p['fetch_strategy'] = 'recent'
-                        processed.append(p)
-                logger.info(f"  ✅ Call 1 (recent): {len(processed)} reviews in {call_time:.1f}s")
-                return processed
-            else:
-                logger.warning(f"  ⚠️ Call 1 (recent): No response in {call_time:.1f}s")
-                return []
-        
-        def call_five_star():
-            # Rate limiting: 1 second delay before call 2
-            time.sleep(1.0)
-            call_start = time.time()
-            logger.info(f"  📞 Call 2 (5-star): Starting for {competitor_name}")
-            
-            def make_call():
-                return self.client.google_maps_reviews(
-                    query=[place_id],
-                    reviews_limit=five_star_limit,
-                    sort='highest_rating',
-                    cutoff_rating=5,
-                    language=language,
-                    ignore_empty=True
-                )
-            
-            response = self._make_api_call_with_retry(make_call)
-            call_time = time.time() - call_start
-            
-            if response and len(response) > 0:
-                reviews = response[0].get('reviews_data', [])
-                processed = []
-                for review in reviews:
-                    p = self._process_review(review, place_id, competitor_name)
-                    if p:
-                        p['fetch_strategy'] = 'five_star'
-                        processed.append(p)
-                logger.info(f"  ✅ Call 2 (5-star): {len(processed)} reviews in {call_time:.1f}s")
-                return processed
-            else:
-                logger.warning(f"  ⚠️ Call 2 (5-star): No response in {call_time:.1f}s")
-                return []
-        
-        def call_low_rated():
-            # Rate limiting: 1 second delay before call 3
-            time.sleep(1.0)
-            call_start = time.time()
-            logger.info(f"  📞 Call 3 (low-rated): Starting for {competitor_name}")
-            
-            def make_call():
-                return self.client.google_maps_reviews(
-                    query=[place_id],
-                    reviews_limit=low_rated_limit,
-                    sort='lowest_rating',
-                    cutoff_rating=2,
+        logger.info(f"🎯 Concurrent strategic review collection for {competitor_name} (tier: {tier})")
+
+        limits = REVIEW_SEGMENT_LIMITS["free" if tier == "free" else "premium"]
+        segments = await asyncio.gather(
+            *(
+                self._fetch_review_segment(
+                    place_id,
+                    competitor_name,
+                    strategy=strategy,
+                    label=label,
+                    reviews_limit=limits[strategy],
+                    sort=sort,
+                    cutoff_rating=cutoff_rating,
                     language=language,
-                    ignore_empty=True
                 )
-            
-            response = self._make_api_call_with_retry(make_call)
-            call_time = time.time() - call_start
-            
-            if response and len(response) > 0:
-                reviews = response[0].get('reviews_data', [])
-                processed = []
-                for review in reviews:
-                    p = self._process_review(review, place_id, competitor_name)
-                    if p:
-                        p['fetch_strategy'] = 'low_rated'
-                        processed.append(p)
-                logger.info(f"  ✅ Call 3 (low-rated): {len(processed)} reviews in {call_time:.1f}s")
-                return processed
-            else:
-                logger.warning(f"  ⚠️ Call 3 (low-rated): No response in {call_time:.1f}s")
-                return []
-        
-        # Execute all 3 calls in parallel (NO pool timeout, each call has its own timeout)
-        with ThreadPoolExecutor(max_workers=3) as executor:
-            futures = {
-                executor.submit(call_recent): "recent",
-                executor.submit(call_five_star): "five_star",
-                executor.submit(call_low_rated): "low_rated"
-            }
-            
-            # Collect results as they complete (no timeout here - let individual calls timeout)
-            for future in as_completed(futures):
-                call_type = futures[future]
-                try:
-                    reviews = future.result()  # Already handled timeout inside the call
-                    all_reviews.extend(reviews)
-                except Exception as e:
-                    logger.error(f"  ❌ {call_type} call failed: {e}")
-        
+                for strategy, sort, cutoff_rating, label in REVIEW_SEGMENTS
+            ),
+            return_exceptions=True,
+        )
+
+        all_reviews = []
+        for (strategy, _, _, _), segment in zip(REVIEW_SEGMENTS, segments):
+            if isinstance(segment, Exception):
+                logger.error(f"  ❌ {strategy} call failed: {segment}")
+                continue
+            all_reviews.extend(segment)
+
         # Deduplicate by review_id
         unique_reviews = self._deduplicate_reviews(all_reviews)
-        
+
         total_time = time.time() - start_time
-        logger.info(f"🎉 Parallel collection complete: {len(all_reviews)} total → {len(unique_reviews)} unique ({total_time:.1f}s)")
-        
+        logger.info(f"🎉 Concurrent collection complete: {len(all_reviews)} total → {len(unique_reviews)} unique ({total_time:.1f}s)")
+
         return unique_reviews
+
+    async def _fetch_review_segment(
+        self,
+        place_id: str,
+        competitor_name: str,
+        *,
+        strategy: str,
+        label: str,
+        reviews_limit: int,
+        sort: str,
+        cutoff_rating: Optional[int],
+        language: str,
+    ) -> List[Dict]:
+        """One strategic reviews-v3 call, processed into standardized reviews."""
+        call_start = time.time()
+        logger.info(f"  📞 {label}: Starting for {competitor_name}")
+
+        response = await self._reviews_request_async(
+            place_id,
+            reviews_limit=reviews_limit,
+            sort=sort,
+            cutoff_rating=cutoff_rating,
+            language=language,
+        )
+        call_time = time.time() - call_start
+
+        if not response:
+            logger.warning(f"  ⚠️ {label}: No response in {call_time:.1f}s")
+            return []
+
+        processed = []
+        for review in response[0].get('reviews_data', []) or []:
+            p = self._process_review(review, place_id, competitor_name)
+            if p:
+                p['fetch_strategy'] = strategy
+                processed.append(p)
+        logger.info(f"  ✅ {label}: {len(processed)} reviews in {call_time:.1f}s")
+        return processed
+
+    async def _reviews_request_async(
+        self,
+        place_id: str,
+        *,
+        reviews_limit: int,
+        sort: str,
+        cutoff_rating: Optional[int],
+        language: str,
+        max_retries: int = 3,
+        backoff_factor: float = 1.0,
+    ) -> List[Dict]:
+        """
+        GET /maps/reviews-v3 (synchronous mode) through the shared pool.
+        Same retry policy as _make_api_call_with_retry: connection errors
+        (and 429/5xx) back off and retry, anything else returns [].
+        """
+        resources = _async_resources()
+        url = f"{OUTSCRAPER_API_URL}/maps/reviews-v3"
+        host = urlsplit(url).netloc
+        params = {
+            'query': place_id,
+            'reviewsLimit': reviews_limit,
+            'limit': 1,
+            'sort': sort,
+            'cutoffRating': cutoff_rating,
+            'ignoreEmpty': True,
+            'language': language,
+            'async': False,
+        }
+        params = {key: value for key, value in params.items() if value is not None}
+        headers = {'X-API-KEY': self.api_key, 'client': 'Python SDK'}
+
+        for attempt in range(max_retries):
+            try:
+                async with resources.semaphore:
+                    await resources.limiter.wait(host)
+                    response = await resources.client.get(url, params=params, headers=headers)
+                if response.status_code == 429 or response.status_code >= 500:
+                    raise _RetryableStatus(f"Response status code: {response.status_code}")
+                if not 199 < response.status_code < 300:
+                    logger.error(f"Non-retryable error: Response status code: {response.status_code}")
+                    return []
+                return response.json().get('data', []) or []
+            except (httpx.TransportError, _RetryableStatus) as e:
+                if attempt < max_retries - 1:
+                    wait_time = backoff_factor * (2 ** attempt)
+                    logger.warning(f"SSL/Connection error (attempt {attempt + 1}/{max_retries}): {e}")
+                    logger.info(f"Retrying in {wait_time}s...")
+                    await asyncio.sleep(wait_time)
+                    continue
+                logger.error(f"All retry attempts failed: {e}")
+                return []
+            except Exception as e:
+                logger.error(f"Non-retryable error: {e}")
+                return []
+        return []
+
+    @staticmethod
+    def _run_blocking(coro):
+        """Run a coroutine to completion from sync code, closing its pool after."""
+        async def runner():
+            try:
+                return await coro
+            finally:
+                await close_async_resources()
+        return asyncio.run(runner())
     
     def fetch_reviews(
         self,
@@ -528,15 +647,39 @@ class OutscraperService:
         tier: str = "premium"
     ) -> Dict[str, any]:
         """
-        OPTIMIZED: Complete analysis with PARALLEL review fetching + SMART CACHING
-        
+        Blocking wrapper around analyze_competitors_async() for sync callers.
+        Must not be called from a running event loop.
+        """
+        return self._run_blocking(
+            self.analyze_competitors_async(
+                location=location,
+                restaurant_name=restaurant_name,
+                category=category,
+                max_competitors=max_competitors,
+                force_refresh=force_refresh,
+                excluded_place_ids=excluded_place_ids,
+                tier=tier,
+            )
+        )
+
+    async def analyze_competitors_async(
+        self,
+        location: str,
+        restaurant_name: str,
+        category: str = "restaurant",
+        max_competitors: int = 5,
+        force_refresh: bool = False,
+        excluded_place_ids: List[str] = None,
+        tier: str = "premium"
+    ) -> Dict[str, any]:
+        """
+        OPTIMIZED: Complete analysis with CONCURRENT review fetching + SMART CACHING
+
         Speed improvements:
         - Sequential: 5 competitors × 30s = 150 seconds (2.5 min)
-        - Parallel: Max(competitor times) = 30-45 seconds
+        - Concurrent: Max(competitor times) = 30-45 seconds
         - Cached reviews: 5-10 seconds (reviews cached for 7 days)
-        
-        That's a 3-15x speedup!
-        
+
         Args:
             location: Location string
             restaurant_name: User's restaurant name
@@ -544,15 +687,65 @@ class OutscraperService:
             max_competitors: Number of competitors to analyze
             force_refresh: Skip cache and fetch fresh data
             excluded_place_ids: List of place_ids to exclude (recently analyzed)
-            
+
         Returns:
             Dict with 'competitors' and 'reviews' keys
         """
-        
+
         start_time = time.time()
-        logger.info(f"🚀 Starting PARALLEL competitor analysis for {restaurant_name} in {location}")
-        
-        # Step 1: Find competitors (with caching and exclusions)
+        logger.info(f"🚀 Starting CONCURRENT competitor analysis for {restaurant_name} in {location}")
+
+        # Step 1: Find competitors (with caching and exclusions); one SDK call
+        competitors = await asyncio.to_thread(
+            self.discover_competitors,
+            location=location,
+            restaurant_name=restaurant_name,
+            category=category,
+            max_competitors=max_competitors,
+            force_refresh=force_refresh,
+            excluded_place_ids=excluded_place_ids,
+        )
+
+        if not competitors:
+            logger.warning("No competitors found")
+            return {'competitors': [], 'reviews': {}}
+
+        logger.info(f"Found {len(competitors)} competitors, fetching reviews concurrently...")
+
+        # Step 2: Fetch reviews for ALL competitors concurrently (with caching)
+        collected = {}
+        async for competitor, reviews in self.stream_competitor_reviews(
+            competitors, force_refresh=force_refresh, tier=tier
+        ):
+            collected[competitor.place_id] = reviews
+        # Keep discovery order for downstream consumers
+        all_reviews = {c.place_id: collected.get(c.place_id, []) for c in competitors}
+
+        total_reviews = sum(len(r) for r in all_reviews.values())
+        total_time = time.time() - start_time
+
+        logger.info(f"🎉 CONCURRENT analysis complete: {len(competitors)} competitors, {total_reviews} total reviews ({total_time:.1f}s)")
+
+        return {
+            'competitors': competitors,
+            'reviews': all_reviews,
+            'timing': {
+                'total_seconds': total_time,
+                'competitors_count': len(competitors),
+                'reviews_count': total_reviews
+            }
+        }
+
+    def discover_competitors(
+        self,
+        location: str,
+        restaurant_name: str,
+        category: str = "restaurant",
+        max_competitors: int = 5,
+        force_refresh: bool = False,
+        excluded_place_ids: List[str] = None,
+    ) -> List[CompetitorInfo]:
+        """Cached competitor discovery minus excluded place_ids, capped at max_competitors."""
         competitors = self._find_competitors_cached(
             location=location,
             restaurant_name=restaurant_name,
@@ -560,7 +753,7 @@ class OutscraperService:
             max_results=max_competitors + (len(excluded_place_ids) if excluded_place_ids else 0),
             force_refresh=force_refresh
         )
-        
+
         # Filter out excluded competitors
         if excluded_place_ids:
             excluded_set = set(excluded_place_ids)
@@ -571,68 +764,42 @@ class OutscraperService:
                 logger.info(f"🚫 Filtered out {excluded_count} recently analyzed competitors")
             # Limit to max_competitors after filtering
             competitors = competitors[:max_competitors]
-        
-        if not competitors:
-            logger.warning("No competitors found")
-            return {'competitors': [], 'reviews': {}}
-        
-        logger.info(f"Found {len(competitors)} competitors, fetching reviews in parallel...")
-        
-        # Step 2: Fetch reviews for ALL competitors in parallel (with caching)
-        all_reviews = {}
-        
-        def fetch_competitor_reviews(competitor):
-            """Fetch reviews for a single competitor (with cache)"""
+
+        return competitors
+
+    async def stream_competitor_reviews(
+        self,
+        competitors: List[CompetitorInfo],
+        force_refresh: bool = False,
+        tier: str = "premium"
+    ) -> AsyncIterator[Tuple[CompetitorInfo, List[Dict]]]:
+        """
+        Fetch every competitor's reviews concurrently and yield
+        (competitor, reviews) in completion order. A failed competitor yields [].
+        """
+
+        async def fetch_competitor_reviews(competitor: CompetitorInfo) -> Tuple[CompetitorInfo, List[Dict]]:
             try:
-                # Add small delay between competitors to reduce server load
-                time.sleep(0.5)
-                reviews = self._fetch_reviews_cached(
+                reviews = await self._fetch_reviews_cached(
                     place_id=competitor.place_id,
                     competitor_name=competitor.name,
                     force_refresh=force_refresh,
                     tier=tier
                 )
-                return competitor.place_id, reviews
             except Exception as e:
-                logger.error(f"Failed to fetch reviews for {competitor.name}: {e}")
-                return competitor.place_id, []
-        
-        # Execute all competitor fetches in parallel (NO pool timeout)
-        with ThreadPoolExecutor(max_workers=max_competitors) as executor:
-            futures = {
-                executor.submit(fetch_competitor_reviews, comp): comp.name
-                for comp in competitors
-            }
-            
-            # Collect results as they complete (no timeout - each competitor handles its own)
-            for future in as_completed(futures):
-                comp_name = futures[future]
-                try:
-                    place_id, reviews = future.result()
-                    all_reviews[place_id] = reviews
-                    logger.info(f"  ✅ {comp_name}: {len(reviews)} reviews")
-                except Exception as e:
-                    logger.error(f"  ❌ {comp_name} failed: {e}")
-                    # Still add empty reviews for this competitor
-                    for comp in competitors:
-                        if comp.name == comp_name:
-                            all_reviews[comp.place_id] = []
-                            break
-        
-        total_reviews = sum(len(r) for r in all_reviews.values())
-        total_time = time.time() - start_time
-        
-        logger.info(f"🎉 PARALLEL analysis complete: {len(competitors)} competitors, {total_reviews} total reviews ({total_time:.1f}s)")
-        
-        return {
-            'competitors': competitors,
-            'reviews': all_reviews,
-            'timing': {
-                'total_seconds': total_time,
-                'competitors_count': len(competitors),
-                'reviews_count': total_reviews
-            }
-        }
+                logger.error(f"  ❌ {competitor.name} failed: {e}")
+                reviews = []
+            logger.info(f"  ✅ {competitor.name}: {len(reviews)} reviews")
+            return competitor, reviews
+
+        tasks = [asyncio.ensure_future(fetch_competitor_reviews(comp)) for comp in competitors]
+        try:
+            for next_done in asyncio.as_completed(tasks):
+                yield await next_done
+        finally:
+            # Consumer stopped early (client disconnected)
+            for task in tasks:
+                task.cancel()
     
     def _parse_place_data(self, place: Dict) -> Optional[CompetitorInfo]:
         """Parse Outscraper place data into CompetitorInfo"""
@@ -782,17 +949,10 @@ class OutscraperService:
         return False
     
     def _deduplicate_reviews(self, reviews: List[Dict]) -> List[Dict]:
-        """Remove duplicate reviews by review_id"""
-        seen_ids = set()
-        unique_reviews = []
-        
-        for review in reviews:
-            review_id = review.get('review_id')
-            if review_id and review_id not in seen_ids:
-                seen_ids.add(review_id)
-                unique_reviews.append(review)
-        
-        return unique_reviews
+        """Remove duplicate reviews by review_id and near-duplicate text"""
+        return review_deduplicator.deduplicate_review_dicts(
+            [review for review in reviews if review.get('review_id')]
+        )
     
     # ============================================================================
     # CACHING METHODS (Smart Cache Strategy)
@@ -806,73 +966,88 @@ class OutscraperService:
         max_results: int,
         force_refresh: bool = False
     ) -> List[CompetitorInfo]:
-        """Find competitors with caching (24 hour TTL)"""
+        """
+        Find competitors through the shared discovery cache (24 hour TTL)
         
-        cache_start = time.time()
+        Results are cached unfiltered per area and category, keyed by the
+        geohash tile of the geocoded location, so different spellings of a
+        location and nearby restaurants share one search. The user's own
+        restaurant is filtered out after the cache. Without a geocode the
+        normalized location text is the key.
+        """
         
-        # Generate cache key
-        cache_key = get_competitors_cache_key(location, category)
+        cache_start = time.time()
+        coords = self._geocode_for_cache(location)
         
         # Try cache first (unless force refresh)
+        cached = None
         if not force_refresh:
-            cache_lookup_start = time.time()
-            cached = cache.get(cache_key)
-            cache_lookup_time = time.time() - cache_lookup_start
+            if coords:
+                cached = self.nearby_cache.get(
+                    coords[0], coords[1], OUTSCRAPER_DISCOVERY_RADIUS_MILES, category
+                )
+            else:
+                cached = cache.get(self._competitors_text_key(location, category))
             
-            if cached:
-                logger.info(f"✅ Competitors cache HIT: {location} (lookup: {cache_lookup_time:.3f}s)")
-                # Reconstruct CompetitorInfo objects
-                reconstruct_start = time.time()
-                result = [CompetitorInfo(**comp) for comp in cached[:max_results]]
-                reconstruct_time = time.time() - reconstruct_start
-                total_cache_time = time.time() - cache_start
-                logger.info(f"🏃 Cache reconstruction: {reconstruct_time:.3f}s, total: {total_cache_time:.3f}s")
-                return result
+            if cached is not None:
+                logger.info(f"✅ Competitors cache HIT: {location} ({time.time() - cache_start:.3f}s)")
             else:
-                logger.info(f"❌ Competitors cache MISS: {location} (lookup: {cache_lookup_time:.3f}s)")
+                logger.info(f"❌ Competitors cache MISS: {location}")
         
-        # Cache miss - fetch from API
-        api_start = time.time()
-        competitors = self.find_competitors(
-            location=location,
-            restaurant_name=restaurant_name,
-            category=category,
-            max_results=max_results
-        )
-        api_time = time.time() - api_start
-        logger.info(f"🌐 API competitor search: {api_time:.1f}s")
-        
-        # Cache for 24 hours
-        if competitors:
-            cache_store_start = time.time()
-            # Convert to dict for JSON serialization
-            competitors_dict = [
-                {
-                    'place_id': c.place_id,
-                    'name': c.name,
-                    'address': c.address,
-                    'latitude': c.latitude,
-                    'longitude': c.longitude,
-                    'rating': c.rating,
-                    'review_count': c.review_count,
-                    'price_level': c.price_level,
-                    'distance_miles': c.distance_miles,
-                    'phone': c.phone,
-                    'website': c.website,
-                    'business_status': c.business_status,
-                    'types': c.types
-                }
-                for c in competitors
-            ]
-            cache.set(cache_key, competitors_dict, ttl=86400)  # 24 hours
-            cache_store_time = time.time() - cache_store_start
-            logger.info(f"💾 Cache store: {cache_store_time:.3f}s")
+        if cached is None:
+            # Cache miss - one generous search serves every user in the area
+            api_start = time.time()
+            places = self._search_competitor_places(
+                location, category, limit=max(OUTSCRAPER_DISCOVERY_LIMIT, max_results + 5)
+            )
+            logger.info(f"🌐 API competitor search: {time.time() - api_start:.1f}s")
+            
+            cached = [asdict(c) for c in places]
+            if places:
+                if coords:
+                    self.nearby_cache.set(
+                        lat=coords[0],
+                        lng=coords[1],
+                        searched_radius_miles=OUTSCRAPER_DISCOVERY_RADIUS_MILES + OUTSCRAPER_SHARE_DISTANCE_MILES,
+                        bucket_radius_miles=OUTSCRAPER_DISCOVERY_RADIUS_MILES,
+                        category=category,
+                        places=cached
+                    )
+                    cached = NearbyPlacesCache.within_radius(
+                        cached, coords[0], coords[1], OUTSCRAPER_DISCOVERY_RADIUS_MILES
+                    )
+                else:
+                    cache.set(self._competitors_text_key(location, category), cached, ttl=86400)  # 24 hours
+        
+        competitors = []
+        for comp in cached:
+            if self._is_same_restaurant(comp.get('name', ''), restaurant_name):
+                logger.info(f"Skipping user's restaurant: {comp.get('name')}")
+                continue
+            competitors.append(CompetitorInfo(**comp))
+            if len(competitors) >= max_results:
+                break
         
         total_time = time.time() - cache_start
         logger.info(f"🎯 Total competitor discovery: {total_time:.1f}s")
         return competitors
     
-    def _fetch_reviews_cached(
+    def _geocode_for_cache(self, location: str) -> Optional[Tuple[float, float]]:
+        """Cached geocode of the location, or None when it cannot be geocoded"""
+        coords = cached_geocode(location)
+        if coords or not self.google_api_key or not cache.enabled:
+            return coords
+        try:
+            return geocode_location(location, self.google_api_key)
+        except Exception as e:
+            logger.warning(f"⚠️ Geocoding failed for {location}, caching by text: {e}")
+            return None
+    
+    @staticmethod
+    def _competitors_text_key(location: str, category: str) -> str:
+        return get_competitors_cache_key(normalize_location(location), normalize_category(category))
+    
+    async def _fetch_reviews_cached(
         self,
         place_id: str,
         competitor_name: str,
@@ -893,7 +1068,7 @@ class OutscraperService:
         
         # Cache miss - fetch from API
         logger.info(f"❌ Reviews cache MISS: {competitor_name} (tier: {tier})")
-        reviews = self.fetch_reviews_strategic(
+        reviews = await self.fetch_reviews_strategic_async(
             place_id=place_id,
             competitor_name=competitor_name,
             tier=tier
@@ -909,8 +1084,11 @@ class OutscraperService:
         """Invalidate cache for specific location or competitor"""
         if location:
             # Delete all competitor caches for this location
-            pattern = f"competitors:*{location.lower().replace(' ', '_')}*"
+            pattern = f"competitors:*{normalize_location(location).replace(' ', '_')}*"
             deleted = cache.delete_pattern(pattern)
+            coords = cached_geocode(location)
+            if coords:
+                deleted += self.nearby_cache.invalidate_around(*coords)
             logger.info(f"🗑️ Invalidated {deleted} competitor caches for {location}")
         
         if place_id:
@@ -10,14 +10,21 @@ import asyncio
 from typing import List, Dict, Optional
 from datetime import datetime
 import logging
+import hashlib
 from dotenv import load_dotenv
 
+from services.prompt_compaction import REVIEW_LINE_OVERHEAD_TOKENS, estimate_tokens, premium_tier_compactor
+
 load_dotenv()
 logger = logging.getLogger(__name__)
 
 class PremiumTierLLMService:
     """Premium LLM processing with strategic analysis"""
     
+    # Bump when review selection or prompt formatting changes (retires cached analyses)
+    PROMPT_VERSION = "premium-v1"
+    PROMPT_TEMPLATE_PATH = "prompts/premium_tier_llm_prompt.txt"
+    
     def __init__(self, api_key: Optional[str] = None):
         self.api_key = api_key or os.getenv("GOOGLE_GEMINI_API_KEY")
         if not self.api_key:
@@ -27,13 +34,13 @@ class PremiumTierLLMService:
             genai.configure(api_key=self.api_key)
             self.model = genai.GenerativeModel('gemini-2.0-flash-exp')
         
-        self.max_competitors = 5
-        self.max_reviews_per_competitor = 35  # Selected from 150
-        self.max_input_tokens = 3000  # Higher for premium
+        self.max_competitors = premium_tier_compactor.policy.max_competitors
+        self.max_reviews_per_competitor = premium_tier_compactor.policy.max_reviews_per_competitor
+        self.max_input_tokens = 10000  # Higher for premium
         self.max_output_tokens = 1500  # Higher for premium
         self.timeout_seconds = 45  # Longer timeout for premium
     
-    async def analyze_competitors_premium_tier(self, restaurant_name: str, restaurant_location: str, restaurant_category: str, competitors_data: Dict[str, List[Dict]]) -> Dict:
+    async def analyze_competitors_premium_tier(self, restaurant_name: str, restaurant_location: str, restaurant_category: str, competitors_data: Dict[str, List[Dict]], optimized_data: Optional[Dict] = None) -> Dict:
         """Process premium competitor data into strategic insights"""
         
         if not competitors_data:
@@ -47,7 +54,8 @@ class PremiumTierLLMService:
         
         try:
             # Premium strategic selection: 35 best from 150
-            optimized_data = self._premium_strategic_selection(competitors_data)
+            if optimized_data is None:
+                optimized_data = self._premium_strategic_selection(competitors_data)
             self._last_optimized_data = optimized_data  # Store for evidence
             
             # Call the LLM with premium prompt
@@ -65,91 +73,23 @@ class PremiumTierLLMService:
             logger.error(f"Premium tier LLM analysis failed for {restaurant_name}: {str(e)}")
             return self._get_fallback_analysis(restaurant_name, restaurant_category, competitors_data)
     
-    def _premium_strategic_selection(self, competitors_data: Dict[str, List[Dict]]) -> Dict[str, List[Dict]]:
-        """Premium strategic selection: Select best 35 from 150 reviews per competitor"""
-        optimized = {}
-        
-        for competitor_id, reviews in competitors_data.items():
-            if not reviews:
-                continue
-            
-            competitor_name = reviews[0].get('competitor_name', 'Unknown Competitor')
-            
-            # Filter quality reviews
-            quality_reviews = [r for r in reviews if len(r.get('text', '')) > 20 and r.get('rating') is not None]
-            if not quality_reviews:
-                continue
-            
-            # Apply recency boost to all reviews
-            quality_reviews = self._apply_recency_boost(quality_reviews)
-            
-            # Segment by rating for strategic analysis
-            negative_reviews = [r for r in quality_reviews if r.get('rating', 0) <= 2]
-            positive_reviews = [r for r in quality_reviews if r.get('rating', 0) == 5]
-            neutral_reviews = [r for r in quality_reviews if 3 <= r.get('rating', 0) <= 4]
-            
-            # Sort each segment by final_score (quality + recency)
-            negative_reviews.sort(key=lambda x: x.get('final_score', 0), reverse=True)
-            positive_reviews.sort(key=lambda x: x.get('final_score', 0), reverse=True)
-            neutral_reviews.sort(key=lambda x: x.get('final_score', 0), reverse=True)
-            
-            # Premium strategic selection: 15 negative, 15 positive, 5 neutral (35 total)
-            selected = []
-            selected_negative = negative_reviews[:15]  # Top 15 negative
-            selected_positive = positive_reviews[:15]  # Top 15 positive
-            selected_neutral = neutral_reviews[:5]     # Top 5 neutral
-            
-            selected.extend(selected_negative)
-            selected.extend(selected_positive)
-            selected.extend(selected_neutral)
-            
-            # If we don't have enough in a category, fill with best available
-            if len(selected) < 35:
-                remaining = [r for r in quality_reviews if r not in selected]
-                remaining.sort(key=lambda x: x.get('final_score', 0), reverse=True)
-                selected.extend(remaining[:35 - len(selected)])
-            
-            # Optimize for token cost and track evidence
-            optimized_reviews = []
-            evidence_reviews = {
-                'negative': [],
-                'positive': [],
-                'neutral': []
-            }
-            
-            for review in selected:
-                rating = review.get('rating', 0)
-                review_data = {
-                    'competitor_name': competitor_name,
-                    'rating': rating,
-                    'text': review.get('text', '')[:200],  # Longer text for premium
-                    'quality_score': review.get('quality_score', 0),
-                    'is_negative': rating <= 2,
-                    'is_positive': rating == 5,
-                    'full_text': review.get('text', ''),  # Keep full text for evidence
-                    'date': review.get('date', '')
-                }
-                optimized_reviews.append(review_data)
-                
-                # Categorize for evidence display
-                if rating <= 2:
-                    evidence_reviews['negative'].append(review_data)
-                elif rating == 5:
-                    evidence_reviews['positive'].append(review_data)
-                else:
-                    evidence_reviews['neutral'].append(review_data)
-            
-            optimized[competitor_id] = {
-                'reviews': optimized_reviews,
-                'evidence': evidence_reviews
-            }
-        
-        # Limit to max competitors
-        if len(optimized) > self.max_competitors:
-            sorted_competitors = sorted(optimized.items(), key=lambda x: len(x[1]['reviews']), reverse=True)
-            optimized = dict(sorted_competitors[:self.max_competitors])
-        
-        return optimized
+    def prepare_competitor_data(self, competitors_data: Dict[str, List[Dict]]) -> Dict:
+        """Review selection used for the prompt (also the analysis cache's content)"""
+        return self._premium_strategic_selection(competitors_data)
+    
+    def prompt_fingerprint(self) -> str:
+        """Hash of prompt version, template text and model; part of the analysis cache key"""
+        model_name = getattr(self.model, 'model_name', None) if self.model else None
+        material = f"{self.PROMPT_VERSION}|{model_name}|{self._load_prompt_template()}"
+        return hashlib.sha256(material.encode('utf-8')).hexdigest()[:16]
+    
+    def _premium_strategic_selection(self, competitors_data: Dict[str, List[Dict]]) -> Dict[str, Dict]:
+        """Premium strategic selection within the premium prompt budget"""
+        return premium_tier_compactor.compact(competitors_data, self._review_token_budget())
+    
+    def _review_token_budget(self) -> int:
+        """Input token budget left for reviews once the prompt template is counted"""
+        return self.max_input_tokens - estimate_tokens(self._load_prompt_template())
     
     def _extract_evidence_from_optimized(self, optimized_data: Dict) -> Dict:
         """Extract evidence reviews from optimized data for API response"""
@@ -166,52 +106,13 @@ class PremiumTierLLMService:
         
         return evidence_by_competitor
     
-    def _apply_recency_boost(self, reviews: List[Dict]) -> List[Dict]:
-        """Add recency boost to quality scores"""
-        from datetime import datetime, timedelta
-        
-        now = datetime.now()
-        
-        for review in reviews:
-            base_quality = review.get('quality_score', 0.5)
-            review_date = review.get('review_date')
-            
-            if not review_date:
-                review['final_score'] = base_quality
-                continue
-            
-            # Parse review_date if it's a string
-            if isinstance(review_date, str):
-                try:
-                    # Handle various date formats
-                    if 'T' in review_date:
-                        review_date = datetime.fromisoformat(review_date.replace('Z', '+00:00'))
-                    else:
-                        review_date = datetime.strptime(review_date, '%Y-%m-%d')
-                except:
-                    review['final_score'] = base_quality
-                    continue
-            
-            # Calculate days old
-            days_old = (now - review_date).days
-            
-            # Apply recency boost (higher for premium)
-            if days_old <= 30:
-                recency_boost = 0.4
-            elif days_old <= 90:
-                recency_boost = 0.3
-            elif days_old <= 180:
-                recency_boost = 0.2
-            else:
-                recency_boost = 0.0
-            
-            review['final_score'] = min(1.0, base_quality + recency_boost)
-        
-        return reviews
-
     def get_cost_estimate(self, competitor_count: int, avg_reviews_per_competitor: int) -> Dict[str, float]:
         """Estimate cost for premium tier analysis"""
-        estimated_input_tokens = min((competitor_count * avg_reviews_per_competitor * 50), self.max_input_tokens)
+        policy = premium_tier_compactor.policy
+        reviews_per_competitor = min(avg_reviews_per_competitor, policy.max_reviews_per_competitor)
+        review_tokens = min(competitor_count, policy.max_competitors) * reviews_per_competitor * (policy.max_review_tokens + REVIEW_LINE_OVERHEAD_TOKENS)
+        review_budget = self._review_token_budget()
+        estimated_input_tokens = (self.max_input_tokens - review_budget) + min(review_tokens, review_budget)
         estimated_output_tokens = self.max_output_tokens
         input_cost_per_1k = 0.000125
         output_cost_per_1k = 0.000375
@@ -337,7 +238,8 @@ class PremiumTierLLMService:
             prompt = self._build_premium_prompt(restaurant_name, restaurant_location, restaurant_category, optimized_data)
             
             logger.info(f"Calling Gemini API for premium analysis: {restaurant_name} with {len(optimized_data)} competitors")
-            logger.info(f"Premium prompt length: {len(prompt)} characters")
+            prompt_tokens = estimate_tokens(prompt)
+            logger.info(f"Premium prompt length: {len(prompt)} characters (~{prompt_tokens} tokens, budget {self.max_input_tokens})")
             
             # Call Gemini API with timeout
             start_time = time.time()
@@ -360,6 +262,7 @@ class PremiumTierLLMService:
             if parsed_response:
                 # Add metadata
                 parsed_response['analysis_summary']['processing_time_seconds'] = round(processing_time, 2)
+                parsed_response['analysis_summary']['estimated_input_tokens'] = prompt_tokens
                 parsed_response['filtering_metadata']['is_fallback'] = False
                 return parsed_response
             else:
@@ -377,13 +280,7 @@ class PremiumTierLLMService:
         """Build the premium prompt for the LLM"""
         
         # Load the premium prompt template
-        prompt_template_path = "prompts/premium_tier_llm_prompt.txt"
-        try:
-            with open(prompt_template_path, 'r', encoding='utf-8') as f:
-                prompt_template = f.read()
-        except FileNotFoundError:
-            logger.error(f"Premium prompt template not found at {prompt_template_path}")
-            prompt_template = self._get_default_premium_prompt_template()
+        prompt_template = self._load_prompt_template()
         
         # Format competitor data
         competitor_reviews_text = ""
@@ -409,6 +306,15 @@ class PremiumTierLLMService:
         
         return prompt
     
+    def _load_prompt_template(self) -> str:
+        """Prompt template from disk, or the built-in default"""
+        try:
+            with open(self.PROMPT_TEMPLATE_PATH, 'r', encoding='utf-8') as f:
+                return f.read()
+        except FileNotFoundError:
+            logger.error(f"Premium prompt template not found at {self.PROMPT_TEMPLATE_PATH}")
+            return self._get_default_premium_prompt_template()
+    
     def _get_default_premium_prompt_template(self) -> str:
         """Default premium prompt template if file not found"""
         return """# COMPETITIVE ANALYSIS - PREMIUM TIER
@@ -9,10 +9,23 @@ from decimal import Decimal
 from collections import defaultdict
 import statistics
 import logging
+import numpy as np
 from supabase import Client
 
+from services.price_anomaly_detector import PriceAnomalyDetector
+from services.price_trend_series import bucket_series, downsample_series
+from services.price_history_frame import (
+    PriceHistoryFrame,
+    get_price_frame,
+    group_bounds,
+    latest_rows,
+)
+
 logger = logging.getLogger(__name__)
 
+# Rows per search_invoice_items RPC call (PostgREST caps responses at 1000)
+SEARCH_PAGE_SIZE = 1000
+
 
 def normalize_item_name(description: str) -> str:
     """Normalize item description for grouping across invoices"""
@@ -98,11 +111,82 @@ class PriceAnalyticsService:
     """
     Price analytics that queries invoice_items directly
     No dependency on inventory_items or price_history tables
+
+    Window-wide analytics share a cached columnar PriceHistoryFrame per
+    (user, window), so warming several payloads costs a single fetch.
     """
     
     def __init__(self, supabase_client: Client):
         self.supabase = supabase_client
     
+    def search_invoice_items(
+        self,
+        user_id: str,
+        item_description: str,
+        *,
+        since: Optional[str] = None,
+        sort: str = "rank",
+        limit: Optional[int] = None
+    ) -> List[Dict]:
+        """
+        Invoice lines whose description contains the search term
+        
+        Uses the trigram-indexed search_invoice_items RPC (migration 054),
+        falling back to an ILIKE query if the function is unavailable.
+        
+        Args:
+            user_id: User ID
+            item_description: Search term (matched literally, case-insensitive)
+            since: Only invoices on/after this ISO date
+            sort: "rank" (best match first) or "recent" (newest first)
+            limit: Maximum rows (None for every match)
+            
+        Returns:
+            invoice_items rows with a nested "invoices" dict, plus "rank"
+        """
+        rows: List[Dict] = []
+        offset = 0
+        try:
+            while True:
+                page_size = SEARCH_PAGE_SIZE if limit is None else min(SEARCH_PAGE_SIZE, limit - len(rows))
+                page = self.supabase.rpc("search_invoice_items", {
+                    "p_user_id": user_id,
+                    "p_query": item_description,
+                    "p_since": since,
+                    "p_sort": sort,
+                    "p_limit": page_size,
+                    "p_offset": offset
+                }).execute().data or []
+                rows.extend(self._nest_search_row(row) for row in page)
+                if len(page) < page_size or (limit is not None and len(rows) >= limit):
+                    return rows
+                offset += page_size
+        except Exception as e:
+            logger.warning(f"Item search RPC failed, falling back to ILIKE: {e}")
+        
+        query = self.supabase.table("invoice_items").select(
+            "id, description, unit_price, quantity, extended_price, created_at, invoice_id, "
+            "invoices!inner(vendor_name, invoice_number, invoice_date, user_id)"
+        ).eq("invoices.user_id", user_id).ilike("description", f"%{item_description}%")
+        if since:
+            query = query.gte("invoices.invoice_date", since)
+        if sort == "recent":
+            query = query.order("created_at", desc=True)
+        if limit is not None:
+            query = query.limit(limit)
+        return query.execute().data or []
+    
+    @staticmethod
+    def _nest_search_row(row: Dict) -> Dict:
+        """Reshape a flat RPC row like a PostgREST invoices!inner join"""
+        invoice = {
+            "vendor_name": row.pop("vendor_name", None),
+            "invoice_number": row.pop("invoice_number", None),
+            "invoice_date": row.pop("invoice_date", None)
+        }
+        row["invoices"] = invoice
+        return row
+    
     def get_price_comparison(
         self,
         user_id: str,
@@ -122,15 +206,10 @@ class PriceAnalyticsService:
         """
         cutoff_date = (datetime.now() - timedelta(days=days_back)).date()
         
-        # Query invoice_items (source of truth)
-        result = self.supabase.table('invoice_items')\
-            .select('*, invoices!inner(vendor_name, invoice_date, user_id)')\
-            .ilike('description', f'%{item_description}%')\
-            .eq('invoices.user_id', user_id)\
-            .gte('invoices.invoice_date', cutoff_date.isoformat())\
-            .execute()
+        # Query invoice_items (source of truth) through the indexed search
+        matches = self.search_invoice_items(user_id, item_description, since=cutoff_date.isoformat())
         
-        if not result.data:
+        if not matches:
             return {
                 "item_description": item_description,
                 "vendors": [],
@@ -139,7 +218,7 @@ class PriceAnalyticsService:
         
         # Group by vendor with validation
         vendor_data = defaultdict(list)
-        for item in result.data:
+        for item in matches:
             try:
                 price = float(Decimal(str(item['unit_price'])))
                 quantity = float(Decimal(str(item['quantity'])))
@@ -187,7 +266,9 @@ class PriceAnalyticsService:
         self,
         user_id: str,
         item_description: str,
-        days: int = 90
+        days: int = 90,
+        bucket: Optional[str] = None,
+        max_points: Optional[int] = None
     ) -> List[Dict]:
         """
         Get price trend data for charting
@@ -196,31 +277,35 @@ class PriceAnalyticsService:
             user_id: User ID
             item_description: Item description
             days: Days of trend data
+            bucket: "day" or "week" for per-vendor min/avg/max buckets
+            max_points: Cap on returned points (LTTB downsampling per vendor)
             
         Returns:
             List of price data points
         """
         cutoff_date = (datetime.now() - timedelta(days=days)).date()
         
-        result = self.supabase.table('invoice_items')\
-            .select('unit_price, quantity, invoices!inner(vendor_name, invoice_date, user_id)')\
-            .ilike('description', f'%{item_description}%')\
-            .eq('invoices.user_id', user_id)\
-            .gte('invoices.invoice_date', cutoff_date.isoformat())\
-            .execute()
+        matches = self.search_invoice_items(user_id, item_description, since=cutoff_date.isoformat())
         
         # Sort in Python since we can't order by joined table column
-        result.data.sort(key=lambda x: x['invoices']['invoice_date'])
+        matches.sort(key=lambda x: x['invoices']['invoice_date'])
         
         trends = []
-        for item in result.data:
+        for item in matches:
+            if item.get('unit_price') is None:
+                continue
             trends.append({
                 "date": item['invoices']['invoice_date'],
                 "price": float(Decimal(str(item['unit_price']))),
                 "vendor_name": item['invoices']['vendor_name'],
-                "quantity": float(Decimal(str(item['quantity'])))
+                "quantity": float(Decimal(str(item.get('quantity') or 0)))
             })
         
+        if bucket:
+            trends = bucket_series(trends, bucket)
+        if max_points:
+            trends = downsample_series(trends, max_points)
+        
         return trends
     
     def find_savings_opportunities(
@@ -240,70 +325,64 @@ class PriceAnalyticsService:
         Returns:
             List of savings opportunities
         """
-        cutoff_date = (datetime.now() - timedelta(days=days_back)).date()
+        frame = get_price_frame(self.supabase, user_id, days_back).with_prices()
+        if not frame.size:
+            return []
         
-        result = self.supabase.table('invoice_items')\
-            .select('*, invoices!inner(vendor_name, invoice_date, user_id)')\
-            .eq('invoices.user_id', user_id)\
-            .gte('invoices.invoice_date', cutoff_date.isoformat())\
-            .execute()
-        
-        # Group by normalized item name
-        items_by_description = defaultdict(lambda: defaultdict(list))
-        for item in result.data:
-            normalized = normalize_item_name(item['description'])
-            vendor = item['invoices']['vendor_name']
-            items_by_description[normalized][vendor].append({
-                'price': float(Decimal(str(item['unit_price']))),
-                'date': item['invoices']['invoice_date'],
-                'description': item['description']
-            })
+        # One group per (item, vendor); first_row preserves vendor order
+        pair_codes = frame.item_codes * frame.vendor_count + frame.vendor_codes
+        _, pair_first_row, pair_of_row = np.unique(pair_codes, return_index=True, return_inverse=True)
+        pair_item = frame.item_codes[pair_first_row]
+        pair_vendor = frame.vendor_codes[pair_first_row]
+        
+        # Latest price per (item, vendor)
+        _, latest_pair_rows = latest_rows(pair_of_row, frame.days)
+        pair_latest_price = frame.prices[latest_pair_rows]
+        
+        vendors_per_item = np.bincount(pair_item, minlength=frame.item_count)
+        
+        # Most recent purchase per item decides the current vendor
+        rows = np.arange(frame.size)
+        order = np.lexsort((rows, pair_first_row[pair_of_row], -frame.days, frame.item_codes))
+        starts, _ = group_bounds(frame.item_codes[order])
+        recent_rows = order[starts]
+        
+        # Cheapest latest price per item (first vendor wins ties)
+        best_order = np.lexsort((pair_first_row, pair_latest_price, pair_item))
+        best_starts, _ = group_bounds(pair_item[best_order])
+        best_pairs = best_order[best_starts]
         
         opportunities = []
-        for item_name, vendors in items_by_description.items():
-            if len(vendors) < 2:
+        for recent_row, best_pair in zip(recent_rows.tolist(), best_pairs.tolist()):
+            item_code = frame.item_codes[recent_row]
+            if vendors_per_item[item_code] < 2:
+                continue
+            current_pair = pair_of_row[recent_row]
+            if current_pair == best_pair:
                 continue
             
-            # Get latest price per vendor
-            vendor_latest = {}
-            for vendor, purchases in vendors.items():
-                latest = max(purchases, key=lambda x: x['date'])
-                vendor_latest[vendor] = latest['price']
+            current_price = float(pair_latest_price[current_pair])
+            best_price = float(pair_latest_price[best_pair])
+            savings_amount = current_price - best_price
             
-            # Find most recent purchase overall
-            all_purchases = [p for v in vendors.values() for p in v]
-            most_recent = max(all_purchases, key=lambda x: x['date'])
-            current_vendor = None
-            for vendor, purchases in vendors.items():
-                if most_recent in purchases:
-                    current_vendor = vendor
-                    break
+            # Safe percent calculation
+            savings_percent = calculate_price_change(best_price, current_price)
             
-            current_price = vendor_latest[current_vendor]
-            best_price = min(vendor_latest.values())
-            best_vendor = [v for v, p in vendor_latest.items() if p == best_price][0]
+            if savings_percent is None:
+                logger.warning(f"Cannot calculate savings for {frame.descriptions[recent_row]}: invalid prices")
+                continue
             
-            if current_vendor != best_vendor:
-                savings_amount = current_price - best_price
-                
-                # Safe percent calculation
-                savings_percent = calculate_price_change(best_price, current_price)
-                
-                if savings_percent is None:
-                    logger.warning(f"Cannot calculate savings for {most_recent['description']}: invalid prices")
-                    continue
-                
-                # Use absolute value for comparison
-                if abs(savings_percent) >= min_savings_percent:
-                    opportunities.append({
-                        "item_description": most_recent['description'],
-                        "current_vendor": current_vendor,
-                        "current_price": current_price,
-                        "best_vendor": best_vendor,
-                        "best_price": best_price,
-                        "savings_amount": round(savings_amount, 2),
-                        "savings_percent": round(savings_percent, 2)
-                    })
+            # Use absolute value for comparison
+            if abs(savings_percent) >= min_savings_percent:
+                opportunities.append({
+                    "item_description": frame.descriptions[recent_row],
+                    "current_vendor": frame.vendor_names[pair_vendor[current_pair]],
+                    "current_price": current_price,
+                    "best_vendor": frame.vendor_names[pair_vendor[best_pair]],
+                    "best_price": best_price,
+                    "savings_amount": round(savings_amount, 2),
+                    "savings_percent": round(savings_percent, 2)
+                })
         
         opportunities.sort(key=lambda x: x['savings_amount'], reverse=True)
         return opportunities
@@ -325,35 +404,22 @@ class PriceAnalyticsService:
         Returns:
             Vendor performance data
         """
-        cutoff_date = (datetime.now() - timedelta(days=days_back)).date()
-        
-        result = self.supabase.table('invoice_items')\
-            .select('*, invoices!inner(vendor_name, invoice_date, user_id)')\
-            .eq('invoices.vendor_name', vendor_name)\
-            .eq('invoices.user_id', user_id)\
-            .gte('invoices.invoice_date', cutoff_date.isoformat())\
-            .execute()
-        
-        if not result.data:
+        frame = get_price_frame(self.supabase, user_id, days_back)
+        if vendor_name not in frame.vendor_names:
             return {
                 "vendor_name": vendor_name,
                 "error": "No data found"
             }
         
-        # Group by item
-        items = defaultdict(list)
-        for item in result.data:
-            normalized = normalize_item_name(item['description'])
-            items[normalized].append(Decimal(str(item['unit_price'])))
-        
-        all_prices = [p for prices in items.values() for p in prices]
+        vendor_rows = frame.select(frame.vendor_codes == frame.vendor_names.index(vendor_name))
+        prices = vendor_rows.prices[~np.isnan(vendor_rows.prices)]
         
         return {
             "vendor_name": vendor_name,
-            "total_items": len(items),
-            "total_purchases": len(result.data),
-            "avg_price": round(statistics.mean(all_prices), 2) if all_prices else 0,
-            "price_volatility": round(statistics.stdev(all_prices), 2) if len(all_prices) > 1 else 0,
+            "total_items": int(len(np.unique(vendor_rows.item_codes))),
+            "total_purchases": vendor_rows.size,
+            "avg_price": round(float(prices.mean()), 2) if len(prices) else 0,
+            "price_volatility": round(float(prices.std(ddof=1)), 2) if len(prices) > 1 else 0,
             "analysis_period_days": days_back
         }
     
@@ -361,7 +427,8 @@ class PriceAnalyticsService:
         self,
         user_id: str,
         days_back: int = 90,
-        min_change_percent: float = 20.0
+        min_change_percent: float = 20.0,
+        method: str = "mean"
     ) -> List[Dict]:
         """
         Detect unusual price changes
@@ -370,58 +437,39 @@ class PriceAnalyticsService:
             user_id: User ID
             days_back: Days of history
             min_change_percent: Minimum % change to flag
+            method: Baseline detector ("mean", "ewma" or "median_mad")
             
         Returns:
             List of price anomalies
         """
-        cutoff_date = (datetime.now() - timedelta(days=days_back)).date()
+        detector = PriceAnomalyDetector(method=method)
+        frame = get_price_frame(self.supabase, user_id, days_back).with_prices()
         
-        result = self.supabase.table('invoice_items')\
-            .select('*, invoices!inner(vendor_name, invoice_date, user_id)')\
-            .eq('invoices.user_id', user_id)\
-            .gte('invoices.invoice_date', cutoff_date.isoformat())\
-            .execute()
-        
-        # Group by item
-        items_by_description = defaultdict(list)
-        for item in result.data:
-            normalized = normalize_item_name(item['description'])
-            items_by_description[normalized].append({
-                'price': float(item['unit_price']),
-                'date': item['invoices']['invoice_date'],
-                'vendor': item['invoices']['vendor_name'],
-                'description': item['description']
-            })
+        # Purchases per item in date order (ties keep row order)
+        order = np.lexsort((np.arange(frame.size), frame.days, frame.item_codes))
+        starts, ends = group_bounds(frame.item_codes[order])
         
         anomalies = []
-        for item_name, purchases in items_by_description.items():
-            if len(purchases) < 3:
+        for start, end in zip(starts.tolist(), ends.tolist()):
+            if end - start < 3:
                 continue
             
-            purchases.sort(key=lambda x: x['date'])
+            purchases = order[start:end]
+            prices = frame.prices[purchases]
             
-            # Check each purchase against average of previous
-            for i in range(2, len(purchases)):
-                previous_prices = [p['price'] for p in purchases[:i]]
-                avg_price = statistics.mean(previous_prices)
-                current_price = purchases[i]['price']
-                
-                change = calculate_price_change(avg_price, current_price)
-                if change is None:
-                    continue  # Skip if can't calculate
-                
-                change_percent = abs(change)
-                
-                if change_percent >= min_change_percent:
-                    anomalies.append({
-                        "item_description": purchases[i]['description'],
-                        "vendor_name": purchases[i]['vendor'],
-                        "date": purchases[i]['date'],
-                        "current_price": current_price,
-                        "expected_price": round(avg_price, 2),
-                        "change_percent": round(change_percent, 2),
-                        "anomaly_type": "spike" if current_price > avg_price else "drop"
-                    })
+            # Check each purchase against the baseline of previous purchases
+            for position, expected_price, change_percent in detector.flag(prices, min_change_percent):
+                row = int(purchases[position])
+                current_price = float(prices[position])
+                anomalies.append({
+                    "item_description": frame.descriptions[row],
+                    "vendor_name": frame.vendor_names[frame.vendor_codes[row]],
+                    "date": frame.dates[row],
+                    "current_price": current_price,
+                    "expected_price": round(expected_price, 2),
+                    "change_percent": round(change_percent, 2),
+                    "anomaly_type": "spike" if current_price > expected_price else "drop"
+                })
         
         anomalies.sort(key=lambda x: x['change_percent'], reverse=True)
         return anomalies
@@ -441,15 +489,9 @@ class PriceAnalyticsService:
         Returns:
             Dashboard summary data
         """
-        cutoff_date = (datetime.now() - timedelta(days=days_back)).date()
-        
-        result = self.supabase.table('invoice_items')\
-            .select('*, invoices!inner(vendor_name, invoice_date, user_id)')\
-            .eq('invoices.user_id', user_id)\
-            .gte('invoices.invoice_date', cutoff_date.isoformat())\
-            .execute()
+        frame = get_price_frame(self.supabase, user_id, days_back)
         
-        if not result.data:
+        if not frame.size:
             return {
                 "unique_items_tracked": 0,
                 "active_vendors": 0,
@@ -458,16 +500,11 @@ class PriceAnalyticsService:
                 "analysis_period_days": days_back
             }
         
-        unique_items = len(set(normalize_item_name(item['description']) for item in result.data))
-        unique_vendors = len(set(item['invoices']['vendor_name'] for item in result.data))
-        total_purchases = len(result.data)
-        total_spend = float(sum(Decimal(str(item['extended_price'])) for item in result.data))
-        
         return {
-            "unique_items_tracked": unique_items,
-            "active_vendors": unique_vendors,
-            "total_purchases": total_purchases,
-            "total_spend": round(total_spend, 2),
+            "unique_items_tracked": frame.item_count,
+            "active_vendors": frame.vendor_count,
+            "total_purchases": frame.size,
+            "total_spend": round(float(frame.extended.sum()), 2),
             "analysis_period_days": days_back
         }
     
@@ -487,78 +524,79 @@ class PriceAnalyticsService:
         Returns:
             List of items with price data
         """
-        cutoff_date = (datetime.now() - timedelta(days=days_back)).date()
-        cutoff_7d = (datetime.now() - timedelta(days=7)).date()
-        cutoff_28d = (datetime.now() - timedelta(days=28)).date()
-        
-        result = self.supabase.table('invoice_items')\
-            .select('*, invoices!inner(vendor_name, invoice_date, user_id)')\
-            .eq('invoices.user_id', user_id)\
-            .gte('invoices.invoice_date', cutoff_date.isoformat())\
-            .execute()
-        
-        # Group by normalized name
-        items_data = defaultdict(list)
-        for item in result.data:
-            normalized = normalize_item_name(item['description'])
-            items_data[normalized].append({
-                'price': float(item['unit_price']),
-                'date': item['invoices']['invoice_date'],
-                'vendor': item['invoices']['vendor_name'],
-                'description': item['description']
-            })
+        frame = get_price_frame(self.supabase, user_id, days_back).with_prices()
+        if not frame.size:
+            return []
+        
+        groups = frame.item_count
+        cutoff_7d = PriceHistoryFrame.day_number((datetime.now() - timedelta(days=7)).date())
+        cutoff_28d = PriceHistoryFrame.day_number((datetime.now() - timedelta(days=28)).date())
+        codes = frame.item_codes
+        prices = frame.prices
+        
+        counts = np.bincount(codes, minlength=groups)
+        sums = np.bincount(codes, weights=prices, minlength=groups)
+        in_7d = frame.days >= cutoff_7d
+        in_28d = frame.days >= cutoff_28d
+        counts_7d = np.bincount(codes, weights=in_7d, minlength=groups)
+        sums_7d = np.bincount(codes, weights=prices * in_7d, minlength=groups)
+        counts_28d = np.bincount(codes, weights=in_28d, minlength=groups)
+        sums_28d = np.bincount(codes, weights=prices * in_28d, minlength=groups)
+        
+        by_item = np.argsort(codes, kind="stable")
+        starts, _ = group_bounds(codes[by_item])
+        group_codes = codes[by_item][starts]
+        mins = np.minimum.reduceat(prices[by_item], starts)
+        maxs = np.maximum.reduceat(prices[by_item], starts)
+        _, latest = latest_rows(codes, frame.days)
         
         items = []
-        for item_name, purchases in items_data.items():
-            latest = max(purchases, key=lambda x: x['date'])
-            prices = [p['price'] for p in purchases]
-            
-            # Calculate 7-day average
-            prices_7d = [p['price'] for p in purchases if p['date'] >= cutoff_7d.isoformat()]
-            avg_7d = round(statistics.mean(prices_7d), 2) if prices_7d else None
-            
-            # Calculate 28-day average
-            prices_28d = [p['price'] for p in purchases if p['date'] >= cutoff_28d.isoformat()]
-            avg_28d = round(statistics.mean(prices_28d), 2) if prices_28d else None
+        for code, latest_row, min_price, max_price in zip(
+            group_codes.tolist(), latest.tolist(), mins.tolist(), maxs.tolist()
+        ):
+            latest_price = float(prices[latest_row])
+            count_7d = int(counts_7d[code])
+            count_28d = int(counts_28d[code])
+            avg_7d = round(float(sums_7d[code] / count_7d), 2) if count_7d else None
+            avg_28d = round(float(sums_28d[code] / count_28d), 2) if count_28d else None
             
             # Calculate price change percentages safely
             price_change_7d = None
             if avg_7d:
-                change = calculate_price_change(avg_7d, latest['price'])
+                change = calculate_price_change(avg_7d, latest_price)
                 if change is not None:
                     price_change_7d = round(change, 1)
             
             price_change_28d = None
             if avg_28d:
-                change = calculate_price_change(avg_28d, latest['price'])
+                change = calculate_price_change(avg_28d, latest_price)
                 if change is not None:
                     price_change_28d = round(change, 1)
             
-            # Calculate 90-day average (all prices within the query window)
-            avg_90d = round(statistics.mean(prices), 2)
+            # 90-day average (all prices within the query window)
+            avg_90d = round(float(sums[code] / counts[code]), 2)
             
             items.append({
-                "description": latest['description'],
-                "last_paid_price": latest['price'],
-                "last_paid_date": latest['date'],
-                "last_paid_vendor": latest['vendor'],
+                "description": frame.descriptions[latest_row],
+                "last_paid_price": latest_price,
+                "last_paid_date": frame.dates[latest_row],
+                "last_paid_vendor": frame.vendor_names[frame.vendor_codes[latest_row]],
                 "avg_price_7day": avg_7d,
                 "avg_price_28day": avg_28d,
                 "avg_price_90day": avg_90d,
                 "avg_price_all": avg_90d,  # Keep for backwards compatibility
                 "price_change_7day_percent": price_change_7d,
                 "price_change_28day_percent": price_change_28d,
-                "min_price": min(prices),
-                "max_price": max(prices),
-                "purchase_count": len(purchases),
-                "purchases_last_7days": len(prices_7d),
-                "purchases_last_28days": len(prices_28d)
+                "min_price": min_price,
+                "max_price": max_price,
+                "purchase_count": int(counts[code]),
+                "purchases_last_7days": count_7d,
+                "purchases_last_28days": count_28d
             })
         
         items.sort(key=lambda x: x['last_paid_date'], reverse=True)
         return items
-
-
+    
     def get_item_purchase_history(self, user_id: str, item_description: str) -> List[Dict]:
         """
         Get all purchases for a specific item
@@ -571,16 +609,11 @@ class PriceAnalyticsService:
             List of purchase records with date, vendor, price, quantity, invoice
         """
         try:
-            # Query invoice_items for this user and item
-            result = self.supabase.table("invoice_items").select(
-                "id, description, unit_price, quantity, created_at, invoice_id, "
-                "invoices!inner(vendor_name, invoice_number, invoice_date, user_id)"
-            ).eq("invoices.user_id", user_id).ilike(
-                "description", f"%{item_description}%"
-            ).order("created_at", desc=True).limit(50).execute()
+            # Most recent matching purchases for this user and item
+            matches = self.search_invoice_items(user_id, item_description, sort="recent", limit=50)
             
             purchases = []
-            for item in result.data:
+            for item in matches:
                 invoice = item.get("invoices", {})
                 purchases.append({
                     "date": item.get("created_at") or invoice.get("invoice_date"),
@@ -0,0 +1,135 @@
+"""
+Price Anomaly Detector
+Single-pass baselines for flagging unusual purchase prices.
+
+Each purchase is compared against a baseline built only from the item's
+earlier purchases. Every detector is linear in the number of purchases:
+
+- ``mean``: running mean of all previous prices (the original behaviour)
+- ``ewma``: exponentially weighted moving average of previous prices
+- ``median_mad``: median of the last ``window`` prices, additionally
+  requiring a robust z-score (via the median absolute deviation)
+"""
+import os
+from dataclasses import dataclass
+from itertools import accumulate
+from typing import List, Tuple
+
+import numpy as np
+
+ANOMALY_METHODS = ("mean", "ewma", "median_mad")
+
+EWMA_ALPHA = float(os.getenv("PRICE_ANOMALY_EWMA_ALPHA", "0.3"))
+MEDIAN_WINDOW = int(os.getenv("PRICE_ANOMALY_MEDIAN_WINDOW", "8"))
+MAD_Z_THRESHOLD = float(os.getenv("PRICE_ANOMALY_MAD_Z", "3.5"))
+
+# Scales MAD to a standard-deviation estimate for normally distributed prices
+_MAD_SCALE = 1.4826
+
+# Purchases needed before the first one can be judged
+MIN_HISTORY = 2
+
+
+@dataclass
+class PriceAnomalyDetector:
+    """Compute baselines and flag anomalies for one item's price series."""
+
+    method: str = "mean"
+    alpha: float = EWMA_ALPHA
+    window: int = MEDIAN_WINDOW
+    z_threshold: float = MAD_Z_THRESHOLD
+
+    def __post_init__(self):
+        if self.method not in ANOMALY_METHODS:
+            raise ValueError(f"Unknown anomaly method '{self.method}' (expected one of {ANOMALY_METHODS})")
+
+    def expected_prices(self, prices: np.ndarray) -> np.ndarray:
+        """
+        Baseline for each purchase from earlier purchases only.
+
+        Positions with fewer than ``MIN_HISTORY`` earlier purchases are NaN.
+        """
+        n = len(prices)
+        expected = np.full(n, np.nan)
+        if n <= MIN_HISTORY:
+            return expected
+
+        if self.method == "mean":
+            expected[1:] = self._running_means(prices)[:-1]
+        elif self.method == "ewma":
+            level = float(prices[0])
+            for i in range(1, n):
+                expected[i] = level
+                level += self.alpha * (float(prices[i]) - level)
+        else:
+            expected[1:] = self._rolling_median(prices)[:-1]
+
+        expected[:MIN_HISTORY] = np.nan
+        return expected
+
+    def flag(self, prices: np.ndarray, min_change_percent: float) -> List[Tuple[int, float, float]]:
+        """
+        Return ``(position, expected_price, change_percent)`` for anomalies.
+
+        Change is measured like ``calculate_price_change``: purchases whose
+        baseline is zero or either price is negative are skipped.
+        """
+        expected = self.expected_prices(prices)
+        valid = np.isfinite(expected) & (expected > 0) & (prices >= 0)
+        if not valid.any():
+            return []
+
+        with np.errstate(divide="ignore", invalid="ignore"):
+            change = np.abs((prices - expected) / expected * 100)
+        flagged = valid & (change >= min_change_percent)
+
+        if self.method == "median_mad" and flagged.any():
+            flagged &= self._robust_z(prices) >= self.z_threshold
+
+        positions = np.flatnonzero(flagged)
+        return list(zip(positions.tolist(), expected[positions].tolist(), change[positions].tolist()))
+
+    # ------------------------------------------------------------------#
+    # Helpers
+    # ------------------------------------------------------------------#
+    @staticmethod
+    def _running_means(prices: np.ndarray) -> np.ndarray:
+        """
+        Mean of each prefix, correctly rounded like ``statistics.mean``.
+
+        Prices are scaled to integers over a shared power-of-two denominator
+        so the running sum is exact; int / int division rounds correctly.
+        """
+        ratios = [float(p).as_integer_ratio() for p in prices.tolist()]
+        shift = max(d.bit_length() - 1 for _, d in ratios)
+        scaled = [num << (shift - (den.bit_length() - 1)) for num, den in ratios]
+        return np.fromiter(
+            (total / (count << shift) for count, total in enumerate(accumulate(scaled), start=1)),
+            dtype=np.float64,
+            count=len(scaled),
+        )
+
+    def _windows(self, values: np.ndarray) -> np.ndarray:
+        """Trailing windows ending at each position (NaN-padded at the start)."""
+        width = max(1, self.window)
+        padded = np.concatenate([np.full(width - 1, np.nan), values])
+        return np.lib.stride_tricks.sliding_window_view(padded, width)
+
+    def _rolling_median(self, prices: np.ndarray) -> np.ndarray:
+        """Median of the trailing window ending at each position."""
+        return np.nanmedian(self._windows(prices), axis=1)
+
+    def _robust_z(self, prices: np.ndarray) -> np.ndarray:
+        """|price - baseline| / scaled MAD of the previous window."""
+        n = len(prices)
+        windows = self._windows(prices)
+        medians = np.nanmedian(windows, axis=1)
+        mad = np.nanmedian(np.abs(windows - medians[:, None]), axis=1) * _MAD_SCALE
+
+        # Score purchase i against the window that ends at i - 1
+        z = np.full(n, np.inf)
+        baseline = medians[:-1]
+        spread = mad[:-1]
+        with np.errstate(divide="ignore", invalid="ignore"):
+            z[1:] = np.where(spread > 0, np.abs(prices[1:] - baseline) / spread, np.inf)
+        return z
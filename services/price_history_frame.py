@@ -0,0 +1,237 @@
+"""
+Price History Frame
+Columnar (NumPy) view of a user's invoice line prices for a time window.
+
+Built once from a single projected invoice_items + invoices query and cached
+briefly per (user, window), so every PriceAnalyticsService method computes
+from the same arrays instead of re-fetching and re-normalizing rows.
+
+Frames live in process memory, so each one remembers the user's price
+generation from Redis. Invoice writes bump the generation, which retires the
+user's frames in every worker, not just the one that handled the write.
+"""
+import logging
+import os
+import threading
+import time
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+from supabase import Client
+
+from services.redis_client import cache
+
+logger = logging.getLogger(__name__)
+
+PRICE_FRAME_TTL_SECONDS = int(os.getenv("PRICE_FRAME_TTL_SECONDS", "60"))
+PRICE_FRAME_CACHE_MAX = int(os.getenv("PRICE_FRAME_CACHE_MAX", "256"))
+PRICE_FRAME_PAGE_SIZE = 1000
+PRICE_FRAME_GENERATION_TTL = 7 * 24 * 3600
+
+_frame_cache: Dict[Tuple[str, int, str], Tuple[float, Optional[int], "PriceHistoryFrame"]] = {}
+_frame_lock = threading.Lock()
+
+
+def _generation_key(user_id: str) -> str:
+    return f"prices:frame:gen:{user_id}"
+
+
+def _price_generation(user_id: str) -> Optional[int]:
+    if not cache.enabled:
+        return None
+    return cache.get(_generation_key(user_id))
+
+
+@dataclass
+class PriceHistoryFrame:
+    """
+    One row per invoice line, stored as parallel arrays.
+
+    ``item_codes`` / ``vendor_codes`` index into ``item_keys`` /
+    ``vendor_names`` (codes are assigned in first-appearance order).
+    ``days`` are day numbers since the epoch; ``dates`` keep the original
+    ISO strings for output. ``prices`` is NaN where unit_price was missing.
+    """
+    item_codes: np.ndarray
+    vendor_codes: np.ndarray
+    days: np.ndarray
+    prices: np.ndarray
+    extended: np.ndarray
+    item_keys: List[str]
+    vendor_names: List[Optional[str]]
+    descriptions: List[str]
+    dates: List[str]
+
+    @property
+    def size(self) -> int:
+        return len(self.item_codes)
+
+    @property
+    def item_count(self) -> int:
+        return len(self.item_keys)
+
+    @property
+    def vendor_count(self) -> int:
+        return len(self.vendor_names)
+
+    def select(self, mask: np.ndarray) -> "PriceHistoryFrame":
+        """Row subset sharing the same item / vendor code tables."""
+        rows = np.flatnonzero(mask)
+        return PriceHistoryFrame(
+            item_codes=self.item_codes[rows],
+            vendor_codes=self.vendor_codes[rows],
+            days=self.days[rows],
+            prices=self.prices[rows],
+            extended=self.extended[rows],
+            item_keys=self.item_keys,
+            vendor_names=self.vendor_names,
+            descriptions=[self.descriptions[i] for i in rows.tolist()],
+            dates=[self.dates[i] for i in rows.tolist()],
+        )
+
+    def with_prices(self) -> "PriceHistoryFrame":
+        """Rows that have a usable unit price."""
+        valid = ~np.isnan(self.prices)
+        return self if valid.all() else self.select(valid)
+
+    @staticmethod
+    def day_number(value) -> int:
+        """Day number (since epoch) of a date/datetime/ISO string."""
+        return int(np.datetime64(str(value)[:10], "D").astype(np.int64))
+
+
+def group_bounds(sorted_codes: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """Start/end (exclusive) positions of runs in an already-sorted code array."""
+    if not len(sorted_codes):
+        empty = np.zeros(0, dtype=np.int64)
+        return empty, empty
+    starts = np.flatnonzero(np.r_[True, sorted_codes[1:] != sorted_codes[:-1]])
+    ends = np.r_[starts[1:], len(sorted_codes)]
+    return starts, ends
+
+
+def latest_rows(codes: np.ndarray, days: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Most recent row per code (earliest row wins ties, like ``max()``).
+
+    Returns ``(group_codes, row_indices)`` sorted by code.
+    """
+    rows = np.arange(len(codes))
+    order = np.lexsort((rows, -days, codes))
+    starts, _ = group_bounds(codes[order])
+    first = order[starts]
+    return codes[first], first
+
+
+def build_price_frame(rows: List[Dict]) -> PriceHistoryFrame:
+    """Encode invoice_items rows (with joined ``invoices``) into a frame."""
+    # Imported here to avoid a circular import with price_analytics_service
+    from services.price_analytics_service import normalize_item_name
+
+    item_index: Dict[str, int] = {}
+    vendor_index: Dict[Optional[str], int] = {}
+    normalized_cache: Dict[str, str] = {}
+    item_codes: List[int] = []
+    vendor_codes: List[int] = []
+    prices: List[float] = []
+    extended: List[float] = []
+    descriptions: List[str] = []
+    dates: List[str] = []
+
+    for row in rows:
+        invoice = row.get("invoices") or {}
+        invoice_date = invoice.get("invoice_date")
+        if not invoice_date:
+            continue
+        description = row.get("description") or ""
+
+        key = normalized_cache.get(description)
+        if key is None:
+            key = normalized_cache[description] = normalize_item_name(description)
+        item_codes.append(item_index.setdefault(key, len(item_index)))
+
+        vendor = invoice.get("vendor_name")
+        vendor_codes.append(vendor_index.setdefault(vendor, len(vendor_index)))
+
+        price = row.get("unit_price")
+        prices.append(float(price) if price is not None else np.nan)
+        extended.append(float(row.get("extended_price") or 0))
+        descriptions.append(description)
+        dates.append(invoice_date)
+
+    return PriceHistoryFrame(
+        item_codes=np.asarray(item_codes, dtype=np.int64),
+        vendor_codes=np.asarray(vendor_codes, dtype=np.int64),
+        days=np.asarray([d[:10] for d in dates], dtype="datetime64[D]").astype(np.int64),
+        prices=np.asarray(prices, dtype=np.float64),
+        extended=np.asarray(extended, dtype=np.float64),
+        item_keys=list(item_index),
+        vendor_names=list(vendor_index),
+        descriptions=descriptions,
+        dates=dates,
+    )
+
+
+def _fetch_rows(supabase: Client, user_id: str, cutoff_date: str) -> List[Dict]:
+    """Single projected query, paged past PostgREST's row cap."""
+    rows: List[Dict] = []
+    offset = 0
+    while True:
+        page = (
+            supabase.table("invoice_items")
+            .select("description, unit_price, extended_price, invoices!inner(vendor_name, invoice_date, user_id)")
+            .eq("invoices.user_id", user_id)
+            .gte("invoices.invoice_date", cutoff_date)
+            .order("id")
+            .range(offset, offset + PRICE_FRAME_PAGE_SIZE - 1)
+            .execute()
+            .data
+            or []
+        )
+        rows.extend(page)
+        if len(page) < PRICE_FRAME_PAGE_SIZE:
+            return rows
+        offset += PRICE_FRAME_PAGE_SIZE
+
+
+def get_price_frame(supabase: Client, user_id: str, days_back: int) -> PriceHistoryFrame:
+    """Return the cached frame for (user, window), building it on a miss."""
+    cutoff_date = (datetime.now() - timedelta(days=days_back)).date().isoformat()
+    key = (user_id, days_back, cutoff_date)
+    now = time.monotonic()
+    # Read before building so a write racing the build retires this frame
+    generation = _price_generation(user_id)
+
+    with _frame_lock:
+        cached = _frame_cache.get(key)
+        if cached and now - cached[0] < PRICE_FRAME_TTL_SECONDS and cached[1] == generation:
+            return cached[2]
+
+    started = time.perf_counter()
+    frame = build_price_frame(_fetch_rows(supabase, user_id, cutoff_date))
+    logger.debug(
+        "Built price frame for user %s (%dd): %d rows, %d items in %.3fs",
+        user_id,
+        days_back,
+        frame.size,
+        frame.item_count,
+        time.perf_counter() - started,
+    )
+
+    with _frame_lock:
+        if len(_frame_cache) >= PRICE_FRAME_CACHE_MAX:
+            oldest = min(_frame_cache, key=lambda k: _frame_cache[k][0])
+            _frame_cache.pop(oldest, None)
+        _frame_cache[key] = (now, generation, frame)
+    return frame
+
+
+def invalidate_price_frames(user_id: str) -> None:
+    """Drop cached frames for a user in every worker (e.g. after a new invoice is saved)."""
+    with _frame_lock:
+        for key in [k for k in _frame_cache if k[0] == user_id]:
+            _frame_cache.pop(key, None)
+    if cache.enabled:
+        cache.set(_generation_key(user_id), time.time_ns(), ttl=PRICE_FRAME_GENERATION_TTL)
@@ -0,0 +1,154 @@
+"""
+Price Trend Series
+Chart-sized price trend series built in one vectorized pass.
+
+- ``bucket_series``: daily / weekly min, avg and max price per vendor
+- ``downsample_series``: Largest-Triangle-Three-Buckets (LTTB) per vendor,
+  capped at a requested number of points overall
+
+Both keep payload size bounded by the window (or the point cap) rather
+than by how many times an item was purchased.
+"""
+from datetime import date, timedelta
+from typing import Dict, List
+
+import numpy as np
+
+TREND_BUCKETS = ("day", "week")
+
+_EPOCH = date(1970, 1, 1)
+
+# LTTB needs the first and last point plus at least one bucket between
+_MIN_LTTB_POINTS = 3
+
+
+def _day_numbers(points: List[Dict]) -> np.ndarray:
+    return np.asarray([p["date"][:10] for p in points], dtype="datetime64[D]").astype(np.int64)
+
+
+def _vendor_codes(points: List[Dict]):
+    vendor_index: Dict = {}
+    codes = np.asarray(
+        [vendor_index.setdefault(p.get("vendor_name"), len(vendor_index)) for p in points],
+        dtype=np.int64,
+    )
+    return codes, list(vendor_index)
+
+
+def bucket_series(points: List[Dict], bucket: str = "day") -> List[Dict]:
+    """
+    Aggregate trend points into per-vendor day or week buckets.
+
+    Weeks start on Monday. Each bucket reports ``price`` (the average, so
+    existing chart code keeps working), ``min_price``, ``max_price``, total
+    ``quantity`` and ``purchase_count``; output is sorted by date then vendor.
+    """
+    if bucket not in TREND_BUCKETS:
+        raise ValueError(f"Unknown trend bucket '{bucket}' (expected one of {TREND_BUCKETS})")
+    if not points:
+        return []
+
+    days = _day_numbers(points)
+    if bucket == "week":
+        # 1970-01-01 was a Thursday (weekday 3)
+        days = days - (days + 3) % 7
+    vendors, vendor_names = _vendor_codes(points)
+    prices = np.asarray([p["price"] for p in points], dtype=np.float64)
+    quantities = np.asarray([p.get("quantity") or 0 for p in points], dtype=np.float64)
+
+    # Bucket key orders by (day, vendor) so np.unique yields output order
+    keys = (days - days.min()) * len(vendor_names) + vendors
+    unique_keys, first_index, inverse = np.unique(keys, return_index=True, return_inverse=True)
+    groups = len(unique_keys)
+
+    counts = np.bincount(inverse, minlength=groups)
+    averages = np.bincount(inverse, weights=prices, minlength=groups) / counts
+    totals = np.bincount(inverse, weights=quantities, minlength=groups)
+
+    order = np.argsort(inverse, kind="stable")
+    starts = np.r_[0, np.cumsum(counts)[:-1]]
+    mins = np.minimum.reduceat(prices[order], starts)
+    maxs = np.maximum.reduceat(prices[order], starts)
+
+    return [
+        {
+            "date": (_EPOCH + timedelta(days=int(day))).isoformat(),
+            "vendor_name": vendor_names[vendor],
+            "price": round(avg, 2),
+            "min_price": low,
+            "max_price": high,
+            "quantity": total,
+            "purchase_count": count,
+        }
+        for day, vendor, avg, low, high, total, count in zip(
+            days[first_index].tolist(),
+            vendors[first_index].tolist(),
+            averages.tolist(),
+            mins.tolist(),
+            maxs.tolist(),
+            totals.tolist(),
+            counts.tolist(),
+        )
+    ]
+
+
+def lttb_indices(x: np.ndarray, y: np.ndarray, threshold: int) -> np.ndarray:
+    """
+    Indices of the points LTTB keeps from an x-sorted series.
+
+    The first and last points are always kept; every bucket in between
+    keeps the point forming the largest triangle with the previously
+    kept point and the next bucket's average.
+    """
+    n = len(x)
+    if threshold >= n or threshold < _MIN_LTTB_POINTS:
+        return np.arange(n) if threshold >= n else np.array([0, n - 1])[: max(threshold, 0)]
+
+    edges = np.linspace(1, n - 1, threshold - 1).astype(np.int64)
+    kept = np.empty(threshold, dtype=np.int64)
+    kept[0] = 0
+    kept[-1] = n - 1
+    previous = 0
+    for i in range(threshold - 2):
+        start, end = edges[i], edges[i + 1]
+        next_start, next_end = edges[i + 1], (edges[i + 2] if i + 2 < len(edges) else n)
+        next_x = x[next_start:next_end].mean()
+        next_y = y[next_start:next_end].mean()
+
+        areas = np.abs(
+            (x[previous] - next_x) * (y[start:end] - y[previous])
+            - (x[previous] - x[start:end]) * (next_y - y[previous])
+        )
+        previous = start + int(areas.argmax())
+        kept[i + 1] = previous
+    return kept
+
+
+def downsample_series(points: List[Dict], max_points: int) -> List[Dict]:
+    """
+    Cap a date-sorted trend series at ``max_points`` using LTTB per vendor.
+
+    The point budget is split across vendors in proportion to how many
+    purchases each has (largest remainder), so every vendor line keeps its
+    overall shape and the total never exceeds ``max_points``.
+    """
+    if max_points <= 0 or len(points) <= max_points:
+        return points
+
+    days = _day_numbers(points).astype(np.float64)
+    prices = np.asarray([p["price"] for p in points], dtype=np.float64)
+    vendors, vendor_names = _vendor_codes(points)
+    counts = np.bincount(vendors, minlength=len(vendor_names))
+
+    shares = max_points * counts / len(points)
+    budgets = np.floor(shares).astype(np.int64)
+    leftover = max_points - int(budgets.sum())
+    budgets[np.argsort(budgets - shares, kind="stable")[:leftover]] += 1
+
+    selected: List[np.ndarray] = []
+    for vendor, budget in enumerate(budgets.tolist()):
+        rows = np.flatnonzero(vendors == vendor)
+        selected.append(rows[lttb_indices(days[rows], prices[rows], budget)])
+
+    keep = np.sort(np.concatenate(selected))
+    return [points[i] for i in keep.tolist()]
@@ -0,0 +1,328 @@
+"""
+Prompt compaction for tiered review analysis
+
+Shared by the free and premium LLM services. Given each competitor's
+reviews and a token budget for the review section of the prompt, it:
+
+1. Filters low-content reviews and near-duplicates.
+2. Scores every review once (quality + the tier's recency boost).
+3. Takes the top-k per sentiment segment (negative / positive / neutral)
+   with a heap, then fills unused slots with the best remaining reviews.
+4. Splits the budget across competitors and their selected reviews, and
+   packs each review's most informative sentences into its share instead of
+   cutting at a fixed character count. When the budget cannot give every
+   selected review its minimum share, the lowest-scored reviews (then the
+   smallest competitors) are dropped; the budget is never exceeded.
+
+The result keeps the services' optimized-data shape ({competitor_id:
+{'reviews': [...], 'evidence': {...}}}). Prompt entries carry only the
+packed text; the full text lives once, in the evidence entries. Token
+counts are estimates (about 4 characters per token), used to keep prompt
+size, latency and cost predictable before the call.
+"""
+import heapq
+import logging
+import math
+import re
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Dict, List, Optional, Tuple
+
+from services.review_deduplicator import review_deduplicator
+
+logger = logging.getLogger(__name__)
+
+CHARS_PER_TOKEN = 4
+# "- Rating: 5/5 - " per review line, "### Name" per competitor
+REVIEW_LINE_OVERHEAD_TOKENS = 5
+COMPETITOR_HEADER_OVERHEAD_TOKENS = 8
+MIN_REVIEW_TEXT_CHARS = 20
+# A review never gets fewer tokens than this when it is selected
+MIN_REVIEW_TOKENS = 12
+
+_SENTENCE_SPLIT = re.compile(r"(?<=[.!?])\s+|\n+")
+_WORD = re.compile(r"[a-z0-9']+")
+_STOPWORDS = frozenset(
+    "a an and are as at be but by for from had has have he her his i if in is it its "
+    "just me my no not of on or our so that the their them there they this to too "
+    "very was we were what when which who will with would you your".split()
+)
+
+
+def estimate_tokens(text: str) -> int:
+    """Rough token count for Gemini-style tokenizers."""
+    return math.ceil(len(text or "") / CHARS_PER_TOKEN)
+
+
+@dataclass(frozen=True)
+class CompactionPolicy:
+    """Per-tier selection limits; the token budget is passed per call."""
+    max_competitors: int
+    max_reviews_per_competitor: int
+    segment_quotas: Tuple[Tuple[str, int], ...]  # (segment, top-k) in prompt order
+    max_review_tokens: int
+    recency_boosts: Tuple[Tuple[int, float], ...]  # (max age in days, boost), youngest first
+
+
+FREE_TIER_POLICY = CompactionPolicy(
+    max_competitors=2,
+    max_reviews_per_competitor=10,
+    segment_quotas=(("negative", 4), ("positive", 4), ("neutral", 2)),
+    max_review_tokens=40,
+    recency_boosts=((30, 0.3), (90, 0.2), (180, 0.1)),
+)
+
+PREMIUM_TIER_POLICY = CompactionPolicy(
+    max_competitors=5,
+    max_reviews_per_competitor=35,
+    segment_quotas=(("negative", 15), ("positive", 15), ("neutral", 5)),
+    max_review_tokens=50,
+    # Premium leans harder on recent reviews
+    recency_boosts=((30, 0.4), (90, 0.3), (180, 0.2)),
+)
+
+
+def sentiment_segment(rating) -> str:
+    if rating <= 2:
+        return "negative"
+    if rating == 5:
+        return "positive"
+    return "neutral"
+
+
+def review_score(
+    review: Dict,
+    now: Optional[datetime] = None,
+    recency_boosts: Tuple[Tuple[int, float], ...] = FREE_TIER_POLICY.recency_boosts,
+) -> float:
+    """Quality score plus the first recency boost whose age step fits, capped at 1.0."""
+    base_quality = review.get('quality_score', 0.5)
+    if base_quality is None:
+        base_quality = 0.5
+    review_date = review.get('review_date')
+    if not review_date:
+        return base_quality
+
+    if isinstance(review_date, str):
+        try:
+            if 'T' in review_date:
+                review_date = datetime.fromisoformat(review_date.replace('Z', '+00:00'))
+            else:
+                review_date = datetime.strptime(review_date, '%Y-%m-%d')
+        except ValueError:
+            return base_quality
+    if not isinstance(review_date, datetime):
+        return base_quality
+
+    now = now or datetime.now()
+    if review_date.tzinfo is not None:
+        review_date = review_date.replace(tzinfo=None)
+    days_old = (now - review_date).days
+
+    recency_boost = next((boost for max_days, boost in recency_boosts if days_old <= max_days), 0.0)
+    return min(1.0, base_quality + recency_boost)
+
+
+def pack_sentences(text: str, max_tokens: int) -> str:
+    """
+    Keep the most informative sentences of `text` that fit in max_tokens,
+    in their original order. A sentence's value is its count of content
+    words not already covered by sentences chosen before it; sentences are
+    taken greedily by value relative to length. Falls back to a word-boundary
+    cut of the best sentence when none fits whole.
+    """
+    text = " ".join((text or "").split())
+    if estimate_tokens(text) <= max_tokens:
+        return text
+
+    sentences = [s.strip() for s in _SENTENCE_SPLIT.split(text) if s.strip()]
+    words = [{w for w in _WORD.findall(s.lower()) if w not in _STOPWORDS} for s in sentences]
+    budget_chars = max_tokens * CHARS_PER_TOKEN
+
+    chosen: List[int] = []
+    covered: set = set()
+    used_chars = 0
+    remaining = set(range(len(sentences)))
+    while remaining:
+        best, best_density = None, 0.0
+        for index in remaining:
+            cost = len(sentences[index]) + 1
+            if used_chars + cost > budget_chars:
+                continue
+            value = len(words[index] - covered)
+            # Slight preference for the opening sentence, which usually states the verdict.
+            # Dividing by sqrt(cost) rather than cost keeps long, detailed sentences
+            # competitive with short filler ones.
+            density = (value + (0.5 if index == 0 else 0.0)) / math.sqrt(cost)
+            if best is None or density > best_density:
+                best, best_density = index, density
+        if best is None or best_density <= 0:
+            break
+        chosen.append(best)
+        covered |= words[best]
+        used_chars += len(sentences[best]) + 1
+        remaining.discard(best)
+
+    if chosen:
+        return " ".join(sentences[index] for index in sorted(chosen))
+
+    # No whole sentence fits: cut the most informative one at a word boundary
+    best = max(range(len(sentences)), key=lambda index: len(words[index])) if sentences else None
+    source = sentences[best] if best is not None else text
+    cut = source[: max(budget_chars - 1, 0)].rsplit(" ", 1)[0]
+    return f"{cut}…" if cut else ""
+
+
+class PromptCompactor:
+    """Budgeted review selection and packing for one tier."""
+
+    def __init__(self, policy: CompactionPolicy):
+        self.policy = policy
+
+    def compact(self, competitors_data: Dict[str, List[Dict]], review_token_budget: int) -> Dict:
+        """
+        Build optimized data for the prompt within review_token_budget
+        (estimated tokens for the whole review section).
+        """
+        now = datetime.now()
+        selected_by_competitor: Dict[str, Tuple[str, List[Tuple[float, Dict]]]] = {}
+
+        for competitor_id, reviews in competitors_data.items():
+            if not reviews:
+                continue
+            competitor_name = reviews[0].get('competitor_name', 'Unknown Competitor')
+            selected = self._select(reviews, now)
+            if selected:
+                selected_by_competitor[competitor_id] = (competitor_name, selected)
+
+        # Limit to max competitors (those with the most usable reviews)
+        if len(selected_by_competitor) > self.policy.max_competitors:
+            ranked = sorted(selected_by_competitor.items(), key=lambda item: len(item[1][1]), reverse=True)
+            selected_by_competitor = dict(ranked[: self.policy.max_competitors])
+
+        # Every competitor needs room for its header and at least one review
+        budget = max(review_token_budget, 0)
+        affordable = budget // (COMPETITOR_HEADER_OVERHEAD_TOKENS + REVIEW_LINE_OVERHEAD_TOKENS + MIN_REVIEW_TOKENS)
+        if len(selected_by_competitor) > affordable:
+            ranked = sorted(selected_by_competitor.items(), key=lambda item: len(item[1][1]), reverse=True)
+            selected_by_competitor = dict(ranked[:affordable])
+
+        optimized: Dict[str, Dict] = {}
+        if not selected_by_competitor:
+            return optimized
+
+        competitor_budget = budget // len(selected_by_competitor)
+        estimated_total = 0
+        for competitor_id, (competitor_name, selected) in selected_by_competitor.items():
+            selected = self._fit(selected, competitor_budget - COMPETITOR_HEADER_OVERHEAD_TOKENS)
+            text_budget = competitor_budget - COMPETITOR_HEADER_OVERHEAD_TOKENS - REVIEW_LINE_OVERHEAD_TOKENS * len(selected)
+            allowances = self._allocate(
+                [estimate_tokens(review.get('text', '')) for _, review in selected],
+                text_budget,
+            )
+
+            prompt_reviews = []
+            evidence = {'negative': [], 'positive': [], 'neutral': []}
+            for (_, review), allowance in zip(selected, allowances):
+                rating = review.get('rating', 0)
+                packed = pack_sentences(review.get('text', ''), allowance)
+                prompt_entry = {
+                    'competitor_name': competitor_name,
+                    'rating': rating,
+                    'text': packed,
+                    'quality_score': review.get('quality_score', 0),
+                    'is_negative': rating <= 2,
+                    'is_positive': rating == 5,
+                    'date': review.get('date', '')
+                }
+                prompt_reviews.append(prompt_entry)
+                evidence[sentiment_segment(rating)].append(
+                    {**prompt_entry, 'full_text': review.get('text', '')}
+                )
+                estimated_total += estimate_tokens(packed) + REVIEW_LINE_OVERHEAD_TOKENS
+            estimated_total += COMPETITOR_HEADER_OVERHEAD_TOKENS
+
+            optimized[competitor_id] = {
+                'reviews': prompt_reviews,
+                'evidence': evidence
+            }
+
+        logger.info(
+            f"prompt_compaction: competitors={len(optimized)}, "
+            f"reviews={sum(len(d['reviews']) for d in optimized.values())}, "
+            f"estimated_review_tokens={estimated_total}, budget={review_token_budget}"
+        )
+        return optimized
+
+    def _select(self, reviews: List[Dict], now: datetime) -> List[Tuple[float, Dict]]:
+        """(score, review) for the selected reviews, in segment-quota order."""
+        quality_reviews = [
+            r for r in reviews
+            if len(r.get('text') or '') > MIN_REVIEW_TEXT_CHARS and r.get('rating') is not None
+        ]
+        # Near-duplicates (overlapping pulls, syndicated copies) would waste prompt slots
+        quality_reviews = review_deduplicator.deduplicate_review_dicts(quality_reviews)
+        if not quality_reviews:
+            return []
+
+        # Score once; the index breaks ties without comparing dicts
+        scored = [
+            (review_score(r, now, self.policy.recency_boosts), index, r)
+            for index, r in enumerate(quality_reviews)
+        ]
+        segments: Dict[str, List[Tuple[float, int, Dict]]] = {}
+        for entry in scored:
+            segments.setdefault(sentiment_segment(entry[2].get('rating', 0)), []).append(entry)
+
+        selected: List[Tuple[float, int, Dict]] = []
+        for segment, quota in self.policy.segment_quotas:
+            selected.extend(heapq.nlargest(quota, segments.get(segment, []), key=lambda e: (e[0], -e[1])))
+
+        # If a segment is short, fill with the best remaining reviews
+        open_slots = self.policy.max_reviews_per_competitor - len(selected)
+        if open_slots > 0:
+            taken = {index for _, index, _ in selected}
+            selected.extend(heapq.nlargest(
+                open_slots,
+                (entry for entry in scored if entry[1] not in taken),
+                key=lambda e: (e[0], -e[1]),
+            ))
+
+        return [(score, review) for score, _, review in selected[: self.policy.max_reviews_per_competitor]]
+
+    @staticmethod
+    def _fit(selected: List[Tuple[float, Dict]], budget: int) -> List[Tuple[float, Dict]]:
+        """
+        Keep as many reviews as can get MIN_REVIEW_TOKENS plus their line
+        overhead within budget, dropping the lowest-scored; order is kept.
+        """
+        fit = max(budget, 0) // (REVIEW_LINE_OVERHEAD_TOKENS + MIN_REVIEW_TOKENS)
+        if len(selected) <= fit:
+            return selected
+        keep = set(heapq.nlargest(fit, range(len(selected)), key=lambda index: (selected[index][0], -index)))
+        return [entry for index, entry in enumerate(selected) if index in keep]
+
+    def _allocate(self, wanted_tokens: List[int], budget: int) -> List[int]:
+        """
+        Split budget across reviews: short reviews keep their full text and
+        the slack goes to longer ones (water-filling), each capped at
+        max_review_tokens and floored at MIN_REVIEW_TOKENS. The caller drops
+        reviews until budget covers the floor for every one (see _fit).
+        """
+        count = len(wanted_tokens)
+        if not count:
+            return []
+        wanted = [min(w, self.policy.max_review_tokens) for w in wanted_tokens]
+        allowances = [0] * count
+        remaining_budget = budget
+        pending = sorted(range(count), key=lambda index: wanted[index])
+        while pending:
+            share = remaining_budget // len(pending)
+            index = pending.pop(0)
+            allowances[index] = max(min(wanted[index], share), MIN_REVIEW_TOKENS)
+            remaining_budget -= allowances[index]
+        return allowances
+
+
+free_tier_compactor = PromptCompactor(FREE_TIER_POLICY)
+premium_tier_compactor = PromptCompactor(PREMIUM_TIER_POLICY)
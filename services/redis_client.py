@@ -6,12 +6,180 @@ Provides caching for competitor data and reviews
 import redis
 import json
 import os
-from typing import Optional, Any, List
+import zlib
+from typing import Optional, Any, List, Dict
 import logging
 from datetime import datetime
 
+try:
+    import orjson
+    HAS_ORJSON = True
+except ImportError:
+    HAS_ORJSON = False
+
+try:
+    import msgpack
+    HAS_MSGPACK = True
+except ImportError:
+    HAS_MSGPACK = False
+
+try:
+    import zstandard
+    HAS_ZSTD = True
+except ImportError:
+    HAS_ZSTD = False
+
 logger = logging.getLogger(__name__)
 
+
+# ============================================================================
+# PAYLOAD CODECS
+# ============================================================================
+#
+# Framed values are laid out as:
+#   MAGIC (3 bytes) | VERSION (1) | CODEC ID (1) | COMPRESSION ID (1) | body
+#
+# The magic starts with 0xFF, which can never appear in UTF-8 text, so
+# legacy entries written as plain ``json.dumps`` strings are detected and
+# decoded unchanged.
+
+CODEC_MAGIC = b"\xffRC"
+CODEC_VERSION = 1
+CODEC_HEADER_SIZE = len(CODEC_MAGIC) + 3
+
+COMPRESSION_NONE = 0
+COMPRESSION_ZLIB = 1
+COMPRESSION_ZSTD = 2
+
+
+class CacheCodec:
+    """Serializer for cache payloads (id is stored in the frame header)"""
+
+    codec_id = 0
+    name = "json"
+
+    def dumps(self, value: Any) -> bytes:
+        return json.dumps(value, default=str).encode("utf-8")
+
+    def loads(self, data: bytes) -> Any:
+        return json.loads(data)
+
+
+class OrjsonCodec(CacheCodec):
+    """orjson serializer matching ``json.dumps(default=str)`` output types"""
+
+    codec_id = 1
+    name = "orjson"
+
+    def dumps(self, value: Any) -> bytes:
+        # Pass datetimes through to ``str`` so cached values keep the exact
+        # shape the stdlib codec produced.
+        return orjson.dumps(
+            value,
+            default=str,
+            option=orjson.OPT_NON_STR_KEYS | orjson.OPT_PASSTHROUGH_DATETIME,
+        )
+
+    def loads(self, data: bytes) -> Any:
+        return orjson.loads(data)
+
+
+class MsgpackCodec(CacheCodec):
+    """msgpack serializer (opt-in; keeps non-string dict keys as-is)"""
+
+    codec_id = 2
+    name = "msgpack"
+
+    def dumps(self, value: Any) -> bytes:
+        return msgpack.packb(value, default=str, use_bin_type=True)
+
+    def loads(self, data: bytes) -> Any:
+        return msgpack.unpackb(data, raw=False, strict_map_key=False)
+
+
+def _available_codecs() -> Dict[int, CacheCodec]:
+    codecs: Dict[int, CacheCodec] = {CacheCodec.codec_id: CacheCodec()}
+    if HAS_ORJSON:
+        codecs[OrjsonCodec.codec_id] = OrjsonCodec()
+    if HAS_MSGPACK:
+        codecs[MsgpackCodec.codec_id] = MsgpackCodec()
+    return codecs
+
+
+class PayloadCodec:
+    """
+    Encodes cache values into version-tagged frames
+
+    Values larger than ``compress_min_bytes`` are compressed with zstd when
+    available, otherwise zlib.  Unframed (legacy JSON) values still decode.
+    """
+
+    def __init__(
+        self,
+        codec_name: Optional[str] = None,
+        compress_min_bytes: Optional[int] = None,
+    ):
+        self.codecs = _available_codecs()
+        by_name = {codec.name: codec for codec in self.codecs.values()}
+
+        codec_name = (codec_name or os.getenv('REDIS_CACHE_CODEC', '')).lower()
+        if codec_name and codec_name not in by_name:
+            logger.warning(f"⚠️ Cache codec '{codec_name}' unavailable, using default")
+        default_name = "orjson" if HAS_ORJSON else "json"
+        self.codec = by_name.get(codec_name) or by_name[default_name]
+
+        if compress_min_bytes is None:
+            compress_min_bytes = int(os.getenv('REDIS_COMPRESS_MIN_BYTES', 4096))
+        self.compress_min_bytes = compress_min_bytes
+        self.compression = COMPRESSION_ZSTD if HAS_ZSTD else COMPRESSION_ZLIB
+
+        if HAS_ZSTD:
+            self._zstd_compressor = zstandard.ZstdCompressor(level=3)
+            self._zstd_decompressor = zstandard.ZstdDecompressor()
+
+    def encode(self, value: Any) -> bytes:
+        body = self.codec.dumps(value)
+        compression = COMPRESSION_NONE
+        if self.compress_min_bytes >= 0 and len(body) >= self.compress_min_bytes:
+            compression = self.compression
+            body = self._compress(body, compression)
+        header = CODEC_MAGIC + bytes((CODEC_VERSION, self.codec.codec_id, compression))
+        return header + body
+
+    def decode(self, data: Any) -> Any:
+        if isinstance(data, str):
+            return json.loads(data)
+        if not data.startswith(CODEC_MAGIC):
+            # Legacy entry written as plain JSON text
+            return json.loads(data)
+
+        version, codec_id, compression = data[len(CODEC_MAGIC):CODEC_HEADER_SIZE]
+        if version != CODEC_VERSION:
+            raise ValueError(f"Unsupported cache frame version {version}")
+        codec = self.codecs.get(codec_id)
+        if codec is None:
+            raise ValueError(f"Cache codec {codec_id} not available")
+
+        body = data[CODEC_HEADER_SIZE:]
+        if compression != COMPRESSION_NONE:
+            body = self._decompress(body, compression)
+        return codec.loads(body)
+
+    def _compress(self, body: bytes, compression: int) -> bytes:
+        if compression == COMPRESSION_ZSTD:
+            return self._zstd_compressor.compress(body)
+        return zlib.compress(body, 6)
+
+    def _decompress(self, body: bytes, compression: int) -> bytes:
+        if compression == COMPRESSION_ZSTD:
+            if not HAS_ZSTD:
+                raise ValueError("zstd-compressed cache entry but zstandard not installed")
+            return self._zstd_decompressor.decompress(body)
+        if compression == COMPRESSION_ZLIB:
+            return zlib.decompress(body)
+        raise ValueError(f"Unknown cache compression {compression}")
+
+
 class RedisCache:
     """
     Redis cache client with graceful fallback
@@ -23,6 +191,10 @@ class RedisCache:
     def __init__(self):
         self.enabled = False
         self.client = None
+        # Byte-oriented client for framed payloads; shares settings with
+        # ``client`` but does not decode responses to str.
+        self.binary_client = None
+        self.codec = PayloadCodec()
         
         # Check if Redis is explicitly disabled
         if os.getenv('REDIS_ENABLED', 'true').lower() == 'false':
@@ -45,15 +217,29 @@ class RedisCache:
                 socket_timeout=0.5
             )
             
+            self.binary_client = redis.Redis(
+                host=redis_host,
+                port=redis_port,
+                password=redis_password,
+                db=0,
+                decode_responses=False,
+                socket_connect_timeout=0.5,
+                socket_timeout=0.5
+            )
+            
             # Test connection
             self.client.ping()
             self.enabled = True
-            logger.info(f"✅ Redis connected: {redis_host}:{redis_port}")
+            logger.info(
+                f"✅ Redis connected: {redis_host}:{redis_port} "
+                f"(codec: {self.codec.codec.name}, compress >= {self.codec.compress_min_bytes}B)"
+            )
             
         except Exception as e:
             logger.warning(f"⚠️ Redis unavailable: {e}. Running without cache.")
             self.enabled = False
             self.client = None
+            self.binary_client = None
     
     def get(self, key: str) -> Optional[Any]:
         """Get value from cache"""
@@ -61,10 +247,10 @@ class RedisCache:
             return None
         
         try:
-            value = self.client.get(key)
+            value = self.binary_client.get(key)
             if value:
                 logger.debug(f"✅ Cache HIT: {key}")
-                return json.loads(value)
+                return self.codec.decode(value)
             logger.debug(f"❌ Cache MISS: {key}")
             return None
         except Exception as e:
@@ -77,8 +263,8 @@ class RedisCache:
             return False
         
         try:
-            serialized = json.dumps(value, default=str)
-            self.client.setex(key, ttl, serialized)
+            serialized = self.codec.encode(value)
+            self.binary_client.setex(key, ttl, serialized)
             logger.debug(f"💾 Cache SET: {key} (TTL: {ttl}s)")
             return True
         except Exception as e:
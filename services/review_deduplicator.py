@@ -0,0 +1,158 @@
+#!/usr/bin/env python3
+"""
+Near-duplicate review detection
+
+Reviews reach the LLM from several overlapping pulls (recent / 5-star /
+low-rated) and from syndicated copies with minor edits, so exact-match
+dedup lets near-identical text through. Each review gets a 64-bit SimHash
+over its word unigrams and bigrams; two reviews are duplicates when their
+SimHash similarity (1 - hamming / 64) reaches the threshold and they carry
+the same rating (opposite-sentiment reviews often share most of their
+wording). The default (0.8, at most 12 differing bits) catches lightly
+edited copies of typical 15-30 word reviews; 0.9 missed most of them.
+
+Candidates come from banded LSH over LSH_TABLES fixed bit permutations of
+the fingerprint, each cut into LSH_BAND_BITS-bit bands; a review is only
+compared (exactly) against reviews sharing a band bucket, within its
+rating. The bands are wide enough that unrelated reviews rarely collide
+(about 2% of pairs), so the pass stays near-linear. The candidate step is
+probabilistic: about 99% of edited copies within the 12-bit distance share
+a band, and pairs within 8 bits practically always do.
+
+Very short texts carry too few features for a stable SimHash; they are only
+dropped by the caller's exact key (review_id, or the author/rating/text
+fingerprint), as before.
+"""
+import hashlib
+import logging
+import os
+import re
+from typing import Callable, Dict, Hashable, List, Optional, Sequence, Tuple, TypeVar
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+SIMHASH_BITS = 64
+REVIEW_DEDUP_THRESHOLD = float(os.getenv("REVIEW_DEDUP_THRESHOLD", "0.8"))
+# Below this many tokens only exact matches are treated as duplicates
+MIN_SIMHASH_TOKENS = 6
+LSH_TABLES = 8
+LSH_BAND_BITS = 12
+
+_NON_WORD = re.compile(r"[^\w\s]")
+
+
+def normalize_review_text(text: Optional[str]) -> str:
+    """Lowercase, strip punctuation and collapse whitespace."""
+    return " ".join(_NON_WORD.sub("", (text or "").lower()).split())
+
+
+def simhash(tokens: Sequence[str]) -> int:
+    """64-bit SimHash over word unigrams and bigrams."""
+    features = list(tokens) + [f"{a} {b}" for a, b in zip(tokens, tokens[1:])]
+    if not features:
+        return 0
+    digests = b"".join(
+        hashlib.blake2b(feature.encode("utf-8"), digest_size=8).digest() for feature in features
+    )
+    # One row of 64 bits per feature; a bit is set when most features set it
+    bits = np.unpackbits(np.frombuffer(digests, dtype=np.uint8).reshape(len(features), 8), axis=1)
+    majority = bits.sum(axis=0) * 2 > len(features)
+    return int.from_bytes(np.packbits(majority).tobytes(), "big")
+
+
+def _lsh_bit_indices(tables: int = LSH_TABLES, band_bits: int = LSH_BAND_BITS) -> np.ndarray:
+    """Fingerprint bit positions per band: (tables * bands, band_bits), fixed across runs."""
+    bands = SIMHASH_BITS // band_bits
+    rng = np.random.default_rng(0x5EED)
+    permutations = [np.arange(SIMHASH_BITS)] + [rng.permutation(SIMHASH_BITS) for _ in range(tables - 1)]
+    return np.stack([perm[: bands * band_bits].reshape(bands, band_bits) for perm in permutations]).reshape(-1, band_bits)
+
+
+_LSH_BITS = _lsh_bit_indices()
+_BAND_WEIGHTS = 1 << np.arange(LSH_BAND_BITS - 1, -1, -1)
+
+
+def _band_values(fingerprint: int) -> List[int]:
+    bits = np.unpackbits(np.frombuffer(fingerprint.to_bytes(8, "big"), dtype=np.uint8))
+    return (bits[_LSH_BITS] @ _BAND_WEIGHTS).tolist()
+
+
+class ReviewDeduplicator:
+    """SimHash + banded LSH near-duplicate filter (keeps the first occurrence)."""
+
+    def __init__(self, threshold: float = REVIEW_DEDUP_THRESHOLD):
+        if not 0.0 < threshold <= 1.0:
+            raise ValueError("Dedup threshold must be in (0, 1]")
+        self.threshold = threshold
+        self.max_distance = int((1.0 - threshold) * SIMHASH_BITS)
+
+    def similarity(self, text_a: str, text_b: str) -> float:
+        """SimHash similarity of two texts (1.0 = identical fingerprints)."""
+        a = simhash(normalize_review_text(text_a).split())
+        b = simhash(normalize_review_text(text_b).split())
+        return 1.0 - bin(a ^ b).count("1") / SIMHASH_BITS
+
+    def deduplicate(
+        self,
+        reviews: Sequence[T],
+        text_of: Callable[[T], Optional[str]],
+        exact_key_of: Optional[Callable[[T], Hashable]] = None,
+        group_of: Optional[Callable[[T], Hashable]] = None,
+    ) -> List[T]:
+        """
+        Drop exact duplicates (by exact_key_of, when given) and near-duplicate
+        texts, preserving input order. With group_of (e.g. the rating), only
+        reviews in the same group are near-duplicates of each other.
+        """
+        seen_keys = set()
+        buckets: Dict[Tuple[Hashable, int, int], List[int]] = {}
+        kept_fingerprints: List[int] = []
+        unique: List[T] = []
+
+        for review in reviews:
+            if exact_key_of is not None:
+                key = exact_key_of(review)
+                if key in seen_keys:
+                    continue
+                seen_keys.add(key)
+
+            tokens = normalize_review_text(text_of(review)).split()
+            if len(tokens) < MIN_SIMHASH_TOKENS:
+                unique.append(review)
+                continue
+
+            fingerprint = simhash(tokens)
+            group = group_of(review) if group_of is not None else None
+            band_keys = [(group, index, value) for index, value in enumerate(_band_values(fingerprint))]
+            candidates = {slot for band_key in band_keys for slot in buckets.get(band_key, ())}
+            if any(
+                bin(fingerprint ^ kept_fingerprints[slot]).count("1") <= self.max_distance
+                for slot in candidates
+            ):
+                continue
+
+            slot = len(kept_fingerprints)
+            kept_fingerprints.append(fingerprint)
+            for band_key in band_keys:
+                buckets.setdefault(band_key, []).append(slot)
+            unique.append(review)
+
+        if len(unique) < len(reviews):
+            logger.debug(f"Near-duplicate filter: {len(reviews)} -> {len(unique)} reviews")
+        return unique
+
+    def deduplicate_review_dicts(self, reviews: Sequence[Dict]) -> List[Dict]:
+        """Near-dup filter for standardized review dicts (text / review_id keys)."""
+        return self.deduplicate(
+            reviews,
+            text_of=lambda r: r.get("text"),
+            exact_key_of=lambda r: r.get("review_id") or id(r),
+            group_of=lambda r: r.get("rating"),
+        )
+
+
+review_deduplicator = ReviewDeduplicator()
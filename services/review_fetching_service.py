@@ -13,6 +13,8 @@ from dotenv import load_dotenv
 import hashlib
 import re
 
+from services.review_deduplicator import review_deduplicator
+
 # Load environment variables
 load_dotenv()
 
@@ -203,19 +205,13 @@ class ReviewFetchingService:
         return True
     
     def deduplicate_reviews(self, reviews: List[ReviewData]) -> List[ReviewData]:
-        """Remove duplicate reviews across sources"""
-        seen_reviews = set()
-        unique_reviews = []
-        
-        for review in reviews:
-            # Create fingerprint based on content similarity
-            fingerprint = self._create_review_fingerprint(review)
-            
-            if fingerprint not in seen_reviews:
-                seen_reviews.add(fingerprint)
-                unique_reviews.append(review)
-            else:
-                logger.debug(f"Duplicate review detected: {review.review_id}")
+        """Remove exact and near-duplicate reviews across sources"""
+        unique_reviews = review_deduplicator.deduplicate(
+            reviews,
+            text_of=lambda review: review.text,
+            exact_key_of=self._create_review_fingerprint,
+            group_of=lambda review: review.rating,
+        )
         
         logger.info(f"Deduplicated {len(reviews)} -> {len(unique_reviews)} reviews")
         return unique_reviews
@@ -3,12 +3,14 @@ from __future__ import annotations
 import logging
 from datetime import date, datetime, timezone, timedelta
 from decimal import Decimal, ROUND_HALF_UP
-from typing import Dict, Optional, Tuple
+from typing import Dict, List, Optional, Tuple
 
 from zoneinfo import ZoneInfo
 
 from database.supabase_client import get_supabase_service_client
 from services.account_service import AccountService
+from services.scheduling.grid_cache import invalidate_account_grids
+from services.scheduling.heartbeat_buffer import HEARTBEAT_STALE_SECONDS, heartbeat_buffer
 from services.scheduling.labor_summary_service import LaborSummaryService
 from services.scheduling.week_service import SchedulingWeekService
 from services.scheduling.shift_service import SchedulingShiftService
@@ -34,7 +36,14 @@ class ClockService:
     # ------------------------------------------------------------------#
     # Public API
     # ------------------------------------------------------------------#
-    def start_shift(self, *, shift_id: str, member_user_id: str, source: str = "self") -> Dict:
+    def start_shift(
+        self,
+        *,
+        shift_id: str,
+        member_user_id: str,
+        source: str = "self",
+        rate_info: Optional["RateInfo"] = None,
+    ) -> Dict:
         """Clock a member into a shift."""
         self._assert_shift_member_access(shift_id, member_user_id)
 
@@ -43,7 +52,7 @@ class ClockService:
             logger.info("Live session already exists for shift=%s user=%s", shift_id, member_user_id)
             return existing_session
 
-        rate_info = self._resolve_compensation(member_user_id)
+        rate_info = rate_info or self._resolve_compensation(member_user_id)
         now = datetime.now(timezone.utc).isoformat()
 
         # Warn if rate is zero (but allow clock-in)
@@ -67,6 +76,8 @@ class ClockService:
         }
         result = self.client.table("scheduling_shift_live_sessions").insert(payload).execute()
         session = result.data[0]
+        heartbeat_buffer.register(self.account_id, shift_id, member_user_id)
+        invalidate_account_grids(self.account_id)
 
         logger.info("Shift %s clock-in created for user %s", shift_id, member_user_id)
         return session
@@ -86,7 +97,7 @@ class ClockService:
         if not session:
             raise ValueError("No active shift session to clock out")
 
-        self._assert_shift_member_access(shift_id, member_user_id)
+        shift = self._assert_shift_member_access(shift_id, member_user_id)
 
         clock_in_at = datetime.fromisoformat(session["started_at"])
         end_time = clock_out_at or datetime.now(timezone.utc)
@@ -120,9 +131,12 @@ class ClockService:
 
         # Remove live session
         self.client.table("scheduling_shift_live_sessions").delete().eq("id", session["id"]).execute()
+        heartbeat_buffer.forget(self.account_id, shift_id, member_user_id)
 
-        # Update summaries
-        self.summary_service.recompute_for_shift(shift_id=shift_id)
+        # Fold the completed entry into the day's labor aggregates
+        self.summary_service.recompute_for_shift(
+            shift_id=shift_id, day_id=shift.get("day_id"), week_id=shift.get("week_id")
+        )
 
         logger.info(
             "Shift %s clock-out recorded for user %s (minutes=%s paid_minutes=%s cost=%s)",
@@ -135,7 +149,21 @@ class ClockService:
         return entry
 
     def heartbeat(self, *, shift_id: str, member_user_id: str) -> Dict:
-        """Refresh the heartbeat timestamp of a live session."""
+        """
+        Refresh the heartbeat timestamp of a live session.
+
+        Tracked sessions cost one Redis call; the worker flushes them to
+        Postgres in bulk. Untracked ones (Redis off, or clocked in before
+        buffering) are written through once and tracked from then on.
+        """
+        touched_at = heartbeat_buffer.touch(self.account_id, shift_id, member_user_id)
+        if touched_at is not None:
+            return {
+                "shift_id": shift_id,
+                "member_user_id": member_user_id,
+                "last_heartbeat_at": datetime.fromtimestamp(touched_at, tz=timezone.utc).isoformat(),
+            }
+
         session = self._get_live_session(shift_id, member_user_id)
         if not session:
             raise ValueError("No active session to heartbeat")
@@ -146,8 +174,94 @@ class ClockService:
             .eq("id", session["id"])
             .execute()
         )
+        heartbeat_buffer.register(self.account_id, shift_id, member_user_id)
         return result.data[0] if result.data else session
 
+    def get_stale_sessions(self, stale_after_seconds: int = HEARTBEAT_STALE_SECONDS) -> List[Dict]:
+        """Live sessions whose device has not sent a heartbeat recently."""
+        cutoff = datetime.now(timezone.utc) - timedelta(seconds=stale_after_seconds)
+
+        seen = heartbeat_buffer.last_seen(self.account_id)
+        if seen is not None:
+            cutoff_ts = cutoff.timestamp()
+            return [
+                {
+                    "shift_id": shift_id,
+                    "member_user_id": member_user_id,
+                    "last_heartbeat_at": datetime.fromtimestamp(at, tz=timezone.utc).isoformat(),
+                }
+                for (shift_id, member_user_id), at in seen.items()
+                if at < cutoff_ts
+            ]
+
+        result = (
+            self.client.table("scheduling_shift_live_sessions")
+            .select("shift_id, member_user_id, last_heartbeat_at")
+            .eq("account_id", self.account_id)
+            .lt("last_heartbeat_at", cutoff.isoformat())
+            .execute()
+        )
+        return result.data or []
+
+    def kiosk_toggle(
+        self,
+        member_user_id: str,
+        *,
+        compensation: Optional[Dict] = None,
+        source: str = "pin_kiosk",
+    ) -> Dict:
+        """
+        Clock a PIN-verified member out of their live session, or into the
+        best shift (creating an ad-hoc one when unscheduled).
+
+        One kiosk_clock_toggle RPC (migration 061) does the membership check,
+        shift pick and session/entry write atomically. Returns
+        {"status": "clocked_in" | "clocked_out", "shift_id", "session" | "entry",
+        "is_unscheduled"}.
+        """
+        ad_hoc_shift_id: Optional[str] = None
+        try:
+            outcome = self._kiosk_toggle_rpc(member_user_id, source=source)
+            if outcome.get("status") == "needs_shift":
+                logger.info("No eligible scheduled shift window for user %s; creating ad-hoc shift", member_user_id)
+                ad_hoc_shift_id = self._create_ad_hoc_shift(member_user_id)
+                outcome = self._kiosk_toggle_rpc(member_user_id, source=source, shift_id=ad_hoc_shift_id)
+        except Exception as exc:  # pylint: disable=broad-except
+            logger.warning("Kiosk toggle RPC failed for user %s, using direct path: %s", member_user_id, exc)
+            return self._kiosk_toggle_direct(
+                member_user_id, compensation=compensation, source=source, ad_hoc_shift_id=ad_hoc_shift_id
+            )
+
+        is_unscheduled = ad_hoc_shift_id is not None
+
+        status = outcome.get("status")
+        shift_id = outcome.get("shift_id")
+        if status == "not_member":
+            raise PermissionError("User is not an active member of this account")
+        if status == "no_compensation":
+            raise ValueError("No active compensation configured for this member")
+        if status == "shift_not_found":
+            raise ValueError("Shift not found for account")
+
+        if status == "clocked_out":
+            # The RPC already refreshed the day's labor aggregates
+            heartbeat_buffer.forget(self.account_id, shift_id, member_user_id)
+            invalidate_account_grids(self.account_id)
+            logger.info("Shift %s kiosk clock-out recorded for user %s", shift_id, member_user_id)
+            return {"status": status, "shift_id": shift_id, "entry": outcome["entry"], "is_unscheduled": False}
+
+        session = outcome["session"]
+        if not session.get("started_rate_cents"):
+            logger.warning(
+                "Clock-in for shift %s user %s has zero rate - compensation may not be configured",
+                shift_id,
+                member_user_id,
+            )
+        heartbeat_buffer.register(self.account_id, shift_id, member_user_id)
+        invalidate_account_grids(self.account_id)
+        logger.info("Shift %s kiosk clock-in created for user %s", shift_id, member_user_id)
+        return {"status": status, "shift_id": shift_id, "session": session, "is_unscheduled": is_unscheduled}
+
     def get_live_session_for_member(self, member_user_id: str) -> Optional[Dict]:
         """Return the current live session for a member regardless of shift."""
         result = (
@@ -261,6 +375,60 @@ class ClockService:
         )
         return result.data[0] if result.data else None
 
+    def _kiosk_toggle_rpc(self, member_user_id: str, *, source: str, shift_id: Optional[str] = None) -> Dict:
+        params = {
+            "p_account_id": self.account_id,
+            "p_member_user_id": member_user_id,
+            "p_source": source,
+        }
+        if shift_id:
+            params["p_shift_id"] = shift_id
+        result = self.client.rpc("kiosk_clock_toggle", params).execute()
+        if not isinstance(result.data, dict):
+            raise ValueError("kiosk_clock_toggle returned no result")
+        return result.data
+
+    def _kiosk_toggle_direct(
+        self,
+        member_user_id: str,
+        *,
+        compensation: Optional[Dict],
+        source: str,
+        ad_hoc_shift_id: Optional[str] = None,
+    ) -> Dict:
+        if ad_hoc_shift_id:
+            # The RPC found no live session or shift and the ad-hoc shift exists already
+            session = self.start_shift(
+                shift_id=ad_hoc_shift_id,
+                member_user_id=member_user_id,
+                source=source,
+                rate_info=RateInfo(**compensation) if compensation else None,
+            )
+            return {"status": "clocked_in", "shift_id": ad_hoc_shift_id, "session": session, "is_unscheduled": True}
+
+        live_session = self.get_live_session_for_member(member_user_id)
+        if live_session:
+            entry = self.end_shift(
+                shift_id=live_session["shift_id"],
+                member_user_id=member_user_id,
+                source=source,
+            )
+            return {
+                "status": "clocked_out",
+                "shift_id": live_session["shift_id"],
+                "entry": entry,
+                "is_unscheduled": False,
+            }
+
+        shift_id, is_unscheduled = self.find_shift_for_member(member_user_id)
+        session = self.start_shift(
+            shift_id=shift_id,
+            member_user_id=member_user_id,
+            source=source,
+            rate_info=RateInfo(**compensation) if compensation else None,
+        )
+        return {"status": "clocked_in", "shift_id": shift_id, "session": session, "is_unscheduled": is_unscheduled}
+
     def _get_timezone(self) -> ZoneInfo:
         if self._tzinfo:
             return self._tzinfo
@@ -281,7 +449,7 @@ class ClockService:
             self._tzinfo = ZoneInfo("UTC")
         return self._tzinfo
 
-    def _assert_shift_member_access(self, shift_id: str, member_user_id: str) -> None:
+    def _assert_shift_member_access(self, shift_id: str, member_user_id: str) -> Dict:
         shift = (
             self.client.table("scheduling_shifts")
             .select("id, account_id, day_id, week_id")
@@ -295,6 +463,7 @@ class ClockService:
 
         if not self.account_service.ensure_active_member(self.account_id, member_user_id):
             raise PermissionError("User is not an active member of this account")
+        return shift.data[0]
 
     def _resolve_compensation(self, member_user_id: str) -> "RateInfo":
         result = (
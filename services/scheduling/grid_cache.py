@@ -0,0 +1,87 @@
+"""
+Scheduler grid validators.
+
+The grid ETag is derived from the week tree's version (newest updated_at
+plus row counts, see migration 059). The last ETag served per user/week is
+kept in Redis together with the account's grid generation, so a matching
+If-None-Match is answered with 304 from Redis alone. Scheduling writes bump
+the generation, which retires every remembered ETag for the account at once.
+"""
+from __future__ import annotations
+
+import hashlib
+import logging
+import os
+import time
+from datetime import datetime, timezone
+from typing import Optional
+
+from services.redis_client import cache
+
+logger = logging.getLogger(__name__)
+
+GRID_ETAG_TTL = int(os.getenv("SCHEDULER_GRID_ETAG_TTL", "600"))
+# Live clock-ins advance projected labor every minute
+GRID_LIVE_ETAG_TTL = 60
+GRID_GENERATION_TTL = 7 * 24 * 3600
+
+
+def _generation_key(account_id: str) -> str:
+    return f"sched:grid:gen:{account_id}"
+
+
+def _etag_key(user_id: str, week_id: str) -> str:
+    return f"sched:grid:etag:{user_id}:{week_id}"
+
+
+def grid_etag(week_id: str, version: str, *, live: bool) -> str:
+    """Weak ETag for a rendered grid; minute-stamped while anyone is clocked in."""
+    parts = [week_id, version or ""]
+    if live:
+        parts.append(datetime.now(timezone.utc).strftime("%Y%m%d%H%M"))
+    digest = hashlib.sha1("|".join(parts).encode("utf-8")).hexdigest()
+    return f'W/"{digest}"'
+
+
+def cached_grid_etag(user_id: str, week_id: str) -> Optional[str]:
+    """ETag last served for this user/week, if no scheduling write happened since."""
+    if not cache.enabled:
+        return None
+    entry = cache.get(_etag_key(user_id, week_id))
+    if not isinstance(entry, dict):
+        return None
+    if entry.get("generation") != cache.get(_generation_key(entry.get("account_id", ""))):
+        return None
+    return entry.get("etag")
+
+
+def grid_generation(account_id: str) -> Optional[int]:
+    """Current generation; read it before building so a racing write wins."""
+    if not cache.enabled:
+        return None
+    return cache.get(_generation_key(account_id))
+
+
+def remember_grid_etag(
+    user_id: str,
+    account_id: str,
+    week_id: str,
+    etag: str,
+    *,
+    generation: Optional[int],
+    live: bool,
+) -> None:
+    if not cache.enabled:
+        return
+    cache.set(
+        _etag_key(user_id, week_id),
+        {"etag": etag, "account_id": account_id, "generation": generation},
+        ttl=GRID_LIVE_ETAG_TTL if live else GRID_ETAG_TTL,
+    )
+
+
+def invalidate_account_grids(account_id: str) -> None:
+    """Retire every remembered grid ETag for the account."""
+    if not cache.enabled:
+        return
+    cache.set(_generation_key(account_id), time.time_ns(), ttl=GRID_GENERATION_TTL)
@@ -0,0 +1,177 @@
+"""
+HeartbeatBuffer
+---------------
+Live clock-session heartbeats land in one Redis hash per account
+(field ``<shift_id>:<member_user_id>`` -> epoch seconds) instead of updating
+``scheduling_shift_live_sessions`` on every ping. The worker flushes dirty
+accounts to Postgres in bulk, one RPC per account (migration 060).
+
+Clock-in registers the session in the hash and clock-out removes it, so the
+hash doubles as the account's live-session index for stale detection.
+"""
+from __future__ import annotations
+
+import logging
+import os
+import time
+from datetime import datetime, timezone
+from typing import Dict, Optional, Tuple
+
+from database.supabase_client import get_supabase_service_client
+from services.redis_client import cache
+
+logger = logging.getLogger(__name__)
+
+HEARTBEAT_HASH_TTL_SECONDS = int(os.getenv("HEARTBEAT_HASH_TTL_SECONDS", str(24 * 3600)))
+HEARTBEAT_FLUSH_INTERVAL_SECONDS = int(os.getenv("HEARTBEAT_FLUSH_INTERVAL_SECONDS", "30"))
+HEARTBEAT_STALE_SECONDS = int(os.getenv("HEARTBEAT_STALE_SECONDS", "300"))
+HEARTBEAT_FLUSH_BATCH = 100
+
+SessionKey = Tuple[str, str]  # (shift_id, member_user_id)
+
+# Only touch sessions the hash already knows about, so a late ping after
+# clock-out cannot resurrect a session; one round trip per heartbeat.
+_TOUCH_SCRIPT = """
+if redis.call('HEXISTS', KEYS[1], ARGV[1]) == 0 then
+    return 0
+end
+redis.call('HSET', KEYS[1], ARGV[1], ARGV[2])
+redis.call('EXPIRE', KEYS[1], ARGV[3])
+redis.call('SADD', KEYS[2], ARGV[4])
+return 1
+"""
+
+
+class HeartbeatBuffer:
+    """Per-account heartbeat hashes plus a dirty-account set for the flusher."""
+
+    DIRTY_KEY = "sched:heartbeats:dirty"
+
+    _touch = None
+
+    @staticmethod
+    def heartbeat_key(account_id: str) -> str:
+        return f"sched:heartbeats:{account_id}"
+
+    @staticmethod
+    def _field(shift_id: str, member_user_id: str) -> str:
+        return f"{shift_id}:{member_user_id}"
+
+    @property
+    def enabled(self) -> bool:
+        return bool(cache.enabled and cache.client)
+
+    def register(self, account_id: str, shift_id: str, member_user_id: str, at: Optional[float] = None) -> None:
+        """Track a session that was just clocked in (already persisted)."""
+        if not self.enabled:
+            return
+        try:
+            key = self.heartbeat_key(account_id)
+            pipe = cache.client.pipeline()
+            pipe.hset(key, self._field(shift_id, member_user_id), at or time.time())
+            pipe.expire(key, HEARTBEAT_HASH_TTL_SECONDS)
+            pipe.execute()
+        except Exception as exc:  # pylint: disable=broad-except
+            logger.warning("Heartbeat register failed for account=%s shift=%s: %s", account_id, shift_id, exc)
+
+    def touch(self, account_id: str, shift_id: str, member_user_id: str) -> Optional[float]:
+        """
+        Record a heartbeat. Returns its timestamp, or None when the session is
+        not tracked in Redis (caller falls back to the database).
+        """
+        if not self.enabled:
+            return None
+        now = time.time()
+        try:
+            if HeartbeatBuffer._touch is None:
+                HeartbeatBuffer._touch = cache.client.register_script(_TOUCH_SCRIPT)
+            touched = HeartbeatBuffer._touch(
+                keys=[self.heartbeat_key(account_id), self.DIRTY_KEY],
+                args=[self._field(shift_id, member_user_id), now, HEARTBEAT_HASH_TTL_SECONDS, account_id],
+            )
+        except Exception as exc:  # pylint: disable=broad-except
+            logger.warning("Heartbeat touch failed for account=%s shift=%s: %s", account_id, shift_id, exc)
+            return None
+        return now if touched else None
+
+    def forget(self, account_id: str, shift_id: str, member_user_id: str) -> None:
+        """Stop tracking a session that was clocked out."""
+        if not self.enabled:
+            return
+        try:
+            cache.client.hdel(self.heartbeat_key(account_id), self._field(shift_id, member_user_id))
+        except Exception as exc:  # pylint: disable=broad-except
+            logger.warning("Heartbeat forget failed for account=%s shift=%s: %s", account_id, shift_id, exc)
+
+    def last_seen(self, account_id: str) -> Optional[Dict[SessionKey, float]]:
+        """Latest heartbeat per tracked session, or None if the hash is gone."""
+        if not self.enabled:
+            return None
+        try:
+            raw = cache.client.hgetall(self.heartbeat_key(account_id))
+        except Exception as exc:  # pylint: disable=broad-except
+            logger.warning("Heartbeat read failed for account=%s: %s", account_id, exc)
+            return None
+        if not raw:
+            return None
+        seen: Dict[SessionKey, float] = {}
+        for field, value in raw.items():
+            shift_id, _, member_user_id = field.partition(":")
+            seen[(shift_id, member_user_id)] = float(value)
+        return seen
+
+    def flush(self, client) -> int:
+        """Write buffered heartbeats of dirty accounts to Postgres; returns rows sent."""
+        if not self.enabled:
+            return 0
+        flushed = 0
+        failed = []
+        while True:
+            try:
+                account_ids = cache.client.spop(self.DIRTY_KEY, HEARTBEAT_FLUSH_BATCH) or []
+            except Exception as exc:  # pylint: disable=broad-except
+                logger.warning("Heartbeat flush could not read dirty accounts: %s", exc)
+                break
+            if not account_ids:
+                break
+
+            for account_id in account_ids:
+                seen = self.last_seen(account_id) or {}
+                rows = [
+                    {
+                        "shift_id": shift_id,
+                        "member_user_id": member_user_id,
+                        "last_heartbeat_at": datetime.fromtimestamp(at, tz=timezone.utc).isoformat(),
+                    }
+                    for (shift_id, member_user_id), at in seen.items()
+                ]
+                if not rows:
+                    continue
+                try:
+                    client.rpc(
+                        "touch_live_session_heartbeats",
+                        {"p_account_id": account_id, "p_heartbeats": rows},
+                    ).execute()
+                    flushed += len(rows)
+                except Exception as exc:  # pylint: disable=broad-except
+                    logger.warning("Heartbeat flush failed for account=%s, will retry: %s", account_id, exc)
+                    failed.append(account_id)
+
+        if failed:
+            # Retried on the next interval
+            try:
+                cache.client.sadd(self.DIRTY_KEY, *failed)
+            except Exception as exc:  # pylint: disable=broad-except
+                logger.warning("Heartbeat flush could not requeue %d accounts: %s", len(failed), exc)
+        return flushed
+
+
+heartbeat_buffer = HeartbeatBuffer()
+
+
+def flush_heartbeats() -> int:
+    """Worker entry point: bulk-write buffered heartbeats."""
+    flushed = heartbeat_buffer.flush(get_supabase_service_client())
+    if flushed:
+        logger.info("💓 Flushed %d live-session heartbeats", flushed)
+    return flushed
@@ -1,11 +1,12 @@
 from __future__ import annotations
 
 import logging
-from datetime import datetime, timedelta, timezone
+from datetime import date, datetime, timedelta, timezone
 from decimal import Decimal, ROUND_HALF_UP
 from typing import Dict, Iterable, List, Optional
 
 from database.supabase_client import get_supabase_service_client
+from services.scheduling.grid_cache import invalidate_account_grids
 
 logger = logging.getLogger(__name__)
 
@@ -17,26 +18,49 @@ class LaborSummaryService:
         self.account_id = account_id
         self.client = get_supabase_service_client()
 
-    def recompute_for_shift(self, *, shift_id: str) -> None:
-        """Recompute day/week summaries for a specific shift."""
-        shift = (
-            self.client.table("scheduling_shifts")
-            .select("id, day_id, week_id")
-            .eq("id", shift_id)
-            .eq("account_id", self.account_id)
-            .limit(1)
-            .execute()
-        )
-        if not shift.data:
-            logger.warning("Attempted to recompute shift summaries for missing shift %s", shift_id)
-            return
+    def recompute_for_shift(
+        self,
+        *,
+        shift_id: str,
+        day_id: Optional[str] = None,
+        week_id: Optional[str] = None,
+    ) -> None:
+        """Refresh labor aggregates for the day a shift belongs to."""
+        if not day_id:
+            shift = (
+                self.client.table("scheduling_shifts")
+                .select("id, day_id, week_id")
+                .eq("id", shift_id)
+                .eq("account_id", self.account_id)
+                .limit(1)
+                .execute()
+            )
+            if not shift.data:
+                logger.warning("Attempted to recompute shift summaries for missing shift %s", shift_id)
+                return
+            day_id = shift.data[0]["day_id"]
+            week_id = shift.data[0]["week_id"]
 
-        shift_record = shift.data[0]
-        day_id = shift_record["day_id"]
-        week_id = shift_record["week_id"]
+        self.refresh_day(day_id, week_id=week_id)
+
+    def refresh_day(self, day_id: str, *, week_id: Optional[str] = None) -> None:
+        """
+        Rebuild the member/day labor buckets of one day and roll them up into
+        the day and week summaries (migration 058), in a single round trip.
+        """
+        invalidate_account_grids(self.account_id)
+        try:
+            self.client.rpc(
+                "refresh_scheduling_labor_day",
+                {"p_account_id": self.account_id, "p_day_id": day_id},
+            ).execute()
+            return
+        except Exception as exc:  # pylint: disable=broad-except
+            logger.warning("Labor refresh RPC failed for day %s, recomputing directly: %s", day_id, exc)
 
         self.recompute_day(day_id)
-        self.recompute_week(week_id)
+        if week_id:
+            self._recompute_week_direct(week_id)
 
     def recompute_day(self, day_id: str) -> None:
         day = (
@@ -77,6 +101,47 @@ class LaborSummaryService:
         ).execute()
 
     def recompute_week(self, week_id: str) -> None:
+        """Full rebuild of a week's labor aggregates (repair / backfill)."""
+        invalidate_account_grids(self.account_id)
+        try:
+            self.client.rpc(
+                "refresh_scheduling_labor_week",
+                {"p_account_id": self.account_id, "p_week_id": week_id},
+            ).execute()
+            return
+        except Exception as exc:  # pylint: disable=broad-except
+            logger.warning("Labor week refresh RPC failed for week %s, recomputing directly: %s", week_id, exc)
+        self._recompute_week_direct(week_id)
+
+    def refresh_member_weeks(self, member_user_id: str, since: date) -> int:
+        """
+        Rebuild the weeks ending on or after `since` in which the member has
+        shifts, after their compensation changed (scheduled cost is priced
+        at the member's current rate). Returns the number of weeks rebuilt.
+        """
+        shifts = (
+            self.client.table("scheduling_shifts")
+            .select("week_id")
+            .eq("account_id", self.account_id)
+            .eq("assigned_member_id", member_user_id)
+            .execute()
+        )
+        week_ids = sorted({row["week_id"] for row in shifts.data or [] if row.get("week_id")})
+        if not week_ids:
+            return 0
+        weeks = (
+            self.client.table("scheduling_weeks")
+            .select("id")
+            .eq("account_id", self.account_id)
+            .in_("id", week_ids)
+            .gte("week_start_date", (since - timedelta(days=6)).isoformat())
+            .execute()
+        )
+        for week in weeks.data or []:
+            self.recompute_week(week["id"])
+        return len(weeks.data or [])
+
+    def _recompute_week_direct(self, week_id: str) -> None:
         week = (
             self.client.table("scheduling_weeks")
             .select("id, week_start_date")
@@ -154,8 +219,8 @@ class LaborSummaryService:
             totals["variance_minutes"] = summary.get("variance_minutes")
             totals["variance_cost_cents"] = summary.get("variance_cost_cents")
 
-        day_ids = self._day_ids_for_week(week_id)
-        live_components = self._aggregate_week_components(day_ids)
+        labor = self.get_week_labor(week_id)
+        live_components = labor["week"]
         totals["completed_minutes"] = live_components["completed_minutes"]
         totals["completed_cost_cents"] = live_components["completed_cost_cents"]
         totals["in_progress_minutes"] = live_components["live_minutes"]
@@ -169,7 +234,7 @@ class LaborSummaryService:
             )
 
         # Calculate overtime breakdown per member
-        overtime_breakdown = self._compute_overtime_for_week(week_id)
+        overtime_breakdown = self._compute_overtime_for_week(week_id, labor["members"])
         totals["overtime"] = overtime_breakdown
         totals["regular_cost_cents"] = overtime_breakdown["total_regular_cost_cents"]
         totals["overtime_cost_cents"] = overtime_breakdown["total_overtime_cost_cents"]
@@ -177,7 +242,97 @@ class LaborSummaryService:
 
         return totals
 
-    def _compute_overtime_for_week(self, week_id: str) -> Dict:
+    def get_week_labor(self, week_id: str) -> Dict:
+        """
+        Actual labor for a week: completed time from the maintained member/day
+        buckets plus live sessions projected to now.
+
+        Returns:
+            {"days": {day_id: components}, "week": components,
+             "members": {member_id: {"minutes", "rate_cents", "rate_type"}}}
+        """
+        try:
+            buckets = (
+                self.client.table("scheduling_labor_member_day")
+                .select("day_id, schedule_date, member_user_id, actual_minutes, actual_cost_cents, rate_cents, rate_type")
+                .eq("account_id", self.account_id)
+                .eq("week_id", week_id)
+                .order("schedule_date")
+                .execute()
+            ).data or []
+            live_sessions = (
+                self.client.table("scheduling_shift_live_sessions")
+                .select(
+                    "member_user_id, started_at, started_rate_cents, started_rate_type, "
+                    "scheduling_shifts!inner(day_id, week_id)"
+                )
+                .eq("account_id", self.account_id)
+                .eq("scheduling_shifts.week_id", week_id)
+                .execute()
+            ).data or []
+        except Exception as exc:  # pylint: disable=broad-except
+            logger.warning("Labor aggregates unavailable for week %s, computing directly: %s", week_id, exc)
+            return self._compute_week_labor_direct(week_id)
+
+        days: Dict[str, Dict[str, int]] = {}
+        members: Dict[str, Dict] = {}
+
+        for bucket in buckets:
+            components = days.setdefault(bucket["day_id"], self.empty_components())
+            components["completed_minutes"] += bucket.get("actual_minutes") or 0
+            components["completed_cost_cents"] += bucket.get("actual_cost_cents") or 0
+
+            member_id = bucket.get("member_user_id")
+            minutes = bucket.get("actual_minutes") or 0
+            if not member_id or (not minutes and bucket.get("rate_cents") is None):
+                continue
+            member = members.setdefault(member_id, {"minutes": 0, "rate_cents": 0, "rate_type": "hourly"})
+            member["minutes"] += minutes
+            if bucket.get("rate_cents") is not None:
+                # Buckets are ordered by date, so the latest rate wins
+                member["rate_cents"] = bucket["rate_cents"]
+                member["rate_type"] = bucket.get("rate_type") or "hourly"
+
+        now = datetime.now(timezone.utc)
+        for session in live_sessions:
+            elapsed_minutes = self._elapsed_minutes(session.get("started_at"), now)
+            if elapsed_minutes is None:
+                continue
+            rate_cents = session.get("started_rate_cents") or 0
+            rate_type = (session.get("started_rate_type") or "hourly").lower()
+
+            day_id = (session.get("scheduling_shifts") or {}).get("day_id")
+            components = days.setdefault(day_id, self.empty_components())
+            components["live_minutes"] += elapsed_minutes
+            if rate_type != "salary":
+                components["live_cost_cents"] += self._cost_cents(rate_cents, elapsed_minutes)
+
+            member_id = session.get("member_user_id")
+            if member_id:
+                if member_id not in members:
+                    members[member_id] = {"minutes": 0, "rate_cents": rate_cents, "rate_type": rate_type}
+                members[member_id]["minutes"] += elapsed_minutes
+
+        week = self.empty_components()
+        for components in days.values():
+            components["total_minutes"] = components["completed_minutes"] + components["live_minutes"]
+            components["total_cost_cents"] = components["completed_cost_cents"] + components["live_cost_cents"]
+            for key in week:
+                week[key] += components[key]
+
+        return {"days": days, "week": week, "members": members}
+
+    def _compute_week_labor_direct(self, week_id: str) -> Dict:
+        """Pre-058 path: recompute components and member hours from raw rows."""
+        day_ids = self._day_ids_for_week(week_id)
+        days = {day_id: self._compute_actual_components(day_id) for day_id in day_ids}
+        week = self.empty_components()
+        for components in days.values():
+            for key in week:
+                week[key] += components[key]
+        return {"days": days, "week": week, "members": self._member_hours_direct(day_ids)}
+
+    def _compute_overtime_for_week(self, week_id: str, member_hours: Optional[Dict[str, Dict]] = None) -> Dict:
         """
         Calculate overtime for all members in a week.
         Overtime = configurable multiplier for hours worked over threshold.
@@ -192,17 +347,84 @@ class LaborSummaryService:
         OVERTIME_THRESHOLD_MINUTES = settings.get("overtime_threshold_minutes", 2400)
         OVERTIME_MULTIPLIER = Decimal(str(settings.get("overtime_multiplier", 1.5)))
 
-        # Get all clock entries for this week
-        day_ids = self._day_ids_for_week(week_id)
-        if not day_ids:
+        if member_hours is None:
+            member_hours = self.get_week_labor(week_id)["members"]
+        if not member_hours:
             return self._empty_overtime_result()
 
+        # Calculate overtime per member
+        total_regular_minutes = 0
+        total_overtime_minutes = 0
+        total_regular_cost = 0
+        total_overtime_cost = 0
+        member_breakdown = []
+
+        for member_id, data in member_hours.items():
+            total_minutes = data["minutes"]
+            rate_cents = data["rate_cents"]
+            rate_type = data["rate_type"]
+
+            # Salary employees don't get overtime in this simple model
+            if rate_type == "salary":
+                regular_minutes = total_minutes
+                overtime_minutes = 0
+                regular_cost = 0  # Salary is fixed
+                overtime_cost = 0
+            else:
+                if total_minutes <= OVERTIME_THRESHOLD_MINUTES:
+                    regular_minutes = total_minutes
+                    overtime_minutes = 0
+                else:
+                    regular_minutes = OVERTIME_THRESHOLD_MINUTES
+                    overtime_minutes = total_minutes - OVERTIME_THRESHOLD_MINUTES
+
+                # Calculate costs
+                regular_cost = int(
+                    (Decimal(rate_cents) * Decimal(regular_minutes) / Decimal(60)).quantize(
+                        Decimal("1"), rounding=ROUND_HALF_UP
+                    )
+                )
+                overtime_cost = int(
+                    (Decimal(rate_cents) * OVERTIME_MULTIPLIER * Decimal(overtime_minutes) / Decimal(60)).quantize(
+                        Decimal("1"), rounding=ROUND_HALF_UP
+                    )
+                )
+
+            total_regular_minutes += regular_minutes
+            total_overtime_minutes += overtime_minutes
+            total_regular_cost += regular_cost
+            total_overtime_cost += overtime_cost
+
+            member_breakdown.append({
+                "member_user_id": member_id,
+                "total_minutes": total_minutes,
+                "regular_minutes": regular_minutes,
+                "overtime_minutes": overtime_minutes,
+                "rate_cents": rate_cents,
+                "regular_cost_cents": regular_cost,
+                "overtime_cost_cents": overtime_cost,
+                "total_cost_cents": regular_cost + overtime_cost,
+            })
+
+        return {
+            "threshold_minutes": OVERTIME_THRESHOLD_MINUTES,
+            "overtime_multiplier": float(OVERTIME_MULTIPLIER),
+            "total_regular_minutes": total_regular_minutes,
+            "total_overtime_minutes": total_overtime_minutes,
+            "total_regular_cost_cents": total_regular_cost,
+            "total_overtime_cost_cents": total_overtime_cost,
+            "total_cost_with_overtime_cents": total_regular_cost + total_overtime_cost,
+            "members": member_breakdown,
+        }
+
+    def _member_hours_direct(self, day_ids: List[str]) -> Dict[str, Dict]:
+        """Paid minutes and rate per member from raw clock entries / live sessions."""
         shift_ids = []
         for day_id in day_ids:
             shift_ids.extend(self._shift_ids_for_day(day_id))
 
         if not shift_ids:
-            return self._empty_overtime_result()
+            return {}
 
         # Get completed entries
         entries = (
@@ -251,18 +473,9 @@ class LaborSummaryService:
             if not member_id:
                 continue
 
-            started_at_raw = session.get("started_at")
-            if not started_at_raw:
-                continue
-
-            try:
-                started_at = datetime.fromisoformat(started_at_raw)
-                if started_at.tzinfo is None:
-                    started_at = started_at.replace(tzinfo=timezone.utc)
-            except ValueError:
+            elapsed_minutes = self._elapsed_minutes(session.get("started_at"), now)
+            if elapsed_minutes is None:
                 continue
-
-            elapsed_minutes = max(int((now - started_at).total_seconds() // 60), 0)
             rate_cents = session.get("started_rate_cents") or 0
             rate_type = session.get("started_rate_type") or "hourly"
 
@@ -274,70 +487,7 @@ class LaborSummaryService:
                 }
             member_hours[member_id]["minutes"] += elapsed_minutes
 
-        # Calculate overtime per member
-        total_regular_minutes = 0
-        total_overtime_minutes = 0
-        total_regular_cost = 0
-        total_overtime_cost = 0
-        member_breakdown = []
-
-        for member_id, data in member_hours.items():
-            total_minutes = data["minutes"]
-            rate_cents = data["rate_cents"]
-            rate_type = data["rate_type"]
-
-            # Salary employees don't get overtime in this simple model
-            if rate_type == "salary":
-                regular_minutes = total_minutes
-                overtime_minutes = 0
-                regular_cost = 0  # Salary is fixed
-                overtime_cost = 0
-            else:
-                if total_minutes <= OVERTIME_THRESHOLD_MINUTES:
-                    regular_minutes = total_minutes
-                    overtime_minutes = 0
-                else:
-                    regular_minutes = OVERTIME_THRESHOLD_MINUTES
-                    overtime_minutes = total_minutes - OVERTIME_THRESHOLD_MINUTES
-
-                # Calculate costs
-                regular_cost = int(
-                    (Decimal(rate_cents) * Decimal(regular_minutes) / Decimal(60)).quantize(
-                        Decimal("1"), rounding=ROUND_HALF_UP
-                    )
-                )
-                overtime_cost = int(
-                    (Decimal(rate_cents) * OVERTIME_MULTIPLIER * Decimal(overtime_minutes) / Decimal(60)).quantize(
-                        Decimal("1"), rounding=ROUND_HALF_UP
-                    )
-                )
-
-            total_regular_minutes += regular_minutes
-            total_overtime_minutes += overtime_minutes
-            total_regular_cost += regular_cost
-            total_overtime_cost += overtime_cost
-
-            member_breakdown.append({
-                "member_user_id": member_id,
-                "total_minutes": total_minutes,
-                "regular_minutes": regular_minutes,
-                "overtime_minutes": overtime_minutes,
-                "rate_cents": rate_cents,
-                "regular_cost_cents": regular_cost,
-                "overtime_cost_cents": overtime_cost,
-                "total_cost_cents": regular_cost + overtime_cost,
-            })
-
-        return {
-            "threshold_minutes": OVERTIME_THRESHOLD_MINUTES,
-            "overtime_multiplier": float(OVERTIME_MULTIPLIER),
-            "total_regular_minutes": total_regular_minutes,
-            "total_overtime_minutes": total_overtime_minutes,
-            "total_regular_cost_cents": total_regular_cost,
-            "total_overtime_cost_cents": total_overtime_cost,
-            "total_cost_with_overtime_cents": total_regular_cost + total_overtime_cost,
-            "members": member_breakdown,
-        }
+        return member_hours
 
     def _empty_overtime_result(self) -> Dict:
         settings = self._get_overtime_settings()
@@ -411,8 +561,7 @@ class LaborSummaryService:
 
     def get_week_actual_components(self, week_id: str) -> Dict[str, int]:
         """Aggregate completed vs live breakdown across a week."""
-        day_ids = self._day_ids_for_week(week_id)
-        return self._aggregate_week_components(day_ids)
+        return self.get_week_labor(week_id)["week"]
 
     def _compute_actual_components(self, day_id: str) -> Dict[str, int]:
         shift_ids = self._shift_ids_for_day(day_id)
@@ -577,3 +726,34 @@ class LaborSummaryService:
             delta = delta + timedelta(days=1)
         return max(int(delta.total_seconds() // 60), 0)
 
+    @staticmethod
+    def empty_components() -> Dict[str, int]:
+        return {
+            "completed_minutes": 0,
+            "completed_cost_cents": 0,
+            "live_minutes": 0,
+            "live_cost_cents": 0,
+            "total_minutes": 0,
+            "total_cost_cents": 0,
+        }
+
+    @staticmethod
+    def _elapsed_minutes(started_at_raw: Optional[str], now: datetime) -> Optional[int]:
+        """Whole minutes a live session has been running (None if unparseable)."""
+        if not started_at_raw:
+            return None
+        try:
+            started_at = datetime.fromisoformat(started_at_raw)
+        except ValueError:
+            return None
+        # Ensure timezone-aware comparison
+        if started_at.tzinfo is None:
+            started_at = started_at.replace(tzinfo=timezone.utc)
+        return max(int((now - started_at).total_seconds() // 60), 0)
+
+    @staticmethod
+    def _cost_cents(rate_cents: int, minutes: int) -> int:
+        # Use Decimal for consistent rounding with clock_service
+        return int(
+            (Decimal(rate_cents) * Decimal(minutes) / Decimal(60)).quantize(Decimal("1"), rounding=ROUND_HALF_UP)
+        )
@@ -5,6 +5,7 @@ from datetime import datetime
 from typing import Any, Dict, Optional
 
 from database.supabase_client import get_supabase_service_client
+from services.scheduling.grid_cache import invalidate_account_grids
 
 logger = logging.getLogger(__name__)
 
@@ -92,6 +93,8 @@ class SchedulingSettingsService:
                 **payload,
             }
         ).execute()
+        # Grids render overtime from these settings
+        invalidate_account_grids(self.account_id)
 
         return self.get_settings()
 
@@ -86,7 +86,9 @@ class SchedulingShiftService:
             if refreshed.data:
                 shift_record = refreshed.data[0]
         else:
-            self.labor_summary_service.recompute_for_shift(shift_id=shift_record["id"])
+            self.labor_summary_service.recompute_for_shift(
+                shift_id=shift_record["id"], day_id=day_id, week_id=week_id
+            )
 
         return shift_record
 
@@ -125,8 +127,10 @@ class SchedulingShiftService:
         )
         if not result.data:
             raise ValueError("Shift not found")
-        self.labor_summary_service.recompute_for_shift(shift_id=shift_id)
         shift_record = result.data[0]
+        self.labor_summary_service.recompute_for_shift(
+            shift_id=shift_id, day_id=shift_record.get("day_id"), week_id=shift_record.get("week_id")
+        )
 
         created_at = shift_record.get("created_at") or datetime.utcnow().isoformat()
         updated_at = shift_record.get("updated_at") or created_at
@@ -179,11 +183,34 @@ class SchedulingShiftService:
         break_minutes: Optional[int] = None,
         role_label: Optional[str] = None,
         notes: Optional[str] = None,
+        day_id: Optional[str] = None,
     ) -> Dict[str, Any]:
-        if not self._shift_belongs_to_account(shift_id):
+        current = (
+            self.client.table("scheduling_shifts")
+            .select("id, day_id, week_id")
+            .eq("id", shift_id)
+            .eq("account_id", self.account_id)
+            .limit(1)
+            .execute()
+        )
+        if not current.data:
             raise ValueError("Shift does not belong to the account")
+        previous = current.data[0]
 
         payload: Dict[str, Any] = {"updated_at": datetime.utcnow().isoformat()}
+        if day_id is not None and day_id != previous.get("day_id"):
+            target_day = (
+                self.client.table("scheduling_days")
+                .select("id, week_id")
+                .eq("id", day_id)
+                .eq("account_id", self.account_id)
+                .limit(1)
+                .execute()
+            )
+            if not target_day.data:
+                raise ValueError("Day does not belong to the account")
+            payload["day_id"] = day_id
+            payload["week_id"] = target_day.data[0]["week_id"]
         if shift_type is not None:
             payload["shift_type"] = shift_type
         if start_time is not None:
@@ -205,8 +232,14 @@ class SchedulingShiftService:
         )
         if not result.data:
             raise ValueError("Shift not found")
-        self.labor_summary_service.recompute_for_shift(shift_id=shift_id)
-        return result.data[0]
+        shift_record = result.data[0]
+        # A moved shift leaves labor behind on the day it came from
+        if previous.get("day_id") and previous["day_id"] != shift_record.get("day_id"):
+            self.labor_summary_service.refresh_day(previous["day_id"], week_id=previous.get("week_id"))
+        self.labor_summary_service.recompute_for_shift(
+            shift_id=shift_id, day_id=shift_record.get("day_id"), week_id=shift_record.get("week_id")
+        )
+        return shift_record
 
     # ------------------------------------------------------------------#
     # Helpers
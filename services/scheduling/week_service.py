@@ -2,9 +2,10 @@ from __future__ import annotations
 
 import logging
 from datetime import date, datetime, timedelta
-from typing import Any, Dict, Iterable, List, Optional
+from typing import Any, Dict, Iterable, List, Optional, Tuple
 
 from database.supabase_client import get_supabase_service_client
+from services.scheduling.grid_cache import invalidate_account_grids
 from services.scheduling.settings_service import SchedulingSettingsService
 
 logger = logging.getLogger(__name__)
@@ -123,6 +124,37 @@ class SchedulingWeekService:
 
     def get_week(self, week_id: str) -> Optional[Dict[str, Any]]:
         """Return a single week with nested days and shifts."""
+        week, _ = self.get_week_with_version(week_id)
+        return week
+
+    def get_week_with_version(self, week_id: str) -> Tuple[Optional[Dict[str, Any]], Optional[str]]:
+        """
+        Return (week tree, version) from one RPC (migration 059).
+
+        The version changes whenever anything the scheduler grid renders
+        changes; it is what the grid ETag is derived from.
+        """
+        try:
+            result = self.client.rpc(
+                "get_scheduling_week_tree",
+                {"p_account_id": self.account_id, "p_week_id": week_id},
+            ).execute()
+        except Exception as exc:  # pylint: disable=broad-except
+            logger.warning("Week tree RPC failed for week %s, querying tables: %s", week_id, exc)
+        else:
+            week = result.data
+            if not week:
+                return None, None
+            version = week.pop("version", None)
+            return week, version
+
+        week = self._get_week_direct(week_id)
+        if not week:
+            return None, None
+        stamps, counts = self._related_version_parts(week)
+        return week, self._tree_version(week, stamps, counts)
+
+    def _get_week_direct(self, week_id: str) -> Optional[Dict[str, Any]]:
         result = (
             self.client.table("scheduling_weeks")
             .select("*")
@@ -323,6 +355,7 @@ class SchedulingWeekService:
         )
         if not result.data:
             raise ValueError(f"Week {week_id} not found for account {self.account_id}")
+        invalidate_account_grids(self.account_id)
         return result.data[0]
 
     def update_day_forecast(
@@ -351,11 +384,78 @@ class SchedulingWeekService:
         )
         if not result.data:
             raise ValueError(f"Scheduling day {day_id} not found for account {self.account_id}")
+        invalidate_account_grids(self.account_id)
         return result.data[0]
 
     # ------------------------------------------------------------------#
     # Helpers
     # ------------------------------------------------------------------#
+    @staticmethod
+    def _tree_version(week: Dict[str, Any], extra_stamps: Iterable[str] = (), extra_counts: Iterable[int] = ()) -> str:
+        """Newest updated_at plus node counts, mirroring the RPC's version."""
+        stamps = [week.get("updated_at") or ""] + list(extra_stamps)
+        counts = [0, 0, 0, 0, 0]
+        for day in week.get("days", []):
+            counts[0] += 1
+            stamps.append(day.get("updated_at") or "")
+            for shift in day.get("shifts", []):
+                counts[1] += 1
+                stamps.append(shift.get("updated_at") or "")
+                for key, index in (("assignments", 2), ("live_sessions", 3)):
+                    for row in shift.get(key) or []:
+                        counts[index] += 1
+                        stamps.append(row.get("updated_at") or "")
+                if shift.get("latest_entry"):
+                    counts[4] += 1
+                    stamps.append(shift["latest_entry"].get("updated_at") or "")
+        return ":".join([max(stamps)] + [str(count) for count in counts + list(extra_counts)])
+
+    def _related_version_parts(self, week: Dict[str, Any]) -> Tuple[List[str], List[int]]:
+        """
+        Stamps and counts for what the grid's labor costs depend on outside
+        the week tree (all clock entries, week summary, settings, members,
+        compensation), as the RPC's version includes them.
+        """
+        shift_ids = [shift["id"] for day in week.get("days", []) for shift in day.get("shifts", [])]
+        entries: List[Dict[str, Any]] = []
+        if shift_ids:
+            entries = (
+                self.client.table("scheduling_shift_clock_entries")
+                .select("updated_at")
+                .in_("shift_id", shift_ids)
+                .execute()
+            ).data or []
+        summaries = (
+            self.client.table("scheduling_labor_week_summary")
+            .select("updated_at")
+            .eq("account_id", self.account_id)
+            .eq("week_id", week["id"])
+            .execute()
+        ).data or []
+        settings = (
+            self.client.table("scheduling_settings")
+            .select("updated_at")
+            .eq("account_id", self.account_id)
+            .execute()
+        ).data or []
+        members = (
+            self.client.table("account_members")
+            .select("updated_at")
+            .eq("account_id", self.account_id)
+            .execute()
+        ).data or []
+        compensation = (
+            self.client.table("account_member_compensation")
+            .select("created_at, effective_at, ends_at")
+            .eq("account_id", self.account_id)
+            .execute()
+        ).data or []
+
+        stamps = [row.get("updated_at") or "" for row in entries + summaries + settings + members]
+        for row in compensation:
+            stamps.extend(row.get(key) or "" for key in ("created_at", "effective_at", "ends_at"))
+        return stamps, [len(entries), len(members), len(compensation)]
+
     @staticmethod
     def _group_by(items: Iterable[Dict[str, Any]], key: str) -> Dict[Any, List[Dict[str, Any]]]:
         grouped: Dict[Any, List[Dict[str, Any]]] = {}
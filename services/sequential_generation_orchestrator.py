@@ -8,40 +8,80 @@ This is cleaner for the user because:
 1. They see images appear one by one (feels faster)
 2. Each image can have a different prompt
 3. If one fails, others still complete
+
+In parallel mode every prompt is dispatched at once, bounded by a per-user
+and a per-process cap, and results stream in completion order, so a batch
+takes about as long as its slowest image. The user's image allowance is
+reserved for the whole batch up front; prompts beyond it are reported as
+failed without being dispatched.
 """
 from __future__ import annotations
 
 import asyncio
 import logging
+import os
 import uuid
-from typing import Any, AsyncGenerator, Dict, List, Optional
+from contextlib import asynccontextmanager
+from typing import Any, AsyncGenerator, AsyncIterator, Dict, List
 
-from services.nano_banana_orchestrator import NanoBananaImageOrchestrator
+from services.nano_banana_orchestrator import NanoBananaImageOrchestrator, UsageLimitExceededError
 
 logger = logging.getLogger(__name__)
 
+IMAGE_GENERATION_MAX_CONCURRENCY = int(os.getenv("IMAGE_GENERATION_MAX_CONCURRENCY", "8"))
+IMAGE_GENERATION_PER_USER_CONCURRENCY = int(os.getenv("IMAGE_GENERATION_PER_USER_CONCURRENCY", "3"))
+
+
+class GenerationSlots:
+    """Per-user and process-wide limits on in-flight image generations."""
+
+    def __init__(self, max_concurrency: int, per_user_concurrency: int) -> None:
+        self._global = asyncio.Semaphore(max_concurrency)
+        self._per_user_concurrency = per_user_concurrency
+        # user_id -> [semaphore, number of tasks using it]
+        self._users: Dict[str, List[Any]] = {}
+
+    @asynccontextmanager
+    async def acquire(self, user_id: str) -> AsyncIterator[None]:
+        entry = self._users.setdefault(user_id, [asyncio.Semaphore(self._per_user_concurrency), 0])
+        entry[1] += 1
+        try:
+            # User slot first, so one user's queued images never hold global slots
+            async with entry[0]:
+                async with self._global:
+                    yield
+        finally:
+            entry[1] -= 1
+            if entry[1] == 0:
+                self._users.pop(user_id, None)
+
+
+# Shared by every batch in the process
+generation_slots = GenerationSlots(IMAGE_GENERATION_MAX_CONCURRENCY, IMAGE_GENERATION_PER_USER_CONCURRENCY)
+
 
 class SequentialGenerationOrchestrator:
     """
     Orchestrates multi-prompt generation with progressive streaming.
-    
-    Instead of sending all prompts at once, this generates images sequentially
+
+    Generates one image per prompt, either one after another or in parallel,
     and streams each result back as it completes.
     """
-    
+
     def __init__(self) -> None:
         self.base_orchestrator = NanoBananaImageOrchestrator()
-    
+
     async def generate_sequential(
         self,
         *,
         user_id: str,
         prompts: List[Dict[str, Any]],
         shared_config: Dict[str, Any],
+        parallel: bool = False,
     ) -> AsyncGenerator[Dict[str, Any], None]:
         """
-        Generate images sequentially, yielding each result as it completes.
-        
+        Generate images, yielding each result as it completes.
+
         Args:
             user_id: The user requesting generation
             prompts: List of prompt configurations, each with:
@@ -53,7 +93,9 @@ class SequentialGenerationOrchestrator:
                 - brand_profile_id: Brand profile to use
                 - style_preferences: Shared style settings
                 - desired_outputs: Output format (dimensions, format)
-        
+            parallel: Dispatch all prompts concurrently (within the per-user and
+                global caps) and report results in completion order
+
         Yields:
             Progress events:
                 - {"type": "started", "data": {"total": N, "current": 0}}
@@ -61,134 +103,92 @@ class SequentialGenerationOrchestrator:
                 - {"type": "image_ready", "data": {"current": 1, "asset": {...}}}
                 - {"type": "image_failed", "data": {"current": 1, "error": "..."}}
                 - {"type": "completed", "data": {"total": N, "successful": M, "assets": [...]}}
+
+        Raises:
+            UsageLimitExceededError: No image allowance is left for the batch
         """
         total = len(prompts)
-        successful = 0
-        all_assets: List[Dict[str, Any]] = []
-        
+        usage_service = self.base_orchestrator.usage_service
+        granted, limit_details = usage_service.reserve_usage(user_id, "image_generation", total)
+        if not granted:
+            raise UsageLimitExceededError(limit_details)
+        reserved = granted
+
         # Create a parent job to track the batch
         batch_id = str(uuid.uuid4())
-        
-        yield {
-            "type": "started",
-            "data": {
-                "batch_id": batch_id,
-                "total": total,
-                "current": 0,
-                "message": f"Starting generation of {total} images..."
-            }
-        }
-        
-        for idx, prompt_config in enumerate(prompts, start=1):
-            label = prompt_config.get("label", f"Image {idx} of {total}")
-            
+        results: List[Dict[str, Any]] = []
+
+        try:
             yield {
-                "type": "generating",
+                "type": "started",
                 "data": {
                     "batch_id": batch_id,
-                    "current": idx,
                     "total": total,
-                    "label": label,
-                    "message": f"Generating {label}..."
+                    "current": 0,
+                    "mode": "parallel" if parallel else "sequential",
+                    "message": f"Starting generation of {total} images..."
                 }
             }
-            
-            try:
-                # Build the request for this specific image
-                request = {
-                    "template_id": prompt_config.get("template_id") or shared_config.get("template_id"),
-                    "theme_id": shared_config.get("theme_id"),
-                    "user_inputs": prompt_config.get("user_inputs", {}),
-                    "brand_profile_id": shared_config.get("brand_profile_id"),
-                    "style_preferences": {
-                        **shared_config.get("style_preferences", {}),
-                        **prompt_config.get("style_preferences", {}),
-                    },
-                    "desired_outputs": {
-                        **shared_config.get("desired_outputs", {"variants": 1, "dimensions": "1024x1024"}),
-                        "variants": 1,  # Force single variant per prompt
-                    },
-                }
-                
-                # Generate this single image
-                job_result = await self.base_orchestrator.start_generation(
-                    user_id=user_id,
-                    request=request,
+
+            jobs = [
+                (idx, prompt_config.get("label", f"Image {idx} of {total}"), prompt_config)
+                for idx, prompt_config in enumerate(prompts, start=1)
+            ]
+            for idx, label, _ in jobs[granted:]:
+                event = self._failure_event(
+                    batch_id, idx, total, label,
+                    error=limit_details.get("message") or "Usage limit reached",
+                    message=f"✗ {label} skipped - usage limit reached",
                 )
-                
-                # Extract the asset from the completed job
-                job_id = job_result.get("id")
-                if job_result.get("status") == "completed":
-                    # Fetch the full job with assets
-                    full_job = self.base_orchestrator.get_job(
-                        job_id=job_id,
-                        user_id=user_id,
+                results.append(event)
+                yield event
+
+            if parallel:
+                events: asyncio.Queue = asyncio.Queue()
+                tasks = [
+                    asyncio.create_task(
+                        self._generate_into_queue(events, user_id, batch_id, idx, total, label, prompt_config, shared_config)
                     )
-                    assets = full_job.get("assets", []) if full_job else []
-                    
-                    if assets:
-                        asset = assets[0]
-                        asset["label"] = label
-                        asset["sequence_index"] = idx
-                        all_assets.append(asset)
-                        successful += 1
-                        
-                        yield {
-                            "type": "image_ready",
-                            "data": {
-                                "batch_id": batch_id,
-                                "current": idx,
-                                "total": total,
-                                "label": label,
-                                "asset": asset,
-                                "job_id": job_id,
-                                "message": f"✓ {label} complete"
-                            }
-                        }
-                    else:
-                        yield {
-                            "type": "image_failed",
-                            "data": {
-                                "batch_id": batch_id,
-                                "current": idx,
-                                "total": total,
-                                "label": label,
-                                "error": "No assets returned",
-                                "message": f"✗ {label} failed - no image generated"
-                            }
-                        }
-                else:
-                    # Job didn't complete synchronously - this shouldn't happen with Gemini
-                    yield {
-                        "type": "image_failed",
-                        "data": {
-                            "batch_id": batch_id,
-                            "current": idx,
-                            "total": total,
-                            "label": label,
-                            "error": f"Job status: {job_result.get('status')}",
-                            "message": f"✗ {label} - unexpected status"
-                        }
-                    }
-                    
-            except Exception as e:
-                logger.error(f"Sequential generation failed for image {idx}: {e}", exc_info=True)
-                yield {
-                    "type": "image_failed",
-                    "data": {
-                        "batch_id": batch_id,
-                        "current": idx,
-                        "total": total,
-                        "label": label,
-                        "error": str(e),
-                        "message": f"✗ {label} failed"
-                    }
-                }
-            
-            # Small delay between generations to be nice to the API
-            if idx < total:
-                await asyncio.sleep(0.5)
-        
+                    for idx, label, prompt_config in jobs[:granted]
+                ]
+                try:
+                    finished = 0
+                    while finished < len(tasks):
+                        event = await events.get()
+                        if event["type"] != "generating":
+                            finished += 1
+                            reserved -= 1
+                            usage_service.release_usage_reservation(user_id, "image_generation")
+                            results.append(event)
+                        yield event
+                finally:
+                    for task in tasks:
+                        if not task.done():
+                            task.cancel()
+            else:
+                for position, (idx, label, prompt_config) in enumerate(jobs[:granted]):
+                    yield self._generating_event(batch_id, idx, total, label)
+                    async with generation_slots.acquire(user_id):
+                        event = await self._generate_one(user_id, batch_id, idx, total, label, prompt_config, shared_config)
+                    reserved -= 1
+                    usage_service.release_usage_reservation(user_id, "image_generation")
+                    results.append(event)
+                    yield event
+
+                    # Small delay between generations to be nice to the API
+                    if position < granted - 1:
+                        await asyncio.sleep(0.5)
+        finally:
+            # Stream closed early: give back what was never used
+            if reserved:
+                usage_service.release_usage_reservation(user_id, "image_generation", reserved)
+
+        all_assets = sorted(
+            (event["data"]["asset"] for event in results if event["type"] == "image_ready"),
+            key=lambda asset: asset["sequence_index"],
+        )
+        successful = len(all_assets)
+
         # Final completion event
         yield {
             "type": "completed",
@@ -201,3 +201,132 @@ class SequentialGenerationOrchestrator:
                 "message": f"Completed: {successful}/{total} images generated"
             }
         }
+
+    async def _generate_into_queue(
+        self,
+        events: asyncio.Queue,
+        user_id: str,
+        batch_id: str,
+        idx: int,
+        total: int,
+        label: str,
+        prompt_config: Dict[str, Any],
+        shared_config: Dict[str, Any],
+    ) -> None:
+        """Parallel mode: generate one image under the caps, reporting to the queue."""
+        async with generation_slots.acquire(user_id):
+            events.put_nowait(self._generating_event(batch_id, idx, total, label))
+            event = await self._generate_one(user_id, batch_id, idx, total, label, prompt_config, shared_config)
+        events.put_nowait(event)
+
+    async def _generate_one(
+        self,
+        user_id: str,
+        batch_id: str,
+        idx: int,
+        total: int,
+        label: str,
+        prompt_config: Dict[str, Any],
+        shared_config: Dict[str, Any],
+    ) -> Dict[str, Any]:
+        """Generate a single image; returns its image_ready or image_failed event."""
+        try:
+            # Build the request for this specific image
+            request = {
+                "template_id": prompt_config.get("template_id") or shared_config.get("template_id"),
+                "theme_id": shared_config.get("theme_id"),
+                "user_inputs": prompt_config.get("user_inputs", {}),
+                "brand_profile_id": shared_config.get("brand_profile_id"),
+                "style_preferences": {
+                    **shared_config.get("style_preferences", {}),
+                    **prompt_config.get("style_preferences", {}),
+                },
+                "desired_outputs": {
+                    **shared_config.get("desired_outputs", {"variants": 1, "dimensions": "1024x1024"}),
+                    "variants": 1,  # Force single variant per prompt
+                },
+            }
+
+            # Generate this single image
+            job_result = await self.base_orchestrator.start_generation(
+                user_id=user_id,
+                request=request,
+            )
+
+            # Extract the asset from the completed job
+            job_id = job_result.get("id")
+            if job_result.get("status") != "completed":
+                # Job didn't complete synchronously - this shouldn't happen with Gemini
+                return self._failure_event(
+                    batch_id, idx, total, label,
+                    error=f"Job status: {job_result.get('status')}",
+                    message=f"✗ {label} - unexpected status",
+                )
+
+            # Fetch the full job with assets
+            full_job = self.base_orchestrator.get_job(
+                job_id=job_id,
+                user_id=user_id,
+            )
+            assets = full_job.get("assets", []) if full_job else []
+            if not assets:
+                return self._failure_event(
+                    batch_id, idx, total, label,
+                    error="No assets returned",
+                    message=f"✗ {label} failed - no image generated",
+                )
+
+            asset = assets[0]
+            asset["label"] = label
+            asset["sequence_index"] = idx
+            return {
+                "type": "image_ready",
+                "data": {
+                    "batch_id": batch_id,
+                    "current": idx,
+                    "total": total,
+                    "label": label,
+                    "asset": asset,
+                    "job_id": job_id,
+                    "message": f"✓ {label} complete"
+                }
+            }
+
+        except Exception as e:
+            logger.error(f"Sequential generation failed for image {idx}: {e}", exc_info=True)
+            return self._failure_event(batch_id, idx, total, label, error=str(e), message=f"✗ {label} failed")
+
+    @staticmethod
+    def _generating_event(batch_id: str, idx: int, total: int, label: str) -> Dict[str, Any]:
+        return {
+            "type": "generating",
+            "data": {
+                "batch_id": batch_id,
+                "current": idx,
+                "total": total,
+                "label": label,
+                "message": f"Generating {label}..."
+            }
+        }
+
+    @staticmethod
+    def _failure_event(
+        batch_id: str,
+        idx: int,
+        total: int,
+        label: str,
+        *,
+        error: str,
+        message: str,
+    ) -> Dict[str, Any]:
+        return {
+            "type": "image_failed",
+            "data": {
+                "batch_id": batch_id,
+                "current": idx,
+                "total": total,
+                "label": label,
+                "error": error,
+                "message": message,
+            }
+        }
@@ -53,23 +53,19 @@ class StreamingOrchestrator:
                 analysis_type='review'
             )
             
-            # Phase 1 & 2: Use the PROVEN parallel method (competitors + reviews together)
-            logger.info(f"🔍 Starting PARALLEL competitor analysis")
+            # Phase 1: Competitor discovery (cached; one Outscraper search on a miss)
+            logger.info(f"🔍 Starting competitor discovery")
             
-            analysis_results = await asyncio.to_thread(
-                self.outscraper_service.analyze_competitors_parallel,
+            competitors = await asyncio.to_thread(
+                self.outscraper_service.discover_competitors,
                 location=request.location,
                 restaurant_name=request.restaurant_name,
                 category=request.category or "restaurant",
                 max_competitors=2 if request.tier.value == "free" else 5,
                 force_refresh=False,
                 excluded_place_ids=excluded_place_ids,
-                tier=request.tier.value
             )
             
-            competitors = analysis_results.get('competitors', [])
-            competitors_with_reviews = analysis_results.get('reviews', {})
-            
             if not competitors:
                 yield {
                     'type': 'error',
@@ -149,9 +145,36 @@ class StreamingOrchestrator:
                 }
             }
             
-            # Reviews are already collected by analyze_competitors_parallel!
-            total_reviews = sum(len(reviews) for reviews in competitors_with_reviews.values())
-            logger.info(f"📝 Reviews collected via parallel method: {total_reviews} total reviews")
+            # Phase 2: Reviews stream back as each competitor finishes
+            collected_reviews = {}
+            total_reviews = 0
+            async for competitor, reviews in self.outscraper_service.stream_competitor_reviews(
+                competitors,
+                force_refresh=False,
+                tier=request.tier.value
+            ):
+                collected_reviews[competitor.place_id] = reviews
+                total_reviews += len(reviews)
+                completed = len(collected_reviews)
+                yield {
+                    'type': 'competitor_reviews',
+                    'data': {
+                        'step': f'Collected {len(reviews)} reviews from {competitor.name} ({completed}/{len(competitors)})',
+                        'competitor_id': competitor.place_id,
+                        'competitor_name': competitor.name,
+                        'reviews_collected': len(reviews),
+                        'competitors_completed': completed,
+                        'total_competitors': len(competitors),
+                        'total_reviews': total_reviews,
+                        'progress': 20 + int(50 * completed / len(competitors))
+                    }
+                }
+            
+            # Keep discovery order for the LLM stage
+            competitors_with_reviews = {
+                comp.place_id: collected_reviews.get(comp.place_id, []) for comp in competitors
+            }
+            logger.info(f"📝 Reviews collected: {total_reviews} total reviews")
             
             # Store all reviews in database (batch operation)
             all_review_data = []
@@ -179,16 +202,6 @@ class StreamingOrchestrator:
                     on_conflict='competitor_id,source,external_id'
                 ).execute()
             
-            # Stream single progress update for review collection
-            yield {
-                'type': 'competitor_reviews',
-                'data': {
-                    'step': f'Collected {total_reviews} reviews from {len(competitors)} competitors',
-                    'total_reviews': total_reviews,
-                    'progress': 70
-                }
-            }
-            
             # Phase 3: LLM Analysis (streaming insights)
             logger.info(f"🧠 Starting LLM analysis with {total_reviews} reviews")
             
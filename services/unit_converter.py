@@ -3,13 +3,35 @@ Unit Converter Service
 Handles pack size parsing and unit conversions
 Pattern: Follows services/inventory_service.py structure
 """
+import os
 import re
-from typing import Dict, Optional, Tuple
+from functools import lru_cache
+from typing import Dict, Iterable, Optional, Tuple
 from decimal import Decimal
 import logging
 
+import numpy as np
+
 logger = logging.getLogger(__name__)
 
+# Distinct pack strings per account number in the hundreds; the cache is
+# shared process-wide so every converter instance benefits.
+PACK_PARSE_CACHE_SIZE = int(os.getenv("PACK_PARSE_CACHE_SIZE", "4096"))
+
+# Standard commercial can sizes in ounces (drained/usable weight)
+# #10 = 96 oz (6 lb), #6 = 104 oz (6.5 lb), #5 = 56 oz (3.5 lb)
+# #3 = 46 oz (2.875 lb), #2 = 20 oz (1.25 lb), #1 = 16 oz (1 lb)
+CAN_SIZES_OZ = {
+    '10': 96,   # #10 can = 96 oz (6 lb) - most common large can
+    '6': 104,   # #6 can = 104 oz (6.5 lb) - common for tomato products
+    '5': 56,    # #5 can = 56 oz (3.5 lb)
+    '3': 46,    # #3 can = 46 oz (2.875 lb)
+    '2': 20,    # #2 can = 20 oz (1.25 lb)
+    '1': 16,    # #1 can = 16 oz (1 lb)
+}
+
+_SIMPLE_CAN_RE = re.compile(r'^(?P<count>\d+)\s+(?P<can>10|6|5|3|2|1)\s*(?:cs|case)?$')
+
 
 class UnitConverter:
     """Convert between units and parse pack sizes"""
@@ -147,83 +169,64 @@ class UnitConverter:
             "10 lb" → {count: 1, size: 10, unit: 'lb', type: 'simple'}
             "24 ct" → {count: 24, size: 1, unit: 'ea', type: 'count'}
         
+        Results are memoized per normalized string (bounded LRU).
+        
         Returns:
             Dict with count, size, unit, type or None if can't parse
         """
         if not pack_size:
             return None
         
-        pack_size = pack_size.lower().strip()
-        
-        simple_can_match = re.match(r'^(?P<count>\d+)\s+(?P<can>10|6|5|3|2|1)\s*(?:cs|case)?$', pack_size)
-        if simple_can_match:
-            # Standard commercial can sizes in ounces (drained/usable weight)
-            # #10 = 96 oz (6 lb), #6 = 104 oz (6.5 lb), #5 = 56 oz (3.5 lb)
-            # #3 = 46 oz (2.875 lb), #2 = 20 oz (1.25 lb), #1 = 16 oz (1 lb)
-            can_sizes_oz = {
-                '10': 96,   # #10 can = 96 oz (6 lb) - most common large can
-                '6': 104,   # #6 can = 104 oz (6.5 lb) - common for tomato products
-                '5': 56,    # #5 can = 56 oz (3.5 lb)
-                '3': 46,    # #3 can = 46 oz (2.875 lb)
-                '2': 20,    # #2 can = 20 oz (1.25 lb)
-                '1': 16,    # #1 can = 16 oz (1 lb)
-            }
-            can_num = simple_can_match.group('can')
-            weight_oz = can_sizes_oz.get(can_num, 96)
-            return {
-                'count': int(simple_can_match.group('count')),
-                'size': Decimal(str(weight_oz)),
-                'unit': 'oz',
-                'type': 'can_size'
-            }
-        
-        for pattern, pattern_type in self.PACK_PATTERNS:
-            match = re.search(pattern, pack_size, re.IGNORECASE)
-            if match:
-                if pattern_type == 'multiply':
-                    return {
-                        'count': int(match.group(1)),
-                        'size': Decimal(match.group(2)),
-                        'unit': match.group(3).lower(),
-                        'type': 'multiply'
-                    }
-                elif pattern_type == 'can_size':
-                    # Standard commercial can sizes in ounces (drained/usable weight)
-                    # #10 = 96 oz (6 lb), #6 = 104 oz (6.5 lb), #5 = 56 oz (3.5 lb)
-                    # #3 = 46 oz (2.875 lb), #2 = 20 oz (1.25 lb), #1 = 16 oz (1 lb)
-                    can_sizes_oz = {
-                        '10': 96,   # #10 can = 96 oz (6 lb)
-                        '6': 104,   # #6 can = 104 oz (6.5 lb)
-                        '5': 56,    # #5 can = 56 oz (3.5 lb)
-                        '3': 46,    # #3 can = 46 oz (2.875 lb)
-                        '2': 20,    # #2 can = 20 oz (1.25 lb)
-                        '1': 16,    # #1 can = 16 oz (1 lb)
-                    }
-                    can_num = match.group(2)
-                    weight_oz = can_sizes_oz.get(can_num, 96)  # Default to #10 size
-                    return {
-                        'count': int(match.group(1)),
-                        'size': Decimal(str(weight_oz)),  # Keep in oz for accurate conversion
-                        'unit': 'oz',
-                        'type': 'can_size'
-                    }
-                elif pattern_type == 'simple':
-                    return {
-                        'count': 1,
-                        'size': Decimal(match.group(1)),
-                        'unit': match.group(2).lower(),
-                        'type': 'simple'
-                    }
-                elif pattern_type == 'count':
-                    return {
-                        'count': int(match.group(1)),
-                        'size': Decimal('1.0'),
-                        'unit': 'ea',
-                        'type': 'count'
-                    }
-        
-        logger.warning(f"Could not parse pack size: {pack_size}")
-        return None
+        parsed = _parse_pack_size_cached(pack_size.lower().strip())
+        if parsed is None:
+            return None
+        count, size, unit, pattern_type = parsed
+        return {'count': count, 'size': size, 'unit': unit, 'type': pattern_type}
+    
+    def parse_many(self, pack_sizes: Iterable[Optional[str]]) -> Dict[str, np.ndarray]:
+        """
+        Parse a batch of pack size strings into parallel arrays
+        
+        Each distinct string is parsed once. Unparseable or empty entries
+        have parsed=False, NaN count/size and None unit/type.
+        
+        Returns:
+            Dict of arrays: count, size (float64), unit, type (object), parsed (bool)
+        """
+        pack_sizes = list(pack_sizes)
+        n = len(pack_sizes)
+        counts = np.full(n, np.nan)
+        sizes = np.full(n, np.nan)
+        units = np.full(n, None, dtype=object)
+        types = np.full(n, None, dtype=object)
+        
+        distinct: Dict[str, Optional[Tuple]] = {}
+        for i, pack_size in enumerate(pack_sizes):
+            if not pack_size:
+                continue
+            key = pack_size.lower().strip()
+            if key not in distinct:
+                distinct[key] = _parse_pack_size_cached(key)
+            parsed = distinct[key]
+            if parsed is None:
+                continue
+            counts[i] = parsed[0]
+            sizes[i] = float(parsed[1])
+            units[i] = parsed[2]
+            types[i] = parsed[3]
+        
+        return {
+            'count': counts,
+            'size': sizes,
+            'unit': units,
+            'type': types,
+            'parsed': ~np.isnan(counts)
+        }
+    
+    @staticmethod
+    def parse_cache_info():
+        """Hit/miss statistics of the shared pack-size parse cache"""
+        return _parse_pack_size_cached.cache_info()
     
     def convert_to_base_units(self, quantity: Decimal, unit: str) -> Tuple[Decimal, str]:
         """
@@ -306,9 +309,7 @@ class UnitConverter:
         # Convert to base units
         total_base, base_unit = self.convert_to_base_units(total_original, parsed['unit'])
         
-        logger.info(
-            f"Converted: {quantity} × {pack_size} = {total_base:.2f} {base_unit}"
-        )
+        logger.debug("Converted: %s × %s = %.2f %s", quantity, pack_size, total_base, base_unit)
         
         return (total_base, base_unit)
     
@@ -415,21 +416,70 @@ class UnitConverter:
             total_weight = count * size
             unit_cost_per_weight = pack_price / total_weight
             
-            logger.info(
-                f"Calculated: ${pack_price} ÷ {count} pieces = ${unit_cost_per_piece:.4f}/ea, "
-                f"${pack_price} ÷ {total_weight} {parsed['unit']} = ${unit_cost_per_weight:.4f}/{parsed['unit']}"
+            logger.debug(
+                "Calculated: $%s ÷ %s pieces = $%.4f/ea, $%s ÷ %s %s = $%.4f/%s",
+                pack_price, count, unit_cost_per_piece,
+                pack_price, total_weight, parsed['unit'], unit_cost_per_weight, parsed['unit']
             )
         else:
             # Simple pack like "40 lb" - only weight cost
             total_qty = Decimal(str(parsed['count'])) * parsed['size']
             unit_cost_per_weight = pack_price / total_qty
             
-            logger.info(
-                f"Calculated unit cost: ${pack_price} ÷ {total_qty} {parsed['unit']} = ${unit_cost_per_weight:.4f}/{parsed['unit']}"
+            logger.debug(
+                "Calculated unit cost: $%s ÷ %s %s = $%.4f/%s",
+                pack_price, total_qty, parsed['unit'], unit_cost_per_weight, parsed['unit']
             )
         
         return (unit_cost_per_weight, parsed['unit'], unit_cost_per_piece, None)
     
+    def unit_costs_many(
+        self,
+        pack_prices: Iterable[Optional[float]],
+        pack_sizes: Iterable[Optional[str]]
+    ) -> Dict[str, np.ndarray]:
+        """
+        Vectorized calculate_unit_cost_from_pack over parallel price/size lists
+        
+        Costs are float64 (NaN where unavailable) rather than Decimal; the
+        error array carries the same messages as the scalar method.
+        
+        Returns:
+            Dict of arrays: unit_cost_per_weight, weight_unit,
+            unit_cost_per_piece, error
+        """
+        pack_sizes = list(pack_sizes)
+        prices = np.array(
+            [np.nan if price is None else float(price) for price in pack_prices],
+            dtype=np.float64
+        )
+        parsed = self.parse_many(pack_sizes)
+        n = len(pack_sizes)
+        
+        errors = np.full(n, None, dtype=object)
+        missing_size = np.array([not size for size in pack_sizes], dtype=bool)
+        bad_price = ~missing_size & ~(prices > 0)
+        unparsed = ~missing_size & ~bad_price & ~parsed['parsed']
+        errors[missing_size] = "Pack size not available"
+        errors[bad_price] = "Invalid pack price"
+        for i in np.flatnonzero(unparsed).tolist():
+            errors[i] = f"Could not parse pack size: {pack_sizes[i]}"
+        
+        ok = ~missing_size & ~bad_price & parsed['parsed']
+        with np.errstate(divide='ignore', invalid='ignore'):
+            per_weight = np.where(ok, prices / (parsed['count'] * parsed['size']), np.nan)
+            is_multi = ok & np.isin(parsed['type'], ['multiply', 'can_size'])
+            per_piece = np.where(is_multi, prices / parsed['count'], np.nan)
+        
+        weight_units = np.where(ok, parsed['unit'], None)
+        
+        return {
+            'unit_cost_per_weight': per_weight,
+            'weight_unit': weight_units,
+            'unit_cost_per_piece': per_piece,
+            'error': errors
+        }
+    
     def validate_unit_compatibility(
         self,
         recipe_unit: str,
@@ -518,3 +568,44 @@ class UnitConverter:
         )
         
         return (converted_qty, None)
+
+
+def _compile_pack_patterns():
+    return [
+        (re.compile(pattern, re.IGNORECASE), pattern_type)
+        for pattern, pattern_type in UnitConverter.PACK_PATTERNS
+    ]
+
+
+_COMPILED_PACK_PATTERNS = _compile_pack_patterns()
+
+
+@lru_cache(maxsize=PACK_PARSE_CACHE_SIZE)
+def _parse_pack_size_cached(pack_size: str) -> Optional[Tuple[int, Decimal, str, str]]:
+    """
+    Parse an already lower-cased, stripped pack size string
+    
+    Returns an immutable (count, size, unit, type) tuple so cached results
+    can't be mutated by callers; None if the string can't be parsed.
+    """
+    simple_can_match = _SIMPLE_CAN_RE.match(pack_size)
+    if simple_can_match:
+        weight_oz = CAN_SIZES_OZ.get(simple_can_match.group('can'), 96)
+        return (int(simple_can_match.group('count')), Decimal(str(weight_oz)), 'oz', 'can_size')
+    
+    for pattern, pattern_type in _COMPILED_PACK_PATTERNS:
+        match = pattern.search(pack_size)
+        if match:
+            if pattern_type == 'multiply':
+                return (int(match.group(1)), Decimal(match.group(2)), match.group(3).lower(), 'multiply')
+            elif pattern_type == 'can_size':
+                weight_oz = CAN_SIZES_OZ.get(match.group(2), 96)  # Default to #10 size
+                # Keep in oz for accurate conversion
+                return (int(match.group(1)), Decimal(str(weight_oz)), 'oz', 'can_size')
+            elif pattern_type == 'simple':
+                return (1, Decimal(match.group(1)), match.group(2).lower(), 'simple')
+            elif pattern_type == 'count':
+                return (int(match.group(1)), Decimal('1.0'), 'ea', 'count')
+    
+    logger.warning(f"Could not parse pack size: {pack_size}")
+    return None
@@ -4,15 +4,21 @@ Enforces free tier usage limits with atomic operations
 Pattern: Security-first, prevents all abuse vectors
 """
 import logging
+import os
+import threading
 from datetime import datetime, timedelta, timezone
 from typing import Dict, Optional, Tuple
 
 from zoneinfo import ZoneInfo
 
 from database.supabase_client import get_supabase_service_client
+from services.redis_client import cache
 
 logger = logging.getLogger(__name__)
 
+# Outstanding reservations expire if a batch dies without releasing them
+USAGE_RESERVATION_TTL_SECONDS = int(os.getenv("USAGE_RESERVATION_TTL_SECONDS", "900"))
+
 
 class UsageLimitService:
     """
@@ -35,6 +41,8 @@ class UsageLimitService:
     def __init__(self):
         self.client = get_supabase_service_client()
         self._est = ZoneInfo("America/New_York")
+        self._reservation_lock = threading.Lock()
+        self._local_reservations: Dict[str, int] = {}
     
     def check_limit(
         self,
@@ -166,6 +174,74 @@ class UsageLimitService:
             # Don't fail the operation if logging fails
             return False
     
+    def reserve_usage(
+        self,
+        user_id: str,
+        operation_type: str,
+        requested: int
+    ) -> Tuple[int, Dict]:
+        """
+        Reserve up to `requested` operations before running them concurrently
+
+        check_limit alone cannot guard a batch: parallel operations all check
+        before any of them increments. The reservation is taken against the
+        remaining allowance minus what the user's other in-flight batches
+        already hold. Each operation still calls increment_usage when it
+        succeeds; release one reservation per operation once it has finished.
+
+        Returns:
+            (granted: int, details: dict from check_limit)
+        """
+        allowed, details = self.check_limit(user_id, operation_type)
+        if not allowed or requested <= 0:
+            return 0, details
+
+        remaining = max(0, int(details.get('limit_value') or 0) - int(details.get('current_usage') or 0))
+        key = self._reservation_key(user_id, operation_type)
+
+        if cache.enabled:
+            try:
+                held = cache.client.incrby(key, requested)
+                cache.client.expire(key, USAGE_RESERVATION_TTL_SECONDS)
+                granted = max(0, min(requested, remaining - (held - requested)))
+                if granted < requested:
+                    cache.client.decrby(key, requested - granted)
+                return granted, details
+            except Exception as e:
+                logger.warning(f"Usage reservation unavailable in Redis, using local counter: {e}")
+
+        with self._reservation_lock:
+            held = self._local_reservations.get(key, 0)
+            granted = max(0, min(requested, remaining - held))
+            if granted:
+                self._local_reservations[key] = held + granted
+        return granted, details
+
+    def release_usage_reservation(self, user_id: str, operation_type: str, count: int = 1) -> None:
+        """Give back reservations taken by reserve_usage"""
+        if count <= 0:
+            return
+        key = self._reservation_key(user_id, operation_type)
+
+        if cache.enabled:
+            try:
+                if cache.client.decrby(key, count) <= 0:
+                    cache.client.delete(key)
+                return
+            except Exception as e:
+                logger.warning(f"Usage reservation release failed in Redis: {e}")
+
+        with self._reservation_lock:
+            held = self._local_reservations.get(key, 0) - count
+            if held > 0:
+                self._local_reservations[key] = held
+            else:
+                self._local_reservations.pop(key, None)
+
+    @staticmethod
+    def _reservation_key(user_id: str, operation_type: str) -> str:
+        return f"usage:reserved:{operation_type}:{user_id}"
+
     def get_usage_summary(self, user_id: str) -> Dict:
         """
         Get user's current usage summary
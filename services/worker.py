@@ -0,0 +1,97 @@
+"""
+Background worker entry point.
+
+Runs jobs queued through ``services.job_queue`` in a dedicated process so
+heavy recomputation scales independently of the web workers:
+
+    python -m services.worker
+"""
+from __future__ import annotations
+
+import logging
+import os
+import signal
+import time
+
+from dotenv import load_dotenv
+
+load_dotenv()
+
+import config.logging_config  # noqa: E402,F401  (configures root logging)
+from services.job_queue import get_job_queue  # noqa: E402
+
+# Importing registers the post-upload job handlers on the shared queue
+import services.background_tasks  # noqa: E402,F401
+from services.scheduling.heartbeat_buffer import (  # noqa: E402
+    HEARTBEAT_FLUSH_INTERVAL_SECONDS,
+    flush_heartbeats,
+)
+
+logger = logging.getLogger(__name__)
+
+WORKER_POLL_TIMEOUT_SECONDS = int(os.getenv("WORKER_POLL_TIMEOUT_SECONDS", "5"))
+WORKER_MAINTENANCE_INTERVAL_SECONDS = int(os.getenv("WORKER_MAINTENANCE_INTERVAL_SECONDS", "10"))
+
+
+class Worker:
+    """Single-threaded job loop with periodic job maintenance and heartbeat flushes."""
+
+    def __init__(self):
+        self.queue = get_job_queue()
+        self._running = False
+        self._last_maintenance = 0.0
+        self._last_heartbeat_flush = 0.0
+
+    def stop(self, *_args) -> None:
+        logger.info("🛑 Worker stopping after current job")
+        self._running = False
+
+    def _flush_heartbeats(self) -> None:
+        now = time.time()
+        if now - self._last_heartbeat_flush < HEARTBEAT_FLUSH_INTERVAL_SECONDS:
+            return
+        self._last_heartbeat_flush = now
+        try:
+            flush_heartbeats()
+        except Exception as exc:  # pylint: disable=broad-except
+            logger.error("Heartbeat flush failed: %s", exc)
+
+    def _maintain(self) -> None:
+        now = time.time()
+        if now - self._last_maintenance < WORKER_MAINTENANCE_INTERVAL_SECONDS:
+            return
+        self._last_maintenance = now
+        try:
+            promoted = self.queue.promote_delayed(now)
+            requeued = self.queue.requeue_stale(now)
+            if promoted or requeued:
+                logger.info("⏫ Promoted %d delayed / requeued %d stale jobs", promoted, requeued)
+        except Exception as exc:  # pylint: disable=broad-except
+            logger.error("Worker maintenance failed: %s", exc)
+
+    def run(self) -> None:
+        if not self.queue.enabled:
+            logger.error("❌ Job queue requires Redis; nothing to consume")
+            return
+
+        self._running = True
+        signal.signal(signal.SIGTERM, self.stop)
+        signal.signal(signal.SIGINT, self.stop)
+        logger.info("👷 Worker started (job types: %s)", ", ".join(self.queue.registered_types()))
+
+        while self._running:
+            self._maintain()
+            self._flush_heartbeats()
+            try:
+                self.queue.process_next(timeout=WORKER_POLL_TIMEOUT_SECONDS)
+            except Exception as exc:  # pylint: disable=broad-except
+                logger.error("Worker loop error: %s", exc)
+                time.sleep(1)
+
+
+def main() -> None:
+    Worker().run()
+
+
+if __name__ == "__main__":
+    main()